@@ -0,0 +1,152 @@
+# match_metadata_extractor.py: Single round-trip extraction of match page metadata.
+# Part of Phase 6 Overhaul (v2.8)
+# This script reads league, region, team and score fields from a Flashscore match page in one page.evaluate.
+
+"""
+Match Metadata Extractor
+The fields are declared once in METADATA_SPEC as (knowledge.json key, property)
+candidates per field, grouped by what they describe. The spec is resolved against
+the fs_match_page selectors and runs as a single in-page script. That script waits
+briefly for the match header, reads every requested group, times each group with
+performance.now(), and picks tournamentId out of the inline scripts (rather than
+transferring the whole HTML). Candidates are tried in order; the first non-empty
+value wins. Text is innerText, attributes are raw (as get_attribute returns them).
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from playwright.async_api import Page
+
+from Core.Intelligence.selector_db import knowledge_db
+
+CONTEXT = "fs_match_page"
+
+# field -> ordered (selector key, 'text' | attribute name) candidates, per group.
+METADATA_SPEC: Dict[str, Dict[str, List[Tuple[str, str]]]] = {
+    'league': {
+        'region': [('region_name', 'text')],
+        'region_flag': [('region_flag_img', 'src')],
+        'region_url': [('region_url', 'href')],
+        'league': [('league_url', 'text')],
+        'league_url': [('league_url', 'href')],
+    },
+    'teams': {
+        'home_name': [('home_name', 'text'), ('home_team', 'text')],
+        'home_url': [('home_url', 'href'), ('home_name', 'href')],
+        'home_crest': [('home_crest', 'src')],
+        'away_name': [('away_name', 'text'), ('away_team', 'text')],
+        'away_url': [('away_url', 'href'), ('away_name', 'href')],
+        'away_crest': [('away_crest', 'src')],
+    },
+    'score': {
+        'home_score': [('final_score_home', 'text'), ('header_score_home', 'text')],
+        'away_score': [('final_score_away', 'text'), ('header_score_away', 'text')],
+    },
+    'datetime': {
+        'match_time_text': [('match_time', 'text')],
+        'match_status': [('meta_match_status', 'text')],
+    },
+}
+WAIT_FOR_KEYS = ('match_header', 'league_url')  # Header is rendered once these exist
+DEFAULT_WAIT_MS = 2000
+
+_EXTRACT_SCRIPT = """
+async ({groups, waitFor, timeout}) => {
+    const started = performance.now();
+    const present = () => waitFor.every(s => { try { return !!document.querySelector(s); } catch (e) { return true; } });
+    while (!present() && performance.now() - started < timeout) {
+        await new Promise(resolve => setTimeout(resolve, 50));
+    }
+    const timings = {wait: performance.now() - started};
+    const read = (selector, prop) => {
+        let el = null;
+        try { el = document.querySelector(selector); } catch (e) { return null; }
+        if (!el) return null;
+        const value = prop === 'text' ? el.innerText : el.getAttribute(prop);
+        return value ? value.trim() || null : null;
+    };
+    const fields = {};
+    for (const [group, spec] of Object.entries(groups)) {
+        const t0 = performance.now();
+        for (const [name, candidates] of Object.entries(spec)) {
+            let value = null;
+            for (const [selector, prop] of candidates) {
+                value = read(selector, prop);
+                if (value) break;
+            }
+            fields[name] = value;
+        }
+        timings[group] = performance.now() - t0;
+    }
+    if (groups.league) {
+        const t0 = performance.now();
+        let tournamentId = null;
+        for (const script of document.querySelectorAll('script:not([src])')) {
+            const m = /tournamentId[:\\s]+'([^']+)'/.exec(script.textContent || '');
+            if (m) { tournamentId = m[1]; break; }
+        }
+        fields.tournament_id = tournamentId;
+        timings.tournament_id = performance.now() - t0;
+    }
+    return {fields, timings};
+}
+"""
+
+
+@dataclass
+class MatchMetadata:
+    """Metadata read from one match page; None where the page (or the spec) has no value."""
+    region: Optional[str] = None
+    region_flag: Optional[str] = None
+    region_url: Optional[str] = None
+    league: Optional[str] = None
+    league_url: Optional[str] = None
+    tournament_id: Optional[str] = None
+    home_name: Optional[str] = None
+    home_url: Optional[str] = None
+    home_crest: Optional[str] = None
+    away_name: Optional[str] = None
+    away_url: Optional[str] = None
+    away_crest: Optional[str] = None
+    home_score: Optional[str] = None
+    away_score: Optional[str] = None
+    match_time_text: Optional[str] = None
+    match_status: Optional[str] = None
+    timings: Dict[str, float] = field(default_factory=dict)  # Seconds per group, plus 'wait' and 'round_trip'
+
+
+def build_spec(groups: Iterable[str], selectors: Optional[Dict[str, str]] = None) -> Dict[str, Dict[str, List[Tuple[str, str]]]]:
+    """METADATA_SPEC groups with knowledge keys replaced by CSS selectors (unknown keys dropped)."""
+    lookup = {**knowledge_db.get(CONTEXT, {}), **(selectors or {})}
+    resolved = {}
+    for group in groups:
+        resolved[group] = {
+            name: [(lookup[key], prop) for key, prop in candidates if lookup.get(key)]
+            for name, candidates in METADATA_SPEC[group].items()
+        }
+    return resolved
+
+
+async def extract_match_metadata(page: Page, groups: Iterable[str] = tuple(METADATA_SPEC),
+                                 selectors: Optional[Dict[str, str]] = None,
+                                 wait_ms: int = DEFAULT_WAIT_MS) -> MatchMetadata:
+    """
+    Reads the requested field groups in one page.evaluate.
+    'selectors' overrides fs_match_page entries from knowledge.json (e.g. freshly healed ones).
+    """
+    groups = [g for g in groups if g in METADATA_SPEC]
+    lookup = {**knowledge_db.get(CONTEXT, {}), **(selectors or {})}
+    wait_for = [lookup[k] for k in WAIT_FOR_KEYS if lookup.get(k)]
+
+    started = time.perf_counter()
+    result = await page.evaluate(_EXTRACT_SCRIPT, {
+        'groups': build_spec(groups, selectors), 'waitFor': wait_for, 'timeout': wait_ms,
+    })
+    round_trip = time.perf_counter() - started
+
+    fields = {k: v for k, v in (result.get('fields') or {}).items() if k in MatchMetadata.__dataclass_fields__}
+    timings = {name: ms / 1000.0 for name, ms in (result.get('timings') or {}).items()}
+    timings['round_trip'] = round_trip
+    return MatchMetadata(**fields, timings=timings)
@@ -0,0 +1,208 @@
+# context_pool.py: Persistent browser with a pool of reusable contexts and pages.
+# Refactored for Clean Architecture (v2.8)
+# This script shares one Chromium across a whole run and sizes its worker pool to host headroom.
+
+"""
+Context Pool Module
+One browser per run, a pool of contexts (one reusable page each) and an adaptive
+concurrency limit (Core/Utils/task_pool.ConcurrencyController).
+
+Workers check a page out with `async with pool.page() as page:`. On return the page
+is reset to about:blank and parked for the next fixture; a context is recycled after
+CONTEXT_MAX_USES fixtures or when its page crashed. The number of pages in flight is
+re-evaluated every window of completed tasks from CPU busy time, available memory,
+page latency and error rate: it grows by one while the host has headroom and latency
+holds, and backs off by a quarter under pressure.
+"""
+
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Union
+
+from playwright.async_api import Browser, BrowserContext, Page, Playwright
+
+from Core.Utils.task_pool import AdaptiveTaskPool, ConcurrencyController, default_max_workers
+from .resource_router import apply_resource_profile
+
+# --- Pool Configuration ---
+CONTEXT_MAX_USES = int(os.getenv('LEO_POOL_CONTEXT_MAX_USES', 50))     # Fixtures per context before it is recycled
+
+LAUNCH_ARGS = ['--disable-gpu', '--no-sandbox', '--disable-setuid-sandbox', '--disable-dev-shm-usage']
+CONTEXT_OPTIONS = {
+    'viewport': {'width': 1280, 'height': 720},
+    'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+    'ignore_https_errors': True,
+}
+
+
+class StageTimings:
+    """Accumulated wall time and call counts per named stage."""
+
+    def __init__(self):
+        self.totals: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+
+    @asynccontextmanager
+    async def stage(self, name: str) -> AsyncIterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started)
+
+    def add(self, name: str, seconds: float):
+        self.totals[name] = self.totals.get(name, 0.0) + seconds
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+    def report(self, indent: str = "  ") -> str:
+        lines = []
+        for name, total in self.totals.items():
+            count = self.counts[name]
+            lines.append(f"{indent}{name:<14} {total:9.1f}s total  {total / count * 1000:8.0f}ms avg  ({count} calls)")
+        return "\n".join(lines)
+
+
+class _Slot:
+    __slots__ = ('context', 'page', 'uses')
+
+    def __init__(self, context: BrowserContext, page: Page):
+        self.context, self.page, self.uses = context, page, 0
+
+
+class BrowserPool:
+    """
+    One launched browser shared by every worker of a run.
+    Use as `async with BrowserPool(playwright) as pool:`.
+    """
+
+    def __init__(self, playwright: Playwright, *, min_workers: int = 2, max_workers: Optional[int] = None,
+                 initial: Optional[int] = None, adaptive: bool = True, max_uses: int = CONTEXT_MAX_USES,
+                 context_options: Optional[Dict[str, Any]] = None, launch_args: Optional[List[str]] = None,
+                 headless: bool = True, resource_profile: Optional[str] = None, chapter: str = 'General'):
+        self.playwright = playwright
+        self.controller = ConcurrencyController(min_workers, max_workers or default_max_workers(), initial, adaptive)
+        self.max_uses = max(1, max_uses)
+        self.context_options = dict(CONTEXT_OPTIONS if context_options is None else context_options)
+        self.launch_args = LAUNCH_ARGS if launch_args is None else launch_args
+        self.headless = headless
+        self.resource_profile = resource_profile    # resource_router site profile applied to every context
+        self.chapter = chapter
+        self.browser: Optional[Browser] = None
+        self._idle: List[_Slot] = []
+        self._in_flight = 0
+        self._cond = asyncio.Condition()
+        self.stats = {'tasks': 0, 'failures': 0, 'contexts_created': 0, 'contexts_recycled': 0}
+        self.tasks: Optional[AdaptiveTaskPool] = None   # Scheduler of the latest map()
+
+    async def start(self) -> "BrowserPool":
+        if self.browser is None:
+            self.browser = await self.playwright.chromium.launch(headless=self.headless, args=self.launch_args)
+        return self
+
+    async def close(self):
+        for slot in self._idle:
+            await self._discard(slot, count=False)
+        self._idle = []
+        if self.browser is not None:
+            try:
+                await self.browser.close()
+            except Exception:
+                pass
+            self.browser = None
+
+    async def __aenter__(self) -> "BrowserPool":
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    @property
+    def limit(self) -> int:
+        return self.controller.limit
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    # --- Slots ---
+
+    async def _new_slot(self) -> _Slot:
+        context = await self.browser.new_context(**self.context_options)
+        if self.resource_profile:
+            await apply_resource_profile(context, self.resource_profile, self.chapter)
+        self.stats['contexts_created'] += 1
+        return _Slot(context, await context.new_page())
+
+    async def _discard(self, slot: _Slot, count: bool = True):
+        if count:
+            self.stats['contexts_recycled'] += 1
+        try:
+            await slot.context.close()
+        except Exception:
+            pass
+
+    async def _checkin(self, slot: _Slot, healthy: bool):
+        slot.uses += 1
+        if not healthy or slot.page.is_closed() or slot.uses >= self.max_uses:
+            await self._discard(slot)
+            return
+        try:
+            # Drop the previous fixture's DOM, timers and sockets before the next one.
+            await slot.page.goto('about:blank')
+        except Exception:
+            await self._discard(slot)
+            return
+        if len(self._idle) >= self.limit:
+            await self._discard(slot)  # The pool shrank while this page was busy
+            return
+        self._idle.append(slot)
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[Page]:
+        """Checks out a page once the adaptive limit admits another worker."""
+        await self.start()
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+        slot = None
+        healthy = False
+        started = time.monotonic()
+        try:
+            slot = self._idle.pop() if self._idle else await self._new_slot()
+            yield slot.page
+            healthy = True
+        finally:
+            self.stats['tasks'] += 1
+            self.stats['failures'] += 0 if healthy else 1
+            self.controller.record(time.monotonic() - started, healthy)
+            if slot is not None:
+                await self._checkin(slot, healthy)
+            async with self._cond:
+                self._in_flight -= 1
+                self._cond.notify_all()
+
+    async def map(self, func: Callable[[Page, Any], Awaitable[Any]], items: Union[Iterable[Any], AsyncIterable[Any]],
+                  timeout: Optional[float] = None, retries: int = 0) -> AsyncIterator[Any]:
+        """
+        Runs func(page, item) for every item and yields results in completion order.
+        Scheduling goes through an AdaptiveTaskPool sharing this pool's controller, so
+        items are pulled only as pages free up, each task can carry a deadline and
+        failures are retried with backoff. The consumer's own awaits (saves, syncs)
+        never stall the workers. Tasks that fail every attempt are skipped.
+        """
+        async def run(item):
+            async with self.page() as page:
+                return await func(page, item)
+
+        # page() already reports latency and health to the controller.
+        self.tasks = AdaptiveTaskPool(self.chapter, controller=self.controller, feedback=False,
+                                      timeout=timeout, retries=retries)
+        results = self.tasks.map(run, items)
+        try:
+            async for _, result in results:
+                if result is not None:
+                    yield result
+        finally:
+            await results.aclose()
@@ -0,0 +1,236 @@
+# resource_router.py: Request interception and resource blocking for Playwright contexts.
+# Refactored for Clean Architecture (v2.8)
+# This script drops assets the scrapers never read and serves static JS/CSS from a local cache.
+
+"""
+Resource Router Module
+Per-site routing profiles applied to every scraping context.
+
+The scrapers only read DOM text and attributes, so images, fonts, media and
+third-party ad/analytics traffic are aborted before they leave the browser
+(an <img> keeps its src attribute, so crest URLs are still extracted). Each site
+profile lists:
+  block_types    - Playwright resource types to abort
+  deny_domains   - third-party domains aborted for every resource type
+  allow_domains  - domains never blocked (consent managers, captchas, ...)
+  cache_domains  - hosts whose script/stylesheet responses may be served from disk
+
+Profiles can be overridden per site with a JSON file (LEO_RESOURCE_PROFILES) and
+the whole layer switched off with LEO_BLOCK_RESOURCES=0. The static cache is
+opt-in (LEO_STATIC_CACHE=1). Requests and bytes saved are counted per chapter;
+blocked bytes are estimated from typical asset sizes, cache hits are exact.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+from playwright.async_api import BrowserContext, Route
+
+# --- Routing Configuration ---
+_project_root = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+BLOCK_RESOURCES = os.getenv('LEO_BLOCK_RESOURCES', '1').lower() not in ('0', 'false', 'no')
+PROFILES_FILE = os.getenv('LEO_RESOURCE_PROFILES', os.path.join(_project_root, "Config", "resource_profiles.json"))
+STATIC_CACHE = os.getenv('LEO_STATIC_CACHE', '0').lower() in ('1', 'true', 'yes')
+STATIC_CACHE_DIR = os.getenv('LEO_STATIC_CACHE_DIR', os.path.join(_project_root, "Data", "Store", "static_cache"))
+STATIC_CACHE_MAX_BYTES = int(os.getenv('LEO_STATIC_CACHE_MAX_BYTES', 5 * 1024 * 1024))  # Largest single file cached
+
+# Typical transfer size of an aborted request, by resource type (for the bytes-saved estimate).
+ESTIMATED_BYTES = {
+    'image': 20_000, 'media': 250_000, 'font': 35_000, 'stylesheet': 15_000,
+    'script': 40_000, 'xhr': 3_000, 'fetch': 3_000, 'other': 5_000,
+}
+
+_AD_ANALYTICS_DOMAINS = [
+    'doubleclick.net', 'googlesyndication.com', 'googleadservices.com', 'googletagmanager.com',
+    'googletagservices.com', 'google-analytics.com', 'adservice.google.com', 'amazon-adsystem.com',
+    'adnxs.com', 'criteo.com', 'criteo.net', 'pubmatic.com', 'rubiconproject.com', 'openx.net',
+    'casalemedia.com', 'taboola.com', 'outbrain.com', 'scorecardresearch.com', 'quantserve.com',
+    'hotjar.com', 'facebook.net', 'connect.facebook.net', 'clarity.ms', 'moatads.com', 'smartadserver.com',
+    'adform.net', 'teads.tv', 'yieldlove.com', 'id5-sync.com', 'gemius.pl', 'chartbeat.com', 'newrelic.com',
+]
+
+DEFAULT_PROFILES: Dict[str, Dict[str, List[str]]] = {
+    'flashscore': {
+        'block_types': ['image', 'media', 'font'],
+        'deny_domains': _AD_ANALYTICS_DOMAINS,
+        'allow_domains': ['cookielaw.org', 'onetrust.com'],
+        'cache_domains': ['static.flashscore.com'],
+    },
+    'football_com': {
+        # Images stay: booking flows click visual elements and AI healing reads screenshots.
+        'block_types': ['media', 'font'],
+        'deny_domains': _AD_ANALYTICS_DOMAINS,
+        'allow_domains': ['google.com/recaptcha', 'gstatic.com', 'hcaptcha.com', 'cloudflare.com'],
+        'cache_domains': [],
+    },
+    'default': {
+        'block_types': ['media', 'font'],
+        'deny_domains': _AD_ANALYTICS_DOMAINS,
+        'allow_domains': [],
+        'cache_domains': [],
+    },
+}
+
+_profiles: Optional[Dict[str, Dict[str, List[str]]]] = None
+_stats: Dict[str, Dict[str, int]] = {}
+
+
+def load_profiles() -> Dict[str, Dict[str, List[str]]]:
+    """Default profiles with any per-site keys from PROFILES_FILE laid over them."""
+    global _profiles
+    if _profiles is None:
+        profiles = {site: {k: list(v) for k, v in p.items()} for site, p in DEFAULT_PROFILES.items()}
+        if os.path.exists(PROFILES_FILE):
+            try:
+                with open(PROFILES_FILE, 'r', encoding='utf-8') as f:
+                    for site, overrides in json.load(f).items():
+                        profiles.setdefault(site, {k: list(v) for k, v in DEFAULT_PROFILES['default'].items()})
+                        profiles[site].update({k: list(v) for k, v in overrides.items()})
+            except Exception as e:
+                print(f"    [Resource Router] Ignoring {os.path.basename(PROFILES_FILE)}: {e}")
+        _profiles = profiles
+    return _profiles
+
+
+def _matches(host: str, path: str, patterns: List[str]) -> bool:
+    """Domain suffix match ('doubleclick.net'), or host+path substring when the pattern has a '/'."""
+    for pattern in patterns:
+        if '/' in pattern:
+            if pattern in host + path:
+                return True
+        elif host == pattern or host.endswith('.' + pattern):
+            return True
+    return False
+
+
+def _counter(chapter: str) -> Dict[str, int]:
+    return _stats.setdefault(chapter, {
+        'requests': 0, 'blocked': 0, 'blocked_bytes_est': 0,
+        'cache_hits': 0, 'cache_bytes': 0, 'cache_stores': 0,
+    })
+
+
+def _cache_path(url: str) -> str:
+    digest = hashlib.sha1(url.encode('utf-8')).hexdigest()
+    return os.path.join(STATIC_CACHE_DIR, digest[:2], digest)
+
+
+def _read_cache(url: str) -> Optional[Dict[str, Any]]:
+    path = _cache_path(url)
+    try:
+        with open(path + '.json', 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        with open(path, 'rb') as f:
+            meta['body'] = f.read()
+        return meta
+    except (OSError, ValueError):
+        return None
+
+
+def _write_cache(url: str, content_type: str, body: bytes):
+    path = _cache_path(url)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Body first, metadata last: a half-written entry is never read as a hit.
+    for target, data, mode in ((path, body, 'wb'), (path + '.json', json.dumps({'content_type': content_type}), 'w')):
+        tmp = f"{target}.{os.getpid()}.tmp"
+        with open(tmp, mode) as f:
+            f.write(data)
+        os.replace(tmp, target)
+
+
+class ResourceRouter:
+    """Route handler for one context: applies a site profile and counts what it saved."""
+
+    def __init__(self, site: str = 'default', chapter: str = 'General'):
+        profiles = load_profiles()
+        profile = profiles.get(site, profiles['default'])
+        self.site = site
+        self.chapter = chapter
+        self.block_types = set(profile.get('block_types', []))
+        self.deny_domains = list(profile.get('deny_domains', []))
+        self.allow_domains = list(profile.get('allow_domains', []))
+        self.cache_domains = list(profile.get('cache_domains', [])) if STATIC_CACHE else []
+
+    async def handle(self, route: Route):
+        request = route.request
+        stats = _counter(self.chapter)
+        stats['requests'] += 1
+        url = request.url
+        if not url.startswith('http'):
+            await route.continue_()
+            return
+
+        parsed = urlparse(url)
+        host, path = (parsed.hostname or '').lower(), parsed.path
+        resource_type = request.resource_type
+        if not _matches(host, path, self.allow_domains) and (
+                resource_type in self.block_types or _matches(host, path, self.deny_domains)):
+            stats['blocked'] += 1
+            stats['blocked_bytes_est'] += ESTIMATED_BYTES.get(resource_type, ESTIMATED_BYTES['other'])
+            await route.abort('blockedbyclient')
+            return
+
+        if (self.cache_domains and resource_type in ('script', 'stylesheet') and request.method == 'GET'
+                and _matches(host, path, self.cache_domains)):
+            await self._serve_cached(route, url, stats)
+            return
+
+        await route.continue_()
+
+    async def _serve_cached(self, route: Route, url: str, stats: Dict[str, int]):
+        cached = await asyncio.to_thread(_read_cache, url)
+        if cached is not None:
+            stats['cache_hits'] += 1
+            stats['cache_bytes'] += len(cached['body'])
+            await route.fulfill(status=200, content_type=cached.get('content_type') or None, body=cached['body'])
+            return
+        try:
+            response = await route.fetch()
+            body = await response.body()
+        except Exception:
+            await route.continue_()
+            return
+        if response.status == 200 and len(body) <= STATIC_CACHE_MAX_BYTES:
+            try:
+                await asyncio.to_thread(_write_cache, url, response.headers.get('content-type', ''), body)
+                stats['cache_stores'] += 1
+            except OSError as e:
+                print(f"    [Resource Router] Could not cache {url}: {e}")
+        await route.fulfill(response=response, body=body)
+
+
+async def apply_resource_profile(context: BrowserContext, site: str = 'default', chapter: str = 'General') -> Optional[ResourceRouter]:
+    """Routes every request of the context through the site's profile. No-op when LEO_BLOCK_RESOURCES=0."""
+    if not BLOCK_RESOURCES:
+        return None
+    router = ResourceRouter(site, chapter)
+    try:
+        await context.route("**/*", router.handle)
+    except Exception as e:
+        print(f"    [Resource Router] Could not attach to context: {e}")
+        return None
+    return router
+
+
+def resource_stats(chapter: Optional[str] = None) -> Dict[str, Any]:
+    """Counters for one chapter, or every chapter keyed by name."""
+    if chapter is not None:
+        return dict(_counter(chapter))
+    return {name: dict(counts) for name, counts in _stats.items()}
+
+
+def print_resource_report(chapter: str):
+    """One-line summary of requests blocked and bytes saved in a chapter."""
+    stats = _stats.get(chapter)
+    if not stats or not stats['requests']:
+        return
+    saved_mb = (stats['blocked_bytes_est'] + stats['cache_bytes']) / (1024 * 1024)
+    line = (f"  [Resource Router] {chapter}: blocked {stats['blocked']}/{stats['requests']} requests, "
+            f"~{saved_mb:.1f} MB saved")
+    if stats['cache_hits'] or stats['cache_stores']:
+        line += f" ({stats['cache_hits']} static cache hits, {stats['cache_stores']} stored)"
+    print(line)
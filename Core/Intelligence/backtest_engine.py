@@ -0,0 +1,305 @@
+# backtest_engine.py: Multi-core backtest runner for RuleConfig sweeps.
+# Refactored for Clean Architecture (v2.8)
+# This script scores RuleConfig variants against every finished fixture across all cores.
+
+"""
+Backtest Engine Module
+Evaluates grids or random samples of RuleConfig variants over finished fixtures.
+Responsible for hit rate, ROI and calibration per config and per league.
+
+Analysis inputs are built once, point-in-time, from the shared HistoryIndex
+(form / H2H strictly before each fixture's date) and handed read-only to a
+ProcessPoolExecutor: with the fork start method workers inherit them without a
+copy. Each task runs RuleEngine.analyze_many for one config over one shard of
+fixtures, grades the picks with prediction_evaluator.evaluate_prediction and
+returns only aggregate counters, which the parent merges and writes to
+backtest_results.csv as one columnar batch.
+
+ROI uses a 1-unit flat stake, like the accuracy reports: the odds stored in
+predictions.csv when the variant makes the same pick, BACKTEST_DEFAULT_ODDS otherwise.
+"""
+
+import itertools
+import math
+import os
+import random
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import fields, replace
+from datetime import datetime as dt
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .rule_config import RuleConfig
+from .rule_engine import RuleEngine
+
+# --- Backtest Configuration ---
+BACKTEST_WORKERS = int(os.getenv('LEO_BACKTEST_WORKERS', 0)) or (os.cpu_count() or 1)
+BACKTEST_DEFAULT_ODDS = float(os.getenv('LEO_BACKTEST_DEFAULT_ODDS', 2.0))   # Same fallback as the accuracy report
+BACKTEST_MIN_SHARD = int(os.getenv('LEO_BACKTEST_MIN_SHARD', 500))           # Fixtures per task, at least
+MIN_FORM_MATCHES = 3                                                          # fs_offline data-quality threshold
+
+CONFIDENCE_LABELS = ("Low", "Medium", "High", "Very High")
+WEIGHT_FIELDS = [f.name for f in fields(RuleConfig) if f.type in (float, 'float')]
+
+# Fixture tuple: (fixture_id, date, region_league, home, away, actual_score, stored_prediction, stored_odds)
+Fixture = Tuple[str, str, str, str, str, str, str, float]
+
+
+# --- Config Variants ---
+
+def config_grid(grid: Dict[str, Iterable[Any]], base: Optional[RuleConfig] = None) -> List[RuleConfig]:
+    """Cartesian product of field values on top of base, one named RuleConfig per combination."""
+    base = base or RuleConfig()
+    names = list(grid)
+    configs = []
+    for i, values in enumerate(itertools.product(*(list(grid[n]) for n in names))):
+        configs.append(replace(base, name=f"{base.name}_g{i}", **dict(zip(names, values))))
+    return configs
+
+
+def config_sample(n: int, spread: float = 0.5, seed: Optional[int] = None, base: Optional[RuleConfig] = None,
+                  fields_to_vary: Optional[List[str]] = None) -> List[RuleConfig]:
+    """n random variants: each weight scaled by a uniform factor in [1 - spread, 1 + spread]."""
+    base = base or RuleConfig()
+    rng = random.Random(seed)
+    vary = fields_to_vary or WEIGHT_FIELDS
+    configs = []
+    for i in range(n):
+        changes = {f: round(getattr(base, f) * rng.uniform(1 - spread, 1 + spread), 3) for f in vary}
+        configs.append(replace(base, name=f"{base.name}_s{i}", **changes))
+    return configs
+
+
+# --- Fixture Preparation ---
+
+def _float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def prepare_fixtures(point_in_time: bool = True, limit: Optional[int] = None) -> Tuple[List[Fixture], List[Dict[str, Any]]]:
+    """
+    Builds (fixtures, analysis inputs) for every finished, dated fixture with enough form.
+    point_in_time=False reproduces the old backtest, which also saw the fixture's own result.
+    """
+    from Data.Access.db_helpers import PREDICTIONS_CSV, get_all_schedules
+    from Data.Access.history_index import get_history_index, is_finished
+    from Data.Access.table_store import get_table
+
+    history = get_history_index()
+    stored = {r.get('fixture_id'): (r.get('prediction', ''), _float(r.get('odds')))
+              for r in get_table(PREDICTIONS_CSV, key='fixture_id').rows()}
+
+    fixtures: List[Fixture] = []
+    inputs: List[Dict[str, Any]] = []
+    for m in get_all_schedules():
+        if not is_finished(m):
+            continue
+        date = m.get('date', '')
+        try:
+            dt.strptime(date, "%d.%m.%Y")
+        except (TypeError, ValueError):
+            continue
+        home_team, away_team = m.get('home_team'), m.get('away_team')
+        region_league = m.get('region_league', 'Unknown')
+        before = date if point_in_time else None
+        home_last_10 = history.team_matches(home_team, limit=10, before=before)
+        away_last_10 = history.team_matches(away_team, limit=10, before=before)
+        if len(home_last_10) < MIN_FORM_MATCHES or len(away_last_10) < MIN_FORM_MATCHES:
+            continue
+
+        prediction, odds = stored.get(m.get('fixture_id'), ('', 0.0))
+        fixtures.append((m.get('fixture_id'), date, region_league, home_team, away_team,
+                         f"{m.get('home_score')}-{m.get('away_score')}", prediction, odds))
+        inputs.append({
+            "h2h_data": {
+                "home_team": home_team,
+                "away_team": away_team,
+                "home_last_10_matches": home_last_10,
+                "away_last_10_matches": away_last_10,
+                "head_to_head": history.head_to_head(home_team, away_team, before=before),
+                "region_league": region_league,
+                "reference_date": before  # H2H lookback counts back from the fixture date
+            },
+            "standings": history.standings(region_league)
+        })
+        if limit and len(fixtures) >= limit:
+            break
+    return fixtures, inputs
+
+
+# --- Scoring ---
+
+def _new_counters() -> Dict[str, Any]:
+    return {'fixtures': 0, 'predicted': 0, 'evaluated': 0, 'correct': 0, 'profit': 0.0, 'brier': 0.0,
+            'calibration': {label: [0, 0] for label in CONFIDENCE_LABELS}}
+
+
+def _merge(into: Dict[str, Any], other: Dict[str, Any]):
+    for k in ('fixtures', 'predicted', 'evaluated', 'correct', 'profit', 'brier'):
+        into[k] += other[k]
+    for label, (n, hits) in other['calibration'].items():
+        slot = into['calibration'].setdefault(label, [0, 0])
+        slot[0] += n
+        slot[1] += hits
+
+
+def _confidence_score(prediction: Dict[str, Any]) -> float:
+    """Raw probability of the selected market (before league calibration)."""
+    for market in (prediction.get('betting_markets') or {}).values():
+        if market.get('market_prediction') == prediction.get('market_prediction') and \
+                market.get('market_type') == prediction.get('market_type'):
+            return float(market.get('confidence_score', 0.5))
+    return 0.5
+
+
+def score_shard(config: RuleConfig, fixtures: List[Fixture], inputs: List[Dict[str, Any]],
+                keep_predictions: bool = False) -> Tuple[Dict[str, Dict[str, Any]], List[Dict[str, Any]]]:
+    """Predicts and grades one shard. Returns (counters per league plus 'ALL', optional prediction rows)."""
+    from Data.Access.prediction_evaluator import evaluate_prediction
+
+    scopes: Dict[str, Dict[str, Any]] = {'ALL': _new_counters()}
+    rows: List[Dict[str, Any]] = []
+    for fixture, prediction in zip(fixtures, RuleEngine.analyze_many(inputs, config)):
+        fixture_id, date, region_league, home_team, away_team, actual_score, stored_prediction, stored_odds = fixture
+        targets = (scopes['ALL'], scopes.setdefault(region_league, _new_counters()))
+        for c in targets:
+            c['fixtures'] += 1
+        pick = prediction.get('type', 'SKIP')
+        if pick == 'SKIP':
+            continue
+        correct = evaluate_prediction(pick, actual_score, home_team, away_team)
+        if keep_predictions:
+            rows.append({
+                'fixture_id': fixture_id, 'date': date, 'home_team': home_team, 'away_team': away_team,
+                'prediction': pick, 'confidence': prediction.get('confidence', 'Low'),
+                'actual_score': actual_score, 'outcome_correct': 'N/A' if correct is None else str(correct),
+                'config_name': config.name
+            })
+        odds = stored_odds if stored_prediction == pick and stored_odds > 1 else BACKTEST_DEFAULT_ODDS
+        score = _confidence_score(prediction)
+        label = prediction.get('confidence', 'Low')
+        for c in targets:
+            c['predicted'] += 1
+            if correct is None:
+                continue
+            c['evaluated'] += 1
+            c['correct'] += int(correct)
+            c['profit'] += (odds - 1) if correct else -1.0
+            c['brier'] += (score - float(correct)) ** 2
+            slot = c['calibration'].setdefault(label, [0, 0])
+            slot[0] += 1
+            slot[1] += int(correct)
+    return scopes, rows
+
+
+def _summary(config: RuleConfig, scope: str, c: Dict[str, Any]) -> Dict[str, Any]:
+    evaluated = c['evaluated']
+    row = {
+        'config_name': config.name,
+        'scope': scope,
+        'fixtures': c['fixtures'],
+        'predicted': c['predicted'],
+        'evaluated': evaluated,
+        'correct': c['correct'],
+        'hit_rate': round(c['correct'] / evaluated * 100, 2) if evaluated else 0.0,
+        'roi_pct': round(c['profit'] / evaluated * 100, 2) if evaluated else 0.0,
+        'brier': round(c['brier'] / evaluated, 4) if evaluated else None,
+    }
+    for label in CONFIDENCE_LABELS:
+        n, hits = c['calibration'].get(label, [0, 0])
+        key = label.lower().replace(' ', '_')
+        row[f'n_{key}'] = n
+        row[f'hit_{key}'] = round(hits / n * 100, 2) if n else None
+    return row
+
+
+# --- Process Pool ---
+
+_shared: Dict[str, Any] = {}
+
+
+def _init_worker(fixtures: List[Fixture], inputs: List[Dict[str, Any]]):
+    _shared['fixtures'], _shared['inputs'] = fixtures, inputs
+
+
+def _run_task(config: RuleConfig, lo: int, hi: int, keep_predictions: bool):
+    scopes, rows = score_shard(config, _shared['fixtures'][lo:hi], _shared['inputs'][lo:hi], keep_predictions)
+    return config.name, scopes, rows
+
+
+def run_backtest(configs: List[RuleConfig], workers: Optional[int] = None, point_in_time: bool = True,
+                 limit: Optional[int] = None, write: bool = True,
+                 keep_predictions: bool = False) -> Dict[str, Any]:
+    """
+    Evaluates every config over all finished fixtures.
+    Returns {'run_id', 'results' (one summary row per config x scope, 'ALL' first), 'predictions'}.
+    keep_predictions collects per-fixture rows per config (meant for single-config runs).
+    """
+    names = [c.name for c in configs]
+    if len(set(names)) != len(names):
+        raise ValueError("Backtest configs need unique names")
+
+    started = time.perf_counter()
+    fixtures, inputs = prepare_fixtures(point_in_time=point_in_time, limit=limit)
+    workers = max(1, workers or BACKTEST_WORKERS)
+    print(f"    [Backtest] {len(configs)} configs x {len(fixtures)} fixtures on {workers} worker(s) "
+          f"(inputs built in {time.perf_counter() - started:.1f}s)")
+
+    # Enough shards to keep every core busy, but not so small that IPC dominates.
+    n_shards = max(1, min(math.ceil(2 * workers / max(1, len(configs))), math.ceil(len(fixtures) / BACKTEST_MIN_SHARD)))
+    bounds = [(len(fixtures) * i // n_shards, len(fixtures) * (i + 1) // n_shards) for i in range(n_shards)]
+    tasks = [(config, lo, hi, keep_predictions) for config in configs for lo, hi in bounds]
+
+    if workers == 1:
+        _init_worker(fixtures, inputs)
+        outputs = [_run_task(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(fixtures, inputs)) as pool:
+            outputs = list(pool.map(_run_task, *zip(*tasks)))
+
+    merged: Dict[str, Dict[str, Dict[str, Any]]] = {name: {} for name in names}
+    predictions: Dict[str, List[Dict[str, Any]]] = {name: [] for name in names}
+    for name, scopes, rows in outputs:
+        for scope, counters in scopes.items():
+            if scope in merged[name]:
+                _merge(merged[name][scope], counters)
+            else:
+                merged[name][scope] = counters
+        predictions[name].extend(rows)
+
+    results = []
+    for config in configs:
+        scopes = merged[config.name]
+        ordered = ['ALL'] + sorted(s for s in scopes if s != 'ALL')
+        results.extend(_summary(config, scope, scopes[scope]) for scope in ordered if scope in scopes)
+
+    run_id = str(uuid.uuid4())[:8]
+    if write and results:
+        write_results(run_id, configs, results)
+
+    elapsed = time.perf_counter() - started
+    best = max((r for r in results if r['scope'] == 'ALL'), key=lambda r: r['roi_pct'], default=None)
+    print(f"    [Backtest] Run {run_id} done in {elapsed:.1f}s"
+          + (f"; best ROI {best['config_name']}: {best['roi_pct']}% (hit rate {best['hit_rate']}%)" if best else ""))
+    return {'run_id': run_id, 'results': results, 'predictions': predictions}
+
+
+def write_results(run_id: str, configs: List[RuleConfig], results: List[Dict[str, Any]], filepath: Optional[str] = None) -> str:
+    """Appends one run (summary rows + each config's weights as columns) to backtest_results.csv in one write."""
+    import pandas as pd
+    from Data.Access.db_helpers import DB_DIR
+
+    filepath = filepath or os.path.join(DB_DIR, "backtest_results.csv")
+    weights = {c.name: {f: getattr(c, f) for f in WEIGHT_FIELDS + ['h2h_lookback_days', 'min_h2h_games']} for c in configs}
+    df = pd.DataFrame(results)
+    df.insert(0, 'run_id', run_id)
+    df.insert(1, 'generated_at', dt.now().isoformat())
+    df = df.join(pd.DataFrame.from_dict(weights, orient='index'), on='config_name')
+
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    df.to_csv(filepath, mode='a', header=not os.path.exists(filepath) or os.path.getsize(filepath) == 0, index=False)
+    return filepath
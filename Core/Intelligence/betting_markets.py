@@ -7,7 +7,47 @@ Betting Markets Module
 Generates predictions for comprehensive betting markets with a focus on safety and certainty.
 """
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Market keys in generation order (select_best_market breaks confidence ties by this order)
+MARKET_KEYS = ("1X2", "double_chance", "draw_no_bet", "over_1.5", "over_under",
+               "home_over_0.5", "away_over_0.5", "btts", "winner_btts")
+_DC, _DNB, _OVER15, _OVER_UNDER, _HOME_O05, _AWAY_O05, _BTTS, _WINNER_BTTS = range(1, len(MARKET_KEYS))
+_SAFE_TYPE_COLUMNS = [_DC, _DNB, _HOME_O05, _AWAY_O05]          # market types matching select_best_market's safe_types
+_SAFE_KEY_COLUMNS = [_DC, _OVER15, _DNB, _HOME_O05, _AWAY_O05]  # its safe_keys, in order
+# Team-name text that select_best_market's substring checks would pick up
+_SELECTION_MARKERS = ("draw", "close xg", "2+", "btts no")
+
+
+def _over15_probability(scores: List[Dict], over25_prob: float) -> float:
+    """Over 1.5 share of the listed correct scores (over 2.5 + 0.2, capped, when there are none)."""
+    over15_prob = 0.0
+    total_prob_analyzed = 0.0
+    if scores:
+        for s in scores:
+            try:
+                score_str = s['score']
+                h_str, a_str = score_str.split('-')
+                h = 3.5 if '3+' in h_str else float(h_str)
+                a = 3.5 if '3+' in a_str else float(a_str)
+                prob = s['prob']
+                total_prob_analyzed += prob
+                if h + a > 1.5:
+                    over15_prob += prob
+            except Exception:
+                pass
+
+        if total_prob_analyzed > 0:
+            return over15_prob / total_prob_analyzed
+    return min(over25_prob + 0.2, 0.95)
+
+
+def _calc_confidence(base_score: np.ndarray, threshold) -> np.ndarray:
+    ratio = base_score / threshold
+    return np.where(base_score > threshold, np.minimum(ratio, 1.0), ratio * 0.5)
+
 
 class BettingMarkets:
     """Generates predictions for various betting markets"""
@@ -31,28 +71,7 @@ class BettingMarkets:
             return (base_score / threshold) * 0.5
 
         # Calculate Over 1.5 Probability from score distribution
-        over15_prob = 0.0
-        total_prob_analyzed = 0.0
-        if scores:
-            for s in scores:
-                try:
-                    score_str = s['score']
-                    h_str, a_str = score_str.split('-')
-                    h = 3.5 if '3+' in h_str else float(h_str)
-                    a = 3.5 if '3+' in a_str else float(a_str)
-                    prob = s['prob']
-                    total_prob_analyzed += prob
-                    if h + a > 1.5:
-                        over15_prob += prob
-                except Exception:
-                    pass
-            
-            if total_prob_analyzed > 0:
-                over15_prob /= total_prob_analyzed
-            else:
-                over15_prob = min(over25_prob + 0.2, 0.95)
-        else:
-            over15_prob = min(over25_prob + 0.2, 0.95)
+        over15_prob = _over15_probability(scores, over25_prob)
 
         # 1. Full Time Result (1X2)
         outcomes = [
@@ -271,3 +290,149 @@ class BettingMarkets:
             return format_selection(dc, "fallback_swap_dc")
 
         return format_selection(top, "fallback")
+
+    @staticmethod
+    def generate_many(
+        home_teams: Sequence[str], away_teams: Sequence[str], home_score: np.ndarray, away_score: np.ndarray,
+        draw_score: np.ndarray, btts_prob: np.ndarray, over25_prob: np.ndarray, scores: Sequence[List[Dict]],
+        home_xg: np.ndarray, away_xg: np.ndarray, reasoning: Sequence[List[str]]
+    ) -> List[Tuple[Dict[str, Dict[str, Any]], Optional[str]]]:
+        """
+        generate_betting_market_predictions() for N fixtures, plus the key of the market
+        select_best_market() picks from them. Confidences and the selection are array ops
+        over the batch; only the market dicts are built per row. The key is None for rows
+        whose team names contain text the selection's substring checks look for: those
+        must go through select_best_market.
+        """
+        hs, aws, ds, btts, over25, hxg, axg = (np.asarray(a, dtype=float).reshape(-1) for a in (
+            home_score, away_score, draw_score, btts_prob, over25_prob, home_xg, away_xg))
+        n = len(hs)
+        over15 = np.array([_over15_probability(sc, o) for sc, o in zip(scores, over25.tolist())], dtype=float).reshape(n)
+        flags = []   # reasoning mentions a draw / close xG / "scores 2+"
+        for reasons in reasoning:
+            lowered = [r.lower() for r in reasons]
+            flags.append((any("draw" in r for r in lowered), any("close xg" in r for r in lowered),
+                          any("scores 2+" in r for r in reasons)))
+        r_draw, r_close, r_scores2 = np.array(flags, dtype=bool).reshape(n, 3).T
+
+        # 1. Full Time Result (1X2): first of draw, home, away with the highest score
+        home_best = hs > ds
+        away_best = aws > np.where(home_best, hs, ds)
+        outcome = np.where(away_best, 2, np.where(home_best, 1, 0))
+        conf_1x2 = _calc_confidence(np.where(away_best, aws, np.where(home_best, hs, ds)), np.where(outcome == 0, 18, 20))
+
+        # 2. Double Chance
+        dc_home = hs + ds > aws + 2
+        dc_away = ~dc_home & (aws + ds > hs + 2)
+        dc_close = ~dc_home & ~dc_away & r_close
+        dc_open = ~dc_home & ~dc_away & ~r_close
+        dc_base = np.select(
+            [dc_home, dc_away, dc_close],
+            [_calc_confidence((hs + ds) / 2, 12) * np.where(axg > hxg + 0.5, 0.7, 1.0),
+             _calc_confidence((aws + ds) / 2, 12) * np.where(hxg > axg + 0.5, 0.7, 1.0),
+             0.85],
+            _calc_confidence(np.maximum(hs, aws), 10))
+        conf_dc = np.minimum(dc_base * np.where(r_draw, 1.25, 1.0), 0.98)
+
+        # 3. Draw No Bet
+        dnb_home = hs > aws + 3
+        dnb_away = ~dnb_home & (aws > hs + 3)
+        conf_dnb = np.where(dnb_home, _calc_confidence(hs - aws, 8), _calc_confidence(aws - hs, 8))
+
+        # 4. Over/Under, 5. team goals, 6. BTTS, 7. winner and BTTS
+        ou_over = over25 > 0.65
+        ou_under = ~ou_over & (over25 < 0.35)
+        conf_ou = np.where(ou_over, over25, (1 - over25) * np.where(r_scores2, 0.6, 1.0))
+        btts_yes = btts > 0.5
+        conf_btts = np.where(btts_yes, btts, 1 - btts)
+        conf_btts = np.where(r_scores2 & (btts > 0.45), np.maximum(conf_btts, 0.75), conf_btts)
+        wb_home = (hs > aws + 2) & (btts > 0.6)
+        wb_away = ~wb_home & (aws > hs + 2) & (btts > 0.6)
+        conf_wb = np.where(wb_home, np.minimum(hs / 12, btts), np.minimum(aws / 12, btts)) * 0.9
+
+        always = np.ones(n, dtype=bool)
+        present = np.column_stack([always, always, dnb_home | dnb_away, over15 > 0.75, ou_over | ou_under,
+                                   hxg > 1.3, axg > 1.3, always, wb_home | wb_away])
+        values = np.column_stack([conf_1x2, conf_dc, conf_dnb, over15, conf_ou,
+                                  np.full(n, 0.85), np.full(n, 0.85), conf_btts, conf_wb])
+        conf = np.where(present, values, -np.inf)
+
+        # --- select_best_market(..., "conservative") for rows with plain team names ---
+        # The "Draw unlikely" Double Chance reason triggers the draw override; goal overrides
+        # and the "Under" filter need "scores 2+" / "concedes 2+" in a market reason, which
+        # only a team name could supply.
+        directional = ~dc_open                                     # " or Draw" in the DC pick
+        btts_no_vetoed = ~btts_yes & directional
+        high = conf >= 0.80
+        high[:, _BTTS] &= ~btts_no_vetoed
+        high_conf = np.where(high, conf, -np.inf)
+        safe_high = high_conf[:, _SAFE_TYPE_COLUMNS]
+        pick_high = np.where(np.isfinite(safe_high).any(axis=1),
+                             np.asarray(_SAFE_TYPE_COLUMNS)[safe_high.argmax(axis=1)], high_conf.argmax(axis=1))
+        safe_cands = np.where(conf > 0.60, conf, -np.inf)[:, _SAFE_KEY_COLUMNS]
+        pick_safe = np.asarray(_SAFE_KEY_COLUMNS)[safe_cands.argmax(axis=1)]
+        top = conf.argmax(axis=1)
+        pick_top = np.where((top == _BTTS) & btts_no_vetoed & (conf[:, _DC] > 0.55), _DC, top)
+        selected = np.select([dc_open & (conf[:, _DC] > 0.65), high.any(axis=1), np.isfinite(safe_cands).any(axis=1)],
+                             [_DC, pick_high, pick_safe], pick_top)
+
+        plain: Dict[str, bool] = {}
+        for team in set(home_teams) | set(away_teams):
+            lower = team.lower()
+            plain[team] = not any(marker in lower for marker in _SELECTION_MARKERS)
+
+        results = []
+        columns = zip(home_teams, away_teams, outcome.tolist(), conf_1x2.tolist(), dc_home.tolist(), dc_away.tolist(),
+                      dc_close.tolist(), conf_dc.tolist(), dnb_home.tolist(), dnb_away.tolist(), conf_dnb.tolist(),
+                      present.tolist(), over15.tolist(), ou_over.tolist(), conf_ou.tolist(), hxg.tolist(), axg.tolist(),
+                      btts.tolist(), btts_yes.tolist(), conf_btts.tolist(), wb_home.tolist(), conf_wb.tolist(),
+                      hs.tolist(), aws.tolist(), selected.tolist())
+        for (home_team, away_team, outcome_i, c_1x2, dch, dca, dcc, c_dc, dnbh, dnba, c_dnb, has, o15, ouo, c_ou,
+             h_xg, a_xg, p_btts, yes, c_btts, wbh, c_wb, h_score, a_score, pick) in columns:
+            predictions: Dict[str, Dict[str, Any]] = {}
+            prediction, reason = (("Draw", "Draw most likely outcome"),
+                                  (f"{home_team} to win", f"{home_team} favored to win"),
+                                  (f"{away_team} to win", f"{away_team} favored to win"))[outcome_i]
+            predictions["1X2"] = {"market_type": "Full Time Result (1X2)", "market_prediction": prediction,
+                                  "confidence_score": c_1x2, "reason": reason}
+
+            if dch:
+                dc_pred, dc_reason = f"{home_team} or Draw", f"{home_team} unlikely to lose"
+            elif dca:
+                dc_pred, dc_reason = f"{away_team} or Draw", f"{away_team} unlikely to lose"
+            elif dcc:
+                stronger_side = home_team if h_score >= a_score else away_team
+                dc_pred, dc_reason = f"{stronger_side} or Draw", f"Close match favors DC ({stronger_side})"
+            else:
+                dc_pred, dc_reason = f"{home_team} or {away_team}", "Draw unlikely (12)"
+            predictions["double_chance"] = {"market_type": "Double Chance", "market_prediction": dc_pred,
+                                            "confidence_score": c_dc, "reason": dc_reason}
+
+            if dnbh or dnba:
+                team = home_team if dnbh else away_team
+                predictions["draw_no_bet"] = {"market_type": "Draw No Bet", "market_prediction": f"{team} to win (DNB)",
+                                              "confidence_score": c_dnb, "reason": f"{team} clear favorite"}
+            if has[_OVER15]:
+                predictions["over_1.5"] = {"market_type": "Over/Under 1.5 Goals", "market_prediction": "Over 1.5",
+                                           "confidence_score": o15, "reason": "Safe goal expectation"}
+            if has[_OVER_UNDER]:
+                predictions["over_under"] = {
+                    "market_type": "Over/Under 2.5 Goals", "market_prediction": "Over 2.5" if ouo else "Under 2.5",
+                    "confidence_score": c_ou,
+                    "reason": f"{'High' if ouo else 'Low'} goal expectation: {h_xg + a_xg:.1f} xG"
+                }
+            if has[_HOME_O05]:
+                predictions["home_over_0.5"] = {"market_type": "Home Team Over 0.5 Goals", "market_prediction": f"{home_team} Over 0.5",
+                                                "confidence_score": 0.85, "reason": f"{home_team} expected to score"}
+            if has[_AWAY_O05]:
+                predictions["away_over_0.5"] = {"market_type": "Away Team Over 0.5 Goals", "market_prediction": f"{away_team} Over 0.5",
+                                                "confidence_score": 0.85, "reason": f"{away_team} expected to score"}
+            predictions["btts"] = {"market_type": "Both Teams To Score (BTTS)", "market_prediction": "BTTS Yes" if yes else "BTTS No",
+                                   "confidence_score": c_btts, "reason": f"BTTS probability: {p_btts:.2f}"}
+            if has[_WINNER_BTTS]:
+                team = home_team if wbh else away_team
+                predictions["winner_btts"] = {"market_type": "Winner & BTTS", "market_prediction": f"{team} to win & BTTS Yes",
+                                              "confidence_score": c_wb, "reason": f"{team} likely to win with both teams scoring"}
+
+            results.append((predictions, MARKET_KEYS[pick] if plain[home_team] and plain[away_team] else None))
+        return results
@@ -0,0 +1,688 @@
+# compiled_rules.py: Compiled evaluation path for the rule engine.
+# Refactored for Clean Architecture (v2.8)
+# This script parses form, H2H and standings once into numeric features and scores rules as array ops.
+
+"""
+Compiled Rules Module
+Parses each input match once into compact __slots__ feature structs and evaluates
+the RuleEngine heuristics as a boolean signal vector against a RuleConfig weight
+matrix. String tags are only rendered when a result is built.
+
+Results are identical to the reference (tag-based) path: the rule table keeps the
+reference order and scores are accumulated with a sequential cumsum, so float
+sums match bit for bit. Scripts/bench_rule_engine.py checks parity.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .rule_config import RuleConfig
+
+FORM_KEYS = ('SNG', 'CS', 'S1+', 'S2+', 'S3+', 'C1+', 'C2+', 'C3+', 'W', 'D', 'L')
+STRENGTHS = ('top', 'mid', 'bottom')
+_SNG, _CS, _S1, _S2, _S3, _C1, _C2, _C3, _W, _D, _L = range(len(FORM_KEYS))
+_XG_WEIGHTS = (0.0, 1.0, 2.0, 3.5)                  # "0", "1", "2", "3+" -> expected goals
+_DEFAULT_DIST = (0.4, 0.3, 0.2, 0.1)
+
+# Score columns of the weight matrix
+HOME, AWAY, DRAW, OVER25 = range(4)
+
+# Rule table in reference evaluation order: (name, column, RuleConfig weight, over25 bonus, reason template)
+RULES: Tuple[Tuple[str, int, str, int, Optional[str]], ...] = (
+    ('xg_home', HOME, 'xg_advantage', 0, "{home} has xG advantage"),
+    ('xg_away', AWAY, 'xg_advantage', 0, "{away} has xG advantage"),
+    ('xg_draw', DRAW, 'xg_draw', 0, "Close xG suggests draw"),
+    ('h2h_home_win', HOME, 'h2h_home_win', 0, "{home} strong in H2H"),
+    ('h2h_away_win', AWAY, 'h2h_away_win', 0, "{away} strong in H2H"),
+    ('h2h_draw', DRAW, 'h2h_draw', 0, "H2H suggests Draw"),
+    ('h2h_over25', OVER25, 'h2h_over25', 0, None),
+    ('home_top_vs_bottom', HOME, 'standings_top_vs_bottom', 0, "Top ({home}) vs Bottom ({away})"),
+    ('away_top_vs_bottom', AWAY, 'standings_top_vs_bottom', 0, "Top ({away}) vs Bottom ({home})"),
+    ('home_table_adv', HOME, 'standings_table_advantage', 0, None),
+    ('away_table_adv', AWAY, 'standings_table_advantage', 0, None),
+    ('home_gd_strong', HOME, 'standings_gd_strong', 0, "{home} has strong GD"),
+    ('away_gd_strong', AWAY, 'standings_gd_strong', 0, "{away} has strong GD"),
+    ('home_gd_weak', AWAY, 'standings_gd_weak', 0, "{home} has weak GD"),
+    ('away_gd_weak', HOME, 'standings_gd_weak', 0, "{away} has weak GD"),
+    ('home_scores_2plus', HOME, 'form_score_2plus', 2, "{home} scores 2+ often"),
+    ('away_scores_2plus', AWAY, 'form_score_2plus', 2, "{away} scores 2+ often"),
+    ('home_scores_3plus', HOME, 'form_score_3plus', 1, None),
+    ('away_scores_3plus', AWAY, 'form_score_3plus', 1, None),
+    ('away_concedes_2plus', HOME, 'form_concede_2plus', 2, "{away} concedes 2+ often"),
+    ('home_concedes_2plus', AWAY, 'form_concede_2plus', 2, "{home} concedes 2+ often"),
+    ('home_no_score', AWAY, 'form_no_score', 0, "{home} fails to score"),
+    ('away_no_score', HOME, 'form_no_score', 0, "{away} fails to score"),
+    ('home_clean_sheet', HOME, 'form_clean_sheet', 0, "{home} has strong defense"),
+    ('away_clean_sheet', AWAY, 'form_clean_sheet', 0, "{away} has strong defense"),
+    ('home_vs_top_win', HOME, 'form_vs_top_win', 0, None),
+    ('away_vs_top_win', AWAY, 'form_vs_top_win', 0, None),
+)
+RULE_COUNT = len(RULES)
+
+
+def _majority_or_third(count: int, total: int) -> bool:
+    """TagGenerator.check_threshold(..., "majority") or (..., "third")."""
+    return total > 0 and (count >= total // 2 + 1 or count >= max(3, total // 3))
+
+
+def _parse_score(match: Dict) -> Optional[Tuple[int, int]]:
+    """Parses "H-A" exactly like TagGenerator/GoalPredictor. None if unparseable."""
+    try:
+        gf, ga = map(int, match.get("score", "0-0").replace(" ", "").split("-"))
+        return gf, ga
+    except:
+        return None
+
+
+def _slug(team_name: str) -> str:
+    return team_name.replace(" ", "_").upper()
+
+
+def _strength(rank: int, league_size: int) -> int:
+    """Index into STRENGTHS (TagGenerator.classify_opponent_strength)."""
+    if rank <= (league_size // 4):
+        return 0
+    elif rank <= (league_size // 2):
+        return 1
+    return 2
+
+
+def _form_entry(match: Dict, team_name: str) -> Tuple[Tuple[int, ...], Any, Optional[int], Optional[int]]:
+    """
+    One form match seen from team_name: (FORM_KEYS indices it counts towards, opponent,
+    scored-goal bucket when the fixture is a home game, bucket for an away game).
+    Buckets are None for unparseable scores.
+    """
+    home = match.get("home", "")
+    away = match.get("away", "")
+    parsed = _parse_score(match)
+    gf, ga = parsed if parsed else (0, 0)
+
+    winner = match.get("winner", "")
+    if winner == "Draw":
+        result = _D
+    elif (winner == "Home" and home == team_name) or (winner == "Away" and away == team_name):
+        result = _W
+    else:
+        result = _L
+
+    hits = [result]
+    if gf == 0: hits.append(_SNG)
+    if ga == 0: hits.append(_CS)
+    if gf >= 1: hits.append(_S1)
+    if gf >= 2: hits.append(_S2)
+    if gf >= 3: hits.append(_S3)
+    if ga >= 1: hits.append(_C1)
+    if ga >= 2: hits.append(_C2)
+    if ga >= 3: hits.append(_C3)
+
+    opponent = away if home == team_name else home
+    if not parsed:
+        return tuple(hits), opponent, None, None
+    # Away results count 1.25x towards a home game, home results 0.8x towards an away game
+    is_home_match = home == team_name
+    goals_for = gf if is_home_match else ga
+    home_game = goals_for if is_home_match else int(goals_for * 1.25)
+    away_game = int(goals_for * 0.80) if is_home_match else goals_for
+    return tuple(hits), opponent, min(home_game, 5), min(away_game, 5)
+
+
+def _h2h_counts(h2h: List[Dict], home_team: str, away_team: str) -> List[int]:
+    """H2H home wins, away wins, draws, over 2.5, under 2.5, btts (unparseable scores skipped)."""
+    counts = [0] * 6
+    for m in h2h:
+        parsed = _parse_score(m)
+        if parsed is None:
+            continue
+        hg, ag = parsed
+        winner, home, away = m.get("winner"), m.get("home"), m.get("away")
+        if (winner == "Home" and home == home_team) or (winner == "Away" and away == home_team):
+            counts[0] += 1
+        elif (winner == "Home" and home == away_team) or (winner == "Away" and away == away_team):
+            counts[1] += 1
+        else:
+            counts[2] += 1
+        counts[3 if hg + ag > 2 else 4] += 1
+        if hg > 0 and ag > 0:
+            counts[5] += 1
+    return counts
+
+
+def _form_tags(slug: str, has: List[bool], strength_tags: List[List[int]]) -> List[str]:
+    """TagGenerator.generate_form_tags output from the per-key and per-strength hits."""
+    tags = [f"{slug}_FORM_{key}" for key, hit in zip(FORM_KEYS, has) if hit]
+    for strength, found in zip(STRENGTHS, strength_tags):
+        tags.extend(f"{slug}_FORM_{FORM_KEYS[i]}_vs_{strength.upper()}" for i in found)
+    return list(set(tags))
+
+
+def _h2h_tags(home_slug: str, away_slug: str, n: int, counts: List[int]) -> List[str]:
+    """TagGenerator.generate_h2h_tags output from the H2H counts."""
+    if not n:
+        return []
+    keys = (f'{home_slug}_WINS_H2H', f'{away_slug}_WINS_H2H', 'H2H_D', 'H2H_O25', 'H2H_U25', 'H2H_BTTS')
+    tags = []
+    for key, cnt in zip(keys, counts):
+        if cnt >= n // 2 + 1:
+            tags.append(key)
+        elif cnt >= max(3, n // 3):
+            tags.append(f"{key}_third")
+    return list(set(tags))
+
+
+def _standings_tags(hs: str, aws: str, hr: Any, ar: Any, hgd: Any, agd: Any, size: int) -> List[str]:
+    """TagGenerator.generate_standings_tags output from both teams' positions and goal differences."""
+    tags = []
+    if hr <= 3: tags.append(f"{hs}_TOP3")
+    if hr > size - 5: tags.append(f"{hs}_BOTTOM5")
+    if ar <= 3: tags.append(f"{aws}_TOP3")
+    if ar > size - 5: tags.append(f"{aws}_BOTTOM5")
+    if hgd > 0: tags.append(f"{hs}_GD_POS")
+    if hgd < 0: tags.append(f"{hs}_GD_NEG")
+    if agd > 0: tags.append(f"{aws}_GD_POS")
+    if agd < 0: tags.append(f"{aws}_GD_NEG")
+    if hr < ar - 8: tags.append(f"{hs}_TABLE_ADV8+")
+    if ar < hr - 8: tags.append(f"{aws}_TABLE_ADV8+")
+    if hgd > 10: tags.append(f"{hs}_GD_POS_STRONG")
+    if hgd < -10: tags.append(f"{hs}_GD_NEG_WEAK")
+    if agd > 10: tags.append(f"{aws}_GD_POS_STRONG")
+    if agd < -10: tags.append(f"{aws}_GD_NEG_WEAK")
+    return list(set(tags))
+
+
+class FormFeatures:
+    """Last-N form of one team, parsed once: outcome counts, per-opponent-strength counts, goal distribution."""
+    __slots__ = ('n', 'counts', 'strength_counts', 'strength_n', 'scored_dist')
+
+    def __init__(self, matches: List[Dict], team_name: str, team_to_rank: Dict[str, Any],
+                 league_size: int, is_home_game: bool):
+        self.n = len(matches)
+        self.counts = [0] * len(FORM_KEYS)
+        self.strength_counts = [[0] * len(FORM_KEYS) for _ in STRENGTHS]
+        self.strength_n = [0, 0, 0]
+        scored = [0, 0, 0, 0, 0, 0]
+        scored_total = 0
+
+        for match in matches:
+            hits, opponent, home_bucket, away_bucket = _form_entry(match, team_name)
+            for i in hits:
+                self.counts[i] += 1
+
+            if opponent in team_to_rank:
+                s = _strength(team_to_rank[opponent], league_size)
+                self.strength_n[s] += 1
+                row = self.strength_counts[s]
+                for i in hits:
+                    row[i] += 1
+
+            # Goal distribution (GoalPredictor semantics: unparseable scores are skipped)
+            bucket = home_bucket if is_home_game else away_bucket
+            if bucket is not None:
+                scored[bucket] += 1
+                scored_total += 1
+
+        if not matches:
+            self.scored_dist = _DEFAULT_DIST
+        else:
+            total = scored_total or 1
+            self.scored_dist = (scored[0] / total, scored[1] / total, scored[2] / total,
+                                (scored[3] + scored[4] + scored[5]) / total)
+
+    @property
+    def xg(self) -> float:
+        return sum(w * p for w, p in zip(_XG_WEIGHTS, self.scored_dist))
+
+    def has(self, key_index: int) -> bool:
+        """True when the "{SLUG}_FORM_{KEY}" tag would be generated."""
+        return self.n >= 3 and _majority_or_third(self.counts[key_index], self.n)
+
+    def _strength_tags(self, s: int) -> List[int]:
+        s_n = self.strength_n[s]
+        if self.n < 3 or s_n < 2:
+            return []
+        return [i for i, cnt in enumerate(self.strength_counts[s]) if cnt >= max(3, s_n // 3)]
+
+    def vs_top_win(self, slug: str) -> bool:
+        """
+        Reference check: any tag whose lowercase contains both "vs_top" and "_w".
+        Resolved from the slug and counts without building the tag strings.
+        """
+        if self.n < 3:
+            return False
+        lower = slug.lower()
+        slug_w = "_w" in lower
+        if "vs_top" in lower:
+            base = [i for i in range(len(FORM_KEYS)) if self.has(i)]
+            every = base + [i for s in range(len(STRENGTHS)) for i in self._strength_tags(s)]
+            return bool(every) and (slug_w or _W in every)
+        top = self._strength_tags(0)
+        return bool(top) and (slug_w or _W in top)
+
+    def tags(self, slug: str) -> List[str]:
+        """Renders the TagGenerator.generate_form_tags output."""
+        if self.n < 3:
+            return []
+        return _form_tags(slug, [self.has(i) for i in range(len(FORM_KEYS))],
+                          [self._strength_tags(s) for s in range(len(STRENGTHS))])
+
+
+class MatchFeatures:
+    """Numeric view of one fixture: both forms, H2H counts, standings positions and goal model."""
+    __slots__ = ('home_team', 'away_team', 'home_slug', 'away_slug', 'home', 'away',
+                 'h2h_n', 'h2h_counts', 'has_standings', 'league_size', 'hr', 'ar', 'hgd', 'agd')
+
+    def __init__(self, home_team: str, away_team: str, home_form: List[Dict], away_form: List[Dict],
+                 h2h: List[Dict], standings: List[Dict]):
+        self.home_team = home_team
+        self.away_team = away_team
+        self.home_slug = _slug(home_team)
+        self.away_slug = _slug(away_team)
+
+        team_to_rank = {t["team_name"]: t["position"] for t in standings}
+        form_league_size = len(standings) or 20
+        self.home = FormFeatures(home_form, home_team, team_to_rank, form_league_size, True)
+        self.away = FormFeatures(away_form, away_team, team_to_rank, form_league_size, False)
+
+        self.h2h_n = len(h2h)
+        self.h2h_counts = _h2h_counts(h2h, home_team, away_team)
+
+        self.has_standings = bool(standings)
+        self.league_size = len(standings)
+        gd = {t["team_name"]: t.get("goal_difference", (t.get("goals_for") or 0) - (t.get("goals_against") or 0))
+              for t in standings} if standings else {}
+        self.hr = team_to_rank.get(home_team, 999)
+        self.ar = team_to_rank.get(away_team, 999)
+        self.hgd = gd.get(home_team, 0)
+        self.agd = gd.get(away_team, 0)
+
+    @property
+    def supported(self) -> bool:
+        """
+        False for slug collisions where reference tag-prefix matching would cross
+        teams (identical slugs, or slugs that embed H2H tag markers).
+        """
+        slugs = (self.home_slug, self.away_slug)
+        return self.home_slug != self.away_slug and not any(
+            "_WINS_H2H" in s or s.startswith("H2H_D") for s in slugs
+        )
+
+    def signals(self, home_xg: float, away_xg: float) -> np.ndarray:
+        """Boolean vector aligned with RULES."""
+        home, away = self.home, self.away
+        h2h_n, c = self.h2h_n, self.h2h_counts
+
+        st = self.has_standings
+        size = self.league_size
+        home_top3 = st and self.hr <= 3
+        away_top3 = st and self.ar <= 3
+        home_bottom5 = st and self.hr > size - 5
+        away_bottom5 = st and self.ar > size - 5
+
+        return np.array([
+            home_xg > away_xg + 0.5,
+            not home_xg > away_xg + 0.5 and away_xg > home_xg + 0.5,
+            not home_xg > away_xg + 0.5 and not away_xg > home_xg + 0.5 and abs(home_xg - away_xg) < 0.3,
+            _majority_or_third(c[0], h2h_n),
+            _majority_or_third(c[1], h2h_n),
+            _majority_or_third(c[2], h2h_n),
+            _majority_or_third(c[3], h2h_n),
+            home_top3 and away_bottom5,
+            away_top3 and home_bottom5,
+            st and self.hr < self.ar - 8,
+            st and self.ar < self.hr - 8,
+            st and self.hgd > 10,
+            st and self.agd > 10,
+            st and self.hgd < -10,
+            st and self.agd < -10,
+            home.has(_S2),
+            away.has(_S2),
+            home.has(_S3),
+            away.has(_S3),
+            away.has(_C2),
+            home.has(_C2),
+            home.has(_SNG),
+            away.has(_SNG),
+            home.has(_CS),
+            away.has(_CS),
+            home.vs_top_win(self.home_slug),
+            away.vs_top_win(self.away_slug),
+        ], dtype=bool)
+
+    def h2h_tags(self) -> List[str]:
+        """Renders the TagGenerator.generate_h2h_tags output."""
+        return _h2h_tags(self.home_slug, self.away_slug, self.h2h_n, self.h2h_counts)
+
+    def standings_tags(self) -> List[str]:
+        """Renders the TagGenerator.generate_standings_tags output."""
+        if not self.has_standings:
+            return []
+        return _standings_tags(self.home_slug, self.away_slug, self.hr, self.ar, self.hgd, self.agd, self.league_size)
+
+    def all_tags(self) -> Tuple[List[str], List[str], List[str], List[str]]:
+        """(home_tags, away_tags, h2h_tags, standings_tags) as the reference path returns them."""
+        return (self.home.tags(self.home_slug), self.away.tags(self.away_slug),
+                self.h2h_tags(), self.standings_tags())
+
+
+# --- Weight Matrix ---
+
+_matrix_cache: Dict[Tuple, np.ndarray] = {}
+
+
+def weight_matrix(config: RuleConfig) -> np.ndarray:
+    """RULE_COUNT x 4 (home, away, draw, over25) contribution matrix for a RuleConfig (cached by weights)."""
+    cache_key = tuple(getattr(config, attr) for _, _, attr, _, _ in RULES)
+    matrix = _matrix_cache.get(cache_key)
+    if matrix is None:
+        matrix = np.zeros((RULE_COUNT, 4), dtype=float)
+        for i, (_, column, attr, over25_bonus, _) in enumerate(RULES):
+            matrix[i, column] = getattr(config, attr)
+            if over25_bonus:
+                matrix[i, OVER25] = over25_bonus
+        if len(_matrix_cache) > 256:
+            _matrix_cache.clear()
+        _matrix_cache[cache_key] = matrix
+    return matrix
+
+
+def score_signals(signals: np.ndarray, matrix: np.ndarray) -> Tuple[float, float, float, float]:
+    """
+    Sums the weights of fired rules per column in rule order. cumsum is strictly
+    sequential, so the result equals the reference `score += weight` chain.
+    """
+    fired = matrix[signals]
+    if not len(fired):
+        return 0.0, 0.0, 0.0, 0.0
+    home, away, draw, over25 = np.cumsum(fired, axis=0)[-1]
+    return float(home), float(away), float(draw), float(over25)
+
+
+def rule_ids(signals: Sequence[bool]) -> List[str]:
+    """Names of the fired rules, in reference order (feature store attribution)."""
+    return [rule[0] for rule, hit in zip(RULES, signals) if hit]
+
+
+def reasons(signals: Sequence[bool], home_team: str, away_team: str) -> List[str]:
+    """Reasoning strings of the fired rules, in reference order."""
+    return [rule[4].format(home=home_team, away=away_team) for rule, hit in zip(RULES, signals) if hit and rule[4]]
+
+
+def top_scores(grid: Sequence[Sequence[float]]) -> List[Dict[str, Any]]:
+    """Correct-score list (cells above 3%, most likely first) for one fixture's 4 x 4 grid of floats."""
+    scores = [{"score": f"{h}-{a}", "prob": round(grid[h][a], 3)}
+              for h in range(3) for a in range(3) if grid[h][a] > 0.03]
+    scores.sort(key=lambda x: x["prob"], reverse=True)
+    return scores
+
+
+def goal_probabilities(home_dist: Tuple[float, ...], away_dist: Tuple[float, ...]):
+    """
+    (btts_prob, over25_prob, top scores) from the two scored-goal distributions,
+    using one product grid and the reference summation order.
+    """
+    grid = [[h * a for a in away_dist] for h in home_dist]
+    btts = sum(grid[h][a] for h in range(4) for a in range(4) if h != 0 and a != 0)
+    over25 = sum(grid[h][a] for h in range(4) for a in range(4) if h + a > 2)
+    return btts, over25, top_scores(grid)
+
+
+# --- Batch Evaluation (RuleEngine.analyze_many) ---
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float))
+
+
+def _majority_or_third_arr(count: np.ndarray, total: np.ndarray) -> np.ndarray:
+    return (total > 0) & ((count >= total // 2 + 1) | (count >= np.maximum(3, total // 3)))
+
+
+def batch_goal_model(home_dist: np.ndarray, away_dist: np.ndarray):
+    """
+    xG, BTTS and over 2.5 for N fixtures from (N, 4) scored-goal distributions via one
+    (N, 4, 4) outer product. Cells are accumulated in the scalar path's order, so each
+    row is bit-identical to goal_probabilities()/FormFeatures.xg.
+    Returns (home_xg, away_xg, btts, over25, grid).
+    """
+    grid = home_dist[:, :, None] * away_dist[:, None, :]
+    home_xg = np.zeros(len(home_dist))
+    away_xg = np.zeros(len(away_dist))
+    for i, w in enumerate(_XG_WEIGHTS):
+        home_xg = home_xg + w * home_dist[:, i]
+        away_xg = away_xg + w * away_dist[:, i]
+    btts = np.zeros(len(grid))
+    over25 = np.zeros(len(grid))
+    for h in range(4):
+        for a in range(4):
+            if h != 0 and a != 0:
+                btts = btts + grid[:, h, a]
+            if h + a > 2:
+                over25 = over25 + grid[:, h, a]
+    return home_xg, away_xg, btts, over25, grid
+
+
+def _segment_sums(values: np.ndarray, bounds: np.ndarray) -> np.ndarray:
+    """Sums of values[start:end] (first axis) for every (start, end) row of bounds."""
+    totals = np.zeros((len(values) + 1,) + values.shape[1:], dtype=np.int64)
+    np.cumsum(values, axis=0, out=totals[1:])
+    return totals[bounds[:, 1]] - totals[bounds[:, 0]]
+
+
+class BatchFeatures:
+    """
+    Columnar MatchFeatures for a batch of fixtures (RuleEngine.analyze_many).
+
+    add() walks each fixture's inputs once, parsing every form match once per
+    (match, team) even when it recurs in other fixtures' forms (HistoryIndex hands
+    out shared entries) and each standings list once. finish() then builds the
+    outcome counts, per-strength counts and goal distributions of all fixtures as
+    segment sums over one entry array. Row i equals the MatchFeatures of the i-th
+    added fixture: same signals, same tags, same float bits.
+    """
+
+    def __init__(self):
+        self.home_team: List[str] = []
+        self.away_team: List[str] = []
+        self.home_slug: List[str] = []
+        self.away_slug: List[str] = []
+        self.h2h_n: List[int] = []
+        self.h2h_counts: List[List[int]] = []
+        self.standings: List[Optional[Tuple[Any, Any, Any, Any, int]]] = []   # (hr, ar, hgd, agd, size) or None
+        self._tables: Dict[int, Tuple[Any, Dict[str, Any], int, Dict[Any, int]]] = {}
+        self._gd: Dict[int, Dict[str, Any]] = {}
+        self._facts: Dict[str, Dict[int, Tuple[int, Any, int, int]]] = {}    # team -> id(match) -> (hits row, opponent, buckets)
+        self._hits: List[List[int]] = []
+        self._matches: List[Dict] = []        # keeps the id() keys above alive
+        # Per side (home form, away form): flat entry columns and each fixture's (start, end)
+        self._fact = ([], [])
+        self._strength = ([], [])
+        self._bucket = ([], [])
+        self._bounds: Tuple[List[Tuple[int, int]], List[Tuple[int, int]]] = ([], [])
+
+    def __len__(self) -> int:
+        return len(self.home_team)
+
+    def _table(self, standings: List[Dict]) -> Tuple[Any, Dict[str, Any], int, Dict[Any, int]]:
+        """(standings, team_to_rank, form league size, opponent strength cache), built once per list."""
+        table = self._tables.get(id(standings))
+        if table is None:
+            team_to_rank = {t["team_name"]: t["position"] for t in standings}
+            table = self._tables[id(standings)] = (standings, team_to_rank, len(standings) or 20, {})
+        return table
+
+    def _form(self, matches: List[Dict], team_name: str, table: Tuple[Any, Dict[str, Any], int, Dict[Any, int]],
+              is_home_game: bool) -> Tuple[List[int], List[int], List[int]]:
+        """(hits rows, opponent strengths or -1, scored buckets or -1) of a form, as FormFeatures reads it."""
+        _, team_to_rank, league_size, strengths = table
+        facts = self._facts.get(team_name)
+        if facts is None:
+            facts = self._facts[team_name] = {}
+        rows, opponent_strengths, buckets = [], [], []
+        for match in matches:
+            fact = facts.get(id(match))
+            if fact is None:
+                hits, opponent, home_bucket, away_bucket = _form_entry(match, team_name)
+                row = [0] * len(FORM_KEYS)
+                for i in hits:
+                    row[i] = 1
+                fact = facts[id(match)] = (len(self._hits), opponent, -1 if home_bucket is None else home_bucket,
+                                           -1 if away_bucket is None else away_bucket)
+                self._hits.append(row)
+                self._matches.append(match)
+            rows.append(fact[0])
+            buckets.append(fact[2] if is_home_game else fact[3])
+
+            opponent = fact[1]
+            strength = -1
+            if opponent in team_to_rank:
+                strength = strengths.get(opponent, -1)
+                if strength < 0:
+                    strength = strengths[opponent] = _strength(team_to_rank[opponent], league_size)
+            opponent_strengths.append(strength)
+        return rows, opponent_strengths, buckets
+
+    def add(self, home_team: str, away_team: str, home_form: List[Dict], away_form: List[Dict],
+            h2h: List[Dict], standings: List[Dict]) -> bool:
+        """
+        Appends one fixture. Raises wherever MatchFeatures would. Returns False, adding
+        nothing, for fixtures the batch does not take: unsupported slugs (MatchFeatures.supported)
+        or non-numeric standings, whose scalar comparisons may raise.
+        """
+        home_slug, away_slug = _slug(home_team), _slug(away_team)
+        table = self._table(standings)
+        home_entries = self._form(home_form, home_team, table, True)
+        away_entries = self._form(away_form, away_team, table, False)
+        h2h_counts = _h2h_counts(h2h, home_team, away_team)
+
+        position = None
+        if standings:
+            gd = self._gd.get(id(standings))
+            if gd is None:
+                gd = self._gd[id(standings)] = {
+                    t["team_name"]: t.get("goal_difference", (t.get("goals_for") or 0) - (t.get("goals_against") or 0))
+                    for t in standings}
+            team_to_rank = table[1]
+            position = (team_to_rank.get(home_team, 999), team_to_rank.get(away_team, 999),
+                        gd.get(home_team, 0), gd.get(away_team, 0), len(standings))
+            if not all(_is_number(v) for v in position[:4]):
+                return False
+        if home_slug == away_slug or any("_WINS_H2H" in s or s.startswith("H2H_D") for s in (home_slug, away_slug)):
+            return False
+
+        self.home_team.append(home_team)
+        self.away_team.append(away_team)
+        self.home_slug.append(home_slug)
+        self.away_slug.append(away_slug)
+        self.h2h_n.append(len(h2h))
+        self.h2h_counts.append(h2h_counts)
+        self.standings.append(position)
+        for side, (rows, strengths, buckets) in enumerate((home_entries, away_entries)):
+            start = len(self._fact[side])
+            self._fact[side].extend(rows)
+            self._strength[side].extend(strengths)
+            self._bucket[side].extend(buckets)
+            self._bounds[side].append((start, start + len(rows)))
+        return True
+
+    def finish(self):
+        """Builds the (N, ...) arrays: form counts, has/strength-tag flags and goal distributions per side."""
+        n = len(self)
+        hits = np.array(self._hits, dtype=np.int64).reshape(-1, len(FORM_KEYS))
+        self.form_n, self.has, self.strength_tags, self.dist = [], [], [], []
+        for side in range(2):
+            bounds = np.array(self._bounds[side], dtype=np.int64).reshape(n, 2)
+            fact, strength, bucket = (np.array(column[side], dtype=np.int64)
+                                      for column in (self._fact, self._strength, self._bucket))
+            entry_hits = hits[fact]
+            form_n = bounds[:, 1] - bounds[:, 0]
+            counts = _segment_sums(entry_hits, bounds)
+
+            in_strength = [strength == s for s in range(len(STRENGTHS))]
+            strength_n = np.column_stack([_segment_sums(mask.astype(np.int64), bounds) for mask in in_strength])
+            strength_counts = np.stack([_segment_sums(entry_hits * mask[:, None], bounds) for mask in in_strength], axis=1)
+
+            scored = _segment_sums((bucket[:, None] == np.arange(6)).astype(np.int64), bounds)  # (N, 6)
+            total = scored.sum(axis=1)
+            total[total == 0] = 1
+            dist = np.column_stack([scored[:, 0] / total, scored[:, 1] / total, scored[:, 2] / total,
+                                    (scored[:, 3] + scored[:, 4] + scored[:, 5]) / total])
+            dist[form_n == 0] = _DEFAULT_DIST
+
+            enough = (form_n >= 3)
+            self.form_n.append(form_n)
+            self.has.append(enough[:, None] & _majority_or_third_arr(counts, form_n[:, None]))
+            self.strength_tags.append(enough[:, None, None] & (strength_n >= 2)[:, :, None]
+                                      & (strength_counts >= np.maximum(3, strength_n // 3)[:, :, None]))
+            self.dist.append(dist)
+        self.home_dist, self.away_dist = self.dist
+        self._tag_rows = None
+
+    def _vs_top_win(self, side: int, slugs: List[str]) -> np.ndarray:
+        """FormFeatures.vs_top_win for every row of one side."""
+        has, tags = self.has[side], self.strength_tags[side]
+        lower = [slug.lower() for slug in slugs]
+        slug_w = np.array(["_w" in s for s in lower], dtype=bool)
+        vs_top = np.array(["vs_top" in s for s in lower], dtype=bool)
+        every = has.any(axis=1) | tags.any(axis=(1, 2))
+        every_w = has[:, _W] | tags[:, :, _W].any(axis=1)
+        top = tags[:, 0, :].any(axis=1)
+        top_w = tags[:, 0, _W]
+        return (self.form_n[side] >= 3) & np.where(vs_top, every & (slug_w | every_w), top & (slug_w | top_w))
+
+    def signals(self, home_xg: np.ndarray, away_xg: np.ndarray) -> np.ndarray:
+        """(N, RULE_COUNT) boolean signal matrix; row i equals MatchFeatures.signals for fixture i."""
+        n = len(self)
+        home_has, away_has = self.has
+        h2h = np.array(self.h2h_counts, dtype=np.int64).reshape(n, 6)
+        h2h_n = np.array(self.h2h_n, dtype=np.int64)
+        st = np.array([p is not None for p in self.standings], dtype=bool)
+        hr, ar, hgd, agd, size = np.array([p or (0, 0, 0, 0, 0) for p in self.standings], dtype=float).reshape(n, 5).T
+
+        xg_home = home_xg > away_xg + 0.5
+        xg_away = ~xg_home & (away_xg > home_xg + 0.5)
+        xg_draw = ~xg_home & ~(away_xg > home_xg + 0.5) & (np.abs(home_xg - away_xg) < 0.3)
+
+        return np.column_stack([
+            xg_home, xg_away, xg_draw,
+            _majority_or_third_arr(h2h[:, 0], h2h_n),
+            _majority_or_third_arr(h2h[:, 1], h2h_n),
+            _majority_or_third_arr(h2h[:, 2], h2h_n),
+            _majority_or_third_arr(h2h[:, 3], h2h_n),
+            st & (hr <= 3) & (ar > size - 5),
+            st & (ar <= 3) & (hr > size - 5),
+            st & (hr < ar - 8),
+            st & (ar < hr - 8),
+            st & (hgd > 10),
+            st & (agd > 10),
+            st & (hgd < -10),
+            st & (agd < -10),
+            home_has[:, _S2], away_has[:, _S2],
+            home_has[:, _S3], away_has[:, _S3],
+            away_has[:, _C2], home_has[:, _C2],
+            home_has[:, _SNG], away_has[:, _SNG],
+            home_has[:, _CS], away_has[:, _CS],
+            self._vs_top_win(0, self.home_slug),
+            self._vs_top_win(1, self.away_slug),
+        ]).reshape(n, RULE_COUNT)
+
+    def tags(self, row: int) -> Tuple[List[str], List[str], List[str], List[str]]:
+        """MatchFeatures.all_tags for one row."""
+        if self._tag_rows is None:
+            self._tag_rows = [(self.form_n[side].tolist(), self.has[side].tolist(),
+                               [[[i for i, hit in enumerate(found) if hit] for found in strengths]
+                                for strengths in self.strength_tags[side].tolist()])
+                              for side in range(2)]
+        form = []
+        for (form_n, has, strength_tags), slug in zip(self._tag_rows, (self.home_slug[row], self.away_slug[row])):
+            form.append(_form_tags(slug, has[row], strength_tags[row]) if form_n[row] >= 3 else [])
+        position = self.standings[row]
+        return (form[0], form[1],
+                _h2h_tags(self.home_slug[row], self.away_slug[row], self.h2h_n[row], self.h2h_counts[row]),
+                _standings_tags(self.home_slug[row], self.away_slug[row], *position) if position else [])
+
+
+def batch_scores(signals: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    """(N, 4) home/away/draw/over25 scores; sequential cumsum over the rule axis as in score_signals."""
+    if not len(signals):
+        return np.zeros((0, 4))
+    return np.cumsum(signals[:, :, None] * matrix[None, :, :], axis=1)[:, -1, :]
@@ -0,0 +1,325 @@
+# goal_model.py: Poisson / Dixon-Coles score-matrix goal model.
+# Refactored for Clean Architecture (v2.8)
+# This script fits team attack/defence strengths and derives every goal market from score matrices.
+
+"""
+Goal Model Module
+NumPy goal model: one (N+1) x (N+1) score probability matrix per fixture.
+Responsible for strength fitting from schedules.csv and array-based market reductions.
+
+Expected goals follow the multiplicative Maher model
+    home goals ~ Poisson(base * home_adv * attack[home] * defence[away])
+    away goals ~ Poisson(base * attack[away] * defence[home])
+fitted by exact Poisson maximum-likelihood coordinate updates (bincount sums),
+with exponential time decay and pseudo-match shrinkage towards the average
+team. The Dixon-Coles variant additionally fits the low-score correlation rho
+and applies its tau correction to the 0-0 / 1-0 / 0-1 / 1-1 cells.
+
+Every market (1X2, double chance, BTTS, over/under lines, team totals, goal
+ranges, correct score) is a reduction over the score matrix, computed for a
+whole batch of fixtures at once.
+"""
+
+import os
+import threading
+import time
+from functools import lru_cache
+from datetime import datetime as dt
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# --- Model Configuration ---
+GOAL_MODEL_MAX_GOALS = int(os.getenv('LEO_GOAL_MODEL_MAX_GOALS', 10))          # Matrix covers 0..N goals per side
+GOAL_MODEL_HALF_LIFE = float(os.getenv('LEO_GOAL_MODEL_HALF_LIFE_DAYS', 180))  # Time-decay half-life (0 = off)
+GOAL_MODEL_PRIOR = float(os.getenv('LEO_GOAL_MODEL_PRIOR_MATCHES', 3.0))       # Shrinkage in pseudo-matches
+GOAL_MODEL_ITERATIONS = int(os.getenv('LEO_GOAL_MODEL_ITERATIONS', 30))
+GOAL_MODEL_KIND = os.getenv('LEO_GOAL_MODEL_KIND', 'dixon_coles')               # 'poisson' or 'dixon_coles'
+GOAL_MODEL_REFIT_INTERVAL = float(os.getenv('LEO_GOAL_MODEL_REFIT_INTERVAL', 60))  # Min seconds between refit checks
+
+OU_LINES = (0.5, 1.5, 2.5, 3.5, 4.5)
+TEAM_LINES = (0.5, 1.5, 2.5)
+GOAL_RANGES = ((0, 1), (2, 3), (4, 6), (7, None))
+
+
+# --- Score Matrices ---
+
+def poisson_pmf(rates: np.ndarray, max_goals: int = GOAL_MODEL_MAX_GOALS) -> np.ndarray:
+    """(N,) rates -> (N, max_goals + 1) Poisson probabilities."""
+    rates = np.maximum(np.asarray(rates, dtype=float), 1e-9)[:, None]
+    k = np.arange(max_goals + 1)
+    log_fact = np.concatenate(([0.0], np.cumsum(np.log(np.arange(1, max_goals + 1)))))
+    return np.exp(k * np.log(rates) - rates - log_fact)
+
+
+def score_matrix(home_rate: Sequence[float], away_rate: Sequence[float], rho: float = 0.0,
+                 max_goals: int = GOAL_MODEL_MAX_GOALS) -> np.ndarray:
+    """
+    (N, G+1, G+1) matrices, [n, h, a] = P(home scores h, away scores a).
+    rho != 0 applies the Dixon-Coles low-score correction. Rows are renormalised
+    so the truncated tail mass is spread proportionally.
+    """
+    lam = np.atleast_1d(np.asarray(home_rate, dtype=float))
+    mu = np.atleast_1d(np.asarray(away_rate, dtype=float))
+    matrix = poisson_pmf(lam, max_goals)[:, :, None] * poisson_pmf(mu, max_goals)[:, None, :]
+    if rho:
+        matrix[:, 0, 0] *= np.maximum(1 - lam * mu * rho, 0.0)
+        matrix[:, 0, 1] *= np.maximum(1 + lam * rho, 0.0)
+        matrix[:, 1, 0] *= np.maximum(1 + mu * rho, 0.0)
+        matrix[:, 1, 1] *= max(1 - rho, 0.0)
+    return matrix / matrix.sum(axis=(1, 2), keepdims=True)
+
+
+@lru_cache(maxsize=8)
+def _score_labels(g: int) -> np.ndarray:
+    """Flattened-cell index -> "h-a" label."""
+    return np.array([f"{h}-{a}" for h in range(g) for a in range(g)], dtype=object)
+
+
+def _total_goals(matrix: np.ndarray) -> np.ndarray:
+    """(N, G+1, G+1) -> (N, 2G+1) distribution of total goals (sum over anti-diagonals)."""
+    g = matrix.shape[1]
+    totals = np.add.outer(np.arange(g), np.arange(g)).ravel()
+    onehot = np.zeros((g * g, 2 * g - 1))
+    onehot[np.arange(g * g), totals] = 1.0
+    return matrix.reshape(len(matrix), -1) @ onehot
+
+
+def markets(matrix: np.ndarray, top_n: int = 5) -> Dict[str, Any]:
+    """
+    All goal markets for a batch of score matrices, as (N,) arrays keyed by market,
+    plus 'correct_score': per fixture, the top_n (score, prob) pairs.
+    """
+    n, g, _ = matrix.shape
+    home_marginal = matrix.sum(axis=2)
+    away_marginal = matrix.sum(axis=1)
+    total = _total_goals(matrix)
+    home_cdf = np.cumsum(home_marginal, axis=1)
+    away_cdf = np.cumsum(away_marginal, axis=1)
+    total_cdf = np.cumsum(total, axis=1)
+
+    home_win = np.tril(np.ones((g, g)), -1)
+    out: Dict[str, Any] = {
+        'home_win': (matrix * home_win).sum(axis=(1, 2)),
+        'draw': np.trace(matrix, axis1=1, axis2=2),
+        'away_win': (matrix * home_win.T).sum(axis=(1, 2)),
+        'btts_yes': matrix[:, 1:, 1:].sum(axis=(1, 2)),
+        'home_clean_sheet': away_marginal[:, 0],
+        'away_clean_sheet': home_marginal[:, 0],
+        'expected_home_goals': home_marginal @ np.arange(g),
+        'expected_away_goals': away_marginal @ np.arange(g),
+    }
+    out['btts_no'] = 1 - out['btts_yes']
+    out['home_or_draw'] = out['home_win'] + out['draw']
+    out['away_or_draw'] = out['away_win'] + out['draw']
+    out['home_or_away'] = out['home_win'] + out['away_win']
+    for line in OU_LINES:
+        under = total_cdf[:, int(line)]
+        out[f'over_{line}'] = 1 - under
+        out[f'under_{line}'] = under
+    for line in TEAM_LINES:
+        out[f'home_over_{line}'] = 1 - home_cdf[:, int(line)]
+        out[f'away_over_{line}'] = 1 - away_cdf[:, int(line)]
+    for lo, hi in GOAL_RANGES:
+        key = f'goals_{lo}_{hi}' if hi is not None else f'goals_{lo}_plus'
+        out[key] = total[:, lo:(hi + 1 if hi is not None else None)].sum(axis=1)
+
+    flat = matrix.reshape(n, -1)
+    top = np.argsort(-flat, axis=1, kind='stable')[:, :top_n]
+    labels = _score_labels(g)[top].tolist()
+    probs = np.take_along_axis(flat, top, axis=1).tolist()
+    out['correct_score'] = [list(zip(l, p)) for l, p in zip(labels, probs)]
+    return out
+
+
+def rule_engine_probabilities(matrix: np.ndarray, threshold: float = 0.03) -> List[Tuple[float, float, List[Dict[str, Any]]]]:
+    """(btts, over 2.5, correct-score list) per fixture, in the shape RuleEngine passes to _finalize."""
+    m = markets(matrix, top_n=min(matrix.shape[1] ** 2, int(1 / threshold) + 1))   # at most 1/threshold cells clear it
+    results = []
+    for i in range(len(matrix)):
+        scores = [{"score": s, "prob": round(p, 3)} for s, p in m['correct_score'][i] if p > threshold]
+        results.append((float(m['btts_yes'][i]), float(m['over_2.5'][i]), scores))
+    return results
+
+
+# --- Strength Fitting ---
+
+class GoalModel:
+    """Fitted attack/defence strengths; unknown teams fall back to the average team (strength 1.0)."""
+
+    def __init__(self, teams: List[str], attack: np.ndarray, defence: np.ndarray, base: float, home_adv: float,
+                 rho: float = 0.0, kind: str = 'poisson', matches: int = 0):
+        self.teams = teams
+        self.team_index = {t: i for i, t in enumerate(teams)}
+        self.attack = attack
+        self.defence = defence
+        self.base = base
+        self.home_adv = home_adv
+        self.rho = rho if kind == 'dixon_coles' else 0.0
+        self.kind = kind
+        self.matches = matches
+
+    @classmethod
+    def fit(cls, home: Sequence[str], away: Sequence[str], home_goals: Sequence[int], away_goals: Sequence[int],
+            ages_days: Optional[Sequence[float]] = None, kind: str = GOAL_MODEL_KIND,
+            half_life: float = GOAL_MODEL_HALF_LIFE, prior: float = GOAL_MODEL_PRIOR,
+            iterations: int = GOAL_MODEL_ITERATIONS) -> 'GoalModel':
+        """Fits strengths from parallel result arrays (ages_days: how long ago each match was played)."""
+        teams = sorted(set(home) | set(away))
+        index = {t: i for i, t in enumerate(teams)}
+        hi = np.fromiter((index[t] for t in home), dtype=np.int64, count=len(home))
+        ai = np.fromiter((index[t] for t in away), dtype=np.int64, count=len(away))
+        hg = np.asarray(home_goals, dtype=float)
+        ag = np.asarray(away_goals, dtype=float)
+        w = np.ones(len(hg))
+        if ages_days is not None and half_life > 0:
+            w = np.power(0.5, np.maximum(np.asarray(ages_days, dtype=float), 0.0) / half_life)
+        n_teams = len(teams)
+        if not len(hg):
+            return cls(teams, np.ones(n_teams), np.ones(n_teams), 1.35, 1.1, kind=kind)
+
+        def wsum(idx, values):
+            return np.bincount(idx, weights=w * values, minlength=n_teams)
+
+        attack = np.ones(n_teams)
+        defence = np.ones(n_teams)
+        base = max(float((w * ag).sum() / w.sum()), 1e-3)
+        home_adv = max(float((w * hg).sum() / max((w * ag).sum(), 1e-9)), 1e-3)
+        # Pseudo-matches: each team also "scores / concedes" the league rate `prior` times.
+        prior_goals = prior * base * (1 + home_adv) / 2
+        for _ in range(iterations):
+            exp_home = base * home_adv * defence[ai]           # per unit of attack[hi]
+            exp_away = base * defence[hi]                      # per unit of attack[ai]
+            attack = (wsum(hi, hg) + wsum(ai, ag) + prior_goals) / \
+                     (wsum(hi, exp_home) + wsum(ai, exp_away) + prior_goals)
+            conc_home = base * home_adv * attack[hi]           # per unit of defence[ai]
+            conc_away = base * attack[ai]                      # per unit of defence[hi]
+            defence = (wsum(ai, hg) + wsum(hi, ag) + prior_goals) / \
+                      (wsum(ai, conc_home) + wsum(hi, conc_away) + prior_goals)
+            # Identifiability: both strength vectors have geometric mean 1, base carries the scale.
+            attack /= np.exp(np.log(attack).mean())
+            defence /= np.exp(np.log(defence).mean())
+            base = float((w * ag).sum() / (w * attack[ai] * defence[hi]).sum())
+            home_adv = float((w * hg).sum() / (w * base * attack[hi] * defence[ai]).sum())
+
+        rho = 0.0
+        if kind == 'dixon_coles':
+            lam = base * home_adv * attack[hi] * defence[ai]
+            mu = base * attack[ai] * defence[hi]
+            rho = cls._fit_rho(lam, mu, hg, ag, w)
+        return cls(teams, attack, defence, base, home_adv, rho=rho, kind=kind, matches=len(hg))
+
+    @staticmethod
+    def _fit_rho(lam: np.ndarray, mu: np.ndarray, hg: np.ndarray, ag: np.ndarray, w: np.ndarray) -> float:
+        """Weighted profile likelihood of rho over a grid (only low-score results contribute)."""
+        low = (hg <= 1) & (ag <= 1)
+        if not low.any():
+            return 0.0
+        lam, mu, hg, ag, w = lam[low], mu[low], hg[low], ag[low], w[low]
+        grid = np.linspace(-0.25, 0.25, 101)[:, None]
+        tau = np.where((hg == 0) & (ag == 0), 1 - lam * mu * grid,
+              np.where((hg == 0) & (ag == 1), 1 + lam * grid,
+              np.where((hg == 1) & (ag == 0), 1 + mu * grid, 1 - grid)))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            loglik = np.where(tau > 0, np.log(tau), -np.inf) @ w
+        return float(grid[int(np.argmax(loglik)), 0])
+
+    def rates(self, home: Sequence[str], away: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Expected home / away goals for parallel team-name sequences."""
+        hi = np.array([self.team_index.get(t, -1) for t in home], dtype=np.int64)
+        ai = np.array([self.team_index.get(t, -1) for t in away], dtype=np.int64)
+        attack = np.append(self.attack, 1.0)     # index -1 -> average team
+        defence = np.append(self.defence, 1.0)
+        lam = self.base * self.home_adv * attack[hi] * defence[ai]
+        mu = self.base * attack[ai] * defence[hi]
+        return lam, mu
+
+    def predict_many(self, home: Sequence[str], away: Sequence[str], max_goals: int = GOAL_MODEL_MAX_GOALS) -> np.ndarray:
+        """(N, G+1, G+1) score matrices for N fixtures."""
+        lam, mu = self.rates(home, away)
+        return score_matrix(lam, mu, self.rho, max_goals)
+
+    def markets_many(self, home: Sequence[str], away: Sequence[str], top_n: int = 5) -> Dict[str, Any]:
+        return markets(self.predict_many(home, away), top_n=top_n)
+
+
+def _finished_results(rows: Iterable[Dict[str, Any]], today: dt):
+    """(home, away, home goals, away goals, ages in days) of the finished, dated matches among rows."""
+    home, away, hg, ag, ages = [], [], [], [], []
+    for row in rows:
+        if row.get('match_status') == 'scheduled' or not row.get('home_team') or not row.get('away_team'):
+            continue
+        try:
+            h, a = int(row.get('home_score')), int(row.get('away_score'))
+            played = dt.strptime(row.get('date', ''), "%d.%m.%Y")
+        except (TypeError, ValueError):
+            continue
+        home.append(row.get('home_team'))
+        away.append(row.get('away_team'))
+        hg.append(min(h, GOAL_MODEL_MAX_GOALS))
+        ag.append(min(a, GOAL_MODEL_MAX_GOALS))
+        ages.append((today - played).days)
+    return home, away, hg, ag, ages
+
+
+def fit_from_rows(rows: Iterable[Dict[str, Any]], kind: str = GOAL_MODEL_KIND, today: Optional[dt] = None) -> GoalModel:
+    """Fits a GoalModel from schedules.csv rows (finished matches with integer scores and DD.MM.YYYY dates)."""
+    home, away, hg, ag, ages = _finished_results(rows, today or dt.now())
+    return GoalModel.fit(home, away, hg, ag, ages_days=ages, kind=kind)
+
+
+# --- Process-wide Model ---
+
+_model: Optional[GoalModel] = None
+_model_version: Optional[int] = None      # schedules version the model was last checked against
+_model_results: Optional[int] = None      # hash of the finished results it was fitted on
+_model_checked = float('-inf')            # time.monotonic() of the last refit check
+_refitting = False
+_model_lock = threading.Lock()
+_fit_lock = threading.Lock()              # one fit at a time
+
+
+def _refit(table, version: int):
+    """Re-reads the schedules and refits when the finished results (or the day, for time decay) changed."""
+    global _model, _model_version, _model_results, _refitting
+    try:
+        with _fit_lock:
+            results = _finished_results(table.rows(), dt.now())
+            signature = hash(tuple(map(tuple, results)))
+            model = GoalModel.fit(*results[:4], ages_days=results[4]) if signature != _model_results else None
+            with _model_lock:
+                if model is not None:
+                    _model, _model_results = model, signature
+                    print(f"    [Goal Model] Fitted {model.kind} on {model.matches} results, {len(model.teams)} teams "
+                          f"(home adv {model.home_adv:.2f}, rho {model.rho:+.3f}).")
+                _model_version = version
+    finally:
+        with _model_lock:
+            _refitting = False
+
+
+def get_goal_model() -> GoalModel:
+    """
+    Shared model fitted from schedules.csv. Only the first call fits on the caller's thread.
+    After that, a schedules change starts a background check, at most once per
+    GOAL_MODEL_REFIT_INTERVAL seconds. The check refits only when the finished results differ,
+    and callers keep the current model until the new one is swapped in.
+    """
+    global _model_checked, _refitting
+    from Data.Access.db_helpers import SCHEDULES_CSV
+    from Data.Access.table_store import get_table
+
+    table = get_table(SCHEDULES_CSV, key='fixture_id')
+    version = table.version
+    with _model_lock:
+        if _model is not None:
+            now = time.monotonic()
+            if version != _model_version and not _refitting and now - _model_checked >= GOAL_MODEL_REFIT_INTERVAL:
+                _model_checked, _refitting = now, True
+                threading.Thread(target=_refit, args=(table, version), name="GoalModelRefit", daemon=True).start()
+            return _model
+        _refitting = True
+    _refit(table, version)
+    with _model_lock:
+        _model_checked = time.monotonic()
+        return _model
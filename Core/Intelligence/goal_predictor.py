@@ -10,6 +10,10 @@ Predicts goal distributions and expected goals (xG) for teams.
 from typing import List, Dict, Any
 from collections import Counter
 
+import numpy as np
+
+from .goal_model import get_goal_model, poisson_pmf
+
 
 class GoalPredictor:
     """Predicts goal distributions and expected goals for team analysis"""
@@ -104,29 +108,28 @@ class GoalPredictor:
     def predict_score_probabilities(home_xg: float, away_xg: float) -> List[Dict[str, Any]]:
         """
         Predict most probable scores based on expected goals.
-        Uses Poisson distribution approximation.
+        Uses an independent Poisson score matrix (0-5 goals per side).
         """
-        import math
-
-        scores = []
         max_goals = 5  # Consider scores up to 5-5
+        matrix = poisson_pmf(np.array([home_xg]), max_goals)[0][:, None] * poisson_pmf(np.array([away_xg]), max_goals)[0][None, :]
 
-        for home_goals in range(max_goals + 1):
-            for away_goals in range(max_goals + 1):
-                # Poisson probability for each score
-                home_prob = math.exp(-home_xg) * (home_xg ** home_goals) / math.factorial(home_goals)
-                away_prob = math.exp(-away_xg) * (away_xg ** away_goals) / math.factorial(away_goals)
-                total_prob = home_prob * away_prob
-
-                if total_prob > 0.01:  # Only include reasonably probable scores
-                    score_str = f"{home_goals}-{away_goals}"
-                    scores.append({
-                        "score": score_str,
-                        "probability": round(total_prob, 4),
-                        "home_goals": home_goals,
-                        "away_goals": away_goals
-                    })
+        scores = []
+        for home_goals, away_goals in zip(*np.nonzero(matrix > 0.01)):  # Only include reasonably probable scores
+            scores.append({
+                "score": f"{home_goals}-{away_goals}",
+                "probability": round(float(matrix[home_goals, away_goals]), 4),
+                "home_goals": int(home_goals),
+                "away_goals": int(away_goals)
+            })
 
         # Sort by probability (highest first)
         scores.sort(key=lambda x: x["probability"], reverse=True)
         return scores[:10]  # Return top 10 most probable scores
+
+    @staticmethod
+    def predict_markets(home_teams: List[str], away_teams: List[str], top_n: int = 5) -> Dict[str, Any]:
+        """
+        Every goal market (1X2, DC, BTTS, O/U, team totals, goal ranges, correct score)
+        for a batch of fixtures, from the fitted Poisson / Dixon-Coles score matrices.
+        """
+        return get_goal_model().markets_many(home_teams, away_teams, top_n=top_n)
@@ -43,6 +43,11 @@ async def get_selector_auto(page, context_key: str, element_key: str) -> str:
     return await SelectorManager.get_selector_auto(page, context_key, element_key)
 
 
+async def get_selectors_auto(page, context_key: str, element_keys: list) -> dict:
+    """Delegate to SelectorManager"""
+    return await SelectorManager.get_selectors_auto(page, context_key, element_keys)
+
+
 async def get_selector_with_fallback(page, context_key: str, element_key: str, action_description: str = "") -> str:
     """
     ROBUST SELECTOR ACCESSOR:
@@ -189,6 +194,7 @@ __all__ = [
     'attempt_visual_recovery',
     'get_selector',
     'get_selector_auto',
+    'get_selectors_auto',
     'get_selector_with_fallback',
     'extract_league_data',
     'fb_universal_popup_dismissal',
@@ -13,11 +13,24 @@ Handles prediction learning, performance analysis, and weight adaptation with re
 # Refactored for Clean Architecture (v2.7)
 # This script provides resilient UI element locating with AI fallbacks.
 
+import copy
 import json
 import os
-import csv
+import threading
+import time
 from collections import defaultdict
-from typing import Dict, Any, List, Tuple
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, Tuple
+
+import numpy as np
+
+
+def _freeze(value: Any) -> Any:
+    """Read-only view of nested weight dicts (shared across callers, so never mutated)."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    return value
+
 
 class LearningEngine:
     """Self-learning component that analyzes prediction performance and adjusts weights per region/league."""
@@ -65,12 +78,25 @@ class LearningEngine:
         }
     }
 
+    # --- Weights Registry ---
+    # One immutable snapshot per version of the weights file. Readers grab the current
+    # snapshot reference (no I/O); it is swapped whole when the file's signature
+    # changes (checked at most every WEIGHTS_CHECK_INTERVAL seconds) or update_weights runs.
+    WEIGHTS_CHECK_INTERVAL = float(os.getenv('LEO_WEIGHTS_CHECK_INTERVAL', 5.0))
+    _snapshot: Dict[str, Any] = {"sig": None, "raw": {}, "resolved": {}, "checked": float('-inf')}
+    _registry_lock = threading.RLock()
+
     @staticmethod
-    def load_weights(region_league: str = "GLOBAL") -> Dict[str, Any]:
-        """
-        Load learned weights for a specific region/league.
-        Falls back to GLOBAL if specific weights don't exist.
-        """
+    def _file_sig():
+        try:
+            st = os.stat(LearningEngine.LEARNING_DB)
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
+
+    @staticmethod
+    def _read_all_weights() -> Dict[str, Any]:
+        """Parses the weights file, migrating the old flat format. Never raises."""
         all_weights = {}
         if os.path.exists(LearningEngine.LEARNING_DB):
             try:
@@ -78,41 +104,74 @@ class LearningEngine:
                     all_weights = json.load(f)
             except:
                 pass
-        
         # If the file is the old flat format, migrate it to the new structure
         if "h2h_home_win" in all_weights:
             all_weights = {"GLOBAL": all_weights}
+        return all_weights
 
-        # 1. Try exact match
-        if region_league in all_weights:
-            return LearningEngine._merge_defaults(all_weights[region_league])
-            
-        # 2. Try Region match (if "Region - League" format)
-        if " - " in region_league:
-            region = region_league.split(" - ")[0]
-            # Potential future expansion: Region-level fallbacks
-        
-        # 3. Fallback to GLOBAL
-        return LearningEngine._merge_defaults(all_weights.get("GLOBAL", {}))
+    @staticmethod
+    def _publish(all_weights: Dict[str, Any], sig) -> Dict[str, Any]:
+        snapshot = {"sig": sig, "raw": all_weights, "resolved": {}, "checked": time.monotonic()}
+        LearningEngine._snapshot = snapshot
+        return snapshot
+
+    @staticmethod
+    def _current_snapshot() -> Dict[str, Any]:
+        snapshot = LearningEngine._snapshot
+        now = time.monotonic()
+        if now - snapshot["checked"] < LearningEngine.WEIGHTS_CHECK_INTERVAL:
+            return snapshot
+        with LearningEngine._registry_lock:
+            snapshot = LearningEngine._snapshot
+            sig = LearningEngine._file_sig()
+            if sig != snapshot["sig"] or snapshot["checked"] == float('-inf'):
+                return LearningEngine._publish(LearningEngine._read_all_weights(), sig)
+            snapshot["checked"] = now
+            return snapshot
+
+    @staticmethod
+    def load_weights(region_league: str = "GLOBAL") -> Mapping[str, Any]:
+        """
+        Load learned weights for a specific region/league (read-only mapping).
+        Falls back to the region's entry, then GLOBAL, then the defaults.
+        """
+        snapshot = LearningEngine._current_snapshot()
+        resolved = snapshot["resolved"].get(region_league)
+        if resolved is None:
+            all_weights = snapshot["raw"]
+            region = region_league.split(" - ")[0] if " - " in region_league else None
+            # 1. Exact match  2. Region-level entry  3. GLOBAL
+            if region_league in all_weights:
+                source = all_weights[region_league]
+            elif region and region in all_weights:
+                source = all_weights[region]
+            else:
+                source = all_weights.get("GLOBAL", {})
+            resolved = _freeze(LearningEngine._merge_defaults(source))
+            snapshot["resolved"][region_league] = resolved
+        return resolved
 
     @staticmethod
     def _merge_defaults(weights: Dict[str, Any]) -> Dict[str, Any]:
-        """Ensure all keys exist by merging with defaults."""
-        merged = LearningEngine.DEFAULT_WEIGHTS.copy()
-        # Deep merge for confidence_calibration
-        if "confidence_calibration" in weights:
-            merged["confidence_calibration"].update(weights["confidence_calibration"])
-            del weights["confidence_calibration"]
-            
-        merged.update(weights)
+        """Ensure all keys exist by merging with defaults (inputs are left untouched)."""
+        merged = copy.deepcopy(LearningEngine.DEFAULT_WEIGHTS)
+        for key, value in weights.items():
+            if key == "confidence_calibration" and isinstance(value, dict):
+                merged[key].update(value)
+            else:
+                merged[key] = copy.deepcopy(value)
         return merged
 
     @staticmethod
     def save_all_weights(all_weights: Dict[str, Any]):
-        """Save the entire weights dictionary to file."""
-        os.makedirs("Data/Store", exist_ok=True)
-        with open(LearningEngine.LEARNING_DB, 'w') as f:
-            json.dump(all_weights, f, indent=2)
+        """Save the entire weights dictionary to file (atomic replace) and publish it to readers."""
+        os.makedirs(os.path.dirname(LearningEngine.LEARNING_DB) or ".", exist_ok=True)
+        with LearningEngine._registry_lock:
+            tmp_path = f"{LearningEngine.LEARNING_DB}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(all_weights, f, indent=2)
+            os.replace(tmp_path, LearningEngine.LEARNING_DB)
+            LearningEngine._publish(copy.deepcopy(all_weights), LearningEngine._file_sig())
 
     @staticmethod
     def analyze_performance() -> Tuple[Dict[str, Dict[str, Dict[str, int]]], Dict[str, Dict[str, Dict[str, int]]]]:
@@ -120,47 +179,51 @@ class LearningEngine:
         Analyze prediction performance breakdown by Region/League and Rule.
         Returns: (rule_performance, confidence_performance)
         where each is { RegionLeague: { Key: { 'correct': int, 'total': int } } }
+
+        Fired rules come from the feature store, joined to reviewed outcomes by fixture_id;
+        predictions saved before the store existed fall back to REASON_TO_RULE_MAP phrases.
         """
-        from Data.Access.db_helpers import PREDICTIONS_CSV
-        
-        if not os.path.exists(PREDICTIONS_CSV):
-            return {}, {}
+        from Data.Access.feature_store import load_features, reviewed_outcomes
+        from .compiled_rules import RULES
 
         # Structure: League -> Rule -> Stats
         performance = defaultdict(lambda: defaultdict(lambda: {"correct": 0, "total": 0}))
-        
+
         # Structure: League -> Confidence -> Stats
         conf_performance = defaultdict(lambda: defaultdict(lambda: {"correct": 0, "total": 0}))
 
         try:
-            with open(PREDICTIONS_CSV, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    # Only analyze resolved matches
-                    if row.get('outcome_correct') not in ['True', 'False']:
-                        continue
-                        
-                    is_correct = row.get('outcome_correct') == 'True'
-                    region_league = row.get('region_league', 'Unknown')
-                    prediction_conf = row.get('confidence', 'Medium')
-                    reasoning_text = row.get('reason', '')
-                    
-                    # Track confidence accuracy
-                    conf_performance[region_league][prediction_conf]["total"] += 1
-                    conf_performance["GLOBAL"][prediction_conf]["total"] += 1
-                    if is_correct:
-                        conf_performance[region_league][prediction_conf]["correct"] += 1
-                        conf_performance["GLOBAL"][prediction_conf]["correct"] += 1
-
-                    # Track rule accuracy based on reasoning text
-                    for phrase, rule_key in LearningEngine.REASON_TO_RULE_MAP.items():
-                        if phrase in reasoning_text:
-                            performance[region_league][rule_key]["total"] += 1
-                            performance["GLOBAL"][rule_key]["total"] += 1
-                            if is_correct:
-                                performance[region_league][rule_key]["correct"] += 1
-                                performance["GLOBAL"][rule_key]["correct"] += 1
-                                
+            outcomes = reviewed_outcomes()
+            if not len(outcomes['fixture_id']):
+                return {}, {}
+            frame = load_features()
+            leagues, correct = outcomes['region_league'], outcomes['correct']
+
+            # Track confidence accuracy
+            levels, level_codes = np.unique(outcomes['confidence'], return_inverse=True)
+            level_hits = level_codes[:, None] == np.arange(len(levels))
+            LearningEngine._tally(conf_performance, leagues, correct, level_hits, levels.tolist())
+
+            # Track rule accuracy per weight key (a key counts once even if home and away variants fired)
+            weight_keys = list(dict.fromkeys([rule[2] for rule in RULES] + list(LearningEngine.REASON_TO_RULE_MAP.values())))
+            key_pos = {key: j for j, key in enumerate(weight_keys)}
+            membership = np.zeros((len(RULES), len(weight_keys)), dtype=bool)
+            for i, rule in enumerate(RULES):
+                membership[i, key_pos[rule[2]]] = True
+
+            key_hits = np.zeros((len(correct), len(weight_keys)), dtype=bool)
+            rows = frame.locate(outcomes['fixture_id'])
+            stored = rows >= 0
+            if stored.any():
+                fired = frame.columns('rules', [rule[0] for rule in RULES])[rows[stored]]
+                key_hits[stored] = (fired.astype(np.int32) @ membership.astype(np.int32)) > 0
+            for i in np.flatnonzero(~stored):
+                reasoning_text = outcomes['reason'][i]
+                for phrase, rule_key in LearningEngine.REASON_TO_RULE_MAP.items():
+                    if phrase in reasoning_text:
+                        key_hits[i, key_pos[rule_key]] = True
+            LearningEngine._tally(performance, leagues, correct, key_hits, weight_keys)
+
         except Exception as e:
             print(f"Error analyzing performance: {e}")
             return {}, {}
@@ -168,25 +231,35 @@ class LearningEngine:
         # Convert defaultdicts to regular dicts for return
         return dict(performance), dict(conf_performance)
 
+    @staticmethod
+    def _tally(target, leagues: np.ndarray, correct: np.ndarray, hits: np.ndarray, keys: List[str]):
+        """Adds per-league and GLOBAL correct/total counts for each key column of hits."""
+        names, codes = np.unique(leagues, return_inverse=True)
+        total = np.zeros((len(names), len(keys)), dtype=np.int64)
+        good = np.zeros_like(total)
+        np.add.at(total, codes, hits)
+        np.add.at(good, codes, hits & correct[:, None])
+        for scope, scope_total, scope_good in [*zip(names.tolist(), total, good), ("GLOBAL", total.sum(axis=0), good.sum(axis=0))]:
+            for j in np.flatnonzero(scope_total):
+                stats = target[scope][keys[j]]
+                stats["total"] += int(scope_total[j])
+                stats["correct"] += int(scope_good[j])
+
     @staticmethod
     def update_weights() -> Dict[str, Any]:
         """
         Update learning weights based on historical performance for each league.
         """
         rule_perf, conf_perf = LearningEngine.analyze_performance()
-        
-        # Load existing (or init new structure)
-        if os.path.exists(LearningEngine.LEARNING_DB):
-            try:
-                with open(LearningEngine.LEARNING_DB, 'r') as f:
-                    all_weights = json.load(f)
-                # Migration check
-                if "h2h_home_win" in all_weights:
-                    all_weights = {"GLOBAL": all_weights}
-            except:
-                all_weights = {"GLOBAL": LearningEngine.DEFAULT_WEIGHTS.copy()}
-        else:
-            all_weights = {"GLOBAL": LearningEngine.DEFAULT_WEIGHTS.copy()}
+
+        # Serialised: readers keep the previous snapshot until the merged one is published.
+        with LearningEngine._registry_lock:
+            return LearningEngine._update_weights_locked(rule_perf, conf_perf)
+
+    @staticmethod
+    def _update_weights_locked(rule_perf, conf_perf) -> Dict[str, Any]:
+        # Load existing (or init new structure); work on a private copy
+        all_weights = LearningEngine._read_all_weights() or {"GLOBAL": copy.deepcopy(LearningEngine.DEFAULT_WEIGHTS)}
 
         # Update weights for each league found in performance history
         # We also explicitly update GLOBAL based on global stats
@@ -194,7 +267,7 @@ class LearningEngine:
         
         for league in leagues_to_update:
             if league not in all_weights:
-                all_weights[league] = LearningEngine.DEFAULT_WEIGHTS.copy()
+                all_weights[league] = copy.deepcopy(LearningEngine.DEFAULT_WEIGHTS)
             
             league_weights = all_weights[league]
             
@@ -219,7 +292,7 @@ class LearningEngine:
             # Adjust expectation of truthfulness for each confidence level
             if league in conf_perf:
                 if "confidence_calibration" not in league_weights:
-                    league_weights["confidence_calibration"] = LearningEngine.DEFAULT_WEIGHTS["confidence_calibration"].copy()
+                    league_weights["confidence_calibration"] = dict(LearningEngine.DEFAULT_WEIGHTS["confidence_calibration"])
                 
                 for level, stats in conf_perf[league].items():
                     if stats["total"] >= 10 and level in league_weights["confidence_calibration"]:
@@ -9,9 +9,11 @@ Responsible for ensemble ML-based prediction capabilities.
 """
 
 import os
+import threading
+import time
 import joblib
 import numpy as np
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Sequence, Tuple
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
 
 
@@ -30,179 +32,267 @@ class MLModel:
     ]
 
     @staticmethod
-    def prepare_features(vision_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Extract and prepare features for ML prediction"""
-        h2h_data = vision_data.get("h2h_data", {})
-        standings = vision_data.get("standings", [])
-        home_team = h2h_data.get("home_team")
-        away_team = h2h_data.get("away_team")
+    def feature_row(vision_data: Dict[str, Any], home_xg: Optional[float] = None,
+                    away_xg: Optional[float] = None) -> Optional[np.ndarray]:
+        """
+        FEATURES as a float row from the fixture's form, H2H and standings.
+        home_xg / away_xg are the rule engine's form xG when it already has them;
+        otherwise they are derived from the same GoalPredictor distributions.
+        Returns None when teams or standings are missing.
+        """
+        xgs = None if home_xg is None or away_xg is None else [(home_xg, away_xg)]
+        positions, rows = MLModel.feature_rows([vision_data], xgs)
+        return rows[0] if positions else None
 
-        if not home_team or not away_team or not standings:
-            return None
+    @staticmethod
+    def feature_rows(vision_datas: Sequence[Dict[str, Any]],
+                     xgs: Optional[Sequence[Tuple[float, float]]] = None) -> Tuple[List[int], np.ndarray]:
+        """
+        feature_row() for a batch: (positions of the fixtures that have a row, their rows stacked).
+        xgs holds (home_xg, away_xg) per fixture. Standings tables and form matches shared
+        between fixtures (HistoryIndex hands out shared entries) are read once per batch.
+        """
+        tables: Dict[int, Tuple[Any, Dict[str, float], Dict[str, float]]] = {}
+        records: Dict[str, Dict[int, Tuple[int, int, int, int]]] = {}   # team -> id(match) -> record
+        seen: List[Dict[str, Any]] = []                                 # keeps the id() keys alive
+
+        def form_record(form: List[Dict[str, Any]], team: str) -> Tuple[int, int, int, int, int]:
+            known = records.get(team)
+            if known is None:
+                known = records[team] = {}
+            wins = draws = scored = conceded = 0
+            for m in form:
+                record = known.get(id(m))
+                if record is None:
+                    record = known[id(m)] = _match_record(m, team)
+                    seen.append(m)
+                wins += record[0]
+                draws += record[1]
+                scored += record[2]
+                conceded += record[3]
+            return wins, draws, len(form) - wins - draws, scored, conceded
+
+        positions, rows = [], []
+        for i, vision_data in enumerate(vision_datas):
+            h2h_data = vision_data.get("h2h_data", {})
+            standings = vision_data.get("standings", [])
+            home_team = h2h_data.get("home_team")
+            away_team = h2h_data.get("away_team")
+
+            if not home_team or not away_team or not standings:
+                continue
+
+            # Basic team data
+            table = tables.get(id(standings))
+            if table is None:
+                table = tables[id(standings)] = (
+                    standings,
+                    {t.get("team_name"): _number(t.get("position", 20), 20) for t in standings},
+                    {t.get("team_name"): _number(t.get("goal_difference", 0)) for t in standings},
+                )
+            _, rank, gd = table
+
+            home_form = [m for m in h2h_data.get("home_last_10_matches", []) if m]
+            away_form = [m for m in h2h_data.get("away_last_10_matches", []) if m]
+            h2h = [m for m in h2h_data.get("head_to_head", []) if m]
+
+            if xgs is None:
+                home_xg, away_xg = MLModel._form_xg(home_form, away_form, home_team, away_team)
+            else:
+                home_xg, away_xg = xgs[i]
+
+            home_record = form_record(home_form, home_team)
+            away_record = form_record(away_form, away_team)
+            h2h_home_wins = sum(1 for m in h2h if _won(m, home_team))
+            h2h_away_wins = sum(1 for m in h2h if _won(m, away_team))
+            h2h_draws = sum(1 for m in h2h if m.get("winner") == "Draw")
+
+            positions.append(i)
+            rows.append([
+                rank.get(home_team, 20.0), rank.get(away_team, 20.0),
+                gd.get(home_team, 0.0), gd.get(away_team, 0.0),
+                *home_record[:3], *away_record[:3],
+                home_record[3], home_record[4], away_record[3], away_record[4],
+                h2h_home_wins, h2h_away_wins, h2h_draws,
+                home_xg, away_xg, len(standings)
+            ])
+        return positions, np.array(rows, dtype=float).reshape(len(rows), len(MLModel.FEATURES))
 
-        # Basic team data
-        rank = {t["team_name"]: t["position"] for t in standings}
-        gd = {t["team_name"]: t.get("goal_difference", 0) for t in standings}
-
-        home_position = rank.get(home_team, 20)
-        away_position = rank.get(away_team, 20)
-        home_gd = gd.get(home_team, 0)
-        away_gd = gd.get(away_team, 0)
-
-        # Form data
-        home_form = h2h_data.get("home_last_10_matches", [])
-        away_form = h2h_data.get("away_last_10_matches", [])
-
-        home_wins = sum(1 for m in home_form if
-                       (m.get("winner") == "Home" and m.get("home") == home_team) or
-                       (m.get("winner") == "Away" and m.get("away") == home_team))
-        home_draws = sum(1 for m in home_form if m.get("winner") == "Draw")
-        home_losses = len(home_form) - home_wins - home_draws
-
-        away_wins = sum(1 for m in away_form if
-                       (m.get("winner") == "Home" and m.get("home") == away_team) or
-                       (m.get("winner") == "Away" and m.get("away") == away_team))
-        away_draws = sum(1 for m in away_form if m.get("winner") == "Draw")
-        away_losses = len(away_form) - away_wins - away_draws
-
-        # Goal stats
-        home_scored = sum(int(m.get("score", "0-0").split("-")[0 if m.get("home") == home_team else 1]) for m in home_form if m.get("score"))
-        home_conceded = sum(int(m.get("score", "0-0").split("-")[1 if m.get("home") == home_team else 0]) for m in home_form if m.get("score"))
-        away_scored = sum(int(m.get("score", "0-0").split("-")[0 if m.get("home") == away_team else 1]) for m in away_form if m.get("score"))
-        away_conceded = sum(int(m.get("score", "0-0").split("-")[1 if m.get("home") == away_team else 0]) for m in away_form if m.get("score"))
-
-        # H2H stats
-        h2h = h2h_data.get("head_to_head", [])
-        h2h_home_wins = sum(1 for m in h2h if
-                           (m.get("winner") == "Home" and m.get("home") == home_team) or
-                           (m.get("winner") == "Away" and m.get("away") == home_team))
-        h2h_away_wins = sum(1 for m in h2h if
-                           (m.get("winner") == "Home" and m.get("home") == away_team) or
-                           (m.get("winner") == "Away" and m.get("away") == away_team))
-        h2h_draws = sum(1 for m in h2h if m.get("winner") == "Draw")
-
-        # xG calculation (simplified - would need RuleEngine for full calculation)
-        home_dist_scored = {"0": 0.4, "1": 0.3, "2": 0.2, "3+": 0.1}  # Placeholder
-        away_dist_scored = {"0": 0.4, "1": 0.3, "2": 0.2, "3+": 0.1}  # Placeholder
-
-        home_xg = sum(float(k.replace("3+", "3.5")) * v for k, v in home_dist_scored.items())
-        away_xg = sum(float(k.replace("3+", "3.5")) * v for k, v in away_dist_scored.items())
-
-        return {
-            'home_position': home_position,
-            'away_position': away_position,
-            'home_gd': home_gd,
-            'away_gd': away_gd,
-            'home_form_wins': home_wins,
-            'home_form_draws': home_draws,
-            'home_form_losses': home_losses,
-            'away_form_wins': away_wins,
-            'away_form_draws': away_draws,
-            'away_form_losses': away_losses,
-            'home_goals_scored': home_scored,
-            'home_goals_conceded': home_conceded,
-            'away_goals_scored': away_scored,
-            'away_goals_conceded': away_conceded,
-            'h2h_home_wins': h2h_home_wins,
-            'h2h_away_wins': h2h_away_wins,
-            'h2h_draws': h2h_draws,
-            'home_xg': home_xg,
-            'away_xg': away_xg,
-            'league_size': len(standings)
-        }
+    @staticmethod
+    def _form_xg(home_form, away_form, home_team, away_team):
+        from .goal_predictor import GoalPredictor
+        xg = GoalPredictor.get_match_xg(home_team, away_team, home_form, away_form)
+        return xg["home_xg"], xg["away_xg"]
+
+    @staticmethod
+    def prepare_features(vision_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Extract and prepare features for ML prediction (FEATURES -> value)."""
+        row = MLModel.feature_row(vision_data)
+        if row is None:
+            return None
+        return dict(zip(MLModel.FEATURES, row.tolist()))
 
     @staticmethod
     def train_models() -> bool:
-        """Train ML models using historical prediction data"""
-        from Data.Access.db_helpers import PREDICTIONS_CSV
-        import csv
+        """Train ML models on feature-store vectors joined with reviewed outcomes"""
+        from Data.Access.feature_store import load_features, reviewed_outcomes
 
-        if not os.path.exists(PREDICTIONS_CSV):
+        outcomes = reviewed_outcomes()
+        frame = load_features()
+        if not len(frame):
             return False
-
-        # Load historical data
-        data = []
-        with open(PREDICTIONS_CSV, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                if row.get('outcome_correct') in ['True', 'False']:
-                    # We need to reconstruct features from stored data
-                    # This is a simplified version - in practice you'd store features
-                    data.append(row)
-
-        if len(data) < 50:  # Need minimum data for training
+        rows = frame.locate(outcomes['fixture_id'])
+        X = frame.columns('features', MLModel.FEATURES)[np.maximum(rows, 0)]
+        usable = (rows >= 0) & np.isfinite(X).all(axis=1)
+        X = X[usable]
+        y = outcomes['correct'][usable].astype(int)
+
+        if len(X) < 50:  # Need minimum data for training
+            print(f"ML training skipped: {len(X)} reviewed predictions with stored features (need 50)")
+            return False
+        if len(np.unique(y)) < 2:
             return False
 
-        # Create training data (simplified - you'd extract proper features)
-        X = []
-        y = []
-
-        for row in data:
-            # Extract basic features from stored reasoning/tags
-            # This is a placeholder - you'd need to store proper features
-            features = [0] * len(MLModel.FEATURES)  # Placeholder
-            target = 1 if row.get('outcome_correct') == 'True' else 0
-            X.append(features)
-            y.append(target)
+        rf, gb = MLModel.fit_models(X, y)
 
-        X = np.array(X)
-        y = np.array(y)
+        # Cross-validation scores
+        from sklearn.model_selection import cross_val_score
+        rf_scores = cross_val_score(rf, X, y, cv=5, n_jobs=-1)
+        gb_scores = cross_val_score(gb, X, y, cv=5, n_jobs=-1)
 
-        if len(X) == 0:
-            return False
+        print(f"ML Models trained - RF: {rf_scores.mean():.3f}, GB: {gb_scores.mean():.3f}")
+        return True
 
-        # Train models
+    @staticmethod
+    def fit_models(X: np.ndarray, y: np.ndarray) -> Tuple[RandomForestClassifier, GradientBoostingClassifier]:
+        """Fit the ensemble, replace the pickles atomically and have the registry reload them."""
         os.makedirs(MLModel.MODEL_DIR, exist_ok=True)
 
         # Random Forest
-        rf = RandomForestClassifier(n_estimators=100, random_state=42)
+        rf = RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=-1)
         rf.fit(X, y)
-        joblib.dump(rf, os.path.join(MLModel.MODEL_DIR, 'random_forest.pkl'))
 
         # Gradient Boosting
         gb = GradientBoostingClassifier(n_estimators=100, random_state=42)
         gb.fit(X, y)
-        joblib.dump(gb, os.path.join(MLModel.MODEL_DIR, 'gradient_boosting.pkl'))
 
-        # Cross-validation scores
-        from sklearn.model_selection import cross_val_score
-        rf_scores = cross_val_score(rf, X, y, cv=5)
-        gb_scores = cross_val_score(gb, X, y, cv=5)
+        # Atomic replace so a running registry never loads a half-written pickle
+        for model, name in ((rf, 'random_forest.pkl'), (gb, 'gradient_boosting.pkl')):
+            path = os.path.join(MLModel.MODEL_DIR, name)
+            joblib.dump(model, path + '.tmp')
+            os.replace(path + '.tmp', path)
+        _registry.invalidate()
+        return rf, gb
 
-        print(f"ML Models trained - RF: {rf_scores.mean():.3f}, GB: {gb_scores.mean():.3f}")
-        return True
+    @staticmethod
+    def predict_many(feature_matrix: np.ndarray) -> List[Dict[str, Any]]:
+        """
+        Ensemble predictions for an (N, len(FEATURES)) matrix with the warm models
+        from the registry: one predict_proba call per model for the whole batch.
+        """
+        n = len(feature_matrix)
+        models = _registry.get()
+        if models is None or n == 0:
+            return [{"confidence": 0.5, "prediction": "UNKNOWN"} for _ in range(n)]
+
+        try:
+            rf, gb = models
+            X = np.asarray(feature_matrix, dtype=float).reshape(n, len(MLModel.FEATURES))
+            rf_pred = rf.predict_proba(X)[:, 1]  # Probability of correct prediction
+            gb_pred = gb.predict_proba(X)[:, 1]
+
+            # Ensemble prediction
+            ensemble = (rf_pred + gb_pred) / 2
+            return [{
+                "confidence": float(c),
+                "rf_confidence": float(r),
+                "gb_confidence": float(g),
+                "prediction": "HIGH" if c > 0.6 else "MEDIUM" if c > 0.4 else "LOW"
+            } for c, r, g in zip(ensemble, rf_pred, gb_pred)]
+
+        except Exception as e:
+            print(f"ML Prediction error: {e}")
+            return [{"confidence": 0.5, "prediction": "UNKNOWN"} for _ in range(n)]
 
     @staticmethod
     def predict(features: Dict[str, Any]) -> Dict[str, Any]:
         """Make ML predictions using ensemble of trained models"""
-        rf_path = os.path.join(MLModel.MODEL_DIR, 'random_forest.pkl')
-        gb_path = os.path.join(MLModel.MODEL_DIR, 'gradient_boosting.pkl')
+        return MLModel.predict_many(np.array([[features.get(f, 0) for f in MLModel.FEATURES]], dtype=float))[0]
 
-        if not (os.path.exists(rf_path) and os.path.exists(gb_path)):
-            return {"confidence": 0.5, "prediction": "UNKNOWN"}
 
-        try:
-            # Load models
-            rf = joblib.load(rf_path)
-            gb = joblib.load(gb_path)
+# --- Feature Helpers ---
 
-            # Prepare feature vector
-            feature_vector = np.array([[features.get(f, 0) for f in MLModel.FEATURES]])
+def _number(value: Any, default: float = 0.0) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
 
-            # Get predictions
-            rf_pred = rf.predict_proba(feature_vector)[0][1]  # Probability of correct prediction
-            gb_pred = gb.predict_proba(feature_vector)[0][1]
 
-            # Ensemble prediction
-            ensemble_confidence = (rf_pred + gb_pred) / 2
+def _won(m: Dict[str, Any], team: str) -> bool:
+    return (m.get("winner") == "Home" and m.get("home") == team) or (m.get("winner") == "Away" and m.get("away") == team)
 
-            return {
-                "confidence": ensemble_confidence,
-                "rf_confidence": rf_pred,
-                "gb_confidence": gb_pred,
-                "prediction": "HIGH" if ensemble_confidence > 0.6 else "MEDIUM" if ensemble_confidence > 0.4 else "LOW"
-            }
 
-        except Exception as e:
-            print(f"ML Prediction error: {e}")
-            return {"confidence": 0.5, "prediction": "UNKNOWN"}
+def _match_record(m: Dict[str, Any], team: str) -> Tuple[int, int, int, int]:
+    """(won, drawn, goals scored, goals conceded) of one match for team; unparseable scores add no goals."""
+    won = int(_won(m, team))
+    drawn = int(m.get("winner") == "Draw")
+    try:
+        hg, ag = map(int, str(m.get("score", "")).replace(" ", "").split("-"))
+    except ValueError:
+        return won, drawn, 0, 0
+    if m.get("home") == team:
+        return won, drawn, hg, ag
+    return won, drawn, ag, hg
+
+
+# --- Model Registry ---
+
+class ModelRegistry:
+    """
+    Keeps the trained ensemble in memory. The pickles are loaded once and reloaded
+    only when their files change (checked at most every CHECK_INTERVAL seconds,
+    or immediately after invalidate(), which train_models calls).
+    """
+
+    CHECK_INTERVAL = float(os.getenv('LEO_ML_CHECK_INTERVAL', 30.0))
+    MODEL_FILES = ('random_forest.pkl', 'gradient_boosting.pkl')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._models = None
+        self._sig = None
+        self._checked = float('-inf')
+
+    def _paths(self) -> List[str]:
+        return [os.path.join(MLModel.MODEL_DIR, name) for name in self.MODEL_FILES]
+
+    def _stat(self):
+        try:
+            return tuple((st.st_mtime_ns, st.st_size) for st in map(os.stat, self._paths()))
+        except OSError:
+            return None
+
+    def get(self):
+        """(random_forest, gradient_boosting), or None when no trained models exist."""
+        if time.monotonic() - self._checked < self.CHECK_INTERVAL:
+            return self._models
+        with self._lock:
+            sig = self._stat()
+            if sig != self._sig:
+                models = None
+                if sig is not None:
+                    try:
+                        models = tuple(joblib.load(path) for path in self._paths())
+                        print(f"    [ML] Loaded ensemble from {MLModel.MODEL_DIR}")
+                    except Exception as e:
+                        print(f"    [ML] Could not load models: {e}")
+                self._models, self._sig = models, sig
+            self._checked = time.monotonic()
+            return self._models
+
+    def invalidate(self):
+        self._checked = float('-inf')
+
+
+_registry = ModelRegistry()
@@ -407,11 +407,12 @@ class PageAnalyzer:
                 return "NOT_FINISHED"
 
             # Extract Score
-            home_score_sel = await SelectorManager.get_selector_auto(page, "match_page", "header_score_home")
+            score_sel = await SelectorManager.get_selectors_auto(page, "match_page", ["header_score_home", "header_score_away"])
+            home_score_sel = score_sel["header_score_home"]
             if not home_score_sel:
                 home_score_sel = "div.detailScore__wrapper > span:nth-child(1)"
 
-            away_score_sel = await SelectorManager.get_selector_auto(page, "match_page", "header_score_away")
+            away_score_sel = score_sel["header_score_away"]
             if not away_score_sel:
                 away_score_sel = "div.detailScore__wrapper > span:nth-child(3)"
 
@@ -444,8 +445,9 @@ class PageAnalyzer:
                 "league_name": "meta_breadcrumb_league"
             }
 
+            resolved = await SelectorManager.get_selectors_auto(page, context, list(selectors_to_try.values()))
             for field, selector_key in selectors_to_try.items():
-                selector = await SelectorManager.get_selector_auto(page, context, selector_key)
+                selector = resolved[selector_key]
                 if selector:
                     try:
                         element = page.locator(selector).first
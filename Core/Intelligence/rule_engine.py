@@ -8,7 +8,11 @@ Core rule-based prediction engine for LeoBook.
 Handles main analysis combining rules, xG, ML, and market selection.
 """
 
-from typing import List, Dict, Any
+import gc
+import os
+from contextlib import contextmanager
+from functools import lru_cache, partial
+from typing import List, Dict, Any, Callable, Optional, Sequence, Tuple
 from datetime import datetime, timedelta
 import numpy as np
 
@@ -19,6 +23,38 @@ from .goal_predictor import GoalPredictor
 from .betting_markets import BettingMarkets
 
 from .rule_config import RuleConfig
+from . import compiled_rules
+from . import goal_model
+
+# Compiled feature/vector path (parity-checked against analyze_reference)
+COMPILED_RULES = os.getenv('LEO_RULE_ENGINE_COMPILED', '1') == '1'
+# BTTS / over 2.5 / correct scores from the fitted score-matrix goal model instead of the form histogram
+GOAL_MODEL_MARKETS = os.getenv('LEO_RULE_ENGINE_GOAL_MODEL', '0') == '1'
+
+@lru_cache(maxsize=8192)
+def _parse_match_date(date_str: str) -> Optional[datetime]:
+    """Parses YYYY-MM-DD / DD.MM.YYYY match dates (cached: fixtures share few distinct dates). None if invalid."""
+    try:
+        if "-" in date_str and len(date_str.split("-")[0]) == 4:
+            return datetime.strptime(date_str, "%Y-%m-%d")
+        return datetime.strptime(date_str, "%d.%m.%Y")
+    except:
+        return None
+
+@contextmanager
+def _gc_paused():
+    """
+    Pauses the cyclic garbage collector around a batch. analyze_many keeps every result
+    alive until it returns, so the generation-2 passes its allocations trigger would rescan
+    the whole batch and find nothing to free; any cycles are collected once it is re-enabled.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
 
 class RuleEngine:
     @staticmethod
@@ -27,24 +63,33 @@ class RuleEngine:
         MAIN PREDICTION ENGINE — Returns full market predictions
         Accepts optional RuleConfig for custom logic.
         """
-        if config is None:
-            config = RuleConfig()
-            
+        if COMPILED_RULES:
+            return RuleEngine.analyze_compiled(vision_data, config)
+        return RuleEngine.analyze_reference(vision_data, config)
+
+    @staticmethod
+    def _inputs(vision_data: Dict[str, Any], config: RuleConfig):
+        """Common input extraction: (home_team, away_team, region_league, home_form, away_form, h2h, standings)."""
         h2h_data = vision_data.get("h2h_data", {})
         standings = vision_data.get("standings", [])
         home_team = h2h_data.get("home_team")
         away_team = h2h_data.get("away_team")
         region_league = h2h_data.get("region_league", "GLOBAL")
 
-        if not home_team or not away_team:
-            return {"type": "SKIP", "confidence": "Low", "reason": "Missing teams"}
-
         home_form = [m for m in h2h_data.get("home_last_10_matches", []) if m][:10]
         away_form = [m for m in h2h_data.get("away_last_10_matches", []) if m][:10]
-        h2h_raw = h2h_data.get("head_to_head", [])
+        # Backtests pass the fixture's own date, so the lookback is point-in-time.
+        reference = _parse_match_date(h2h_data.get("reference_date") or "")
+        h2h = RuleEngine._recent_h2h(h2h_data.get("head_to_head", []), config.h2h_lookback_days, reference)
+        return home_team, away_team, region_league, home_form, away_form, h2h, standings
 
-        # Filter H2H based on config
-        cutoff = datetime.now() - timedelta(days=config.h2h_lookback_days)
+    @staticmethod
+    def _recent_h2h(h2h_raw: List[Dict], lookback_days: int, reference: Optional[datetime] = None) -> List[Dict]:
+        """
+        Filter H2H based on config lookback, counted back from reference (default: now).
+        Matches with unparseable dates are kept.
+        """
+        cutoff = (reference or datetime.now()) - timedelta(days=lookback_days)
         h2h = []
         for m in h2h_raw:
             if not m:
@@ -52,14 +97,137 @@ class RuleEngine:
             try:
                 date_str = m.get("date", "")
                 if date_str:
-                    if "-" in date_str and len(date_str.split("-")[0]) == 4:
-                        d = datetime.strptime(date_str, "%Y-%m-%d")
-                    else:
-                        d = datetime.strptime(date_str, "%d.%m.%Y")
-                    if d >= cutoff:
-                        h2h.append(m)
+                    d = _parse_match_date(date_str)
+                    if d is None or d >= cutoff:
+                        h2h.append(m)  # keep if date parse fails
             except:
-                h2h.append(m)  # keep if date parse fails
+                h2h.append(m)
+        return h2h
+
+    @staticmethod
+    def analyze_compiled(vision_data: Dict[str, Any], config: RuleConfig = None) -> Dict[str, Any]:
+        """
+        Compiled path: inputs are parsed once into MatchFeatures, rules are scored as
+        a signal vector against the RuleConfig weight matrix, tags are rendered last.
+        """
+        if config is None:
+            config = RuleConfig()
+
+        home_team, away_team, region_league, home_form, away_form, h2h, standings = RuleEngine._inputs(vision_data, config)
+        if not home_team or not away_team:
+            return {"type": "SKIP", "confidence": "Low", "reason": "Missing teams"}
+        features = compiled_rules.MatchFeatures(home_team, away_team, home_form, away_form, h2h, standings)
+        if not features.supported:
+            return RuleEngine.analyze_reference(vision_data, config)
+
+        home_xg = features.home.xg
+        away_xg = features.away.xg
+        signals = features.signals(home_xg, away_xg)
+        home_score, away_score, draw_score, _ = compiled_rules.score_signals(signals, compiled_rules.weight_matrix(config))
+        reasoning = compiled_rules.reasons(signals, home_team, away_team)
+        btts_prob, over25_prob, scores = compiled_rules.goal_probabilities(features.home.scored_dist, features.away.scored_dist)
+
+        return RuleEngine._finalize(
+            vision_data, home_team, away_team, region_league,
+            home_score, away_score, draw_score, btts_prob, over25_prob, scores, home_xg, away_xg, reasoning,
+            features.all_tags, (len(h2h), len(home_form), len(away_form)),
+            rule_ids=compiled_rules.rule_ids(signals)
+        )
+
+    @staticmethod
+    def analyze_many(fixtures: List[Dict[str, Any]], config: RuleConfig = None) -> List[Dict[str, Any]]:
+        """
+        Batch entry point for offline reprediction and backtests. Returns one result per
+        fixture, in order, equal to analyze() on each. One pass over the inputs fills a
+        compiled_rules.BatchFeatures (matches and standings shared between fixtures are
+        parsed once); form counts, goal models, xG, BTTS/over 2.5, score grids, rule scores,
+        ML feature rows, the ensemble, market confidences and market selection are then
+        computed for the whole batch, and only result assembly runs per row.
+        Region weights come from the LearningEngine registry. A fixture whose analysis raises
+        yields a SKIP result instead of aborting the batch.
+        """
+        if config is None:
+            config = RuleConfig()
+        with _gc_paused():
+            return RuleEngine._analyze_batch(fixtures, config)
+
+    @staticmethod
+    def _analyze_batch(fixtures: List[Dict[str, Any]], config: RuleConfig) -> List[Dict[str, Any]]:
+        results: List[Any] = [None] * len(fixtures)
+        features = compiled_rules.BatchFeatures()
+        batch = []   # (position, vision_data, inputs) per features row
+        for pos, vision_data in enumerate(fixtures):
+            try:
+                inputs = RuleEngine._inputs(vision_data, config)
+                home_team, away_team, _, home_form, away_form, h2h, standings = inputs
+                if not home_team or not away_team:
+                    results[pos] = {"type": "SKIP", "confidence": "Low", "reason": "Missing teams"}
+                    continue
+                if features.add(home_team, away_team, home_form, away_form, h2h, standings):
+                    batch.append((pos, vision_data, inputs))
+                else:
+                    results[pos] = RuleEngine.analyze_reference(vision_data, config)
+            except Exception as e:
+                results[pos] = {"type": "SKIP", "confidence": "Low", "reason": [f"Analysis error: {e}"]}
+
+        if not batch:
+            return results
+
+        features.finish()
+        home_xg, away_xg, btts, over25, grid = compiled_rules.batch_goal_model(features.home_dist, features.away_dist)
+        signals = features.signals(home_xg, away_xg)
+        scores = compiled_rules.batch_scores(signals, compiled_rules.weight_matrix(config))
+
+        goal_probs = [None] * len(batch)
+        if GOAL_MODEL_MARKETS:
+            matrices = goal_model.get_goal_model().predict_many([item[2][0] for item in batch], [item[2][1] for item in batch])
+            goal_probs = goal_model.rule_engine_probabilities(matrices)
+
+        # One feature pass and one ensemble call for every fixture that has an ML feature row
+        home_xg, away_xg = home_xg.tolist(), away_xg.tolist()
+        ml_predictions = [{"confidence": 0.5, "prediction": "UNKNOWN"} for _ in batch]
+        ml_rows: List[Optional[np.ndarray]] = [None] * len(batch)
+        rows_at, matrix = MLModel.feature_rows([item[1] for item in batch], list(zip(home_xg, away_xg)))
+        if rows_at:
+            for row, features_row, prediction in zip(rows_at, matrix, MLModel.predict_many(matrix)):
+                ml_rows[row], ml_predictions[row] = features_row, prediction
+
+        btts, over25, signals = btts.tolist(), over25.tolist(), signals.tolist()
+        top_scores = [compiled_rules.top_scores(cells) for cells in grid.tolist()]
+        if GOAL_MODEL_MARKETS:
+            btts, over25, top_scores = (list(column) for column in zip(*goal_probs))
+        home_teams = [item[2][0] for item in batch]
+        away_teams = [item[2][1] for item in batch]
+        reasoning = [compiled_rules.reasons(fired, home_team, away_team)
+                     for fired, home_team, away_team in zip(signals, home_teams, away_teams)]
+        home_score, away_score, draw_score, _ = scores.T
+        scores = scores.tolist()
+        markets = BettingMarkets.generate_many(home_teams, away_teams, home_score, away_score, draw_score,
+                                               btts, over25, top_scores, home_xg, away_xg, reasoning)
+
+        for row, (pos, vision_data, inputs) in enumerate(batch):
+            home_team, away_team, region_league, home_form, away_form, h2h, _ = inputs
+            try:
+                results[pos] = RuleEngine._finalize(
+                    vision_data, home_team, away_team, region_league,
+                    *scores[row][:3], btts[row], over25[row], top_scores[row], home_xg[row], away_xg[row],
+                    reasoning[row], partial(features.tags, row), (len(h2h), len(home_form), len(away_form)),
+                    goal_probs=goal_probs[row], ml_prediction=ml_predictions[row], ml_row=ml_rows[row],
+                    rule_ids=compiled_rules.rule_ids(signals[row]), markets=markets[row]
+                )
+            except Exception as e:
+                results[pos] = {"type": "SKIP", "confidence": "Low", "reason": [f"Analysis error: {e}"]}
+        return results
+
+    @staticmethod
+    def analyze_reference(vision_data: Dict[str, Any], config: RuleConfig = None) -> Dict[str, Any]:
+        """Reference tag-based path (string tags drive every rule check)."""
+        if config is None:
+            config = RuleConfig()
+
+        home_team, away_team, region_league, home_form, away_form, h2h, standings = RuleEngine._inputs(vision_data, config)
+        if not home_team or not away_team:
+            return {"type": "SKIP", "confidence": "Low", "reason": "Missing teams"}
 
         # Generate all tags using TagGenerator
         home_tags = TagGenerator.generate_form_tags(home_form, home_team, standings)
@@ -74,26 +242,20 @@ class RuleEngine:
         home_xg = sum(float(k.replace("3+", "3.5")) * v for k, v in home_dist["goals_scored"].items())
         away_xg = sum(float(k.replace("3+", "3.5")) * v for k, v in away_dist["goals_scored"].items())
 
-        # Prepare ML features
-        ml_features = MLModel.prepare_features(vision_data)
-        ml_prediction = MLModel.predict(ml_features) if ml_features else {"confidence": 0.5, "prediction": "UNKNOWN"}
-
-        # --- LOAD REGION-SPECIFIC WEIGHTS ---
-        weights = LearningEngine.load_weights(region_league)
-
         # Weighted rule voting using learned weights
         home_score = away_score = draw_score = over25_score = 0
         reasoning = []
+        fired = []   # compiled_rules.RULES names, for feature store attribution
 
         # Incorporate xG into voting
         if home_xg > away_xg + 0.5:
-            home_score += config.xg_advantage
+            home_score += config.xg_advantage; fired.append('xg_home')
             reasoning.append(f"{home_team} has xG advantage")
         elif away_xg > home_xg + 0.5:
-            away_score += config.xg_advantage
+            away_score += config.xg_advantage; fired.append('xg_away')
             reasoning.append(f"{away_team} has xG advantage")
         elif abs(home_xg - away_xg) < 0.3:
-            draw_score += config.xg_draw
+            draw_score += config.xg_draw; fired.append('xg_draw')
             reasoning.append("Close xG suggests draw")
 
         home_slug = home_team.replace(" ", "_").upper()
@@ -101,45 +263,45 @@ class RuleEngine:
 
         # H2H signals
         if any(t.startswith(f"{home_slug}_WINS_H2H") for t in h2h_tags):
-            home_score += config.h2h_home_win; reasoning.append(f"{home_team} strong in H2H")
+            home_score += config.h2h_home_win; fired.append('h2h_home_win'); reasoning.append(f"{home_team} strong in H2H")
         if any(t.startswith(f"{away_slug}_WINS_H2H") for t in h2h_tags):
-            away_score += config.h2h_away_win; reasoning.append(f"{away_team} strong in H2H")
+            away_score += config.h2h_away_win; fired.append('h2h_away_win'); reasoning.append(f"{away_team} strong in H2H")
         if any(t.startswith("H2H_D") for t in h2h_tags):
-            draw_score += config.h2h_draw; reasoning.append("H2H suggests Draw")
+            draw_score += config.h2h_draw; fired.append('h2h_draw'); reasoning.append("H2H suggests Draw")
         if any(t in h2h_tags for t in ["H2H_O25", "H2H_O25_third"]):
-            over25_score += config.h2h_over25
+            over25_score += config.h2h_over25; fired.append('h2h_over25')
 
         # Standings signals
         if f"{home_slug}_TOP3" in standings_tags and f"{away_slug}_BOTTOM5" in standings_tags:
-            home_score += config.standings_top_vs_bottom; reasoning.append(f"Top ({home_team}) vs Bottom ({away_team})")
+            home_score += config.standings_top_vs_bottom; fired.append('home_top_vs_bottom'); reasoning.append(f"Top ({home_team}) vs Bottom ({away_team})")
         if f"{away_slug}_TOP3" in standings_tags and f"{home_slug}_BOTTOM5" in standings_tags:
-            away_score += config.standings_top_vs_bottom; reasoning.append(f"Top ({away_team}) vs Bottom ({home_team})")
+            away_score += config.standings_top_vs_bottom; fired.append('away_top_vs_bottom'); reasoning.append(f"Top ({away_team}) vs Bottom ({home_team})")
         
-        if f"{home_slug}_TABLE_ADV8+" in standings_tags: home_score += config.standings_table_advantage
-        if f"{away_slug}_TABLE_ADV8+" in standings_tags: away_score += config.standings_table_advantage
+        if f"{home_slug}_TABLE_ADV8+" in standings_tags: home_score += config.standings_table_advantage; fired.append('home_table_adv')
+        if f"{away_slug}_TABLE_ADV8+" in standings_tags: away_score += config.standings_table_advantage; fired.append('away_table_adv')
         
-        if f"{home_slug}_GD_POS_STRONG" in standings_tags: home_score += config.standings_gd_strong; reasoning.append(f"{home_team} has strong GD")
-        if f"{away_slug}_GD_POS_STRONG" in standings_tags: away_score += config.standings_gd_strong; reasoning.append(f"{away_team} has strong GD")
-        if f"{home_slug}_GD_NEG_WEAK" in standings_tags: away_score += config.standings_gd_weak; reasoning.append(f"{home_team} has weak GD")
-        if f"{away_slug}_GD_NEG_WEAK" in standings_tags: home_score += config.standings_gd_weak; reasoning.append(f"{away_team} has weak GD")
+        if f"{home_slug}_GD_POS_STRONG" in standings_tags: home_score += config.standings_gd_strong; fired.append('home_gd_strong'); reasoning.append(f"{home_team} has strong GD")
+        if f"{away_slug}_GD_POS_STRONG" in standings_tags: away_score += config.standings_gd_strong; fired.append('away_gd_strong'); reasoning.append(f"{away_team} has strong GD")
+        if f"{home_slug}_GD_NEG_WEAK" in standings_tags: away_score += config.standings_gd_weak; fired.append('home_gd_weak'); reasoning.append(f"{home_team} has weak GD")
+        if f"{away_slug}_GD_NEG_WEAK" in standings_tags: home_score += config.standings_gd_weak; fired.append('away_gd_weak'); reasoning.append(f"{away_team} has weak GD")
 
         # Form signals
-        if f"{home_slug}_FORM_S2+" in home_tags: home_score += config.form_score_2plus; over25_score += 2; reasoning.append(f"{home_team} scores 2+ often")
-        if f"{away_slug}_FORM_S2+" in away_tags: away_score += config.form_score_2plus; over25_score += 2; reasoning.append(f"{away_team} scores 2+ often")
-        if f"{home_slug}_FORM_S3+" in home_tags: home_score += config.form_score_3plus; over25_score += 1
-        if f"{away_slug}_FORM_S3+" in away_tags: away_score += config.form_score_3plus; over25_score += 1
+        if f"{home_slug}_FORM_S2+" in home_tags: home_score += config.form_score_2plus; over25_score += 2; fired.append('home_scores_2plus'); reasoning.append(f"{home_team} scores 2+ often")
+        if f"{away_slug}_FORM_S2+" in away_tags: away_score += config.form_score_2plus; over25_score += 2; fired.append('away_scores_2plus'); reasoning.append(f"{away_team} scores 2+ often")
+        if f"{home_slug}_FORM_S3+" in home_tags: home_score += config.form_score_3plus; over25_score += 1; fired.append('home_scores_3plus')
+        if f"{away_slug}_FORM_S3+" in away_tags: away_score += config.form_score_3plus; over25_score += 1; fired.append('away_scores_3plus')
 
-        if f"{away_slug}_FORM_C2+" in away_tags: home_score += config.form_concede_2plus; over25_score += 2; reasoning.append(f"{away_team} concedes 2+ often")
-        if f"{home_slug}_FORM_C2+" in home_tags: away_score += config.form_concede_2plus; over25_score += 2; reasoning.append(f"{home_team} concedes 2+ often")
+        if f"{away_slug}_FORM_C2+" in away_tags: home_score += config.form_concede_2plus; over25_score += 2; fired.append('away_concedes_2plus'); reasoning.append(f"{away_team} concedes 2+ often")
+        if f"{home_slug}_FORM_C2+" in home_tags: away_score += config.form_concede_2plus; over25_score += 2; fired.append('home_concedes_2plus'); reasoning.append(f"{home_team} concedes 2+ often")
 
-        if f"{home_slug}_FORM_SNG" in home_tags: away_score += config.form_no_score; reasoning.append(f"{home_team} fails to score")
-        if f"{away_slug}_FORM_SNG" in away_tags: home_score += config.form_no_score; reasoning.append(f"{away_team} fails to score")
+        if f"{home_slug}_FORM_SNG" in home_tags: away_score += config.form_no_score; fired.append('home_no_score'); reasoning.append(f"{home_team} fails to score")
+        if f"{away_slug}_FORM_SNG" in away_tags: home_score += config.form_no_score; fired.append('away_no_score'); reasoning.append(f"{away_team} fails to score")
 
-        if f"{home_slug}_FORM_CS" in home_tags: home_score += config.form_clean_sheet; reasoning.append(f"{home_team} has strong defense")
-        if f"{away_slug}_FORM_CS" in away_tags: away_score += config.form_clean_sheet; reasoning.append(f"{away_team} has strong defense")
+        if f"{home_slug}_FORM_CS" in home_tags: home_score += config.form_clean_sheet; fired.append('home_clean_sheet'); reasoning.append(f"{home_team} has strong defense")
+        if f"{away_slug}_FORM_CS" in away_tags: away_score += config.form_clean_sheet; fired.append('away_clean_sheet'); reasoning.append(f"{away_team} has strong defense")
 
-        if any("vs_top" in t.lower() and "_w" in t.lower() for t in home_tags): home_score += config.form_vs_top_win
-        if any("vs_top" in t.lower() and "_w" in t.lower() for t in away_tags): away_score += config.form_vs_top_win
+        if any("vs_top" in t.lower() and "_w" in t.lower() for t in home_tags): home_score += config.form_vs_top_win; fired.append('home_vs_top_win')
+        if any("vs_top" in t.lower() and "_w" in t.lower() for t in away_tags): away_score += config.form_vs_top_win; fired.append('away_vs_top_win')
 
         # Calculate probabilities
         keys = ["0", "1", "2", "3+"]
@@ -159,24 +321,67 @@ class RuleEngine:
                     scores.append({"score": f"{hg.replace('3+', '3+')}-{ag.replace('3+', '3+')}", "prob": round(p, 3)})
         scores.sort(key=lambda x: x["prob"], reverse=True)
 
-        # Generate comprehensive betting market predictions
-        betting_markets = BettingMarkets.generate_betting_market_predictions(
-            home_team, away_team, home_score, away_score, draw_score, btts_prob, over25_prob,
-            scores, home_xg, away_xg, reasoning
+        return RuleEngine._finalize(
+            vision_data, home_team, away_team, region_league,
+            home_score, away_score, draw_score, btts_prob, over25_prob, scores, home_xg, away_xg, reasoning,
+            lambda: (home_tags, away_tags, h2h_tags, standings_tags), (len(h2h), len(home_form), len(away_form)),
+            rule_ids=fired
         )
 
-        
-        # --- SELECTION STRATEGY: SAFETY FIRST ---
-        # We assume "conservative" risk preference to prioritize Double Chance, Over 1.5, etc.
-        selection = BettingMarkets.select_best_market(betting_markets, risk_preference="conservative")
-        
+    @staticmethod
+    def _finalize(vision_data: Dict[str, Any], home_team: str, away_team: str, region_league: str,
+                  home_score: float, away_score: float, draw_score: float, btts_prob: float, over25_prob: float,
+                  scores: List[Dict], home_xg: float, away_xg: float, reasoning: List[str],
+                  tags: Callable[[], Tuple[List[str], List[str], List[str], List[str]]],
+                  sample_sizes: Tuple[int, int, int], weights: Dict[str, Any] = None,
+                  goal_probs: Optional[Tuple[float, float, List[Dict]]] = None,
+                  ml_prediction: Optional[Dict[str, Any]] = None, ml_row: Optional[np.ndarray] = None,
+                  rule_ids: Sequence[str] = (),
+                  markets: Optional[Tuple[Dict[str, Dict[str, Any]], Optional[str]]] = None) -> Dict[str, Any]:
+        """
+        Market generation, selection, calibration and sanity checks shared by all paths.
+        markets is a BettingMarkets.generate_many row (markets, selected key or None)
+        when the batch already built them.
+        """
+        if GOAL_MODEL_MARKETS:
+            if goal_probs is None:
+                matrix = goal_model.get_goal_model().predict_many([home_team], [away_team])
+                goal_probs = goal_model.rule_engine_probabilities(matrix)[0]
+            btts_prob, over25_prob, scores = goal_probs
+
+        # ML ensemble on the fixture's feature row (reuses the rule engine's xG)
+        if ml_prediction is None:
+            ml_row = MLModel.feature_row(vision_data, home_xg, away_xg)
+            ml_prediction = MLModel.predict_many(ml_row[None, :])[0] if ml_row is not None else {"confidence": 0.5, "prediction": "UNKNOWN"}
+
+        # --- LOAD REGION-SPECIFIC WEIGHTS ---
+        if weights is None:
+            weights = LearningEngine.load_weights(region_league)
+
+        # Generate comprehensive betting market predictions
+        selected_key = None
+        if markets is None:
+            betting_markets = BettingMarkets.generate_betting_market_predictions(
+                home_team, away_team, home_score, away_score, draw_score, btts_prob, over25_prob,
+                scores, home_xg, away_xg, reasoning
+            )
+        else:
+            betting_markets, selected_key = markets
+
         best_prediction = None
-        if selection:
-             # Find the full market object
-             for k, v in betting_markets.items():
-                 if v["market_type"] == selection["market_type"] and v["market_prediction"] == selection["prediction"]:
-                     best_prediction = v
-                     break
+        if selected_key is not None:
+            best_prediction = betting_markets[selected_key]
+        else:
+            # --- SELECTION STRATEGY: SAFETY FIRST ---
+            # We assume "conservative" risk preference to prioritize Double Chance, Over 1.5, etc.
+            selection = BettingMarkets.select_best_market(betting_markets, risk_preference="conservative")
+
+            if selection:
+                 # Find the full market object
+                 for k, v in betting_markets.items():
+                     if v["market_type"] == selection["market_type"] and v["market_prediction"] == selection["prediction"]:
+                         best_prediction = v
+                         break
         
         # Fallback if no safe bet found
         if not best_prediction and betting_markets:
@@ -230,6 +435,8 @@ class RuleEngine:
              if most_prob_score == "0-0" and "over 2.5" in primary_pred:
                  final_confidence = "Low" # Contradiction
 
+        home_tags, away_tags, h2h_tags, standings_tags = tags()
+        h2h_n, home_form_n, away_form_n = sample_sizes
         return {
             "market_prediction": prediction_text,
             "type": prediction_text,
@@ -248,8 +455,20 @@ class RuleEngine:
             "standings_tags": standings_tags,
             "ml_confidence": ml_prediction.get("confidence", 0.5),
             "betting_markets": betting_markets, 
-            "h2h_n": len(h2h),
-            "home_form_n": len(home_form),
-            "away_form_n": len(away_form),
+            "h2h_n": h2h_n,
+            "home_form_n": home_form_n,
+            "away_form_n": away_form_n,
             "total_xg": round(home_xg + away_xg, 2),
+            # Numeric record of this prediction for Data/Access/feature_store
+            "feature_record": {
+                "features": ml_row.tolist() if ml_row is not None else None,
+                "rules": list(rule_ids),
+                "markets": {
+                    "home_score": float(home_score), "away_score": float(away_score), "draw_score": float(draw_score),
+                    "btts_prob": float(btts_prob), "over25_prob": float(over25_prob),
+                    "home_xg": float(home_xg), "away_xg": float(away_xg),
+                    "ml_confidence": float(ml_prediction.get("confidence", 0.5)),
+                    "confidence_score": float(raw_conf),
+                },
+            },
         }
@@ -13,13 +13,14 @@ AUTO-HEALING PHILOSOPHY:
 - Use get_selector_with_fallback() for robust selector access with automatic healing
 
 USAGE PATTERNS:
-1. get_selector_auto() - Simple DB lookup (no healing)
+1. get_selector_auto() / get_selectors_auto() - DB lookup validated per context in one
+   page round trip (cached per navigation), healing stale keys in a single AI pass
 2. get_selector_with_fallback() - DB lookup + on-demand healing if selector fails
 3. heal_selector_on_failure() - Direct healing when you know a selector failed
 """
 
 import os
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
 from .selector_db import load_knowledge, save_knowledge, knowledge_db
 
@@ -55,49 +56,20 @@ class SelectorManager:
         """
         SMART ACCESSOR:
         1. Checks if selector exists in DB.
-        2. Validates if selector is present on the current page.
+        2. Validates the whole context on the current page in one round trip (cached per navigation).
         3. If missing or invalid, AUTOMATICALLY triggers AI re-analysis and returns fresh selector.
         """
-        # 1. Quick Lookup
-        selector = knowledge_db.get(context_key, {}).get(element_key)
-
-        # 2. Validation
-        is_valid = False
-        if selector:
-            # Wait up to 5s for the selector to be attached (DOM presence)
-            # Reduced timeout to prevent delays, use 'visible' for better reliability
-            try:
-                # 'visible' ensures it's both in DOM and visible, more reliable than 'attached'
-                await page.wait_for_selector(selector, state='visible', timeout=5000)
-                is_valid = True
-            except Exception:
-                # print(f"    [Selector Stale] '{element_key}' ('{selector}') not found after wait.")
-                is_valid = False
-
-        # 3. Auto-Healing
-        if not is_valid:
-            print(
-                f"    [Auto-Heal] Selector '{element_key}' in '{context_key}' invalid/missing. Initiating AI repair..."
-            )
-            # Import here to avoid circular imports
-            from .intelligence import analyze_page_and_update_selectors
-            
-            info = f"Selector '{element_key}' in '{context_key}' invalid/missing."
-            # A. Capture NEW Snapshot (Crucial for fresh analysis)
-            # Note: analyze_page_and_update_selectors handles the snapshot capturing
-            
-            # B. Run AI Analysis (Forces update of DB)
-            await analyze_page_and_update_selectors(page, context_key, force_refresh=True, info=info)
-
-            # C. Re-fetch
-            selector = knowledge_db.get(context_key, {}).get(element_key)
-
-            if selector:
-                print(f"    [Auto-Heal Success] New selector for '{element_key}': {selector}")
-            else:
-                print(f"    [Auto-Heal Failed] AI could not find '{element_key}' even after refresh.")
+        from .selector_validator import resolve_selectors
+        return (await resolve_selectors(page, context_key, [element_key]))[element_key]
 
-        return str(selector) if selector else ""
+    @staticmethod
+    async def get_selectors_auto(page, context_key: str, element_keys: List[str]) -> Dict[str, str]:
+        """
+        Batched get_selector_auto: one validation round trip for all keys and at most
+        one AI repair for whichever of them are stale.
+        """
+        from .selector_validator import resolve_selectors
+        return await resolve_selectors(page, context_key, element_keys)
 
     @staticmethod
     async def heal_selector_on_failure(page, context_key: str, element_key: str, failure_reason: str = "") -> str:
@@ -0,0 +1,218 @@
+# selector_validator.py: Batched validation of knowledge.json contexts on a live page.
+# Refactored for Clean Architecture (v2.8)
+# This script checks every selector of a context in one page round trip and caches the verdicts per navigation.
+
+"""
+Selector Validator Module
+Context-level replacement for one `wait_for_selector` per key.
+
+A single `page.evaluate` checks every selector of a context for a visible first
+match (same rule as Playwright's state='visible'), polling in the page until the
+requested keys show up or the timeout passes. Verdicts are cached per page and
+dropped when the main frame navigates, so later lookups in the same context are
+answered without touching the page. Selectors the browser's CSS engine cannot
+parse (Playwright-only syntax such as :has-text) fall back to `wait_for_selector`;
+templates ('{text}') are never checked.
+
+Stale keys are healed in one AI pass per call, and a key is healed at most once
+per navigation (the AI remaps the whole context against the DOM it sees).
+"""
+
+import os
+import weakref
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .selector_db import knowledge_db
+
+# --- Validation Configuration ---
+VALIDATE_TIMEOUT_MS = int(os.getenv('LEO_SELECTOR_TIMEOUT_MS', 5000))  # Max wait for requested keys to become visible
+POLL_INTERVAL_MS = int(os.getenv('LEO_SELECTOR_POLL_MS', 100))         # In-page re-check interval while waiting
+
+# Returns {key: true | false | null}; null means the selector is not plain CSS.
+_CHECK_SCRIPT = """
+async ({selectors, required, timeout, poll}) => {
+    const visible = (el) => {
+        if (!el) return false;
+        if (getComputedStyle(el).visibility === 'hidden') return false;
+        const rect = el.getBoundingClientRect();
+        return rect.width > 0 && rect.height > 0;
+    };
+    const check = () => {
+        const out = {};
+        for (const [key, selector] of Object.entries(selectors)) {
+            try { out[key] = visible(document.querySelector(selector)); }
+            catch (e) { out[key] = null; }
+        }
+        return out;
+    };
+    const deadline = Date.now() + timeout;
+    let result = check();
+    while (required.some(k => result[k] === false) && Date.now() < deadline) {
+        await new Promise(resolve => setTimeout(resolve, poll));
+        result = check();
+    }
+    return result;
+}
+"""
+
+_stats = {'round_trips': 0, 'cache_hits': 0, 'fallback_waits': 0, 'heals': 0}
+
+
+class _PageState:
+    """Verdicts for one page on its current navigation: context -> key -> (selector, visible)."""
+    __slots__ = ('url', 'verdicts', 'healed')
+
+    def __init__(self, url: str):
+        self.url = url
+        self.verdicts: Dict[str, Dict[str, Tuple[str, Optional[bool]]]] = {}
+        self.healed: Dict[str, set] = {}
+
+
+_states: "weakref.WeakKeyDictionary[Any, _PageState]" = weakref.WeakKeyDictionary()
+
+
+def _page_url(page) -> str:
+    try:
+        return page.url or ""
+    except Exception:
+        return ""
+
+
+def _on_navigated(page_ref, frame):
+    page = page_ref()
+    if page is None:
+        return
+    try:
+        if frame is not page.main_frame:
+            return
+    except Exception:
+        pass
+    _states.pop(page, None)
+
+
+def _state(page) -> _PageState:
+    """Cached state for the page's current document, reset on main-frame navigation or URL change."""
+    url = _page_url(page)
+    try:
+        state = _states.get(page)
+    except TypeError:
+        return _PageState(url)  # Not weak-referenceable: validate without caching
+    if state is None:
+        if page not in _states:
+            try:
+                page_ref = weakref.ref(page)
+                page.on("framenavigated", lambda frame: _on_navigated(page_ref, frame))
+            except Exception:
+                pass  # URL comparison below still invalidates
+        state = _states[page] = _PageState(url)
+    elif state.url != url:
+        state = _states[page] = _PageState(url)
+    return state
+
+
+def checkable_selectors(context_key: str) -> Dict[str, str]:
+    """Selectors of a context that can be checked as-is (templates and empty entries skipped)."""
+    return {
+        key: selector for key, selector in knowledge_db.get(context_key, {}).items()
+        if isinstance(selector, str) and selector and '{' not in selector
+    }
+
+
+async def validate_context(page, context_key: str, wait_for: Iterable[str] = (),
+                           timeout_ms: int = VALIDATE_TIMEOUT_MS) -> Dict[str, Optional[bool]]:
+    """
+    Checks every selector of the context in one round trip, waiting up to timeout_ms
+    for the wait_for keys. Returns {key: True/False/None} and refreshes the page cache.
+    """
+    selectors = checkable_selectors(context_key)
+    required = [k for k in wait_for if k in selectors]
+    _stats['round_trips'] += 1
+    try:
+        result = await page.evaluate(_CHECK_SCRIPT, {
+            'selectors': selectors, 'required': required,
+            'timeout': timeout_ms if required else 0, 'poll': POLL_INTERVAL_MS,
+        })
+    except Exception as e:
+        print(f"    [Selector Check] Batch validation failed for '{context_key}': {e}")
+        result = {}
+    # Templates and Playwright-only syntax stay None and are left to wait_for_selector.
+    verdicts = {
+        key: (str(selector), result.get(key))
+        for key, selector in knowledge_db.get(context_key, {}).items() if selector
+    }
+    _state(page).verdicts[context_key] = verdicts
+    return {key: verdict for key, (_, verdict) in verdicts.items()}
+
+
+async def _wait_visible(page, selector: str, timeout_ms: int) -> bool:
+    _stats['fallback_waits'] += 1
+    try:
+        await page.wait_for_selector(selector, state='visible', timeout=timeout_ms)
+        return True
+    except Exception:
+        return False
+
+
+async def resolve_selectors(page, context_key: str, element_keys: Iterable[str],
+                            timeout_ms: int = VALIDATE_TIMEOUT_MS, heal: bool = True) -> Dict[str, str]:
+    """
+    Current selectors for element_keys ("" when the context has none).
+    Keys with a cached positive verdict cost nothing; the rest share one batch check,
+    and whatever is still stale triggers a single AI repair of the context.
+    """
+    keys = list(dict.fromkeys(element_keys))
+    state = _state(page)
+
+    def current(key: str) -> str:
+        selector = knowledge_db.get(context_key, {}).get(key)
+        return str(selector) if selector else ""
+
+    def verdict(key: str) -> Optional[bool]:
+        cached = state.verdicts.get(context_key, {}).get(key)
+        if cached is None or cached[0] != current(key):
+            return False
+        return cached[1]
+
+    pending = [k for k in keys if current(k) and verdict(k) is not True]
+    _stats['cache_hits'] += len(keys) - len(pending)
+    if pending:
+        await validate_context(page, context_key, wait_for=pending, timeout_ms=timeout_ms)
+        state = _state(page)
+        for key in pending:
+            if current(key) and verdict(key) is None:
+                # Not plain CSS (e.g. :has-text): let Playwright's engine decide.
+                ok = await _wait_visible(page, current(key), timeout_ms)
+                state.verdicts.setdefault(context_key, {})[key] = (current(key), ok)
+
+    healed = state.healed.setdefault(context_key, set())
+    stale = [k for k in keys if verdict(k) is not True and k not in healed]
+    if stale and heal:
+        await _heal(page, context_key, stale)
+        healed.update(stale)
+        if any(current(k) for k in stale):
+            await validate_context(page, context_key)
+
+    return {key: current(key) for key in keys}
+
+
+async def _heal(page, context_key: str, stale: List[str]):
+    """One AI re-analysis of the context for all stale keys."""
+    from .intelligence import analyze_page_and_update_selectors
+
+    names = ", ".join(f"'{k}'" for k in stale)
+    print(f"    [Auto-Heal] {len(stale)} selector(s) in '{context_key}' invalid/missing: {names}. Initiating AI repair...")
+    _stats['heals'] += 1
+    info = f"Selectors {names} in '{context_key}' invalid/missing."
+    await analyze_page_and_update_selectors(page, context_key, force_refresh=True, info=info)
+
+    for key in stale:
+        selector = knowledge_db.get(context_key, {}).get(key)
+        if selector:
+            print(f"    [Auto-Heal Success] New selector for '{key}': {selector}")
+        else:
+            print(f"    [Auto-Heal Failed] AI could not find '{key}' even after refresh.")
+
+
+def validator_stats() -> Dict[str, int]:
+    """Round trips, cache hits, per-selector fallback waits and AI heals so far."""
+    return dict(_stats)
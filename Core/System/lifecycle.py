@@ -7,6 +7,7 @@ import sys
 import argparse
 from datetime import datetime as dt
 from Data.Access.db_helpers import init_csvs
+from Data.Access.table_store import flush_all_tables
 from Core.Utils.utils import Tee, LOG_DIR
 
 state = {
@@ -30,6 +31,9 @@ state = {
 def log_state(chapter=None, action=None, next_step=None, why=None, expect=None):
     """Updates and prints the current system state."""
     global state
+    if chapter and chapter != state["current_chapter"]:
+        # Chapter boundary: persist write-behind tables before the next phase reads them
+        flush_all_tables()
     if chapter: state["current_chapter"] = chapter
     if action: state["last_action"] = action
     if next_step: state["next_expected"] = next_step
@@ -2,11 +2,12 @@
 # Refactored for Clean Architecture (v2.8)
 
 import os
-import csv
 from datetime import datetime as dt
 from pathlib import Path
 from Core.System.lifecycle import state
 from Data.Access.db_helpers import log_audit_event
+from Data.Access.prediction_analytics import get_prediction_analytics, bet_success_rate
+from Data.Access.sync_worker import get_sync_worker
 
 async def run_chapter_3_oversight():
     """
@@ -64,39 +65,26 @@ def perform_health_check():
     if success_rate is not None and success_rate < 50.0:
         issues.append(f"⚠️ Bet placement success rate is low: {success_rate:.0f}%.")
 
+    # 6. Background Sync Worker (queue depth / lag)
+    sync_stats = get_sync_worker().stats()
+    if sync_stats['rows_dropped'] > 0:
+        issues.append(f"⚠️ Sync worker dropped {sync_stats['rows_dropped']} queued rows under back-pressure (left for next sync).")
+    if sync_stats['lag_seconds'] > 300 or sync_stats['batches_failed'] > 0:
+        issues.append(f"⚠️ Sync worker lagging: depth={sync_stats['queue_depth']}, lag={sync_stats['lag_seconds']:.0f}s, failed batches={sync_stats['batches_failed']}.")
+
     return issues if issues else ["✅ System is healthy and operational."]
 
 def _count_predictions_for_date(date_str: str) -> int:
-    """Count predictions for a given date from predictions.csv."""
-    pred_file = Path("Data/Store/predictions.csv")
-    if not pred_file.exists():
-        return 0
+    """Count predictions whose match date is date_str (YYYY-MM-DD)."""
     try:
-        with open(pred_file, "r", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            return sum(1 for row in reader if row.get("date", "").startswith(date_str))
+        return get_prediction_analytics().count_for_date(dt.strptime(date_str, "%Y-%m-%d"))
     except Exception:
         return 0
 
 def _get_bet_success_rate() -> float | None:
     """Calculate today's bet placement success rate from audit_log.csv."""
-    audit_file = Path("Data/Store/audit_log.csv")
-    if not audit_file.exists():
-        return None
     try:
-        today_str = dt.now().strftime("%Y-%m-%d")
-        total = 0
-        successful = 0
-        with open(audit_file, "r", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                if row.get("event_type") == "BET_PLACEMENT" and today_str in row.get("timestamp", ""):
-                    total += 1
-                    if row.get("status", "").lower() == "success":
-                        successful += 1
-        if total == 0:
-            return None  # No bets placed today — nothing to report
-        return (successful / total) * 100
+        return bet_success_rate()
     except Exception:
         return None
 
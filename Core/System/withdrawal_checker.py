@@ -103,6 +103,8 @@ async def execute_withdrawal(amount: float):
                 headless=True,
                 viewport={'width': 375, 'height': 612}
             )
+            from Core.Browser.resource_router import apply_resource_profile
+            await apply_resource_profile(context, 'football_com', 'Withdrawal')
             page = await context.new_page()
             
             from Modules.FootballCom.booker.withdrawal import check_and_perform_withdrawal
@@ -0,0 +1,350 @@
+# task_pool.py: Adaptive asyncio task pool with deadlines, retries and latency metrics.
+# Refactored for Clean Architecture (v2.8)
+# This script replaces fixed-size semaphore batching with AIMD concurrency driven by observed latency and errors.
+
+"""
+Task Pool Module
+Shared scheduler for the browser-bound stages (Chapter 1A analysis, enrichment,
+outcome review, harvesting).
+
+Items are pulled from a list or an async stream as slots free up, so one slow
+task never holds back the rest. The in-flight limit follows an AIMD rule: +1 per
+window of completed tasks while latency, errors and host headroom allow, x0.75
+under pressure, and an immediate cut when a task is rate limited. Every task can
+carry a deadline (it is cancelled when it runs over); failed or timed out tasks
+go to a retry queue and are retried with exponential backoff. TaskMetrics keeps
+p50/p95 latency, in-flight and throughput figures.
+"""
+
+import asyncio
+import heapq
+import itertools
+import os
+import random
+import statistics
+import time
+from collections import deque
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Deque, Dict, Iterable, List, Optional, Tuple, Union
+
+# --- Pool Configuration ---
+MB_PER_PAGE = int(os.getenv('LEO_POOL_MB_PER_PAGE', 150))             # Memory budget of one worker (an open page)
+MEMORY_FLOOR_MB = int(os.getenv('LEO_POOL_MEMORY_FLOOR_MB', 400))     # Back off below this much available memory
+CPU_HIGH = float(os.getenv('LEO_POOL_CPU_HIGH', 0.90))                # Back off above this CPU busy fraction
+CPU_LOW = float(os.getenv('LEO_POOL_CPU_LOW', 0.75))                  # Only grow below this CPU busy fraction
+LATENCY_SLOWDOWN = float(os.getenv('LEO_POOL_LATENCY_SLOWDOWN', 2.0)) # Back off when median latency exceeds baseline by this factor
+ERROR_RATE_HIGH = float(os.getenv('LEO_POOL_ERROR_RATE_HIGH', 0.2))   # Back off above this failure rate per window
+RETRY_BACKOFF = float(os.getenv('LEO_TASK_RETRY_BACKOFF', 2.0))       # First retry delay (s), doubled per attempt
+RETRY_BACKOFF_MAX = float(os.getenv('LEO_TASK_RETRY_BACKOFF_MAX', 60.0))
+LATENCY_SAMPLES = 1000                                                # Latencies kept for the percentiles
+
+_THROTTLE_MARKERS = ('429', 'too many requests', 'rate limit', 'ratelimit', 'quota')
+
+
+class HostHeadroom:
+    """CPU busy fraction (from /proc/stat deltas) and available memory; None where the host does not expose them."""
+
+    def __init__(self):
+        self._last_cpu: Optional[Tuple[int, int]] = None
+        self.cpu_busy()
+
+    def cpu_busy(self) -> Optional[float]:
+        try:
+            with open('/proc/stat', 'r') as f:
+                fields = [int(v) for v in f.readline().split()[1:]]
+        except (OSError, ValueError):
+            return None
+        idle, total = fields[3] + (fields[4] if len(fields) > 4 else 0), sum(fields)
+        last, self._last_cpu = self._last_cpu, (idle, total)
+        if last is None or total <= last[1]:
+            return None
+        return 1.0 - (idle - last[0]) / (total - last[1])
+
+    @staticmethod
+    def available_mb() -> Optional[float]:
+        try:
+            with open('/proc/meminfo', 'r') as f:
+                for line in f:
+                    if line.startswith('MemAvailable:'):
+                        return int(line.split()[1]) / 1024
+        except (OSError, ValueError):
+            pass
+        return None
+
+
+def default_max_workers() -> int:
+    """Upper bound from cores and memory: workers mostly wait on the network, so a few per core."""
+    bound = max(4, (os.cpu_count() or 1) * 4)
+    available = HostHeadroom.available_mb()
+    if available is not None:
+        bound = min(bound, max(1, int((available - MEMORY_FLOOR_MB) // MB_PER_PAGE)))
+    return max(1, bound)
+
+
+class ConcurrencyController:
+    """Adaptive in-flight limit (AIMD): +1 per window with headroom, x0.75 under pressure or when throttled."""
+
+    def __init__(self, minimum: int, maximum: int, initial: Optional[int] = None, adaptive: bool = True):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = min(self.maximum, max(self.minimum, initial or self.minimum))
+        self.adaptive = adaptive
+        self.headroom = HostHeadroom()
+        self.baseline: Optional[float] = None
+        self.history: List[Tuple[float, int]] = [(time.monotonic(), self.limit)]
+        self._window: List[float] = []
+        self._errors = 0
+
+    def _set_limit(self, new_limit: int):
+        if new_limit != self.limit:
+            self.limit = new_limit
+            self.history.append((time.monotonic(), new_limit))
+
+    def _decrease(self):
+        self._set_limit(max(self.minimum, min(self.limit - 1, int(self.limit * 0.75))))
+
+    def record(self, seconds: float, ok: bool = True, throttled: bool = False):
+        if not self.adaptive:
+            return
+        if throttled:
+            # The remote side asked us to slow down: cut now and start a fresh window.
+            self._window, self._errors = [], 0
+            self._decrease()
+            return
+        self._window.append(seconds)
+        self._errors += 0 if ok else 1
+        if len(self._window) < max(2, self.limit):
+            return
+        median = statistics.median(self._window)
+        error_rate = self._errors / len(self._window)
+        self._window, self._errors = [], 0
+        # Baseline follows the best observed median, drifting up slowly so it can recover.
+        self.baseline = median if self.baseline is None else min(median, self.baseline * 1.02)
+
+        cpu = self.headroom.cpu_busy()
+        memory = self.headroom.available_mb()
+        pressure = (
+            (cpu is not None and cpu > CPU_HIGH)
+            or (memory is not None and memory < MEMORY_FLOOR_MB)
+            or error_rate > ERROR_RATE_HIGH
+            or median > self.baseline * LATENCY_SLOWDOWN
+        )
+        if pressure:
+            self._decrease()
+        elif (cpu is None or cpu < CPU_LOW) and (memory is None or memory > MEMORY_FLOOR_MB + MB_PER_PAGE):
+            self._set_limit(min(self.maximum, self.limit + 1))
+
+
+class TaskMetrics:
+    """Latency percentiles, outcome counters, in-flight and throughput for one pool."""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self.completed = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.throttled = 0
+        self.retried = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+    @property
+    def p50(self) -> Optional[float]:
+        return self.percentile(0.50)
+
+    @property
+    def p95(self) -> Optional[float]:
+        return self.percentile(0.95)
+
+    def throughput(self) -> float:
+        """Completed tasks per minute."""
+        elapsed = time.monotonic() - self.started
+        return self.completed * 60.0 / elapsed if elapsed > 0 else 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'completed': self.completed, 'failed': self.failed, 'timed_out': self.timed_out,
+            'throttled': self.throttled, 'retried': self.retried, 'in_flight': self.in_flight,
+            'max_in_flight': self.max_in_flight, 'p50': self.p50, 'p95': self.p95,
+            'per_minute': self.throughput(),
+        }
+
+    def line(self, name: str, limit: Optional[int] = None) -> str:
+        p50, p95 = self.p50, self.p95
+        latency = f"p50 {p50:.1f}s p95 {p95:.1f}s" if p50 is not None else "no samples"
+        text = (f"  [Task Pool] {name}: {self.completed} done, {self.failed} failed "
+                f"({self.timed_out} timed out, {self.throttled} throttled), {self.retried} retried | "
+                f"{latency} | {self.throughput():.1f}/min | in flight {self.in_flight} (max {self.max_in_flight})")
+        return text + (f", limit {limit}" if limit is not None else "")
+
+
+def _is_throttle(error: BaseException) -> bool:
+    text = str(error).lower()
+    return any(marker in text for marker in _THROTTLE_MARKERS)
+
+
+async def _aiter(items: Union[Iterable[Any], AsyncIterable[Any]]) -> AsyncIterator[Any]:
+    if hasattr(items, '__aiter__'):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
+class AdaptiveTaskPool:
+    """
+    Runs func(item, *args, **kwargs) over a list or async stream of items.
+    `map` yields (item, result) in completion order, `run` returns results in input
+    order. A task that still fails after its retries yields None.
+    """
+
+    def __init__(self, name: str = 'Tasks', *, min_workers: int = 1, max_workers: Optional[int] = None,
+                 initial: Optional[int] = None, adaptive: bool = True, timeout: Optional[float] = None,
+                 retries: int = 0, backoff: float = RETRY_BACKOFF, backoff_max: float = RETRY_BACKOFF_MAX,
+                 controller: Optional[ConcurrencyController] = None, feedback: bool = True):
+        self.name = name
+        self.controller = controller or ConcurrencyController(min_workers, max_workers or default_max_workers(), initial, adaptive)
+        self.timeout = timeout or None
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.feedback = feedback        # False when the wrapped resource already reports to the controller
+        self.metrics = TaskMetrics()
+        self._cancelled = False
+
+    @property
+    def limit(self) -> int:
+        return self.controller.limit
+
+    @property
+    def in_flight(self) -> int:
+        return self.metrics.in_flight
+
+    def cancel(self):
+        """Stops launching new work; running tasks are cancelled by the active map/run."""
+        self._cancelled = True
+
+    async def _call(self, func: Callable[..., Awaitable[Any]], item: Any, args, kwargs) -> Any:
+        if self.timeout:
+            return await asyncio.wait_for(func(item, *args, **kwargs), timeout=self.timeout)
+        return await func(item, *args, **kwargs)
+
+    async def _stream(self, func, items, args, kwargs) -> AsyncIterator[Tuple[int, Any, Any]]:
+        source = _aiter(items)
+        seq = itertools.count()
+        retry_heap: List[Tuple[float, int, int, int, Any]] = []   # (ready_at, seq, attempt, index, item)
+        running: Dict[asyncio.Future, Tuple[int, Any, int, float]] = {}
+        pull: Optional[asyncio.Future] = None
+        exhausted = False
+        index = itertools.count()
+        metrics = self.metrics
+
+        def launch(position: int, item: Any, attempt: int):
+            task = asyncio.ensure_future(self._call(func, item, args, kwargs))
+            running[task] = (position, item, attempt, time.monotonic())
+            metrics.in_flight = len(running)
+            metrics.max_in_flight = max(metrics.max_in_flight, metrics.in_flight)
+
+        try:
+            while not self._cancelled:
+                now = time.monotonic()
+                while retry_heap and retry_heap[0][0] <= now and len(running) < self.limit:
+                    _, _, attempt, position, item = heapq.heappop(retry_heap)
+                    launch(position, item, attempt)
+                if not exhausted and pull is None and len(running) < self.limit:
+                    pull = asyncio.ensure_future(source.__anext__())
+
+                waiting = set(running) | ({pull} if pull is not None else set())
+                # A due retry can only launch once a slot frees up, so with every slot busy
+                # wait for a running task rather than for the (possibly past) retry time.
+                slot_free = len(running) < self.limit
+                delay = max(0.0, retry_heap[0][0] - now) if retry_heap and slot_free else None
+                if not waiting:
+                    if delay is None:
+                        return
+                    await asyncio.sleep(delay)
+                    continue
+                done, _ = await asyncio.wait(waiting, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+
+                for task in done:
+                    if task is pull:
+                        pull = None
+                        try:
+                            launch(next(index), task.result(), 0)
+                        except StopAsyncIteration:
+                            exhausted = True
+                        continue
+
+                    position, item, attempt, started = running.pop(task)
+                    metrics.in_flight = len(running)
+                    elapsed = time.monotonic() - started
+                    error = task.exception() if not task.cancelled() else asyncio.CancelledError()
+                    if error is None:
+                        metrics.completed += 1
+                        metrics.latencies.append(elapsed)
+                        if self.feedback:
+                            self.controller.record(elapsed, True)
+                        yield position, item, task.result()
+                        continue
+
+                    timed_out = isinstance(error, asyncio.TimeoutError)
+                    throttled = not timed_out and _is_throttle(error)
+                    metrics.timed_out += 1 if timed_out else 0
+                    metrics.throttled += 1 if throttled else 0
+                    if self.feedback:
+                        self.controller.record(elapsed, False, throttled)
+                    reason = f"timed out after {self.timeout:g}s" if timed_out else (str(error) or type(error).__name__)
+                    if attempt < self.retries:
+                        metrics.retried += 1
+                        wait = min(self.backoff_max, self.backoff * (2 ** attempt)) * random.uniform(0.8, 1.2)
+                        print(f"      [Task Pool] {self.name}: attempt {attempt + 1} failed ({reason}); retrying in {wait:.1f}s")
+                        heapq.heappush(retry_heap, (time.monotonic() + wait, next(seq), attempt + 1, position, item))
+                    else:
+                        metrics.failed += 1
+                        print(f"      [Task Pool] {self.name}: task failed ({reason})")
+                        yield position, item, None
+        finally:
+            # Consumer stopped early, the pool was cancelled, or an error escaped: stop all work.
+            pending = list(running) + ([pull] if pull is not None else [])
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+            metrics.in_flight = 0
+            if hasattr(source, 'aclose'):
+                await source.aclose()
+
+    async def map(self, func: Callable[..., Awaitable[Any]], items: Union[Iterable[Any], AsyncIterable[Any]],
+                  *args, **kwargs) -> AsyncIterator[Tuple[Any, Any]]:
+        """Yields (item, result) as tasks finish; result is None for a task that failed every attempt."""
+        stream = self._stream(func, items, args, kwargs)
+        try:
+            async for _, item, result in stream:
+                yield item, result
+        finally:
+            await stream.aclose()
+
+    async def run(self, items: Iterable[Any], func: Callable[..., Awaitable[Any]], *args, **kwargs) -> List[Any]:
+        """Runs every item and returns the results in input order (None where a task failed)."""
+        items = list(items)
+        results: List[Any] = [None] * len(items)
+        stream = self._stream(func, items, args, kwargs)
+        try:
+            async for position, _, result in stream:
+                results[position] = result
+        finally:
+            await stream.aclose()
+        return results
+
+    # BatchProcessor-compatible name
+    run_batch = run
+
+    def report(self) -> str:
+        return self.metrics.line(self.name, self.limit)
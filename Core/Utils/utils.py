@@ -8,15 +8,16 @@ General-purpose utility functions and classes for the LeoBook system.
 Responsible for error logging, batch processing, and system utilities.
 """
 
-import asyncio
 import sys
 import traceback
 from datetime import datetime as dt
 from pathlib import Path
-from typing import Callable, List, TypeVar
+from typing import TypeVar
 
 from playwright.async_api import Page
 
+from .task_pool import AdaptiveTaskPool
+
 T = TypeVar('T')
 LOG_DIR = Path("Logs")
 ERROR_LOG_DIR = LOG_DIR / "Error" # Corrected to match handbook
@@ -82,14 +83,11 @@ async def capture_debug_snapshot(page: Page, label: str, info_text: str = ""):
     except Exception as e:
         print(f"    [Debug Failure] Could not write debug snapshot: {e}") 
 
-class BatchProcessor:
+class BatchProcessor(AdaptiveTaskPool):
+    """
+    Fixed-size pool kept for older callers: run_batch(items, func, ...) returns results in
+    input order. New code should use Core.Utils.task_pool.AdaptiveTaskPool directly for
+    adaptive concurrency, deadlines and retries.
+    """
     def __init__(self, max_concurrent: int = 4):
-        self.semaphore = asyncio.Semaphore(max_concurrent)
-
-    async def _worker(self, func: Callable, item: T, *args, **kwargs): # type: ignore
-        async with self.semaphore:
-            return await func(item, *args, **kwargs)
-
-    async def run_batch(self, items: List[T], func: Callable, *args, **kwargs):
-        tasks = [self._worker(func, item, *args, **kwargs) for item in items]
-        return await asyncio.gather(*tasks)
+        super().__init__('Batch', min_workers=max_concurrent, max_workers=max_concurrent, adaptive=False)
@@ -10,6 +10,7 @@ Responsible for reading, writing, appending, and upserting CSV data safely.
 
 import os
 import csv
+import tempfile
 from typing import Dict, Any, List
 
 # --- CSV File Paths ---
@@ -38,14 +39,28 @@ def _append_to_csv(filepath: str, data_row: Dict, fieldnames: List[str]):
     except Exception as e:
         print(f"    [File Error] Failed to write to {filepath}: {e}")
 
-def _write_csv(filepath: str, data: List[Dict], fieldnames: List[str]):
-    """Safely writes a list of dictionaries to a CSV file, overwriting it."""
-    # This function is kept for operations that require a full rewrite, like updating statuses.
+def _atomic_write_csv(filepath: str, data: List[Dict], fieldnames: List[str]):
+    """Writes rows to a temp file beside filepath and renames it into place. Raises on failure."""
+    directory = os.path.dirname(os.path.abspath(filepath))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(filepath)}.", suffix=".tmp", dir=directory)
     try:
-        with open(filepath, 'w', newline='', encoding='utf-8') as f:
+        with os.fdopen(fd, 'w', newline='', encoding='utf-8') as f:
             writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
             writer.writeheader()
             writer.writerows(data)
+        os.replace(temp_path, filepath)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+def _write_csv(filepath: str, data: List[Dict], fieldnames: List[str]):
+    """Safely writes a list of dictionaries to a CSV file, overwriting it."""
+    # This function is kept for operations that require a full rewrite, like updating statuses.
+    # The rename is atomic, so a crash mid-write never leaves a truncated table behind.
+    try:
+        _atomic_write_csv(filepath, data, fieldnames)
     except Exception as e:
         print(f"    [File Error] Failed to write to {filepath}: {e}")
 
@@ -10,11 +10,14 @@ Responsible for saving predictions, schedules, standings, teams, and region-leag
 
 import os
 import csv
+import json
 from datetime import datetime as dt
 from typing import Dict, Any, List, Optional
 import uuid
 
-from .csv_operations import _read_csv, _append_to_csv, _write_csv, upsert_entry
+from .table_store import get_table
+from .history_index import note_schedule_update
+from .feature_store import record_prediction
 
 # --- Data Store Paths ---
 _current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -59,7 +62,7 @@ def log_audit_event(event_type: str, description: str, balance_before: Optional[
         'stake': stake if stake is not None else '',
         'status': status
     }
-    _append_to_csv(AUDIT_LOG_CSV, row, ['id', 'timestamp', 'event_type', 'description', 'balance_before', 'balance_after', 'stake', 'status'])
+    get_table(AUDIT_LOG_CSV, key='id').upsert(row)
 
 def save_prediction(match_data: Dict[str, Any], prediction_result: Dict[str, Any]):
     """UPSERTs a prediction into the predictions.csv file."""
@@ -105,7 +108,8 @@ def save_prediction(match_data: Dict[str, Any], prediction_result: Dict[str, Any
         'last_updated': dt.now().isoformat()
     }
 
-    upsert_entry(PREDICTIONS_CSV, new_row_data, files_and_headers[PREDICTIONS_CSV], 'fixture_id')
+    get_table(PREDICTIONS_CSV, key='fixture_id').upsert(new_row_data)
+    record_prediction(fixture_id, new_row_data['region_league'], prediction_result)
 
 def update_prediction_status(match_id: str, date: str, new_status: str, **kwargs):
     """
@@ -114,24 +118,17 @@ def update_prediction_status(match_id: str, date: str, new_status: str, **kwargs
     if not os.path.exists(PREDICTIONS_CSV):
         return
 
-    rows = []
-    updated = False
     try:
-        with open(PREDICTIONS_CSV, 'r', newline='', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            fieldnames = reader.fieldnames
-            for row in reader:
-                if row.get('fixture_id') == match_id and row.get('date') == date:
-                    row['status'] = new_status
-                    row['last_updated'] = dt.now().isoformat()
-                    for key, value in kwargs.items():
-                        if key in row:
-                            row[key] = value
-                    updated = True
-                rows.append(row)
-
-        if updated and fieldnames is not None:
-            _write_csv(PREDICTIONS_CSV, rows, list(fieldnames))
+        table = get_table(PREDICTIONS_CSV, key='fixture_id')
+        row = table.get(match_id)
+        if row is None or row.get('date') != date:
+            return
+
+        changes = {'status': new_status, 'last_updated': dt.now().isoformat()}
+        for key, value in kwargs.items():
+            if key in row:
+                changes[key] = value
+        table.update(match_id, changes)
     except Exception as e:
         print(f"    [Warning] Failed to update status for {match_id}: {e}")
 
@@ -146,27 +143,23 @@ def backfill_prediction_entry(fixture_id: str, updates: Dict[str, str]):
     if not os.path.exists(PREDICTIONS_CSV):
         return False
 
-    rows = []
     updated = False
     try:
-        with open(PREDICTIONS_CSV, 'r', newline='', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            fieldnames = reader.fieldnames
-            for row in reader:
-                if row.get('fixture_id') == fixture_id:
-                    for key, value in updates.items():
-                        if key in row and value:
-                            current = row[key].strip() if row[key] else ''
-                            if not current or current in ('Unknown', 'N/A', 'unknown'):
-                                row[key] = value
-                                row['last_updated'] = dt.now().isoformat()
-                                updated = True
-                    rows.append(row)
-                else:
-                    rows.append(row)
-
-        if updated and fieldnames is not None:
-            _write_csv(PREDICTIONS_CSV, rows, list(fieldnames))
+        table = get_table(PREDICTIONS_CSV, key='fixture_id')
+        row = table.get(fixture_id)
+        if row is None:
+            return False
+
+        changes = {}
+        for key, value in updates.items():
+            if key in row and value:
+                current = row[key].strip() if row[key] else ''
+                if not current or current in ('Unknown', 'N/A', 'unknown'):
+                    changes[key] = value
+
+        if changes:
+            changes['last_updated'] = dt.now().isoformat()
+            updated = table.update(fixture_id, changes)
     except Exception as e:
         print(f"    [Warning] Failed to backfill prediction {fixture_id}: {e}")
 
@@ -180,7 +173,8 @@ def save_schedule_entry(match_info: Dict[str, Any]):
     # Ensure last_updated is present
     match_info['last_updated'] = dt.now().isoformat()
 
-    upsert_entry(SCHEDULES_CSV, match_info, files_and_headers[SCHEDULES_CSV], 'fixture_id')
+    if get_table(SCHEDULES_CSV, key='fixture_id').upsert(match_info):
+        note_schedule_update(match_info)
 
 def save_standings(standings_data: List[Dict[str, Any]], region_league: str, league_id: str = ""):
     """UPSERTs standings data for a specific league in standings.csv."""
@@ -188,6 +182,7 @@ def save_standings(standings_data: List[Dict[str, Any]], region_league: str, lea
 
     last_updated = dt.now().isoformat()
     updated_count = 0
+    table = get_table(STANDINGS_CSV, key='standings_key')
 
     for row in standings_data:
         row['region_league'] = region_league or row.get('region_league', 'Unknown')
@@ -206,7 +201,7 @@ def save_standings(standings_data: List[Dict[str, Any]], region_league: str, lea
         # Unique key is now team_id + league_id
         if t_id and l_id:
             row['standings_key'] = f"{l_id}_{t_id}".upper()
-            upsert_entry(STANDINGS_CSV, row, files_and_headers[STANDINGS_CSV], 'standings_key')
+            table.upsert(row)
             updated_count += 1
 
     if updated_count > 0:
@@ -257,7 +252,7 @@ def save_region_league_entry(info: Dict[str, Any]):
         'last_updated': dt.now().isoformat()
     }
 
-    upsert_entry(REGION_LEAGUE_CSV, entry, files_and_headers[REGION_LEAGUE_CSV], 'rl_id')
+    get_table(REGION_LEAGUE_CSV, key='rl_id').upsert(entry)
 
 
 def save_team_entry(team_info: Dict[str, Any]):
@@ -266,17 +261,16 @@ def save_team_entry(team_info: Dict[str, Any]):
     if not team_id or team_id == 'unknown': return
 
     # Check for existing entry to merge rl_ids
-    existing_rows = _read_csv(TEAMS_CSV)
+    table = get_table(TEAMS_CSV, key='team_id')
+    existing = table.get(team_id)
     new_rl_id = team_info.get('rl_ids', team_info.get('region_league', ''))
     
     merged_rl_ids = new_rl_id
-    for row in existing_rows:
-        if row.get('team_id') == team_id:
-            existing_rl_ids = row.get('rl_ids', '').split(';')
-            if new_rl_id and new_rl_id not in existing_rl_ids:
-                existing_rl_ids.append(new_rl_id)
-            merged_rl_ids = ';'.join(filter(None, existing_rl_ids))
-            break
+    if existing is not None:
+        existing_rl_ids = existing.get('rl_ids', '').split(';')
+        if new_rl_id and new_rl_id not in existing_rl_ids:
+            existing_rl_ids.append(new_rl_id)
+        merged_rl_ids = ';'.join(filter(None, existing_rl_ids))
 
     entry = {
         'team_id': team_id,
@@ -287,18 +281,19 @@ def save_team_entry(team_info: Dict[str, Any]):
         'last_updated': dt.now().isoformat()
     }
 
-    upsert_entry(TEAMS_CSV, entry, files_and_headers[TEAMS_CSV], 'team_id')
+    table.upsert(entry)
 
 def get_team_crest(team_id: str, team_name: str = "") -> str:
     """Retrieves the crest URL for a team from teams.csv."""
     if not os.path.exists(TEAMS_CSV):
         return ""
     
-    rows = _read_csv(TEAMS_CSV)
-    for row in rows:
-        if str(row.get('team_id')) == str(team_id) or (team_name and row.get('team_name') == team_name):
-            return row.get('team_crest', '')
-    return ""
+    table = get_table(TEAMS_CSV, key='team_id')
+    row = table.get(str(team_id))
+    if row is None and team_name:
+        matches = table.find('team_name', team_name)
+        row = matches[0] if matches else None
+    return row.get('team_crest', '') if row else ""
 
 # --- Football.com Registry Helpers ---
 
@@ -312,7 +307,7 @@ def save_site_matches(matches: List[Dict[str, Any]]):
     """UPSERTs a list of matches extracted from Football.com into the registry."""
     if not matches: return
     
-    headers = files_and_headers[FB_MATCHES_CSV]
+    table = get_table(FB_MATCHES_CSV, key='site_match_id')
     last_extracted = dt.now().isoformat()
     
     for match in matches:
@@ -335,50 +330,39 @@ def save_site_matches(matches: List[Dict[str, Any]]):
             'status': match.get('status', ''),
             'last_updated': dt.now().isoformat()
         }
-        upsert_entry(FB_MATCHES_CSV, row, headers, 'site_match_id')
+        table.upsert(row)
 
 def load_site_matches(target_date: str) -> List[Dict[str, Any]]:
     """Loads all extracted site matches for a specific date."""
     if not os.path.exists(FB_MATCHES_CSV):
         return []
     
-    all_matches = _read_csv(FB_MATCHES_CSV)
-    return [m for m in all_matches if m.get('date') == target_date]
+    return get_table(FB_MATCHES_CSV, key='site_match_id').find('date', target_date)
 
 def load_harvested_site_matches(target_date: str) -> List[Dict[str, Any]]:
     """Loads all harvested site matches for a specific date (v2.7)."""
     if not os.path.exists(FB_MATCHES_CSV):
         return []
     
-    all_matches = _read_csv(FB_MATCHES_CSV)
-    return [m for m in all_matches if m.get('date') == target_date and m.get('booking_status') == 'harvested']
+    day_matches = get_table(FB_MATCHES_CSV, key='site_match_id').find('date', target_date)
+    return [m for m in day_matches if m.get('booking_status') == 'harvested']
 
 def update_site_match_status(site_match_id: str, status: str, fixture_id: Optional[str] = None, details: Optional[str] = None, booking_code: Optional[str] = None, booking_url: Optional[str] = None, matched: Optional[str] = None, **kwargs):
     """Updates the booking status, fixture_id, or booking details for a site match."""
     if not os.path.exists(FB_MATCHES_CSV):
         return
 
-    rows = []
-    updated = False
+    changes: Dict[str, Any] = {'booking_status': status}
+    if fixture_id: changes['fixture_id'] = fixture_id
+    if details: changes['booking_details'] = details
+    if booking_code: changes['booking_code'] = booking_code
+    if booking_url: changes['booking_url'] = booking_url
+    if status: changes['status'] = status
+    if matched: changes['matched'] = matched
+    if 'odds' in kwargs: changes['odds'] = kwargs['odds']
+
     try:
-        with open(FB_MATCHES_CSV, 'r', newline='', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            fieldnames = reader.fieldnames
-            for row in reader:
-                if row.get('site_match_id') == site_match_id:
-                    row['booking_status'] = status
-                    if fixture_id: row['fixture_id'] = fixture_id
-                    if details: row['booking_details'] = details
-                    if booking_code: row['booking_code'] = booking_code
-                    if booking_url: row['booking_url'] = booking_url
-                    if status: row['status'] = status
-                    if matched: row['matched'] = matched
-                    if 'odds' in kwargs: row['odds'] = kwargs['odds']
-                    updated = True
-                rows.append(row)
-
-        if updated and fieldnames is not None:
-            _write_csv(FB_MATCHES_CSV, rows, list(fieldnames))
+        get_table(FB_MATCHES_CSV, key='site_match_id').update(site_match_id, changes)
     except Exception as e:
         print(f"    [DB Error] Failed to update site match status: {e}")
 
@@ -387,9 +371,8 @@ def get_last_processed_info() -> Dict:
     last_processed_info = {}
     if os.path.exists(PREDICTIONS_CSV):
         try:
-            all_predictions = _read_csv(PREDICTIONS_CSV)
-            if all_predictions:
-                last_prediction = all_predictions[-1]
+            last_prediction = get_table(PREDICTIONS_CSV, key='fixture_id').last()
+            if last_prediction:
                 date_str = last_prediction.get('date')
                 if date_str:
                     last_processed_info = {
@@ -404,12 +387,11 @@ def get_last_processed_info() -> Dict:
 
 def get_all_schedules() -> List[Dict[str, Any]]:
     """Loads all match schedules from schedules.csv."""
-    return _read_csv(SCHEDULES_CSV)
+    return get_table(SCHEDULES_CSV, key='fixture_id').rows()
 
 def get_standings(region_league: str) -> List[Dict[str, Any]]:
     """Loads standings for a specific league from standings.csv."""
-    all_standings = _read_csv(STANDINGS_CSV)
-    return [s for s in all_standings if s.get('region_league') == region_league]
+    return get_table(STANDINGS_CSV, key='standings_key').find('region_league', region_league)
 
 # To be accessible from other modules, we need to define the headers dict here
 files_and_headers = {
@@ -443,7 +425,7 @@ files_and_headers = {
         'booking_code', 'booking_url', 'status', 'last_updated'
     ],
     AUDIT_LOG_CSV: [
-        'timestamp', 'event_type', 'description', 'balance_before', 'balance_after', 'stake', 'status'
+        'id', 'timestamp', 'event_type', 'description', 'balance_before', 'balance_after', 'stake', 'status'
     ],
     # User & Rule Engine Tables
     os.path.join(DB_DIR, "profiles.csv"): [
@@ -0,0 +1,268 @@
+# feature_store.py: Columnar store of per-prediction feature vectors.
+# Refactored for Clean Architecture (v2.8)
+# This script persists ML features, fired rules and market probabilities for training and learning.
+
+"""
+Feature Store Module
+Keeps the numeric side of every saved prediction so training and weight learning
+can join arrays against reviewed outcomes instead of re-parsing predictions.csv text.
+
+Each prediction contributes one row keyed by fixture_id: region_league, the ML
+feature vector (MLModel.FEATURES, NaN when the fixture had no standings), a boolean
+vector of fired rules (compiled_rules.RULES) and the market probabilities from the
+rule engine's 'feature_record'. Rows are buffered in memory and written as .npz
+chunks through a temp-file rename; every chunk carries its own column names, so
+loads align columns by name across schema changes. A fixture predicted more than
+once keeps its latest row.
+"""
+
+import atexit
+import glob
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# --- Store Configuration ---
+_project_root = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+FEATURE_STORE_DIR = os.getenv('LEO_FEATURE_STORE_DIR', os.path.join(_project_root, "Data", "Store", "features"))
+FEATURE_FLUSH_ROWS = int(os.getenv('LEO_FEATURE_FLUSH_ROWS', 500))     # Buffered rows before a chunk is written
+FEATURE_COMPACT_AT = int(os.getenv('LEO_FEATURE_COMPACT_AT', 50))      # Chunk count that triggers compaction
+
+MARKET_FIELDS = (
+    'home_score', 'away_score', 'draw_score', 'btts_prob', 'over25_prob',
+    'home_xg', 'away_xg', 'ml_confidence', 'confidence_score',
+)
+
+
+def _schema() -> Tuple[List[str], List[str]]:
+    """Current feature and rule column names (imported lazily: Core depends on Data)."""
+    from Core.Intelligence.ml_model import MLModel
+    from Core.Intelligence.compiled_rules import RULES
+    return list(MLModel.FEATURES), [rule[0] for rule in RULES]
+
+
+@dataclass
+class FeatureFrame:
+    """All stored predictions as aligned arrays (one row per fixture_id, latest wins)."""
+    fixture_id: np.ndarray        # (N,) str
+    region_league: np.ndarray     # (N,) str
+    generated_at: np.ndarray      # (N,) float, epoch seconds
+    features: np.ndarray          # (N, F) float, NaN = no feature row
+    feature_names: List[str]
+    rules: np.ndarray             # (N, R) bool
+    rule_names: List[str]
+    markets: np.ndarray           # (N, M) float, NaN = not recorded
+    market_names: List[str]
+
+    def __len__(self) -> int:
+        return len(self.fixture_id)
+
+    def locate(self, fixture_ids) -> np.ndarray:
+        """Row of each fixture id in this frame, -1 where it has no stored prediction."""
+        query = np.asarray(fixture_ids, dtype=str)
+        if not len(self) or not len(query):
+            return np.full(len(query), -1, dtype=np.int64)
+        order = np.argsort(self.fixture_id, kind='stable')
+        sorted_ids = self.fixture_id[order]
+        slot = np.minimum(np.searchsorted(sorted_ids, query), len(sorted_ids) - 1)
+        return np.where(sorted_ids[slot] == query, order[slot], -1)
+
+    def columns(self, block: str, names: List[str]) -> np.ndarray:
+        """Columns of 'features', 'rules' or 'markets' in the given name order (missing -> NaN / False)."""
+        return _align(getattr(self, block), getattr(self, block[:-1] + '_names'), names)
+
+
+def _align(data: np.ndarray, have_names: List[str], names: List[str]) -> np.ndarray:
+    have = {name: i for i, name in enumerate(have_names)}
+    fill = False if data.dtype == bool else np.nan
+    out = np.full((len(data), len(names)), fill, dtype=data.dtype)
+    for j, name in enumerate(names):
+        if name in have:
+            out[:, j] = data[:, have[name]]
+    return out
+
+
+class FeatureStore:
+    """Buffered writer and cached reader for the .npz chunks under one directory."""
+
+    def __init__(self, directory: str = FEATURE_STORE_DIR):
+        self.directory = directory
+        self._lock = threading.RLock()
+        self._buffer: List[Tuple[str, str, float, Optional[List[float]], List[str], Dict[str, float]]] = []
+        self._cache: Optional[Tuple[Tuple[str, ...], FeatureFrame]] = None
+
+    # --- Writing ---
+
+    def record(self, fixture_id: str, region_league: str, feature_record: Optional[Dict[str, Any]]):
+        """Buffers one prediction's feature_record (no-op when the result carries none)."""
+        if not feature_record or not fixture_id:
+            return
+        with self._lock:
+            self._buffer.append((
+                str(fixture_id), str(region_league or 'Unknown'), time.time(),
+                feature_record.get('features'), list(feature_record.get('rules', [])),
+                dict(feature_record.get('markets', {})),
+            ))
+            if len(self._buffer) >= FEATURE_FLUSH_ROWS:
+                self.flush()
+
+    def flush(self) -> int:
+        """Writes buffered rows as one chunk. Returns rows written."""
+        with self._lock:
+            if not self._buffer:
+                return 0
+            rows, self._buffer = self._buffer, []
+            feature_names, rule_names = _schema()
+            rule_pos = {name: i for i, name in enumerate(rule_names)}
+
+            features = np.full((len(rows), len(feature_names)), np.nan)
+            rules = np.zeros((len(rows), len(rule_names)), dtype=bool)
+            markets = np.full((len(rows), len(MARKET_FIELDS)), np.nan)
+            for i, (_, _, _, vector, fired, probs) in enumerate(rows):
+                if vector is not None and len(vector) == len(feature_names):
+                    features[i] = vector
+                rules[i, [rule_pos[r] for r in fired if r in rule_pos]] = True
+                markets[i] = [probs.get(name, np.nan) for name in MARKET_FIELDS]
+
+            self._write_chunk(self._chunk_path(), {
+                'fixture_id': np.array([r[0] for r in rows], dtype=str),
+                'region_league': np.array([r[1] for r in rows], dtype=str),
+                'generated_at': np.array([r[2] for r in rows], dtype=float),
+                'features': features, 'feature_names': np.array(feature_names, dtype=str),
+                'rules': rules, 'rule_names': np.array(rule_names, dtype=str),
+                'markets': markets, 'market_names': np.array(MARKET_FIELDS, dtype=str),
+            })
+            if len(self._chunks()) > FEATURE_COMPACT_AT:
+                self.compact()
+            return len(rows)
+
+    def _chunk_path(self) -> str:
+        return os.path.join(self.directory, f"part-{time.time_ns():020d}-{os.getpid()}.npz")
+
+    def _write_chunk(self, path: str, arrays: Dict[str, np.ndarray]):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+
+    def compact(self) -> int:
+        """Merges every chunk into one (latest row per fixture). Returns chunks merged."""
+        with self._lock:
+            chunks = self._chunks()
+            if len(chunks) < 2:
+                return 0
+            frame = self._read(chunks)
+            self._write_chunk(self._chunk_path(), {
+                'fixture_id': frame.fixture_id, 'region_league': frame.region_league,
+                'generated_at': frame.generated_at,
+                'features': frame.features, 'feature_names': np.array(frame.feature_names, dtype=str),
+                'rules': frame.rules, 'rule_names': np.array(frame.rule_names, dtype=str),
+                'markets': frame.markets, 'market_names': np.array(frame.market_names, dtype=str),
+            })
+            for path in chunks:
+                os.remove(path)
+            print(f"    [Feature Store] Compacted {len(chunks)} chunks into {len(frame)} rows")
+            return len(chunks)
+
+    # --- Reading ---
+
+    def _chunks(self) -> List[str]:
+        return sorted(glob.glob(os.path.join(self.directory, 'part-*.npz')))
+
+    def load(self) -> FeatureFrame:
+        """Every stored prediction (pending rows are flushed first); cached until the chunks change."""
+        with self._lock:
+            self.flush()
+            chunks = tuple(self._chunks())
+            if self._cache is None or self._cache[0] != chunks:
+                self._cache = (chunks, self._read(list(chunks)))
+            return self._cache[1]
+
+    def _read(self, chunks: List[str]) -> FeatureFrame:
+        feature_names, rule_names = _schema()
+        parts = []
+        for path in chunks:
+            try:
+                with np.load(path, allow_pickle=False) as z:
+                    parts.append({key: z[key] for key in z.files})
+            except Exception as e:
+                print(f"    [Feature Store] Skipping unreadable chunk {os.path.basename(path)}: {e}")
+
+        market_names = list(MARKET_FIELDS)
+        if not parts:
+            return FeatureFrame(np.array([], dtype=str), np.array([], dtype=str), np.array([], dtype=float),
+                                np.empty((0, len(feature_names))), feature_names,
+                                np.zeros((0, len(rule_names)), dtype=bool), rule_names,
+                                np.empty((0, len(market_names))), market_names)
+
+        def aligned(part, block, names):
+            return _align(part[block], part[block[:-1] + '_names'].tolist(), names)
+
+        fixture_id = np.concatenate([p['fixture_id'] for p in parts])
+        # Chunks are in write order: keep the last row of each fixture.
+        _, first_from_end = np.unique(fixture_id[::-1], return_index=True)
+        keep = np.sort(len(fixture_id) - 1 - first_from_end)
+        return FeatureFrame(
+            fixture_id=fixture_id[keep],
+            region_league=np.concatenate([p['region_league'] for p in parts])[keep],
+            generated_at=np.concatenate([p['generated_at'] for p in parts])[keep],
+            features=np.concatenate([aligned(p, 'features', feature_names) for p in parts])[keep],
+            feature_names=feature_names,
+            rules=np.concatenate([aligned(p, 'rules', rule_names) for p in parts])[keep],
+            rule_names=rule_names,
+            markets=np.concatenate([aligned(p, 'markets', market_names) for p in parts])[keep],
+            market_names=market_names,
+        )
+
+
+# --- Process-Wide Store ---
+
+_store: Optional[FeatureStore] = None
+_store_lock = threading.Lock()
+
+
+def get_feature_store() -> FeatureStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = FeatureStore()
+    return _store
+
+
+def record_prediction(fixture_id: str, region_league: str, prediction: Dict[str, Any]):
+    """Buffers the feature_record of a saved prediction."""
+    try:
+        get_feature_store().record(fixture_id, region_league, prediction.get('feature_record'))
+    except Exception as e:
+        print(f"    [Feature Store] Could not record {fixture_id}: {e}")
+
+
+def load_features() -> FeatureFrame:
+    return get_feature_store().load()
+
+
+def reviewed_outcomes() -> Dict[str, np.ndarray]:
+    """fixture_id, region_league, confidence, reason and correct (bool) of every graded prediction."""
+    from .prediction_analytics import get_prediction_analytics
+
+    graded = get_prediction_analytics().reviewed
+    return {
+        'fixture_id': graded['fixture_id'].to_numpy(dtype=str),
+        'region_league': graded['region_league'].replace('', 'Unknown').to_numpy(dtype=str),
+        'confidence': graded['confidence'].replace('', 'Medium').to_numpy(dtype=str),
+        'reason': graded['reason'].tolist(),
+        'correct': graded['correct'].to_numpy(dtype=bool),
+    }
+
+
+def flush_features() -> int:
+    return _store.flush() if _store is not None else 0
+
+
+atexit.register(flush_features)
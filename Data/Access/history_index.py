@@ -0,0 +1,243 @@
+# history_index.py: Precomputed team-history index over schedules and standings.
+# Refactored for Clean Architecture (v2.8)
+# This script serves last-N form, H2H and standings lookups without rescanning the tables.
+
+"""
+History Index Module
+Single-pass index over the finished matches in schedules.csv.
+Responsible for O(1) form / head-to-head / standings lookups for reprediction and backtests.
+
+Every finished match (status not 'scheduled', both scores present) is mapped once
+into the {date, home, away, score, winner} shape the rule engine consumes and
+filed under both team names, both team ids and the unordered team pair. Each
+list is kept sorted newest-first, ties in file order, which is exactly the order
+the old "sort everything, then scan per fixture" loop produced.
+
+get_history_index() returns a process-wide index that is rebuilt only when the
+schedules / standings tables changed behind its back; note_schedule_update()
+folds a single saved row in incrementally so new results do not force a rebuild.
+"""
+
+import bisect
+import threading
+from datetime import datetime as dt
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+SortKey = Tuple[int, int]   # (-date ordinal, file position): ascending == newest first
+
+
+@lru_cache(maxsize=8192)
+def _date_ordinal(date_str: str) -> int:
+    """Ordinal of a DD.MM.YYYY date; 0 (sorts last) when it cannot be parsed."""
+    try:
+        return dt.strptime(date_str, "%d.%m.%Y").toordinal()
+    except (TypeError, ValueError):
+        return 0
+
+
+def is_finished(row: Dict[str, Any]) -> bool:
+    """True for schedule rows that carry a final result."""
+    return (row.get('match_status') != 'scheduled'
+            and row.get('home_score') not in ('', 'N/A', None)
+            and row.get('away_score') not in ('', 'N/A', None))
+
+
+def map_match(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Schedule row -> the history entry shape used in h2h_data."""
+    hs = row.get('home_score', '0')
+    ascore = row.get('away_score', '0')
+    try:
+        hsi, asi = int(hs), int(ascore)
+        winner = "Home" if hsi > asi else "Away" if asi > hsi else "Draw"
+    except (TypeError, ValueError):
+        winner = "Draw"
+    return {
+        "date": row.get("date"),
+        "home": row.get('home_team'),
+        "away": row.get('away_team'),
+        "score": f"{hs}-{ascore}",
+        "winner": winner,
+    }
+
+
+def parse_standings(raw_standings: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """standings.csv rows -> typed standings entries; rows with non-numeric fields are skipped."""
+    standings_data = []
+    for s in raw_standings:
+        try:
+            standings_data.append({
+                "team_name": s.get("team_name"),
+                "position": int(s.get("position", 0)),
+                "goal_difference": int(s.get("goal_difference", 0)),
+                "goals_for": int(s.get("goals_for", 0)),
+                "goals_against": int(s.get("goals_against", 0))
+            })
+        except (TypeError, ValueError):
+            continue
+    return standings_data
+
+
+class HistoryIndex:
+    """
+    Team / pair / league lookups over finished matches.
+    Entries are addressed by their row offset in schedules.csv; the per-team and
+    per-pair lists hold sort keys so incremental inserts are a bisect away.
+    """
+
+    def __init__(self, schedule_rows: Iterable[Dict[str, Any]] = (), standings_rows: Iterable[Dict[str, Any]] = ()):
+        self._entries: Dict[int, Tuple[Dict[str, Any], SortKey, Tuple[str, ...], FrozenSet[str]]] = {}
+        self._offsets: Dict[str, int] = {}          # fixture_id -> row offset
+        self._next_offset = 0
+        self._by_team: Dict[str, List[SortKey]] = {}
+        self._by_team_id: Dict[str, List[SortKey]] = {}
+        self._by_pair: Dict[FrozenSet[str], List[SortKey]] = {}
+        self._standings: Dict[str, List[Dict[str, Any]]] = {}
+        self.schedules_version: Optional[int] = None
+        self.standings_version: Optional[int] = None
+
+        for offset, row in enumerate(schedule_rows):
+            fixture_id = row.get('fixture_id')
+            if fixture_id:
+                self._offsets.setdefault(fixture_id, offset)
+            self._add(offset, row, append=True)
+            self._next_offset = offset + 1
+        # Single pass above appended in file order; one sort per list fixes the date order.
+        for buckets in (self._by_team, self._by_team_id, self._by_pair):
+            for keys in buckets.values():
+                keys.sort()
+        self.load_standings(standings_rows)
+
+    # --- Building ---
+
+    def _add(self, offset: int, row: Dict[str, Any], append: bool = False):
+        if not is_finished(row):
+            return
+        home, away = row.get('home_team'), row.get('away_team')
+        home_id, away_id = row.get('home_team_id'), row.get('away_team_id')
+        teams = (home,) if home == away else (home, away)
+        ids = tuple(i for i in ((home_id,) if home_id == away_id else (home_id, away_id)) if i)
+        pair = frozenset(teams)
+        sort_key = (-_date_ordinal(row.get('date', '')), offset)
+        self._entries[offset] = (map_match(row), sort_key, ids, pair)
+        insert = list.append if append else bisect.insort
+        for team in teams:
+            insert(self._by_team.setdefault(team, []), sort_key)
+        for team_id in ids:
+            insert(self._by_team_id.setdefault(team_id, []), sort_key)
+        insert(self._by_pair.setdefault(pair, []), sort_key)
+
+    def _remove(self, offset: int):
+        entry = self._entries.pop(offset, None)
+        if entry is None:
+            return
+        _, sort_key, ids, pair = entry
+        for bucket, keys in ((self._by_team, pair), (self._by_team_id, ids), (self._by_pair, (pair,))):
+            for k in keys:
+                keys_list = bucket.get(k)
+                if keys_list:
+                    i = bisect.bisect_left(keys_list, sort_key)
+                    if i < len(keys_list) and keys_list[i] == sort_key:
+                        del keys_list[i]
+
+    def update_row(self, row: Dict[str, Any]):
+        """Folds one added/changed schedule row into the index (e.g. a result that just landed)."""
+        fixture_id = row.get('fixture_id')
+        offset = self._offsets.get(fixture_id) if fixture_id else None
+        if offset is None:
+            offset = self._next_offset
+            self._next_offset += 1
+            if fixture_id:
+                self._offsets[fixture_id] = offset
+        else:
+            self._remove(offset)
+        self._add(offset, row)
+
+    def load_standings(self, standings_rows: Iterable[Dict[str, Any]]):
+        """Groups standings rows by region_league (file order kept) and parses them once."""
+        grouped: Dict[str, List[Dict[str, Any]]] = {}
+        for row in standings_rows:
+            grouped.setdefault(row.get('region_league', ''), []).append(row)
+        self._standings = {league: parse_standings(rows) for league, rows in grouped.items()}
+
+    # --- Lookups ---
+
+    def _resolve(self, keys: Optional[List[SortKey]], limit: Optional[int], before: Optional[str] = None) -> List[Dict[str, Any]]:
+        if not keys:
+            return []
+        if before is not None:
+            # Point-in-time view: dated matches strictly earlier than `before` (undated ones are dropped).
+            start = bisect.bisect_left(keys, (-_date_ordinal(before) + 1, -1))
+            stop = bisect.bisect_left(keys, (0, -1), start)
+            keys = keys[start:stop]
+        if limit is not None:
+            keys = keys[:limit]
+        return [self._entries[offset][0] for _, offset in keys]
+
+    def team_matches(self, team_name: str, limit: Optional[int] = 10, team_id: Optional[str] = None,
+                     before: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Newest-first finished matches of a team (by id when given and known, else by name).
+        before (DD.MM.YYYY) restricts to matches played earlier, for leak-free backtests.
+        """
+        if team_id and team_id in self._by_team_id:
+            return self._resolve(self._by_team_id[team_id], limit, before)
+        return self._resolve(self._by_team.get(team_name), limit, before)
+
+    def head_to_head(self, team_a: str, team_b: str, limit: Optional[int] = None,
+                     before: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Newest-first finished meetings between two teams, either venue (optionally before a date)."""
+        return self._resolve(self._by_pair.get(frozenset((team_a, team_b))), limit, before)
+
+    def standings(self, region_league: str) -> List[Dict[str, Any]]:
+        """Parsed standings for a league (shared list: do not mutate)."""
+        return self._standings.get(region_league, [])
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# --- Process-wide Index ---
+
+_index: Optional[HistoryIndex] = None
+_index_lock = threading.RLock()
+
+
+def _tables():
+    from .db_helpers import SCHEDULES_CSV, STANDINGS_CSV
+    from .table_store import get_table
+    return get_table(SCHEDULES_CSV, key='fixture_id'), get_table(STANDINGS_CSV, key='standings_key')
+
+
+def get_history_index() -> HistoryIndex:
+    """
+    Returns the shared index, rebuilding only the parts whose table changed
+    (by any writer other than note_schedule_update) since the last call.
+    """
+    global _index
+    schedules, standings = _tables()
+    with _index_lock:
+        if _index is None or _index.schedules_version != schedules.version:
+            rows = schedules.rows()
+            _index = HistoryIndex(rows)
+            _index.schedules_version = schedules.version
+            print(f"    [History Index] Indexed {len(_index)} finished matches from {len(rows)} schedule rows.")
+        if _index.standings_version != standings.version:
+            _index.load_standings(standings.rows())
+            _index.standings_version = standings.version
+        return _index
+
+
+def note_schedule_update(row: Dict[str, Any]):
+    """
+    Called after a schedule row was saved. If that save is the only change since the
+    index was built, it is applied incrementally; otherwise the next lookup rebuilds.
+    """
+    with _index_lock:
+        if _index is None or _index.schedules_version is None:
+            return
+        schedules, _ = _tables()
+        current = schedules.version
+        if current == _index.schedules_version + 1:
+            _index.update_row(schedules.get(str(row.get('fixture_id'))) or row)
+            _index.schedules_version = current
@@ -6,15 +6,18 @@
 Outcome Reviewer Module
 Core review processing and outcome analysis system.
 Responsible for managing the review workflow, CSV operations, and outcome tracking.
+
+A review run is a pipeline: pending predictions are joined against the schedules
+table in one pass, the still-unresolved ones are fanned out over a bounded pool of
+browser pages, and every outcome is committed with one batched predictions write
+and one batched cloud upsert.
 """
 
-import asyncio
-import csv
 import os
+import time
+import numpy as np
 import pandas as pd
-import pytz
-from datetime import datetime as dt, timedelta
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 
 from .health_monitor import HealthMonitor
 from playwright.async_api import Playwright
@@ -24,6 +27,12 @@ from playwright.async_api import Playwright
 BATCH_SIZE = 10      # How many matches to review at the same time
 LOOKBACK_LIMIT = 5000 # Only check the last 500 eligible matches to prevent infinite backlogs
 ENRICHMENT_CONCURRENCY = 10 # Concurrency for enriching past H2H matches
+REVIEW_WORKERS = int(os.getenv('LEO_REVIEW_WORKERS', 4))  # Browser pages reviewing unresolved matches in parallel
+REVIEW_TIMEOUT = float(os.getenv('LEO_REVIEW_TIMEOUT', 90))  # Per-match deadline (s) for the browser fallback
+REVIEW_RETRIES = int(os.getenv('LEO_REVIEW_RETRIES', 1))  # Retries (with backoff) for reviews that time out
+
+FINISHED_STATUSES = ('FINISHED', 'AET', 'PEN')
+SCHEDULE_OUTCOMES = {'POSTPONED': 'match_postponed', 'CANCELED': 'canceled'}  # schedules match_status -> review status
 
 # --- PRODUCTION CONFIGURATION ---
 PRODUCTION_MODE = True  # Set to True in production environment
@@ -38,40 +47,47 @@ COMPATIBLE_MODELS = ["2.5", "2.6"]  # Compatible with these model versions
 # --- IMPORTS ---
 from .db_helpers import (
     PREDICTIONS_CSV, SCHEDULES_CSV, TEAMS_CSV, REGION_LEAGUE_CSV, 
-    FB_MATCHES_CSV, files_and_headers, save_team_entry, save_region_league_entry
+    FB_MATCHES_CSV, save_team_entry, save_region_league_entry
 )
-from .csv_operations import upsert_entry, _read_csv, _write_csv
-from .sync_manager import SyncManager
+from .table_store import get_table
+from .sync_worker import get_sync_worker
 from Core.Intelligence.intelligence import get_selector_auto, get_selector
+from Core.Browser.resource_router import apply_resource_profile, print_resource_report
 from Core.Utils.constants import NAVIGATION_TIMEOUT
+from Core.Utils.task_pool import AdaptiveTaskPool
 
 
 def _load_schedule_db() -> Dict[str, Dict]:
-    """Loads the schedules.csv into a dictionary for quick lookups."""
-    schedule_db = {}
+    """Loads the schedules table into a dictionary for quick lookups."""
     if not os.path.exists(SCHEDULES_CSV):
         return {}
-    with open(SCHEDULES_CSV, 'r', encoding='utf-8', newline='') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            if row.get('fixture_id'):
-                schedule_db[row['fixture_id']] = row
-    return schedule_db
+    return {row['fixture_id']: row for row in get_table(SCHEDULES_CSV, key='fixture_id').rows() if row.get('fixture_id')}
+
+
+def _load_schedule_index() -> pd.DataFrame:
+    """Result columns of every scheduled fixture, indexed once per review run for the offline join."""
+    columns = ['fixture_id', 'match_status', 'home_score', 'away_score']
+    if not os.path.exists(SCHEDULES_CSV):
+        return pd.DataFrame(columns=columns)
+    rows = get_table(SCHEDULES_CSV, key='fixture_id').rows()
+    index = pd.DataFrame({col: [row.get(col) or '' for row in rows] for col in columns})
+    # Same precedence as the dict lookup: the last row of a fixture wins.
+    return index[index['fixture_id'] != ''].drop_duplicates('fixture_id', keep='last')
 
 
 def get_predictions_to_review() -> List[Dict]:
     """
-    Reads the predictions CSV using pandas and returns a list of matches that 
-    are in the past (Africa/Lagos timezone) and still have a 'pending' status.
+    Reads the predictions table and returns a list of matches that are in the
+    past (Africa/Lagos timezone) and still have a 'pending' status.
     """
     if not os.path.exists(PREDICTIONS_CSV):
         print(f"[Error] Predictions file not found at: {PREDICTIONS_CSV}")
         return []
 
     try:
-        # 1. Load predictions with pandas
-        df = pd.read_csv(PREDICTIONS_CSV, dtype=str).fillna('')
-        
+        # 1. Load predictions through the table store (includes journaled updates)
+        df = pd.DataFrame(get_table(PREDICTIONS_CSV, key='fixture_id').rows()).fillna('')
+
         if df.empty:
             return []
 
@@ -82,25 +98,15 @@ def get_predictions_to_review() -> List[Dict]:
 
         # 3. Handle Date/Time Parsing
         # Format in CSV is 14.02.2026 for date, 15:00 for match_time
-        def parse_dt(row):
-            try:
-                d_str = row.get('date') or row.get('Date')
-                t_str = row.get('match_time')
-                if not d_str or not t_str or t_str == 'N/A':
-                    return pd.NaT
-                return dt.strptime(f"{d_str} {t_str}", "%d.%m.%Y %H:%M")
-            except:
-                return pd.NaT
-
-        df['scheduled_dt'] = df.apply(parse_dt, axis=1)
+        dates = df['date'] if 'date' in df else df.get('Date', pd.Series('', index=df.index))
+        df = df.assign(scheduled_dt=pd.to_datetime(
+            dates.astype(str) + ' ' + df['match_time'].astype(str), format="%d.%m.%Y %H:%M", errors='coerce'
+        ))
         df = df.dropna(subset=['scheduled_dt'])
 
         # 4. Timezone Awareness (Africa/Lagos)
-        lagos_tz = pytz.timezone('Africa/Lagos')
-        now_lagos = dt.now(lagos_tz)
-        
-        # Localize scheduled_dt if naive (usually it is)
-        df['scheduled_dt'] = df['scheduled_dt'].apply(lambda x: lagos_tz.localize(x) if x.tzinfo is None else x)
+        df['scheduled_dt'] = df['scheduled_dt'].dt.tz_localize('Africa/Lagos')
+        now_lagos = pd.Timestamp.now(tz='Africa/Lagos')
 
         # 5. Filter for past matches (scheduled_time < current_time)
         to_review_df = df[df['scheduled_dt'] < now_lagos]
@@ -144,68 +150,70 @@ def smart_parse_datetime(dt_str: str):
     return None, None
 
 
-def save_single_outcome(match_data: Dict, new_status: str):
+def save_outcomes(outcomes: List[Tuple[Dict, str]]) -> int:
     """
-    Atomic Upsert to save the review result.
+    Commits review results as one batched predictions write plus one batched
+    cloud upsert of the graded rows. Returns the number of predictions updated.
     """
-    temp_file = PREDICTIONS_CSV + '.tmp'
-    updated = False
-    row_id_key = 'ID' if 'ID' in match_data else 'fixture_id'
-    target_id = match_data.get(row_id_key)
+    if not outcomes or not os.path.exists(PREDICTIONS_CSV):
+        return 0
 
+    from .review_outcomes import evaluate_prediction as final_eval
     try:
-        with open(PREDICTIONS_CSV, 'r', encoding='utf-8', newline='') as infile, \
-             open(temp_file, 'w', encoding='utf-8', newline='') as outfile:
-
-            reader = csv.DictReader(infile)
-            fieldnames = reader.fieldnames
-            if fieldnames is None: 
-                fieldnames = files_and_headers[PREDICTIONS_CSV]
-
-            writer = csv.DictWriter(outfile, fieldnames=fieldnames)
-            writer.writeheader()
-
-            for row in reader:
-                current_id = row.get('ID') or row.get('fixture_id')
-
-                if current_id == target_id:
-                    row['status'] = new_status
-                    row['actual_score'] = match_data.get('actual_score', row.get('actual_score', 'N/A'))
-                    
-                    # Update scores if available in match_data (from schedules)
-                    if 'home_score' in match_data and 'away_score' in match_data:
-                        row['actual_score'] = f"{match_data['home_score']}-{match_data['away_score']}"
-
-                    if new_status in ['reviewed', 'finished']:
-                        from .review_outcomes import evaluate_prediction as final_eval
-                        prediction = row.get('prediction', '')
-                        actual_score = row.get('actual_score', '')
-                        
-                        try:
-                            h_core, a_core = actual_score.split('-')
-                            is_correct = final_eval(prediction, h_core, a_core)
-                            row['outcome_correct'] = str(is_correct)
-                            
-                            # Immediate Sync (Real-time update)
-                            print(f"      [Cloud] Immediate sync for {target_id}...")
-                            asyncio.create_task(SyncManager().batch_upsert('predictions', [row]))
-                        except Exception as eval_err:
-                            print(f"      [Eval Error] {eval_err}")
-
-                    updated = True
-
-                writer.writerow(row)
-
-        if updated:
-            os.replace(temp_file, PREDICTIONS_CSV)
-            if new_status == 'reviewed' and target_id:
-                _sync_outcome_to_site_registry(target_id, match_data)
-        else:
-            if os.path.exists(temp_file):
-                os.remove(temp_file)
+        table = get_table(PREDICTIONS_CSV, key='fixture_id')
+        changes: Dict[str, Dict] = {}
+        graded: List[Dict] = []
+        reviewed: List[Tuple[str, Dict]] = []
+
+        for match_data, new_status in outcomes:
+            row_id_key = 'ID' if 'ID' in match_data else 'fixture_id'
+            target_id = match_data.get(row_id_key)
+            row = changes.get(target_id) or (table.get(target_id) if target_id else None)
+            if row is None:
+                continue
+
+            row['status'] = new_status
+            row['actual_score'] = match_data.get('actual_score', row.get('actual_score', 'N/A'))
+
+            # Update scores if available in match_data (from schedules)
+            if 'home_score' in match_data and 'away_score' in match_data:
+                row['actual_score'] = f"{match_data['home_score']}-{match_data['away_score']}"
+
+            if new_status in ['reviewed', 'finished']:
+                prediction = row.get('prediction', '')
+                actual_score = row.get('actual_score', '')
+
+                try:
+                    h_core, a_core = actual_score.split('-')
+                    is_correct = final_eval(prediction, h_core, a_core)
+                    row['outcome_correct'] = str(is_correct)
+                    graded.append(row)
+                except Exception as eval_err:
+                    print(f"      [Eval Error] {eval_err}")
+
+            changes[target_id] = row
+            if new_status == 'reviewed':
+                reviewed.append((target_id, match_data))
+
+        updated = table.update_many(changes)
+        if graded:
+            # One coalesced upload via the background sync worker
+            print(f"      [Cloud] Queued sync for {len(graded)} reviewed predictions...")
+            get_sync_worker().enqueue_upsert('predictions', graded)
+        for target_id, match_data in reviewed:
+            _sync_outcome_to_site_registry(target_id, match_data)
+        return updated
     except Exception as e:
         HealthMonitor.log_error("csv_save_error", f"Failed to save CSV: {e}", "high")
         print(f"    [File Error] Failed to write CSV: {e}")
+        return 0
+
+
+def save_single_outcome(match_data: Dict, new_status: str):
+    """
+    Atomic Upsert to save the review result.
+    """
+    save_outcomes([(match_data, new_status)])
 
 def sync_schedules_to_predictions():
     """
@@ -214,14 +222,13 @@ def sync_schedules_to_predictions():
     if not os.path.exists(SCHEDULES_CSV) or not os.path.exists(PREDICTIONS_CSV):
         return
 
-    schedules = _read_csv(SCHEDULES_CSV)
-    predictions = _read_csv(PREDICTIONS_CSV)
-    pred_ids = {p.get('fixture_id') for p in predictions if p.get('fixture_id')}
+    schedules = get_table(SCHEDULES_CSV, key='fixture_id').rows()
+    predictions = get_table(PREDICTIONS_CSV, key='fixture_id')
 
     added_count = 0
     for s in schedules:
         fid = s.get('fixture_id')
-        if fid and fid not in pred_ids:
+        if fid and predictions.get(fid) is None:
             # Create a shell prediction entry
             new_pred = {
                 'fixture_id': fid,
@@ -238,7 +245,7 @@ def sync_schedules_to_predictions():
                 'match_link': s.get('match_link'),
                 'actual_score': f"{s.get('home_score', '')}-{s.get('away_score', '')}" if s.get('home_score') else 'N/A'
             }
-            upsert_entry(PREDICTIONS_CSV, new_pred, files_and_headers[PREDICTIONS_CSV], 'fixture_id')
+            predictions.upsert(new_pred)
             added_count += 1
     
     if added_count > 0:
@@ -263,15 +270,12 @@ def _sync_outcome_to_site_registry(fixture_id: str, match_data: Dict):
         outcome_status = "WON" if is_correct else "LOST"
         
         # 2. Update site registry
-        rows = _read_csv(FB_MATCHES_CSV)
-        sync_count = 0
-        for row in rows:
-            if str(row.get('fixture_id')) == str(fixture_id):
-                row['status'] = outcome_status
-                sync_count += 1
+        registry = get_table(FB_MATCHES_CSV, key='site_match_id')
+        sync_count = registry.update_where(
+            lambda row: str(row.get('fixture_id')) == str(fixture_id), {'status': outcome_status}
+        )
         
         if sync_count > 0:
-            _write_csv(FB_MATCHES_CSV, rows, files_and_headers[FB_MATCHES_CSV])
             print(f"    [Sync] Updated {sync_count} records in fb_matches.csv to {outcome_status}")
             
     except Exception as e:
@@ -280,34 +284,51 @@ def _sync_outcome_to_site_registry(fixture_id: str, match_data: Dict):
 
 
 
-def process_review_task_offline(match: Dict) -> Optional[Dict]:
+def resolve_offline(to_review: List[Dict], schedule_index: Optional[pd.DataFrame] = None) -> Tuple[List[Tuple[Dict, str]], List[Dict]]:
+    """
+    Joins pending predictions against the schedules table in one pass (no browser).
+    Returns (outcomes, unresolved): (match, new_status) pairs for finished, postponed
+    and canceled fixtures, and the matches schedules cannot settle yet.
+    """
+    if not to_review:
+        return [], []
+    if schedule_index is None:
+        schedule_index = _load_schedule_index()
+
+    pending = pd.DataFrame({'fixture_id': [str(m.get('fixture_id') or '') for m in to_review]})
+    joined = pending.merge(schedule_index, on='fixture_id', how='left', sort=False).fillna('')
+    match_status = joined['match_status'].str.upper()
+    finished = match_status.isin(FINISHED_STATUSES) & (joined['home_score'] != '') & (joined['away_score'] != '')
+    verdict = np.where(finished, 'finished', match_status.map(SCHEDULE_OUTCOMES).fillna(''))
+
+    outcomes, unresolved = [], []
+    for match, new_status, home_score, away_score in zip(
+            to_review, verdict.tolist(), joined['home_score'].tolist(), joined['away_score'].tolist()):
+        if new_status == 'finished':
+            match['home_score'] = home_score
+            match['away_score'] = away_score
+            match['actual_score'] = f"{home_score}-{away_score}"
+            print(f"    [Result] {match.get('home_team')} {match['actual_score']} {match.get('away_team')}")
+        if new_status:
+            outcomes.append((match, new_status))
+        else:
+            # Not yet finished in schedules: queue for the browser
+            unresolved.append(match)
+    return outcomes, unresolved
+
+
+def process_review_task_offline(match: Dict, schedule_index: Optional[pd.DataFrame] = None) -> Optional[Dict]:
     """Review a prediction by reading its result from schedules.csv (no browser)."""
-    schedule_db = _load_schedule_db()
-    fixture_id = match.get('fixture_id')
-    schedule = schedule_db.get(fixture_id, {})
-
-    match_status = schedule.get('match_status', '').upper()
-    home_score = schedule.get('home_score', '')
-    away_score = schedule.get('away_score', '')
-
-    if match_status in ('FINISHED', 'AET', 'PEN') and home_score and away_score:
-        match['home_score'] = home_score
-        match['away_score'] = away_score
-        match['actual_score'] = f"{home_score}-{away_score}"
-        save_single_outcome(match, 'finished')
-        print(f"    [Result] {match.get('home_team')} {match['actual_score']} {match.get('away_team')}")
-        return match
-    elif match_status == 'POSTPONED':
-        save_single_outcome(match, 'match_postponed')
+    outcomes, _ = resolve_offline([match], schedule_index)
+    if not outcomes:
+        # Not yet finished — skip
         return None
-    elif match_status == 'CANCELED':
-        save_single_outcome(match, 'canceled')
-        return None
-    # Not yet finished — skip
-    return None
+    save_outcomes(outcomes)
+    return match if outcomes[0][1] == 'finished' else None
 
-async def process_review_task_browser(page, match: Dict) -> Optional[Dict]:
-    """Review a prediction by visiting the match page (Browser fallback)."""
+
+async def _review_outcome_browser(page, match: Dict) -> Optional[Tuple[Dict, str]]:
+    """Reads a match page and returns (match, new_status), or None while it is unresolved."""
     match_link = match.get('match_link')
     if not match_link:
         return None
@@ -323,20 +344,71 @@ async def process_review_task_browser(page, match: Dict) -> Optional[Dict]:
             h_score, a_score = final_score.split('-')
             match['home_score'] = h_score
             match['away_score'] = a_score
-            save_single_outcome(match, 'finished')
             print(f"    [Result-B] {match.get('home_team')} {final_score} {match.get('away_team')}")
-            return match
+            return match, 'finished'
         elif final_score == "Match_POSTPONED":
-            save_single_outcome(match, 'match_postponed')
+            return match, 'match_postponed'
         elif final_score == "ARCHIVED":
             print(f"      [!] Match {match.get('fixture_id')} appears deleted or archived. Flagging.")
-            save_single_outcome(match, 'manual_review_needed')
+            return match, 'manual_review_needed'
     except Exception as e:
         print(f"      [Fallback Error] {e}")
     
     return None
 
 
+async def process_review_task_browser(page, match: Dict) -> Optional[Dict]:
+    """Review a prediction by visiting the match page (Browser fallback)."""
+    outcome = await _review_outcome_browser(page, match)
+    if outcome is None:
+        return None
+    save_outcomes([outcome])
+    return match if outcome[1] == 'finished' else None
+
+
+async def review_in_browser(p: Playwright, matches: List[Dict], workers: int = REVIEW_WORKERS) -> List[Tuple[Dict, str]]:
+    """
+    Browser fallback over a bounded pool of pages (one context each). An adaptive
+    task pool admits up to `workers` reviews at a time, cancels a review that runs
+    past REVIEW_TIMEOUT and retries it with backoff.
+    Returns the (match, new_status) outcomes; nothing is written here.
+    """
+    if not matches:
+        return []
+    workers = max(1, min(workers, len(matches)))
+    tasks = AdaptiveTaskPool('Prologue P1 review', min_workers=1, max_workers=workers, initial=workers,
+                             timeout=REVIEW_TIMEOUT, retries=REVIEW_RETRIES)
+    browser = await p.chromium.launch(headless=True)
+    try:
+        pool = []
+        for _ in range(workers):
+            context = await browser.new_context()
+            await apply_resource_profile(context, 'flashscore', 'Prologue P1')
+            pool.append(await context.new_page())
+
+        async def review(match: Dict) -> Optional[Tuple[Dict, str]]:
+            page = pool.pop()
+            try:
+                return await _review_outcome_browser(page, match)
+            finally:
+                if page.is_closed():
+                    # Replace a crashed page so the pool keeps its size.
+                    try:
+                        page = await page.context.new_page()
+                    except Exception:
+                        context = await browser.new_context()
+                        await apply_resource_profile(context, 'flashscore', 'Prologue P1')
+                        page = await context.new_page()
+                pool.append(page)
+
+        results = await tasks.run(matches, review)
+    finally:
+        await browser.close()
+    print(tasks.report())
+
+    return [result for result in results if result]
+
+
 
 
 async def get_league_url(page):
@@ -437,7 +509,7 @@ async def get_final_score(page):
 def update_region_league_url(region_league: str, url: str):
     """
     Updates the url for a region_league in region_league.csv.
-    Parses the region_league string to create proper region_league_id.
+    Parses the region_league string to create the same rl_id as save_region_league_entry.
     """
     if not region_league or not url or " - " not in region_league:
         return
@@ -450,15 +522,14 @@ def update_region_league_url(region_league: str, url: str):
     region, league_name = region_league.split(" - ", 1)
 
     # Create composite ID matching the save_region_league_entry format
-    region_league_id = f"{region}_{league_name}".replace(' ', '_').replace('-', '_').upper()
+    rl_id = f"{region}_{league_name}".replace(' ', '_').replace('-', '_').upper()
 
-    entry = {
-        'region_league_id': region_league_id,
+    get_table(REGION_LEAGUE_CSV, key='rl_id').upsert({
+        'rl_id': rl_id,
         'region': region.strip(),
-        'league_name': league_name.strip(),
-        'url': url
-    }
-    upsert_entry(REGION_LEAGUE_CSV, entry, files_and_headers[REGION_LEAGUE_CSV], 'region_league_id')
+        'league': league_name.strip(),
+        'league_url': url
+    })
 
 
 async def run_review_process(p: Optional[Playwright] = None):
@@ -477,32 +548,25 @@ async def run_review_process(p: Optional[Playwright] = None):
         
         # Limit to lookback
         to_review = to_review[:LOOKBACK_LIMIT]
-        
-        processed_matches = []
-        needs_browser = []
 
-        for m in to_review:
-            result = process_review_task_offline(m)
-            if result:
-                processed_matches.append(result)
-            else:
-                # If match is in the past but offline failed, queue for browser
-                needs_browser.append(m)
-        
-        # Fallback to Browser if requested and needed
-        if needs_browser and p:
-            print(f"   [Info] Triggering Browser Fallback for {len(needs_browser)} unresolved reviews...")
-            browser = await p.chromium.launch(headless=True)
-            context = await browser.new_context()
-            page = await context.new_page()
-            
-            for m in needs_browser:
-                result = await process_review_task_browser(page, m)
-                if result:
-                    processed_matches.append(result)
-            
-            await browser.close()
-        
+        # 1. Offline: one join against the schedule index
+        outcomes, needs_browser = resolve_offline(to_review, _load_schedule_index())
+
+        # 2. Fallback to Browser if requested and needed
+        try:
+            if needs_browser and p:
+                workers = max(1, min(REVIEW_WORKERS, len(needs_browser)))
+                print(f"   [Info] Triggering Browser Fallback for {len(needs_browser)} unresolved reviews ({workers} pages)...")
+                started = time.monotonic()
+                browser_outcomes = await review_in_browser(p, needs_browser, workers)
+                outcomes.extend(browser_outcomes)
+                print(f"   [Info] Browser Fallback resolved {len(browser_outcomes)}/{len(needs_browser)} in {time.monotonic() - started:.1f}s.")
+                print_resource_report('Prologue P1')
+        finally:
+            # 3. Commit everything resolved so far in one batch
+            save_outcomes(outcomes)
+
+        processed_matches = [m for m, status in outcomes if status == 'finished']
         if processed_matches:
             print(f"\n   [SUCCESS] Reviewed {len(processed_matches)} match outcomes.")
         else:
@@ -510,5 +574,3 @@ async def run_review_process(p: Optional[Playwright] = None):
 
     except Exception as e:
         print(f"   [CRITICAL] Outcome review failed: {e}")
-
-
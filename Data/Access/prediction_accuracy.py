@@ -7,79 +7,12 @@ Prediction Accuracy Analysis Module
 Analyzes prediction accuracy and generates reports for the LeoBook system.
 """
 
-import csv
-import re
 import os
 from datetime import datetime
-from typing import Dict, List, Tuple
-from pathlib import Path
+from typing import Dict, List
 
 from .db_helpers import PREDICTIONS_CSV
-
-
-def get_market_option(prediction: str, home_team: str, away_team: str) -> str:
-    """
-    Normalize prediction string into a generic market option.
-    """
-    pred_lower = prediction.lower()
-    home_lower = home_team.lower()
-    away_lower = away_team.lower()
-
-    if pred_lower == 'home win' or pred_lower == home_lower: # Direct team name often means win
-        return "Home Win"
-    if pred_lower == f"{home_lower} to win":
-        return "Home Win"
-        
-    if pred_lower == 'away win' or pred_lower == away_lower:
-        return "Away Win"
-    if pred_lower == f"{away_lower} to win":
-        return "Away Win"
-
-    if 'or draw' in pred_lower:
-        if home_lower in pred_lower:
-            return "Home or Draw"
-        if away_lower in pred_lower:
-            return "Away or Draw"
-        
-    if 'or' in pred_lower and home_lower in pred_lower and away_lower in pred_lower:
-         return "Home or Away"
-
-    if 'btts' in pred_lower or 'both teams to score' in pred_lower:
-        if 'no' in pred_lower:
-            return "BTTS No"
-        return "BTTS Yes"
-    
-    if 'over' in pred_lower and '2.5' in pred_lower:
-        return "Over 2.5"
-    if 'under' in pred_lower and '2.5' in pred_lower:
-        return "Under 2.5"
-        
-    if '(dnb)' in pred_lower:
-        return "Draw No Bet"
-
-    if '2-3 goals' in pred_lower:
-        return "2-3 Goals"
-
-    # Match Over/Under (Starts with Over/Under)
-    # e.g. "Over 2.5", "Under 3.5 Goals"
-    if re.match(r'^(over|under)\s+\d+(\.\d+)?', pred_lower):
-        match = re.search(r'(over|under)\s+(\d+(\.\d+)?)', pred_lower)
-        if match:
-            type_ = match.group(1).title()
-            val = match.group(2)
-            return f"{type_} {val}"
-
-    # Team Over/Under (Ends with or contains " Over/Under value" but didn't start with it)
-    # e.g. "Atletico-Mg U20 Over 0.5", "Team Over 1.5"
-    if re.search(r'\s+(over|under)\s+\d+(\.\d+)?', pred_lower):
-        match = re.search(r'\s+(over|under)\s+(\d+(\.\d+)?)', pred_lower)
-        if match:
-            type_ = match.group(1).title()
-            val = match.group(2)
-            return f"Team {type_} {val}"
-
-    # Return the specific prediction name if no category matched
-    return prediction.title()
+from .prediction_analytics import PredictionAnalytics, get_prediction_analytics
 
 
 def calculate_accuracy_by_date(predictions: List[Dict]) -> Dict[str, Dict]:
@@ -99,78 +32,7 @@ def calculate_accuracy_by_date(predictions: List[Dict]) -> Dict[str, Dict]:
             }
         }
     """
-    accuracy_by_date = {}
-
-    for pred in predictions:
-        outcome = pred.get('outcome_correct')
-        if outcome in ['True', 'False']:
-            date = pred.get('date', 'Unknown')
-            confidence = pred.get('confidence', 'Low').strip() # Default to Low if missing
-            
-            # Normalize confidence
-            if confidence.lower() in ['very high', 'very_high']:
-                confidence = 'Very High'
-            elif confidence.lower() in ['high']:
-                confidence = 'High'
-            else:
-                confidence = 'Low'
-
-            # Get generic market option
-            home_team = pred.get('home_team', '')
-            away_team = pred.get('away_team', '')
-            prediction_text = pred.get('prediction', '')
-            market_option = get_market_option(prediction_text, home_team, away_team)
-
-            if date not in accuracy_by_date:
-                accuracy_by_date[date] = {
-                    'total_predictions': 0,
-                    'correct_predictions': 0,
-                    'accuracy_percentage': 0.0,
-                    'formatted_date': format_date_for_display(date),
-                    'confidence_stats': {
-                        'Very High': {'total': 0, 'correct': 0, 'acc': 0.0},
-                        'High': {'total': 0, 'correct': 0, 'acc': 0.0},
-                        'Low': {'total': 0, 'correct': 0, 'acc': 0.0}
-                    },
-                    'market_stats': {} 
-                }
-
-            # Update Daily Totals
-            accuracy_by_date[date]['total_predictions'] += 1
-            if outcome == 'True':
-                accuracy_by_date[date]['correct_predictions'] += 1
-
-            # Update Confidence Stats
-            accuracy_by_date[date]['confidence_stats'][confidence]['total'] += 1
-            if outcome == 'True':
-                accuracy_by_date[date]['confidence_stats'][confidence]['correct'] += 1
-            
-            # Update Market Stats
-            if market_option not in accuracy_by_date[date]['market_stats']:
-                accuracy_by_date[date]['market_stats'][market_option] = {'total': 0, 'correct': 0, 'acc': 0.0}
-            
-            accuracy_by_date[date]['market_stats'][market_option]['total'] += 1
-            if outcome == 'True':
-                accuracy_by_date[date]['market_stats'][market_option]['correct'] += 1
-
-    # Calculate percentages
-    for date, data in accuracy_by_date.items():
-        if data['total_predictions'] > 0:
-            data['accuracy_percentage'] = round(
-                (data['correct_predictions'] / data['total_predictions']) * 100, 1
-            )
-        
-        # Calculate Confidence Percentages
-        for conf, c_data in data['confidence_stats'].items():
-             if c_data['total'] > 0:
-                 c_data['acc'] = round((c_data['correct'] / c_data['total']) * 100, 1)
-
-        # Calculate Market Percentages
-        for mkt, m_data in data['market_stats'].items():
-            if m_data['total'] > 0:
-                m_data['acc'] = round((m_data['correct'] / m_data['total']) * 100, 1)
-
-    return accuracy_by_date
+    return PredictionAnalytics(predictions).accuracy_by_date()
 
 
 def calculate_overall_accuracy(predictions: List[Dict]) -> Dict:
@@ -180,41 +42,7 @@ def calculate_overall_accuracy(predictions: List[Dict]) -> Dict:
     Returns:
         Dict with overall accuracy metrics
     """
-    from typing import Optional
-    from datetime import date
-
-    total_reviewed = 0
-    total_correct = 0
-    date_range: Dict[str, Optional[date]] = {'earliest': None, 'latest': None}
-
-    for pred in predictions:
-        outcome = pred.get('outcome_correct')
-        if outcome in ['True', 'False']:
-            total_reviewed += 1
-            if outcome == 'True':
-                total_correct += 1
-
-            date_str = pred.get('date')
-            if date_str:
-                try:
-                    date_obj = datetime.strptime(date_str, "%d.%m.%Y").date()
-                    if date_range['earliest'] is None or date_obj < date_range['earliest']:
-                        date_range['earliest'] = date_obj
-                    if date_range['latest'] is None or date_obj > date_range['latest']:
-                        date_range['latest'] = date_obj
-                except ValueError:
-                    continue
-
-    overall_accuracy = 0.0
-    if total_reviewed > 0:
-        overall_accuracy = round((total_correct / total_reviewed) * 100, 1)
-
-    return {
-        'total_reviewed_predictions': total_reviewed,
-        'correct_predictions': total_correct,
-        'overall_accuracy_percentage': overall_accuracy,
-        'date_range': date_range
-    }
+    return PredictionAnalytics(predictions).overall_accuracy()
 
 
 def calculate_accuracy_by_confidence(predictions: List[Dict]) -> Dict[str, Dict]:
@@ -233,47 +61,14 @@ def calculate_accuracy_by_confidence(predictions: List[Dict]) -> Dict[str, Dict]
             "Low": {...}
         }
     """
-    # Define confidence level mappings
-    confidence_mapping = {
-        'Very High': ['Very High', 'very high', 'VERY HIGH'],
-        'High': ['High', 'high', 'HIGH'],
-        'Low': ['Low', 'low', 'LOW', 'Medium', 'medium', 'MEDIUM']  # Include Medium as Low for simplicity
-    }
-
-    accuracy_by_confidence = {}
-
-    # Initialize confidence levels
-    for conf_level in confidence_mapping.keys():
-        accuracy_by_confidence[conf_level] = {
-            'total_predictions': 0,
-            'correct_predictions': 0,
-            'accuracy_percentage': 0.0
-        }
-
-    for pred in predictions:
-        outcome = pred.get('outcome_correct')
-        confidence = pred.get('confidence', '').strip()
-
-        if outcome in ['True', 'False']:
-            # Determine confidence level
-            conf_level = 'Low'  # Default to Low
-            for level, aliases in confidence_mapping.items():
-                if confidence in aliases:
-                    conf_level = level
-                    break
+    return PredictionAnalytics(predictions).accuracy_by_confidence()
 
-            accuracy_by_confidence[conf_level]['total_predictions'] += 1
-            if outcome == 'True':
-                accuracy_by_confidence[conf_level]['correct_predictions'] += 1
 
-    # Calculate percentages for each confidence level
-    for conf_level, data in accuracy_by_confidence.items():
-        if data['total_predictions'] > 0:
-            data['accuracy_percentage'] = round(
-                (data['correct_predictions'] / data['total_predictions']) * 100, 1
-            )
-
-    return accuracy_by_confidence
+def _parse_date(date_str: str):
+    try:
+        return datetime.strptime(date_str, "%d.%m.%Y")
+    except ValueError:
+        return None
 
 
 def format_date_for_display(date_str: str) -> str:
@@ -322,38 +117,27 @@ def format_date_range(date_range: Dict) -> str:
 def print_accuracy_report():
     """
     Print the prediction accuracy report to console.
-    This function reads predictions from CSV and generates the accuracy report.
+    This function reads predictions through the analytics engine and generates the accuracy report.
     """
     if not os.path.exists(PREDICTIONS_CSV):
         print("  [Accuracy] No predictions CSV found.")
         return
 
-    # Read predictions
-    predictions = []
     try:
-        with open(PREDICTIONS_CSV, 'r', newline='', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            predictions = list(reader)
+        analytics = get_prediction_analytics()
     except Exception as e:
         print(f"  [Accuracy Error] Failed to read predictions: {e}")
         return
 
-    # Filter for reviewed predictions only
-    reviewed_predictions = [
-        pred for pred in predictions
-        if pred.get('outcome_correct') in ['True', 'False']
-    ]
-
-    if not reviewed_predictions:
+    if analytics.reviewed.empty:
         print("  [Accuracy] No reviewed predictions found.")
         return
 
     # Calculate accuracy by date
-    accuracy_by_date = calculate_accuracy_by_date(reviewed_predictions)
+    accuracy_by_date = analytics.accuracy_by_date()
 
-    # Sort dates chronologically
-    sorted_dates = sorted(accuracy_by_date.keys(),
-                         key=lambda d: datetime.strptime(d, "%d.%m.%Y") if d != 'Unknown' else datetime.max.date())
+    # Sort dates chronologically (unparseable dates are not listed)
+    sorted_dates = sorted((d for d in accuracy_by_date if _parse_date(d)), key=_parse_date)
 
     # Print individual date accuracies
     print("\n  [Prediction Accuracy Report]")
@@ -392,7 +176,7 @@ def print_accuracy_report():
             print("  " + "-"*30) # Separator for readability
 
     # Calculate accuracy by confidence level
-    accuracy_by_confidence = calculate_accuracy_by_confidence(reviewed_predictions)
+    accuracy_by_confidence = analytics.accuracy_by_confidence()
 
     # Print confidence-based accuracy
     print("  " + "="*50)
@@ -406,7 +190,7 @@ def print_accuracy_report():
                 print(f"  {conf_level} Confidence: {data['accuracy_percentage']}% Accurate - {data['total_predictions']} Reviewed Predictions")
 
     # Calculate and print overall accuracy
-    overall_stats = calculate_overall_accuracy(reviewed_predictions)
+    overall_stats = analytics.overall_accuracy()
     date_range_str = format_date_range(overall_stats['date_range'])
 
     print("  " + "="*50)
@@ -0,0 +1,312 @@
+# prediction_analytics.py: Vectorized accuracy and reliability analytics over predictions.csv.
+# Refactored for Clean Architecture (v2.8)
+# This script loads predictions once into a typed DataFrame and serves grouped accuracy views.
+
+"""
+Prediction Analytics Module
+Single home for accuracy, reliability and return metrics over predictions.csv.
+
+The predictions table is loaded once (through table_store, so pending writes are
+included) into a typed DataFrame: parsed match dates and update times, a
+normalized confidence level, the generic market option as a categorical column,
+reviewed / correct flags and numeric odds. Every aggregation is a pandas groupby
+over that frame; results are cached until the table's version changes.
+"""
+
+import re
+import threading
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .db_helpers import PREDICTIONS_CSV, AUDIT_LOG_CSV
+from .table_store import get_table
+
+CONFIDENCE_LEVELS = ['Very High', 'High', 'Low']   # Report buckets (Medium is reported as Low)
+DEFAULT_ODDS = 2.0                                 # Flat-stake return when a prediction has no usable odds
+REPORT_TZ = 'Africa/Lagos'
+
+_COLUMNS = ['fixture_id', 'date', 'match_time', 'region_league', 'home_team', 'away_team',
+            'prediction', 'confidence', 'reason', 'outcome_correct', 'status', 'odds', 'last_updated']
+_TZ_SUFFIX = re.compile(r'(?:Z|[+-]\d{2}:?\d{2})$')
+
+
+@lru_cache(maxsize=65536)
+def get_market_option(prediction: str, home_team: str, away_team: str) -> str:
+    """
+    Normalize prediction string into a generic market option.
+    """
+    pred_lower = prediction.lower()
+    home_lower = home_team.lower()
+    away_lower = away_team.lower()
+
+    if pred_lower == 'home win' or pred_lower == home_lower: # Direct team name often means win
+        return "Home Win"
+    if pred_lower == f"{home_lower} to win":
+        return "Home Win"
+
+    if pred_lower == 'away win' or pred_lower == away_lower:
+        return "Away Win"
+    if pred_lower == f"{away_lower} to win":
+        return "Away Win"
+
+    if 'or draw' in pred_lower:
+        if home_lower in pred_lower:
+            return "Home or Draw"
+        if away_lower in pred_lower:
+            return "Away or Draw"
+
+    if 'or' in pred_lower and home_lower in pred_lower and away_lower in pred_lower:
+         return "Home or Away"
+
+    if 'btts' in pred_lower or 'both teams to score' in pred_lower:
+        if 'no' in pred_lower:
+            return "BTTS No"
+        return "BTTS Yes"
+
+    if 'over' in pred_lower and '2.5' in pred_lower:
+        return "Over 2.5"
+    if 'under' in pred_lower and '2.5' in pred_lower:
+        return "Under 2.5"
+
+    if '(dnb)' in pred_lower:
+        return "Draw No Bet"
+
+    if '2-3 goals' in pred_lower:
+        return "2-3 Goals"
+
+    # Match Over/Under (Starts with Over/Under)
+    # e.g. "Over 2.5", "Under 3.5 Goals"
+    if re.match(r'^(over|under)\s+\d+(\.\d+)?', pred_lower):
+        match = re.search(r'(over|under)\s+(\d+(\.\d+)?)', pred_lower)
+        if match:
+            type_ = match.group(1).title()
+            val = match.group(2)
+            return f"{type_} {val}"
+
+    # Team Over/Under (Ends with or contains " Over/Under value" but didn't start with it)
+    # e.g. "Atletico-Mg U20 Over 0.5", "Team Over 1.5"
+    if re.search(r'\s+(over|under)\s+\d+(\.\d+)?', pred_lower):
+        match = re.search(r'\s+(over|under)\s+(\d+(\.\d+)?)', pred_lower)
+        if match:
+            type_ = match.group(1).title()
+            val = match.group(2)
+            return f"Team {type_} {val}"
+
+    # Return the specific prediction name if no category matched
+    return prediction.title()
+
+
+def _confidence_level(raw: pd.Series) -> pd.Series:
+    codes, uniques = pd.factorize(raw)
+    norm = [u.strip().lower().replace('_', ' ') for u in uniques]
+    levels = np.array(['Very High' if n == 'very high' else 'High' if n == 'high' else 'Low' for n in norm] + ['Low'])
+    return pd.Series(pd.Categorical(levels[codes], categories=CONFIDENCE_LEVELS), index=raw.index)
+
+
+def _parse_updated(raw: pd.Series) -> pd.Series:
+    """ISO timestamps -> tz-aware (REPORT_TZ); naive values are taken as REPORT_TZ local time."""
+    out = pd.Series(pd.NaT, index=raw.index, dtype=f'datetime64[ns, {REPORT_TZ}]')
+    values = raw.tolist()
+    aware = np.array([bool(_TZ_SUFFIX.search(v)) for v in values], dtype=bool)
+    if aware.any():
+        out[aware] = pd.to_datetime(raw[aware], errors='coerce', utc=True, format='ISO8601').dt.tz_convert(REPORT_TZ)
+    naive = ~aware & np.array([v != '' for v in values], dtype=bool)
+    if naive.any():
+        out[naive] = pd.to_datetime(raw[naive], errors='coerce', format='ISO8601').dt.tz_localize(
+            REPORT_TZ, ambiguous='NaT', nonexistent='NaT')
+    return out
+
+
+def _accuracy(total: Any, correct: Any) -> Any:
+    return np.round(np.where(np.asarray(total) > 0, np.asarray(correct) / np.maximum(total, 1) * 100, 0.0), 1)
+
+
+class PredictionAnalytics:
+    """Typed, indexed view of a predictions table with cached grouped aggregations."""
+
+    def __init__(self, rows: Iterable[Dict[str, Any]]):
+        df = pd.DataFrame.from_records(list(rows), columns=_COLUMNS).fillna('').astype(str)
+
+        df['date_dt'] = pd.to_datetime(df['date'], format='%d.%m.%Y', errors='coerce')
+        df['updated_dt'] = _parse_updated(df['last_updated'])
+        df['confidence_level'] = _confidence_level(df['confidence'])
+        df['reviewed'] = df['outcome_correct'].isin(['True', 'False'])
+        df['correct'] = df['outcome_correct'] == 'True'
+        df['odds_value'] = pd.to_numeric(df['odds'], errors='coerce')
+
+        # Market option (memoised per distinct prediction / home / away)
+        df['market'] = pd.Categorical([get_market_option(p, h, a) for p, h, a in zip(
+            df['prediction'].tolist(), df['home_team'].tolist(), df['away_team'].tolist())])
+
+        self.frame = df
+        self.reviewed = df[df['reviewed']]
+        self._cache: Dict[Tuple, Any] = {}
+
+    def _cached(self, key: Tuple, build):
+        if key not in self._cache:
+            self._cache[key] = build()
+        return self._cache[key]
+
+    # --- Grouped Aggregations ---
+
+    def accuracy_by(self, *keys: str) -> pd.DataFrame:
+        """total / correct / accuracy (%) of reviewed predictions per group (e.g. 'date', 'region_league', 'market')."""
+        def build():
+            grouped = self.reviewed.groupby(list(keys), observed=True, sort=True)['correct']
+            out = grouped.agg(total='size', correct='sum')
+            out['accuracy'] = _accuracy(out['total'], out['correct'])
+            return out
+        return self._cached(('accuracy_by',) + keys, build)
+
+    def rolling_accuracy(self, window: str = '7D', by: Optional[str] = None) -> pd.DataFrame:
+        """Trailing-window accuracy per match date (optionally per group), over reviewed predictions."""
+        def build():
+            dated = self.reviewed[self.reviewed['date_dt'].notna()]
+            keys = [by, 'date_dt'] if by else ['date_dt']
+            daily = dated.groupby(keys, observed=True, sort=True)['correct'].agg(total='size', correct='sum')
+            if by:
+                rolled = daily.groupby(level=0, observed=True, group_keys=False).apply(
+                    lambda g: g.droplevel(0).rolling(window).sum().set_axis(g.index))
+            else:
+                rolled = daily.rolling(window).sum()
+            rolled['accuracy'] = _accuracy(rolled['total'], rolled['correct'])
+            return rolled
+        return self._cached(('rolling', window, by), build)
+
+    # --- Report Views ---
+
+    def accuracy_by_date(self) -> Dict[str, Dict]:
+        """calculate_accuracy_by_date() structure: per date totals, confidence_stats and market_stats."""
+        def build():
+            from .prediction_accuracy import format_date_for_display
+            result = {}
+            for date, row in self.accuracy_by('date').iterrows():
+                result[date] = {
+                    'total_predictions': int(row['total']),
+                    'correct_predictions': int(row['correct']),
+                    'accuracy_percentage': float(row['accuracy']),
+                    'formatted_date': format_date_for_display(date),
+                    'confidence_stats': {level: {'total': 0, 'correct': 0, 'acc': 0.0} for level in CONFIDENCE_LEVELS},
+                    'market_stats': {},
+                }
+            for (date, level), row in self.accuracy_by('date', 'confidence_level').iterrows():
+                result[date]['confidence_stats'][level] = {'total': int(row['total']), 'correct': int(row['correct']), 'acc': float(row['accuracy'])}
+            for (date, market), row in self.accuracy_by('date', 'market').iterrows():
+                result[date]['market_stats'][market] = {'total': int(row['total']), 'correct': int(row['correct']), 'acc': float(row['accuracy'])}
+            return result
+        return self._cached(('accuracy_by_date',), build)
+
+    def overall_accuracy(self) -> Dict:
+        """calculate_overall_accuracy() structure."""
+        def build():
+            dates = self.reviewed['date_dt'].dropna()
+            total = len(self.reviewed)
+            correct = int(self.reviewed['correct'].sum())
+            return {
+                'total_reviewed_predictions': total,
+                'correct_predictions': correct,
+                'overall_accuracy_percentage': float(_accuracy(total, correct)),
+                'date_range': {'earliest': dates.min().date() if len(dates) else None,
+                               'latest': dates.max().date() if len(dates) else None},
+            }
+        return self._cached(('overall',), build)
+
+    def accuracy_by_confidence(self) -> Dict[str, Dict]:
+        """calculate_accuracy_by_confidence() structure (Very High / High / Low)."""
+        def build():
+            table = self.accuracy_by('confidence_level')
+            out = {}
+            for level in CONFIDENCE_LEVELS:
+                row = table.loc[level] if level in table.index else None
+                out[level] = {
+                    'total_predictions': int(row['total']) if row is not None else 0,
+                    'correct_predictions': int(row['correct']) if row is not None else 0,
+                    'accuracy_percentage': float(row['accuracy']) if row is not None else 0.0,
+                }
+            return out
+        return self._cached(('by_confidence',), build)
+
+    def market_reliability(self, now: Optional[datetime] = None, recent_days: int = 7,
+                           min_total: int = 3, min_recent: int = 2) -> Dict[str, Dict[str, float]]:
+        """
+        Per-market overall and recent (last recent_days by match date) hit rates for
+        recommendations; markets with too few results fall back to 0.5 / overall.
+        """
+        # Match dates are midnight, so "date >= now - recent_days" starts at the next whole day
+        cutoff = pd.Timestamp((now or datetime.now()) - timedelta(days=recent_days)).ceil('D')
+
+        def build():
+            dated = self.reviewed[self.reviewed['date_dt'].notna()]
+            recent = dated['date_dt'] >= cutoff
+            stats = pd.DataFrame({
+                'market': dated['market'], 'correct': dated['correct'],
+                'recent': recent, 'recent_correct': recent & dated['correct'],
+            }).groupby('market', observed=True).agg(
+                total=('correct', 'size'), correct=('correct', 'sum'),
+                recent_total=('recent', 'sum'), recent_correct=('recent_correct', 'sum'))
+            overall = np.where(stats['total'] >= min_total, stats['correct'] / stats['total'], 0.5)
+            recent_rate = np.where(stats['recent_total'] >= min_recent,
+                                   stats['recent_correct'] / stats['recent_total'].clip(lower=1), overall)
+            return {m: {'overall': float(o), 'recent': float(r), 'trend': float(r - o)}
+                    for m, o, r in zip(stats.index, overall, recent_rate)}
+        return self._cached(('reliability', cutoff, min_total, min_recent), build)
+
+    def window_report(self, since: datetime, statuses: Tuple[str, ...] = ('reviewed', 'finished'),
+                      default_odds: float = DEFAULT_ODDS) -> Dict[str, float]:
+        """
+        Volume, win rate and 1-unit flat-stake return of predictions updated since 'since'
+        (tz-aware) with one of the given statuses. Missing / non-positive odds count as
+        default_odds; unparseable odds leave the return untouched.
+        """
+        df = self.frame
+        window = df[(df['updated_dt'] >= since) & df['status'].isin(statuses)]
+        volume = len(window)
+        if not volume:
+            return {'volume': 0, 'correct': 0, 'win_rate': 0.0, 'return_pct': 0.0}
+        odds = window['odds_value'].where(window['odds_value'] > 0, default_odds)
+        returns = np.where(window['odds_value'].isna(), 0.0, np.where(window['correct'], odds - 1, -1.0))
+        correct = int(window['correct'].sum())
+        return {
+            'volume': volume,
+            'correct': correct,
+            'win_rate': correct / volume * 100,
+            'return_pct': float(returns.sum()) / volume * 100,
+        }
+
+    def count_for_date(self, day: datetime) -> int:
+        """Predictions whose match date is the given day."""
+        return int((self.frame['date_dt'] == pd.Timestamp(day.date())).sum())
+
+
+# --- Process-Wide Instance ---
+
+_analytics: Optional[Tuple[Tuple[int, int], PredictionAnalytics]] = None
+_analytics_lock = threading.Lock()
+
+
+def get_prediction_analytics() -> PredictionAnalytics:
+    """Analytics over the current predictions table, rebuilt only when the table changes."""
+    global _analytics
+    table = get_table(PREDICTIONS_CSV, key='fixture_id')
+    with _analytics_lock:
+        sig = (id(table), table.version)
+        if _analytics is None or _analytics[0] != sig:
+            _analytics = (sig, PredictionAnalytics(table.rows()))
+        return _analytics[1]
+
+
+def bet_success_rate(day: Optional[datetime] = None) -> Optional[float]:
+    """Share (%) of BET_PLACEMENT audit events on the given day (default today) that succeeded."""
+    day_str = (day or datetime.now()).strftime("%Y-%m-%d")
+    rows = get_table(AUDIT_LOG_CSV, key='id').find('event_type', 'BET_PLACEMENT')
+    if not rows:
+        return None
+    events = pd.DataFrame.from_records(rows, columns=['timestamp', 'status']).fillna('').astype(str)
+    today = events[events['timestamp'].str.contains(day_str, regex=False)]
+    if today.empty:
+        return None  # No bets placed today — nothing to report
+    return float((today['status'].str.lower() == 'success').mean() * 100)
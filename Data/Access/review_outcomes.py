@@ -16,12 +16,13 @@ This module provides a unified interface to the review system components:
 # Import all modular components
 from .health_monitor import HealthMonitor
 from .data_validator import DataValidator
-import pandas as pd
 from datetime import datetime, timedelta
 import pytz
 import os
 import uuid
-from .db_helpers import PREDICTIONS_CSV, ACCURACY_REPORTS_CSV, log_audit_event, upsert_entry, files_and_headers
+from .db_helpers import PREDICTIONS_CSV, ACCURACY_REPORTS_CSV, log_audit_event
+from .table_store import get_table
+from .prediction_analytics import get_prediction_analytics
 from .sync_manager import SyncManager
 
 def evaluate_prediction(predicted_type: str, home_score: str, away_score: str) -> int:
@@ -72,53 +73,23 @@ async def run_accuracy_generation():
 
     print("\n   [ACCURACY] Generating performance metrics (Last 24h)...")
     try:
-        df = pd.read_csv(PREDICTIONS_CSV, dtype=str).fillna('')
-        if df.empty:
+        analytics = get_prediction_analytics()
+        if analytics.frame.empty:
             print("   [ACCURACY] No predictions found.")
             return
 
-        # 1. Date Filter (Last 24h)
+        # 1. Date Filter (Last 24h) + 2. Aggregates (flat 1-unit stake)
         lagos_tz = pytz.timezone('Africa/Lagos')
         now_lagos = datetime.now(lagos_tz)
         yesterday_lagos = now_lagos - timedelta(days=1)
 
-        def parse_updated(ts):
-            try:
-                # pandas to_datetime is flexible with ISO formats
-                dt = pd.to_datetime(ts)
-                if dt.tzinfo is None:
-                    return lagos_tz.localize(dt)
-                return dt.astimezone(lagos_tz)
-            except:
-                return pd.NaT
-
-        df['updated_dt'] = df['last_updated'].apply(parse_updated)
-        df_24h = df[(df['updated_dt'] >= yesterday_lagos) & (df['status'].isin(['reviewed', 'finished']))].copy()
-
-        if df_24h.empty:
+        report = analytics.window_report(yesterday_lagos, statuses=('reviewed', 'finished'))
+        volume = report['volume']
+        if not volume:
             print("   [ACCURACY] No predictions reviewed in the last 24h.")
             return
-
-        # 2. Aggregates
-        volume = len(df_24h)
-        correct_count = (df_24h['outcome_correct'] == '1').sum()
-        win_rate = (correct_count / volume) * 100 if volume > 0 else 0
-
-        # Return Calculation (1-unit flat stake)
-        total_return = 0
-        for _, row in df_24h.iterrows():
-            try:
-                odds = float(row.get('odds', 0))
-                if odds <= 0: odds = 2.0 # Default conservative odds
-                
-                if row['outcome_correct'] == '1':
-                    total_return += (odds - 1)
-                else:
-                    total_return -= 1
-            except:
-                pass
-        
-        return_pct = (total_return / volume) * 100 if volume > 0 else 0
+        win_rate = report['win_rate']
+        return_pct = report['return_pct']
 
         # 3. Persistence (Local CSV)
         report_id = str(uuid.uuid4())[:8]
@@ -133,7 +104,7 @@ async def run_accuracy_generation():
         }
         
         # Save to accuracy_reports.csv
-        upsert_entry(ACCURACY_REPORTS_CSV, report_row, files_and_headers[ACCURACY_REPORTS_CSV], 'report_id')
+        get_table(ACCURACY_REPORTS_CSV, key='report_id').upsert(report_row)
 
         # Log to audit_log.csv
         log_audit_event(
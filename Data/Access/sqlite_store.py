@@ -0,0 +1,373 @@
+# sqlite_store.py: SQLite storage backend for the Data/Store tables.
+# Refactored for Clean Architecture (v2.8)
+# This script mirrors the TableStore API on an indexed, WAL-mode SQLite database.
+
+"""
+SQLite Store Module
+Optional backend selected with LEO_STORE_BACKEND=sqlite.
+Responsible for keyed, indexed storage of every table in db_helpers.files_and_headers.
+
+Each CSV table maps to one SQLite table (all TEXT columns, '' defaults) with the
+TABLE_CONFIG key as primary key and secondary indexes on the common filter
+columns. The CSV files stay the interchange format for SyncManager and the
+Flutter app: tables are imported from their CSV on first use or whenever the
+CSV is rewritten by another component, and exported back on flush.
+"""
+
+import csv
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from .csv_operations import _atomic_write_csv
+from .table_store import _cell
+
+# --- Backend Configuration ---
+_current_dir = os.path.dirname(os.path.abspath(__file__))
+SQLITE_DB_PATH = os.getenv('LEO_SQLITE_PATH', os.path.join(_current_dir, "..", "Store", "leobook.db"))
+SQLITE_BUSY_TIMEOUT = float(os.getenv('LEO_SQLITE_BUSY_TIMEOUT', 30.0))
+INDEXED_COLUMNS = ['date', 'status', 'region_league', 'home_team_id', 'away_team_id']
+META_TABLE = "_csv_mirror"
+
+
+def _quote(identifier: str) -> str:
+    """Quotes a column/table identifier (headers contain dots, e.g. 'over_2.5')."""
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+class SqliteTable:
+    """
+    SQLite-backed equivalent of TableStore for one CSV table.
+    Connections are per-thread; WAL lets concurrent workers and processes write safely.
+    """
+
+    _local = threading.local()
+    _schema_lock = threading.Lock()
+
+    def __init__(self, filepath: str, fieldnames: List[str], key: str, db_path: str = SQLITE_DB_PATH):
+        self.filepath = os.path.abspath(filepath)
+        self.db_path = os.path.abspath(db_path)
+        self.name = os.path.splitext(os.path.basename(self.filepath))[0]
+        self.key = key
+        self.fieldnames = list(fieldnames)
+        if key not in self.fieldnames:
+            self.fieldnames.insert(0, key)
+        self._dirty = False
+        self._pending: Dict[str, Dict[str, str]] = {}  # Field changes not yet exported to the CSV
+        self._ready = False
+        self._version = 0
+        self.last_flush = time.monotonic()
+        # Sync change tracking (see TableStore.take_changes)
+        self._sync_keys: Set[str] = set()
+        self._sync_full = False
+        self._sync_base_sig: Optional[Tuple[int, int]] = None
+
+    # --- Connection & Schema ---
+
+    def _conn(self) -> sqlite3.Connection:
+        conns = getattr(self._local, 'conns', None)
+        if conns is None:
+            conns = self._local.conns = {}
+        conn = conns.get(self.db_path)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=SQLITE_BUSY_TIMEOUT, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {META_TABLE} (name TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER)")
+            conns[self.db_path] = conn
+        return conn
+
+    def _existing_columns(self, conn: sqlite3.Connection) -> List[str]:
+        return [r['name'] for r in conn.execute(f"PRAGMA table_info({_quote(self.name)})")]
+
+    def _ensure_columns(self, conn: sqlite3.Connection, columns: List[str]):
+        existing = self._existing_columns(conn)
+        for col in columns:
+            if col and col not in existing:
+                conn.execute(f"ALTER TABLE {_quote(self.name)} ADD COLUMN {_quote(col)} TEXT NOT NULL DEFAULT ''")
+                existing.append(col)
+            if col and col not in self.fieldnames:
+                self.fieldnames.append(col)
+
+    def _ensure_schema(self, conn: sqlite3.Connection):
+        if not self._ready:
+            with self._schema_lock:
+                cols = ", ".join(f"{_quote(c)} TEXT NOT NULL DEFAULT ''" for c in self.fieldnames)
+                conn.execute(f"CREATE TABLE IF NOT EXISTS {_quote(self.name)} ({cols}, PRIMARY KEY ({_quote(self.key)}))")
+                self._ensure_columns(conn, self.fieldnames + self._existing_columns(conn))
+                for col in INDEXED_COLUMNS:
+                    if col in self.fieldnames and col != self.key:
+                        conn.execute(
+                            f"CREATE INDEX IF NOT EXISTS {_quote(f'idx_{self.name}_{col}')} "
+                            f"ON {_quote(self.name)} ({_quote(col)})"
+                        )
+                self._sync_base_sig = self._csv_sig()
+                self._ready = True
+
+    def _ensure_ready(self) -> sqlite3.Connection:
+        conn = self._conn()
+        self._ensure_schema(conn)
+        if self._csv_changed(conn):
+            self.import_csv()
+            self._sync_full = True
+        return conn
+
+    # --- CSV Mirror ---
+
+    def _csv_sig(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.filepath)
+            return st.st_mtime_ns, st.st_size
+        except FileNotFoundError:
+            return None
+
+    def _csv_changed(self, conn: sqlite3.Connection) -> bool:
+        """True when the CSV was rewritten since the last import/export (e.g. by a sync pull)."""
+        sig = self._csv_sig()
+        if sig is None:
+            return False
+        row = conn.execute(f"SELECT mtime_ns, size FROM {META_TABLE} WHERE name = ?", (self.name,)).fetchone()
+        return row is None or (row['mtime_ns'], row['size']) != sig
+
+    def _record_csv_sig(self, conn: sqlite3.Connection):
+        sig = self._csv_sig()
+        if sig is not None:
+            conn.execute(
+                f"INSERT INTO {META_TABLE} (name, mtime_ns, size) VALUES (?, ?, ?) "
+                f"ON CONFLICT(name) DO UPDATE SET mtime_ns = excluded.mtime_ns, size = excluded.size",
+                (self.name, sig[0], sig[1])
+            )
+
+    def import_csv(self) -> int:
+        """
+        Upserts every keyed row of the CSV into the table. Returns the number of rows imported.
+        Field changes made here since the last export win over the CSV (as TableStore's pending changes do).
+        """
+        if not os.path.exists(self.filepath) or os.path.getsize(self.filepath) == 0:
+            return 0
+        conn = self._conn()
+        self._ensure_schema(conn)
+        with open(self.filepath, 'r', newline='', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            self._ensure_columns(conn, [c for c in (reader.fieldnames or []) if c])
+            count = 0
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for row in reader:
+                    cleaned = {k: _cell(v) for k, v in row.items() if k}
+                    if cleaned.get(self.key):
+                        cleaned.update(self._pending.get(cleaned[self.key], {}))
+                        self._upsert_sql(conn, cleaned)
+                        count += 1
+                self._record_csv_sig(conn)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return count
+
+    def export_csv(self, filepath: Optional[str] = None) -> int:
+        """Writes the table to its CSV layout (insertion order). Returns the number of rows written."""
+        conn = self._ensure_ready()
+        rows = [dict(r) for r in conn.execute(f"SELECT * FROM {_quote(self.name)} ORDER BY rowid")]
+        target = filepath or self.filepath
+        _atomic_write_csv(target, rows, self.fieldnames)
+        if target == self.filepath:
+            self._record_csv_sig(conn)
+            self._pending = {}
+        return len(rows)
+
+    # --- Internal Writes ---
+
+    def _upsert_sql(self, conn: sqlite3.Connection, changes: Dict[str, str]):
+        cols = list(changes.keys())
+        placeholders = ", ".join("?" for _ in cols)
+        updates = ", ".join(f"{_quote(c)} = excluded.{_quote(c)}" for c in cols if c != self.key)
+        sql = f"INSERT INTO {_quote(self.name)} ({', '.join(_quote(c) for c in cols)}) VALUES ({placeholders})"
+        sql += f" ON CONFLICT({_quote(self.key)}) DO " + (f"UPDATE SET {updates}" if updates else "NOTHING")
+        conn.execute(sql, [changes[c] for c in cols])
+        self._version += 1
+
+    def _update_sql(self, conn: sqlite3.Connection, key_value: str, changes: Dict[str, Any]) -> bool:
+        """Updates an existing row without the freshness check (callers run _ensure_ready first)."""
+        cleaned = {k: v for k, v in self._clean(changes).items() if k != self.key}
+        if not cleaned:
+            return conn.execute(
+                f"SELECT 1 FROM {_quote(self.name)} WHERE {_quote(self.key)} = ?", (key_value,)
+            ).fetchone() is not None
+        assignments = ", ".join(f"{_quote(c)} = ?" for c in cleaned)
+        cur = conn.execute(
+            f"UPDATE {_quote(self.name)} SET {assignments} WHERE {_quote(self.key)} = ?",
+            list(cleaned.values()) + [key_value]
+        )
+        if cur.rowcount:
+            self._mark_dirty(key_value, cleaned)
+            self._version += 1
+        return cur.rowcount > 0
+
+    def _mark_dirty(self, key_value: str, changes: Dict[str, str], track: bool = True):
+        self._dirty = True
+        self._pending.setdefault(key_value, {}).update(changes)
+        if track:
+            self._sync_keys.add(key_value)
+
+    def _clean(self, data_row: Dict[str, Any]) -> Dict[str, str]:
+        return {k: _cell(v) for k, v in data_row.items() if k in self.fieldnames}
+
+    # --- Public API (mirrors TableStore) ---
+
+    def upsert(self, data_row: Dict[str, Any], track: bool = True) -> bool:
+        """
+        Updates the row sharing data_row's key, or inserts it. Returns False if the key is missing.
+        track=False is for rows pulled from Supabase: they are stored but not queued for push.
+        """
+        key_value = _cell(data_row.get(self.key))
+        if not key_value:
+            print(f"    [DB UPSERT Warning] Skipping entry due to missing unique key '{self.key}'.")
+            return False
+        conn = self._ensure_ready()
+        changes = self._clean(data_row)
+        changes[self.key] = key_value
+        self._upsert_sql(conn, changes)
+        self._mark_dirty(key_value, changes, track)
+        return True
+
+    def upsert_many(self, data_rows: List[Dict[str, Any]], track: bool = True) -> List[str]:
+        """upsert() for several rows in one transaction. Rows without a key are skipped. Returns the upserted keys."""
+        conn = self._ensure_ready()
+        applied = []
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for data_row in data_rows:
+                key_value = _cell(data_row.get(self.key))
+                if not key_value:
+                    print(f"    [DB UPSERT Warning] Skipping entry due to missing unique key '{self.key}'.")
+                    continue
+                changes = self._clean(data_row)
+                changes[self.key] = key_value
+                self._upsert_sql(conn, changes)
+                applied.append((key_value, changes))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        for key_value, changes in applied:
+            self._mark_dirty(key_value, changes, track)
+        return [key_value for key_value, _ in applied]
+
+    def update(self, key_value: str, changes: Dict[str, Any]) -> bool:
+        """Applies field changes to an existing row only. Returns True if the row exists."""
+        conn = self._ensure_ready()
+        return self._update_sql(conn, key_value, changes)
+
+    def update_many(self, changes_by_key: Dict[str, Dict[str, Any]]) -> int:
+        """Applies field changes to several existing rows in one transaction. Returns the number of rows found."""
+        conn = self._ensure_ready()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            found = sum(1 for key_value, changes in changes_by_key.items() if self._update_sql(conn, key_value, changes))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return found
+
+    def update_where(self, predicate: Callable[[Dict[str, str]], bool], changes: Dict[str, Any]) -> int:
+        """Applies field changes to every row matching predicate. Returns the number of rows touched."""
+        keys = [r[self.key] for r in self.rows() if predicate(r)]
+        conn = self._ensure_ready()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            touched = sum(1 for k in keys if self._update_sql(conn, k, changes))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return touched
+
+    def get(self, key_value: str) -> Optional[Dict[str, str]]:
+        """Returns the row for key_value, or None."""
+        conn = self._ensure_ready()
+        row = conn.execute(f"SELECT * FROM {_quote(self.name)} WHERE {_quote(self.key)} = ?", (key_value,)).fetchone()
+        return dict(row) if row else None
+
+    def find(self, field: str, value: str) -> List[Dict[str, str]]:
+        """Returns all rows where field == value in insertion order (indexed for INDEXED_COLUMNS)."""
+        conn = self._ensure_ready()
+        if field not in self.fieldnames:
+            return [] if value else self.rows()
+        cur = conn.execute(f"SELECT * FROM {_quote(self.name)} WHERE {_quote(field)} = ? ORDER BY rowid", (value,))
+        return [dict(r) for r in cur]
+
+    def rows(self) -> List[Dict[str, str]]:
+        """Returns all rows in insertion order."""
+        conn = self._ensure_ready()
+        return [dict(r) for r in conn.execute(f"SELECT * FROM {_quote(self.name)} ORDER BY rowid")]
+
+    def last(self) -> Optional[Dict[str, str]]:
+        """Returns the most recently inserted row, or None."""
+        conn = self._ensure_ready()
+        row = conn.execute(f"SELECT * FROM {_quote(self.name)} ORDER BY rowid DESC LIMIT 1").fetchone()
+        return dict(row) if row else None
+
+    def __len__(self) -> int:
+        conn = self._ensure_ready()
+        return conn.execute(f"SELECT COUNT(*) FROM {_quote(self.name)}").fetchone()[0]
+
+    @property
+    def version(self) -> int:
+        """Counter bumped by every row change made through this process (see TableStore.version)."""
+        self._ensure_ready()
+        return self._version
+
+    @property
+    def dirty(self) -> bool:
+        return self._dirty
+
+    def take_changes(self, synced_sig: Optional[Tuple[int, int]]) -> Optional[Set[str]]:
+        """Keys written since the last sync, or None when the CSV mirror changed externally."""
+        conn = self._conn()
+        self._ensure_schema(conn)
+        stale = self._csv_changed(conn)
+        full = self._sync_full or stale or self._sync_base_sig != synced_sig
+        keys, self._sync_keys = self._sync_keys, set()
+        if stale:
+            self.import_csv()
+        self._sync_full = False
+        self._sync_base_sig = self._csv_sig()
+        return None if full else keys
+
+    def restore_changes(self, keys: Set[str], synced_sig: Optional[Tuple[int, int]]):
+        """Undoes take_changes after a failed push (see TableStore.restore_changes)."""
+        self._sync_keys.update(keys)
+        self._sync_base_sig = synced_sig
+
+    def mark_synced(self) -> Optional[Tuple[int, int]]:
+        """Adopts the current CSV mirror (e.g. after a sync pull rewrote it) as the sync baseline."""
+        conn = self._conn()
+        self._ensure_schema(conn)
+        if self._csv_changed(conn):
+            self.import_csv()
+        self._sync_full = False
+        self._sync_base_sig = self._csv_sig()
+        return self._sync_base_sig
+
+    def flush(self, compact: bool = True) -> bool:
+        """
+        Exports the table to its CSV mirror. Writes are already durable in SQLite,
+        so the background flusher (compact=False) skips the export.
+        """
+        if not compact or not self._dirty:
+            return False
+        try:
+            self.export_csv()
+        except Exception as e:
+            print(f"    [File Error] Failed to export {self.name} to {self.filepath}: {e}")
+            return False
+        self._dirty = False
+        self.last_flush = time.monotonic()
+        return True
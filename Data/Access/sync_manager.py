@@ -1,16 +1,21 @@
 import csv
+import json
 import logging
 import asyncio
+import os
 import re
+import threading
+import time
 import pandas as pd
 import numpy as np
 from tqdm import tqdm
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Set
+from typing import Callable, Dict, List, Any, Optional, Set
 
 from Data.Access.supabase_client import get_supabase_client
 from Data.Access.db_helpers import DB_DIR, files_and_headers
+from Data.Access.table_store import flush_all_tables, get_table, take_changes, mark_synced, restore_changes
 
 logger = logging.getLogger(__name__)
 
@@ -32,6 +37,111 @@ TABLE_CONFIG = {
     'audit_log': {'csv': 'audit_log.csv', 'table': 'audit_log', 'key': 'id'},
 }
 
+# --- Incremental Sync ---
+SYNC_STATE_FILE = DATA_DIR / "sync_state.json"   # Per-table csv signature + remote high-watermark
+SYNC_INCREMENTAL = os.getenv('LEO_SYNC_INCREMENTAL', '1') == '1'
+REMOTE_POLL_INTERVAL = float(os.getenv('LEO_SYNC_REMOTE_POLL_INTERVAL', 60))  # Min seconds between remote pulls of an unchanged table
+TS_FORMAT = '%Y-%m-%dT%H:%M:%S.%f'
+EPOCH_TS = '1970-01-01T00:00:00.000000'
+NULL_TOKENS = ['', 'N/A', 'None', 'none', 'nan', 'NaN', 'null', 'NULL']
+DATE_COLUMNS = ['date', 'date_updated', 'last_extracted']
+TIMESTAMP_COLUMNS = ['last_updated', 'date_updated', 'last_extracted', 'created_at']
+_NULL_SET = frozenset(NULL_TOKENS)
+_COLUMN_RENAMES = {'over_2.5': 'over_2_5'}                 # CSV -> Postgres column names
+_DATE_FULL = re.compile(r'^(\d{2})\.(\d{2})\.(\d{4})$')
+_DATE_SHORT = re.compile(r'^(\d{2})\.(\d{2})\.(\d{2})$')
+_ISO_DATE_PREFIX = re.compile(r'^\d{4}-\d{2}-\d{2}')
+
+# --- Parallel Sync ---
+# All requests share the singleton supabase client, i.e. one pooled keep-alive HTTP session.
+SYNC_CONCURRENCY = int(os.getenv('LEO_SYNC_CONCURRENCY', 4))            # Tables synced at once
+PAGE_CONCURRENCY = int(os.getenv('LEO_SYNC_PAGE_CONCURRENCY', 4))       # In-flight pages / upsert batches per table
+
+_last_remote_poll: Dict[str, float] = {}
+
+
+def _normalize_ts_series(values: pd.Series) -> pd.Series:
+    """
+    Vectorized latest-wins key: one bulk ISO8601 parse, tz-aware values converted to
+    naive UTC, unparseable/empty values mapped to EPOCH_TS. Output is fixed-width so
+    plain string comparison orders correctly.
+    """
+    parsed = pd.to_datetime(values.astype(str), format='ISO8601', errors='coerce', utc=True)
+    return parsed.dt.tz_localize(None).dt.strftime(TS_FORMAT).fillna(EPOCH_TS)
+
+
+def _prepare_upsert_rows(table_key: str, data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Cleans rows for a Supabase upsert: whitelist filtering, null-token replacement,
+    DD.MM.YYYY/DD.MM.YY -> ISO dates, timestamp validation and key de-duplication
+    (first occurrence wins). Patterns, whitelist and "now" are resolved once per
+    batch, so each cell costs a set lookup plus at most one precompiled match.
+    """
+    conf = TABLE_CONFIG.get(table_key)
+    if not conf or not data:
+        return []
+
+    csv_path = str(DATA_DIR / conf['csv'])
+    whitelist = set(files_and_headers.get(csv_path, []))
+    whitelist.update(['id', 'created_at', 'last_updated', 'over_2.5'])
+    now_iso = datetime.utcnow().isoformat()
+    date_cols = set(DATE_COLUMNS)
+    keys = [k.strip() for k in conf['key'].split(',')]
+
+    seen = set()
+    deduped = []
+    for row in data:
+        clean = {}
+        for k, v in row.items():
+            if k not in whitelist:
+                continue
+            if v is None or (v.__class__ is str and v in _NULL_SET) or (v.__class__ is float and v != v):
+                clean[_COLUMN_RENAMES.get(k, k)] = None
+                continue
+            if k in date_cols and v.__class__ is str:
+                m = _DATE_FULL.match(v)
+                if m:
+                    v = f"{m.group(3)}-{m.group(2)}-{m.group(1)}"
+                else:
+                    m = _DATE_SHORT.match(v)
+                    if m:
+                        v = f"20{m.group(3)}-{m.group(2)}-{m.group(1)}"
+            clean[_COLUMN_RENAMES.get(k, k)] = v
+
+        if 'id' in clean and not clean['id']:
+            del clean['id']
+        for ts in TIMESTAMP_COLUMNS:
+            if ts in clean and (not clean[ts] or not _ISO_DATE_PREFIX.match(str(clean[ts]))):
+                clean[ts] = now_iso
+        if 'last_updated' not in clean:
+            clean['last_updated'] = now_iso
+
+        # Deduplication on the conflict key(s)
+        kv = tuple(clean.get(k) for k in keys)
+        if all(v not in (None, '') for v in kv) and kv not in seen:
+            seen.add(kv)
+            deduped.append(clean)
+    return deduped
+
+
+def _load_sync_state() -> Dict[str, Dict[str, Any]]:
+    if not SYNC_STATE_FILE.exists():
+        return {}
+    try:
+        with open(SYNC_STATE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        logger.warning(f"    [!] Could not read {SYNC_STATE_FILE.name}, falling back to full sync: {e}")
+        return {}
+
+
+def _save_sync_state(state: Dict[str, Dict[str, Any]]):
+    temp_path = SYNC_STATE_FILE.with_suffix('.json.tmp')
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    os.replace(temp_path, SYNC_STATE_FILE)
+
+
 class SyncManager:
     """
     Manages bi-directional synchronization between local CSVs and Supabase using pandas.
@@ -49,7 +159,8 @@ class SyncManager:
                 if asyncio.iscoroutinefunction(func):
                     return await func(*args, **kwargs)
                 else:
-                    return func(*args, **kwargs)
+                    # supabase-py is blocking; keep it off the event loop
+                    return await asyncio.to_thread(func, *args, **kwargs)
             except Exception as e:
                 retries += 1
                 if retries == max_retries:
@@ -66,11 +177,66 @@ class SyncManager:
 
         logger.info("Starting hardened bi-directional sync on startup...")
 
-        for table_key, config in TABLE_CONFIG.items():
-            await self._sync_table(table_key, config)
+        for table_key, error in await self.sync_tables():
+            if error:
+                logger.error(f"    [Sync Fatal] {table_key}: {error}")
+
+    async def sync_tables(self, full: bool = False) -> List[tuple]:
+        """
+        Syncs every configured table, up to SYNC_CONCURRENCY at a time.
+        Returns (table_key, exception or None) pairs in TABLE_CONFIG order.
+        """
+        flush_all_tables()
+        semaphore = asyncio.Semaphore(max(1, SYNC_CONCURRENCY))
 
-    async def _sync_table(self, table_key: str, config: Dict):
-        """Sync a single table using pandas for delta detection."""
+        async def _one(table_key: str, config: Dict):
+            async with semaphore:
+                try:
+                    await self._sync_table(table_key, config, full=full)
+                    return table_key, None
+                except Exception as e:
+                    return table_key, e
+
+        return await asyncio.gather(*(_one(k, c) for k, c in TABLE_CONFIG.items()))
+
+    async def _fetch_pages(self, query, page_size: int = 1000, raise_errors: bool = False,
+                           on_page: Optional[Callable[[List[Dict[str, Any]]], None]] = None) -> List[Dict[str, Any]]:
+        """
+        Fetches a ranged query in waves of PAGE_CONCURRENCY concurrent pages until a short page.
+        query(start, end) performs the blocking ranged request and returns its response.
+        On error the rows of all completed waves are returned (or the error is raised).
+        With on_page, each page is handed to the callback in order and not accumulated.
+        """
+        rows_out = []
+        offset = 0
+        width = max(1, PAGE_CONCURRENCY)
+        while True:
+            offsets = [offset + i * page_size for i in range(width)]
+            try:
+                results = await asyncio.gather(*(
+                    self._retry_async(lambda o=o: query(o, o + page_size - 1)) for o in offsets
+                ))
+            except Exception as e:
+                if raise_errors:
+                    raise
+                logger.error(f"      [x] Page fetch error at offset {offset}: {e}")
+                return rows_out
+
+            for res in results:
+                data = res.data or []
+                if on_page:
+                    on_page(data)
+                else:
+                    rows_out.extend(data)
+                if len(data) < page_size:
+                    return rows_out
+            offset += width * page_size
+
+    async def _sync_table(self, table_key: str, config: Dict, full: bool = False):
+        """
+        Sync a single table. Uses the incremental path (dirty keys + remote high-watermark)
+        when a baseline exists, otherwise a full pandas diff against remote metadata.
+        """
         table_name = config['table']
         csv_file = config['csv']
         key_field = config['key']
@@ -80,6 +246,13 @@ class SyncManager:
             logger.warning(f"  [SKIP] {csv_file} not found.")
             return
 
+        # Write-behind store must hit disk before pandas reads the file
+        flush_all_tables()
+
+        if SYNC_INCREMENTAL and not full:
+            if await self._sync_table_incremental(table_key, config, csv_path):
+                return
+
         logger.info(f"  Syncing {table_name} <-> {csv_file}...")
 
         # 1. Fetch Remote Metadata (ID + last_updated)
@@ -109,16 +282,8 @@ class SyncManager:
         remote_df = pd.DataFrame(list(remote_meta.items()), columns=[key_field, 'remote_ts'])
         
         # Normalize timestamps for fair comparison
-        def normalize_ts(ts):
-            if not ts or ts in ('None', 'nan', ''): return '1970-01-01T00:00:00'
-            try:
-                # Ensure ISO format comparison works as string comparison
-                return pd.to_datetime(ts).isoformat()
-            except:
-                return '1970-01-01T00:00:00'
-
-        df_local['last_updated'] = df_local['last_updated'].apply(normalize_ts)
-        remote_df['remote_ts'] = remote_df['remote_ts'].apply(normalize_ts)
+        df_local['last_updated'] = _normalize_ts_series(df_local['last_updated'])
+        remote_df['remote_ts'] = _normalize_ts_series(remote_df['remote_ts'])
 
         # Merge to compare
         merged = pd.merge(df_local[[key_field, 'last_updated']], remote_df, on=key_field, how='outer').fillna('')
@@ -126,13 +291,13 @@ class SyncManager:
         # PUSH: Local is strictly newer OR Remote doesn't have it
         to_push_ids = merged[
             (merged['last_updated'] > merged['remote_ts']) | 
-            ((merged['last_updated'] != '1970-01-01T00:00:00') & (merged['remote_ts'] == '1970-01-01T00:00:00'))
+            ((merged['last_updated'] != EPOCH_TS) & (merged['remote_ts'] == EPOCH_TS))
         ][key_field].tolist()
 
         # PULL: Remote is strictly newer OR Local doesn't have it
         to_pull_ids = merged[
             (merged['remote_ts'] > merged['last_updated']) |
-            ((merged['remote_ts'] != '1970-01-01T00:00:00') & (merged['last_updated'] == '1970-01-01T00:00:00'))
+            ((merged['remote_ts'] != EPOCH_TS) & (merged['last_updated'] == EPOCH_TS))
         ][key_field].tolist()
 
         logger.info(f"    Delta: {len(to_push_ids)} to push, {len(to_pull_ids)} to pull. (Conflict resolution: Latest Wins)")
@@ -144,185 +309,209 @@ class SyncManager:
         # 5. Push Operations
         if to_push_ids:
              rows_to_push = df_local[df_local[key_field].isin(to_push_ids)].to_dict('records')
-             await self.batch_upsert(table_key, rows_to_push)
+             if not await self.batch_upsert(table_key, rows_to_push):
+                 # Keep the old baseline so the next sync diffs again
+                 return
              
              # 6. Verification Phase
              await self._verify_sync_parity(table_key, to_push_ids)
 
+        # 7. Baseline for the next incremental sync
+        remote_hw = max((ts for ts in remote_meta.values() if ts), default='')
+        self._record_sync_state(table_name, csv_path, remote_hw)
+        _last_remote_poll[table_name] = time.monotonic()
+
+    def _record_sync_state(self, table_name: str, csv_path: Path, remote_hw: str):
+        """Persists the csv signature and remote high-watermark reached by a successful sync."""
+        state = _load_sync_state()
+        sig = mark_synced(str(csv_path))
+        state[table_name] = {
+            'csv_sig': list(sig) if sig else None,
+            'remote_hw': max(remote_hw or '', state.get(table_name, {}).get('remote_hw') or ''),
+            'synced_at': datetime.utcnow().isoformat()
+        }
+        try:
+            _save_sync_state(state)
+        except Exception as e:
+            logger.warning(f"    [!] Failed to persist sync state for {table_name}: {e}")
+
+    async def _sync_table_incremental(self, table_key: str, config: Dict, csv_path: Path) -> bool:
+        """
+        Pushes only keys written through the table store since the last sync and pulls
+        rows with last_updated above the remote high-watermark.
+        Returns False when no usable baseline exists and a full diff is required.
+        """
+        table_name = config['table']
+        key_field = config['key']
+
+        state = _load_sync_state().get(table_name)
+        if not state or not state.get('remote_hw'):
+            return False
+
+        synced_sig = tuple(state['csv_sig']) if state.get('csv_sig') else None
+        changed = take_changes(str(csv_path), synced_sig)
+        if changed is None:
+            logger.info(f"    [Delta] {csv_path.name} changed outside the table store; running full diff.")
+            return False
+
+        poll_due = time.monotonic() - _last_remote_poll.get(table_name, 0.0) >= REMOTE_POLL_INTERVAL
+        if not changed and not poll_due:
+            logger.info(f"  [SKIP] {table_name}: no local changes.")
+            return True
+
+        # 1. Pull rows changed remotely since the high-watermark (Latest Wins), page by page
+        table = get_table(str(csv_path), key=key_field)
+        remote_hw = state['remote_hw']
+        overridden: Set[str] = set()
+        if poll_due:
+            def _apply_newer(page: List[Dict[str, Any]]):
+                local_ts = [(table.get(str(r.get(key_field))) or {}).get('last_updated', '') for r in page]
+                newer = _normalize_ts_series(pd.Series([r.get('last_updated') for r in page], dtype=object)) > \
+                    _normalize_ts_series(pd.Series(local_ts, dtype=object))
+                to_apply = [row for row, is_newer in zip(page, newer) if is_newer]
+                overridden.update(self._apply_pulled_rows(table, key_field, to_apply))
+
+            try:
+                remote_hw = await self._fetch_updated_since(table_name, state['remote_hw'], on_page=_apply_newer)
+            except Exception:
+                restore_changes(str(csv_path), changed, synced_sig)
+                raise
+            _last_remote_poll[table_name] = time.monotonic()
+            if overridden:
+                table.flush()
+
+        # 2. Push locally written keys (skipping any the remote just overrode)
+        pushed_ids = []
+        if changed:
+            rows = [table.get(k) for k in changed if k not in overridden]
+            rows = [r for r in rows if r]
+            pushed_ids = [r[key_field] for r in rows]
+            if rows and not await self.batch_upsert(table_key, rows):
+                # Nothing is lost: the keys are pushed by the next sync and the baseline stays put.
+                restore_changes(str(csv_path), changed - overridden, synced_sig)
+                logger.warning(f"    [!] {table_name}: push failed; {len(pushed_ids)} keys re-queued.")
+                return True
+
+        logger.info(f"  [Delta] {table_name}: pushed {len(pushed_ids)}, pulled {len(overridden)} (incremental).")
+        self._record_sync_state(table_name, csv_path, remote_hw)
+        return True
+
+    async def _fetch_updated_since(self, table_name: str, high_watermark: str,
+                                   on_page: Callable[[List[Dict[str, Any]]], None]) -> str:
+        """Stream all remote rows with last_updated > high_watermark to on_page. Returns the new watermark."""
+        query = lambda start, end: self.supabase.table(table_name).select("*").gt('last_updated', high_watermark).order('last_updated').range(start, end).execute()
+        new_hw = high_watermark
+
+        def _page(rows: List[Dict[str, Any]]):
+            nonlocal new_hw
+            new_hw = max([new_hw] + [r.get('last_updated') or '' for r in rows])
+            on_page(rows)
+
+        await self._fetch_pages(query, raise_errors=True, on_page=_page)
+        return new_hw
+
     async def _fetch_remote_metadata(self, table_name: str, key_field: str) -> Dict[str, str]:
         """Fetch all ID:last_updated pairs from Supabase."""
         remote_map = {}
-        batch_size = 1000
-        offset = 0
-        
-        while True:
-            try:
-                func = lambda o=offset: self.supabase.table(table_name).select(f"{key_field},last_updated").range(o, o + batch_size - 1).execute()
-                res = await self._retry_async(func)
-                
-                rows = res.data
-                if not rows:
-                    break
-                
-                # Setup progress bar on first batch if we know the count
-                # Note: We don't always know total count here without an extra query, 
-                # but we can show progress in terms of batches or just rows found.
-                for r in rows:
-                    k = r.get(key_field)
-                    if k:
-                        remote_map[str(k)] = r.get('last_updated', '')
-                
-                logger.info(f"      [Metadata] Found {len(remote_map)} remote entries...")
-                
-                if len(rows) < batch_size:
-                    break
-                offset += batch_size
-            except Exception as e:
-                logger.error(f"      [x] Metadata fetch error at offset {offset}: {e}")
-                break
-        
+
+        def _collect(rows: List[Dict[str, Any]]):
+            for r in rows:
+                k = r.get(key_field)
+                if k:
+                    remote_map[str(k)] = r.get('last_updated', '')
+            logger.info(f"      [Metadata] Found {len(remote_map)} remote entries...")
+
+        query = lambda start, end: self.supabase.table(table_name).select(f"{key_field},last_updated").range(start, end).execute()
+        await self._fetch_pages(query, on_page=_collect)
         return remote_map
 
     async def _pull_updates(self, table_name: str, key_field: str, ids: List[str], csv_path: Path):
-        """Fetch rows from Supabase and update local CSV using pandas."""
+        """
+        Fetch rows from Supabase and stream them into the local table store.
+        Each batch is applied as it arrives, so memory stays bounded by the in-flight
+        batches rather than the whole pull; the CSV is written once at the end.
+        """
         if not ids:
             return
 
         logger.info(f"    Pulling {len(ids)} rows from remote...")
         
-        pulled_data = []
         batch_size = 200
+        semaphore = asyncio.Semaphore(max(1, PAGE_CONCURRENCY))
+        table = get_table(str(csv_path), key=key_field)
         pbar = tqdm(total=len(ids), desc=f"    Pulling {table_name}", unit="row")
-        for i in range(0, len(ids), batch_size):
-            batch_ids = ids[i:i + batch_size]
-            func = lambda b=batch_ids: self.supabase.table(table_name).select("*").in_(key_field, b).execute()
-            res = await self._retry_async(func)
-            pulled_data.extend(res.data)
-            pbar.update(len(batch_ids))
-        pbar.close()
+        applied = 0
 
-        if not pulled_data:
-            return
+        async def _fetch(batch_ids):
+            nonlocal applied
+            async with semaphore:
+                func = lambda: self.supabase.table(table_name).select("*").in_(key_field, batch_ids).execute()
+                res = await self._retry_async(func)
+                applied += len(self._apply_pulled_rows(table, key_field, res.data or []))
+                pbar.update(len(batch_ids))
 
-        # Load local, update with pulled, save
-        df_local = pd.read_csv(csv_path, dtype=str).fillna('')
-        df_remote = pd.DataFrame(pulled_data).astype(str).fillna('')
-        
-        # Normalize remote data Types/Keys
-        if 'over_2_5' in df_remote.columns:
-            df_remote['over_2.5'] = df_remote['over_2_5']
-            df_remote = df_remote.drop(columns=['over_2_5'])
-
-        # Data Normalization (PostgreSQL -> CSV formats)
-        for col in df_remote.columns:
-            if col in ['date', 'date_updated', 'last_extracted']:
-                df_remote[col] = df_remote[col].apply(lambda x: f"{x[8:10]}.{x[5:7]}.{x[0:4]}" if len(x) >= 10 and '-' in x else x)
-
-        # Merge
-        df_local.set_index(key_field, inplace=True)
-        df_remote.set_index(key_field, inplace=True)
-        df_local.update(df_remote)
-        
-        # Add new rows
-        new_rows = df_remote[~df_remote.index.isin(df_local.index)]
-        df_final = pd.concat([df_local.reset_index(), new_rows.reset_index()], ignore_index=True)
-
-        # Ensure correct column ordering based on definition
-        headers = files_and_headers.get(str(csv_path), [])
-        if headers:
-            # Only keep headers that actually exist in the dataframe
-            final_cols = [h for h in headers if h in df_final.columns]
-            # Add any extra columns found in data but not in headers (safety)
-            extra_cols = [c for c in df_final.columns if c not in headers]
-            df_final = df_final[final_cols + extra_cols]
-
-        df_final.to_csv(csv_path, index=False, encoding='utf-8')
-        logger.info(f"    [SUCCESS] {csv_path.name} updated via pandas.")
-
-    async def batch_upsert(self, table_key: str, data: List[Dict[str, Any]]):
-        """Upsert a batch of data to Supabase with strict cleaning."""
-        if not self.supabase or not data:
-            return
+        await asyncio.gather(*(_fetch(ids[i:i + batch_size]) for i in range(0, len(ids), batch_size)))
+        pbar.close()
+
+        if table.flush():
+            logger.info(f"    [SUCCESS] {csv_path.name} updated with {applied} pulled rows.")
+
+    @staticmethod
+    def _apply_pulled_rows(table, key_field: str, rows: List[Dict[str, Any]]) -> List[str]:
+        """
+        Apply remote rows to the table store (update existing keys, append new ones) in
+        CSV formats. Rows are stored untracked so they are not pushed back. Returns the applied keys.
+        """
+        converted = []
+        for remote in rows:
+            row = {}
+            for col, value in remote.items():
+                value = '' if value is None else str(value)
+                # Data Normalization (PostgreSQL -> CSV formats)
+                if col in DATE_COLUMNS and len(value) >= 10 and '-' in value:
+                    value = f"{value[8:10]}.{value[5:7]}.{value[0:4]}"
+                row['over_2.5' if col == 'over_2_5' else col] = value
+            converted.append(row)
+        # One lock / freshness check / dirty-budget check per page instead of per row.
+        return table.upsert_many(converted, track=False)
+
+    async def batch_upsert(self, table_key: str, data: List[Dict[str, Any]]) -> bool:
+        """
+        Upsert a batch of data to Supabase with strict cleaning.
+        Returns True when every row was pushed (or there was nothing to push), False otherwise.
+        """
+        if not data:
+            return True
+        if not self.supabase:
+            return False
 
         conf = TABLE_CONFIG.get(table_key)
-        if not conf: return
+        if not conf: return False
         
         table_name = conf['table']
         conflict_key = conf['key']
-        csv_path = str(DATA_DIR / conf['csv'])
-        whitelist = set(files_and_headers.get(csv_path, []))
-        whitelist.update(['id', 'created_at', 'last_updated'])
-
-        cleaned_data = []
-        for row in data:
-            clean = {}
-            for k, v in row.items():
-                if whitelist and k not in whitelist and k != 'over_2.5':
-                    continue
-
-                if v in ('', 'N/A', None, 'None', 'none', 'nan', 'NaN', 'null', 'NULL'):
-                    clean[k] = None
-                else:
-                    val = v
-                    # CSV (DD.MM.YYYY or DD.MM.YY) -> DB (YYYY-MM-DD)
-                    if k in ['date', 'date_updated', 'last_extracted'] and isinstance(val, str):
-                        # Match DD.MM.YYYY
-                        match_full = re.match(r'^(\d{2})\.(\d{2})\.(\d{4})$', val)
-                        if match_full:
-                            d, m, y = match_full.groups()
-                            val = f"{y}-{m}-{d}"
-                        else:
-                            # Match DD.MM.YY (Legacy/Short format)
-                            match_short = re.match(r'^(\d{2})\.(\d{2})\.(\d{2})$', val)
-                            if match_short:
-                                d, m, y_short = match_short.groups()
-                                val = f"20{y_short}-{m}-{d}"
-                    
-                    if k == 'over_2.5':
-                        clean['over_2_5'] = val
-                    else:
-                        clean[k] = val
-            
-            if 'id' in clean and not clean['id']: del clean['id']
-            
-            # Timestamp normalization
-            now_iso = datetime.utcnow().isoformat()
-            ts_cols = ['last_updated', 'date_updated', 'last_extracted', 'created_at']
-            for ts in ts_cols:
-                if ts in clean:
-                    if not clean[ts] or not re.match(r'^\d{4}-\d{2}-\d{2}', str(clean[ts])):
-                        clean[ts] = now_iso
-            
-            if 'last_updated' not in clean: clean['last_updated'] = now_iso
-            cleaned_data.append(clean)
-
-        # Deduplication items
-        keys = [k.strip() for k in conflict_key.split(',')]
-        seen = set()
-        deduped = []
-        for row in cleaned_data:
-            if all(row.get(k) not in (None, '') for k in keys):
-                kv = tuple(row.get(k) for k in keys)
-                if kv not in seen:
-                    seen.add(kv); deduped.append(row)
-        
-        if not deduped: return
+        deduped = _prepare_upsert_rows(table_key, data)
+        if not deduped: return True
 
         try:
             # Batch size for Supabase upsert (usually 1000 is safe)
             api_batch_size = 1000
+            semaphore = asyncio.Semaphore(max(1, PAGE_CONCURRENCY))
             pbar = tqdm(total=len(deduped), desc=f"    Pushing {table_name}", unit="row")
-            
-            for i in range(0, len(deduped), api_batch_size):
-                batch = deduped[i:i + api_batch_size]
-                func = lambda b=batch: self.supabase.table(table_name).upsert(b, on_conflict=conflict_key).execute()
-                await self._retry_async(func)
-                pbar.update(len(batch))
-                
+
+            async def _push(batch):
+                async with semaphore:
+                    func = lambda: self.supabase.table(table_name).upsert(batch, on_conflict=conflict_key).execute()
+                    await self._retry_async(func)
+                    pbar.update(len(batch))
+
+            await asyncio.gather(*(_push(deduped[i:i + api_batch_size]) for i in range(0, len(deduped), api_batch_size)))
             pbar.close()
             logger.info(f"    [SYNC] Upserted {len(deduped)} rows to {table_name}.")
+            return True
         except Exception as e:
             logger.error(f"    [x] Upsert failed: {e}")
+            return False
 
     async def _verify_sync_parity(self, table_key: str, pushed_ids: List[str], sample_size: int = 10):
         """Pick a sample and verify parity between local and remote."""
@@ -389,9 +578,23 @@ class SyncManager:
         except Exception as e:
             logger.error(f"    [x] Parity verification failed: {e}")
 
-async def run_full_sync(session_name: str = "Periodic"):
-    """Wrapper to sync ALL tables with audit logging and failure reporting."""
+async def run_full_sync(session_name: str = "Periodic", full: bool = False, background: bool = False):
+    """
+    Wrapper to sync ALL tables with audit logging and failure reporting.
+    Tables are synced incrementally when possible; full=True forces a complete diff.
+    background=True hands the sync to the SyncWorker thread and returns immediately.
+    """
     from Data.Access.db_helpers import log_audit_event
+    from Data.Access.sync_worker import get_sync_worker
+
+    worker = get_sync_worker()
+    if background:
+        worker.request_sync(session_name, full=full)
+        return True
+    if threading.current_thread().name != "SyncWorker":
+        # Let queued background pushes/syncs finish so two syncs never overlap.
+        await worker.drain_async()
+
     manager = SyncManager()
     logger.info(f"Starting global full sync [{session_name}]...")
     
@@ -399,14 +602,13 @@ async def run_full_sync(session_name: str = "Periodic"):
     fail_count = 0
     errors = []
 
-    for table_key, config in TABLE_CONFIG.items():
-        try:
-            await manager._sync_table(table_key, config)
+    for table_key, error in await manager.sync_tables(full=full):
+        if error is None:
             success_count += 1
-        except Exception as e:
-            logger.error(f"    [Sync Fatal] {table_key}: {e}")
+        else:
+            logger.error(f"    [Sync Fatal] {table_key}: {error}")
             fail_count += 1
-            errors.append(f"{table_key}: {str(e)}")
+            errors.append(f"{table_key}: {str(error)}")
 
     # Audit Logging
     status = "success" if fail_count == 0 else "partial_failure" if success_count > 0 else "failed"
@@ -0,0 +1,250 @@
+# sync_worker.py: Background Supabase sync service.
+# Refactored for Clean Architecture (v2.8)
+# This script moves cloud upserts and periodic syncs off the scraping event loop.
+
+"""
+Sync Worker Module
+Single long-lived worker thread with its own asyncio loop and SyncManager.
+Responsible for coalesced row upserts and queued table syncs with bounded memory.
+
+Producers (scrapers, reviewers) call enqueue_upsert() / request_sync() and return
+immediately; they run on the scraping event loop, so they never wait. Rows are
+coalesced per table by primary key, so repeated updates to the same fixture cost
+one upload. When MAX_PENDING_ROWS is reached new rows are dropped from the queue
+(they stay dirty in the table store and go out with the next incremental sync).
+
+Entry points stop the worker with shutdown_async() while their event loop is still
+running: at interpreter exit the thread pools used for Supabase calls are already
+gone, so the atexit hook can only report what is left for the next sync.
+"""
+
+import asyncio
+import atexit
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+# --- Worker Configuration ---
+MAX_PENDING_ROWS = int(os.getenv('LEO_SYNC_MAX_PENDING', 5000))           # Back-pressure threshold (rows queued)
+COALESCE_WINDOW = float(os.getenv('LEO_SYNC_COALESCE_WINDOW', 0.5))       # Seconds to gather rows before a push
+SHUTDOWN_TIMEOUT = float(os.getenv('LEO_SYNC_SHUTDOWN_TIMEOUT', 60.0))
+
+
+class SyncWorker:
+    """Background thread that owns all Supabase I/O for in-process producers."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._pending: Dict[str, "OrderedDict[str, Dict[str, Any]]"] = {}
+        self._pending_rows = 0
+        self._oldest_enqueued: Optional[float] = None
+        self._sync_jobs: "OrderedDict[str, bool]" = OrderedDict()   # session_name -> full
+        self._busy = False
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        self.metrics = {
+            'rows_enqueued': 0, 'rows_coalesced': 0, 'rows_pushed': 0, 'rows_dropped': 0,
+            'batches_failed': 0, 'syncs_run': 0, 'last_push_seconds': 0.0, 'last_lag_seconds': 0.0,
+        }
+
+    # --- Producer API ---
+
+    def enqueue_upsert(self, table_key: str, rows: List[Dict[str, Any]]) -> int:
+        """
+        Queues rows for upsert, coalescing by the table's key. Never blocks: new keys are
+        dropped while the queue is full. Returns the number of rows accepted.
+        """
+        from .sync_manager import TABLE_CONFIG
+        conf = TABLE_CONFIG.get(table_key)
+        if not conf or not rows:
+            return 0
+        key_field = conf['key']
+        self._ensure_started()
+
+        accepted = dropped = 0
+        with self._cond:
+            table_queue = self._pending.setdefault(table_key, OrderedDict())
+            for row in rows:
+                key_value = str(row.get(key_field) or '')
+                if not key_value:
+                    continue
+                if key_value in table_queue:
+                    table_queue[key_value] = dict(row)
+                    self.metrics['rows_coalesced'] += 1
+                    accepted += 1
+                    continue
+                if self._pending_rows >= MAX_PENDING_ROWS:
+                    dropped += 1
+                    continue
+                table_queue[key_value] = dict(row)
+                self._pending_rows += 1
+                accepted += 1
+                if self._oldest_enqueued is None:
+                    self._oldest_enqueued = time.monotonic()
+            self.metrics['rows_enqueued'] += accepted
+            self.metrics['rows_dropped'] += dropped
+            self._cond.notify_all()
+        if dropped:
+            print(f"    [Sync Worker] Queue full ({MAX_PENDING_ROWS} rows); {dropped} {table_key} row(s) left dirty for the next sync.")
+        return accepted
+
+    def request_sync(self, session_name: str = "Background", full: bool = False):
+        """Queues a run_full_sync on the worker. Duplicate pending requests are merged."""
+        self._ensure_started()
+        with self._cond:
+            self._sync_jobs[session_name] = self._sync_jobs.get(session_name, False) or full
+            self._cond.notify_all()
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until the queue is empty and the worker is idle. Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._pending_rows or self._sync_jobs or self._busy:
+                if self._thread is None or not self._thread.is_alive():
+                    return False
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    async def drain_async(self, timeout: Optional[float] = None) -> bool:
+        """Awaitable drain() that does not block the caller's event loop."""
+        return await asyncio.to_thread(self.drain, timeout)
+
+    def shutdown(self, timeout: float = SHUTDOWN_TIMEOUT):
+        """Flushes queued work and stops the worker thread."""
+        if self._thread is None:
+            return
+        self.drain(timeout)
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        self._thread.join(timeout=5)
+        self._thread = None
+
+    async def shutdown_async(self, timeout: float = SHUTDOWN_TIMEOUT):
+        """Awaitable shutdown() for entry points, run before their event loop closes."""
+        await asyncio.to_thread(self.shutdown, timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, lag (age of the oldest queued row) and throughput counters."""
+        with self._cond:
+            lag = time.monotonic() - self._oldest_enqueued if self._oldest_enqueued else 0.0
+            return {
+                **self.metrics,
+                'queue_depth': self._pending_rows,
+                'queued_syncs': len(self._sync_jobs),
+                'lag_seconds': round(lag, 3),
+                'busy': self._busy,
+            }
+
+    # --- Worker Internals ---
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._cond:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping = False
+                self._thread = threading.Thread(target=self._run, name="SyncWorker", daemon=True)
+                self._thread.start()
+
+    def _take_work(self):
+        with self._cond:
+            while not (self._pending_rows or self._sync_jobs or self._stopping):
+                self._cond.wait()
+            if self._stopping and not (self._pending_rows or self._sync_jobs):
+                return None, None
+            if self._pending_rows and not self._sync_jobs and not self._stopping:
+                # Let bursts accumulate so they go out as one batch per table.
+                deadline = time.monotonic() + COALESCE_WINDOW
+                while not self._stopping and not self._sync_jobs and self._pending_rows < MAX_PENDING_ROWS:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+            batches, self._pending = self._pending, {}
+            jobs, self._sync_jobs = self._sync_jobs, OrderedDict()
+            if self._oldest_enqueued:
+                self.metrics['last_lag_seconds'] = round(time.monotonic() - self._oldest_enqueued, 3)
+            self._pending_rows = 0
+            self._oldest_enqueued = None
+            self._busy = True
+            self._cond.notify_all()
+            return batches, jobs
+
+    def _run(self):
+        from .sync_manager import SyncManager, run_full_sync
+
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        manager = SyncManager()
+        try:
+            while True:
+                batches, jobs = self._take_work()
+                if batches is None:
+                    break
+                try:
+                    for table_key, rows in batches.items():
+                        if not rows or not manager.supabase:
+                            continue
+                        started = time.monotonic()
+                        try:
+                            ok = loop.run_until_complete(manager.batch_upsert(table_key, list(rows.values())))
+                        except Exception as e:
+                            ok = False
+                            print(f"    [Sync Worker] Upsert to {table_key} failed: {e}")
+                        if ok:
+                            self.metrics['rows_pushed'] += len(rows)
+                        else:
+                            # Rows stay dirty in the table store; the next incremental sync retries them.
+                            self.metrics['batches_failed'] += 1
+                        self.metrics['last_push_seconds'] = round(time.monotonic() - started, 3)
+
+                    for session_name, full in jobs.items():
+                        try:
+                            loop.run_until_complete(run_full_sync(session_name, full=full))
+                            self.metrics['syncs_run'] += 1
+                        except Exception as e:
+                            print(f"    [Sync Worker] Sync '{session_name}' failed: {e}")
+                finally:
+                    with self._cond:
+                        self._busy = False
+                        self._cond.notify_all()
+        finally:
+            loop.close()
+
+
+# --- Singleton ---
+
+_worker: Optional[SyncWorker] = None
+_worker_lock = threading.Lock()
+
+
+def get_sync_worker() -> SyncWorker:
+    """Returns the process-wide sync worker."""
+    global _worker
+    if _worker is None:
+        with _worker_lock:
+            if _worker is None:
+                _worker = SyncWorker()
+    return _worker
+
+
+def _report_unflushed():
+    """
+    atexit hook. concurrent.futures is shut down before atexit handlers run, so queued
+    rows cannot be pushed from here; they stay dirty and go out with the next sync.
+    """
+    if _worker is None:
+        return
+    stats = _worker.stats()
+    if stats['queue_depth'] or stats['queued_syncs'] or stats['busy']:
+        print(f"    [Sync Worker] Exiting with {stats['queue_depth']} queued row(s) and "
+              f"{stats['queued_syncs']} queued sync(s); they will go out with the next sync.")
+
+
+atexit.register(_report_unflushed)
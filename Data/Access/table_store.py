@@ -0,0 +1,573 @@
+# table_store.py: Indexed in-memory table store with write-behind flushing.
+# Refactored for Clean Architecture (v2.8)
+# This script keeps each Data/Store CSV table in memory and batches disk writes.
+
+"""
+Table Store Module
+In-memory, key-indexed cache of the CSV tables in Data/Store.
+Responsible for O(1) upserts/lookups and batched, atomic flushes to disk.
+
+Each table is loaded once and indexed by the unique key declared in
+sync_manager.TABLE_CONFIG. Mutations only touch memory; dirty tables are
+written back through a temp-file rename when the flush timer fires, when the
+dirty-row budget is exceeded, at chapter boundaries and at process exit.
+
+Journaled tables (predictions, fb_matches by default) never rewrite on the
+hot path: every change appends one JSON delta line to '<table>.csv.journal'.
+Loading folds the journal over the base CSV, and compaction merges it back
+into the CSV in the background, before syncs and at chapter boundaries.
+
+With LEO_STORE_BACKEND=sqlite, get_table() returns sqlite_store.SqliteTable
+instead, which exposes the same API.
+"""
+
+import atexit
+import bisect
+import csv
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from .csv_operations import _atomic_write_csv
+
+# --- Write-Behind Configuration ---
+STORE_BACKEND = os.getenv('LEO_STORE_BACKEND', 'csv').lower()        # 'csv' (default) or 'sqlite'
+FLUSH_INTERVAL = float(os.getenv('LEO_STORE_FLUSH_INTERVAL', 5.0))   # Seconds between background flushes
+MAX_DIRTY_ROWS = int(os.getenv('LEO_STORE_MAX_DIRTY_ROWS', 500))     # Force a flush past this many pending rows
+JOURNAL_TABLES = [t.strip() for t in os.getenv('LEO_STORE_JOURNAL_TABLES', 'predictions.csv,fb_matches.csv').split(',') if t.strip()]
+JOURNAL_COMPACT_AT = int(os.getenv('LEO_STORE_JOURNAL_COMPACT_AT', 2000))  # Background compaction threshold (records)
+
+
+def _cell(value: Any) -> str:
+    """Normalizes a value the way csv.DictWriter would serialize it."""
+    if value is None:
+        return ''
+    return value if isinstance(value, str) else str(value)
+
+
+class TableStore:
+    """
+    In-memory view of one CSV table.
+    Rows keep their file order; a key -> row-offset index gives O(1) access and
+    optional secondary indexes serve equality filters without full scans.
+    """
+
+    def __init__(self, filepath: str, fieldnames: List[str], key: str, journal: bool = False):
+        self.filepath = os.path.abspath(filepath)
+        self.journal_path = self.filepath + '.journal' if journal else None
+        self.key = key
+        self.fieldnames = list(fieldnames)
+        self._lock = threading.RLock()
+        self._rows: List[Dict[str, str]] = []
+        self._index: Dict[str, int] = {}
+        self._secondary: Dict[str, Dict[str, List[int]]] = {}
+        self._pending: Dict[str, Dict[str, str]] = {}
+        self._disk_sig: Optional[Tuple[int, int]] = None
+        self._loaded = False
+        self._journal_fh = None
+        self._journal_records = 0
+        self._version = 0
+        self.last_flush = time.monotonic()
+        # Sync change tracking (see take_changes)
+        self._sync_keys: Set[str] = set()
+        self._sync_full = False
+        self._sync_base_sig: Optional[Tuple[int, int]] = None
+
+    # --- Loading & Disk Coherence ---
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.filepath)
+            return st.st_mtime_ns, st.st_size
+        except FileNotFoundError:
+            return None
+
+    def _read_disk(self) -> Tuple[List[str], List[Dict[str, str]]]:
+        if not os.path.exists(self.filepath) or os.path.getsize(self.filepath) == 0:
+            return [], []
+        try:
+            with open(self.filepath, 'r', newline='', encoding='utf-8') as f:
+                reader = csv.DictReader(f)
+                rows = list(reader)
+                return list(reader.fieldnames or []), rows
+        except Exception as e:
+            print(f"    [Store Error] Could not read {self.filepath}: {e}")
+            return [], []
+
+    def _load(self):
+        """(Re)loads the table from disk and re-applies any unflushed changes on top."""
+        header, rows = self._read_disk()
+        self._version += 1
+        for col in header:
+            if col and col not in self.fieldnames:
+                self.fieldnames.append(col)
+
+        self._rows = []
+        self._index = {}
+        self._secondary = {}
+        for row in rows:
+            self._append_row({k: _cell(v) for k, v in row.items() if k is not None})
+
+        if self.journal_path:
+            self._replay_journal()
+
+        # Writes made by other code paths since our last flush are kept; our own
+        # pending field changes win for the keys we touched.
+        for key_value, changes in self._pending.items():
+            pos = self._index.get(key_value)
+            if pos is None:
+                self._append_row(self._blank_row(changes))
+            else:
+                self._apply(pos, changes)
+
+        self._disk_sig = self._stat()
+        if self._loaded:
+            # Someone else rewrote the file: key-level change tracking is no longer complete.
+            self._sync_full = True
+        else:
+            self._sync_base_sig = self._disk_sig
+        self._loaded = True
+
+    def _replay_journal(self):
+        """Folds journal deltas over the freshly loaded base rows (crash recovery)."""
+        self._journal_records = 0
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    key_value, changes = record['k'], record['d']
+                except (ValueError, KeyError, TypeError):
+                    continue  # Torn tail from an interrupted append
+                for col in changes:
+                    if col not in self.fieldnames:
+                        self.fieldnames.append(col)
+                pos = self._index.get(key_value)
+                if pos is None:
+                    self._append_row(self._blank_row(changes))
+                else:
+                    self._apply(pos, changes)
+                self._journal_records += 1
+
+    def _journal_append(self, key_value: str, changes: Dict[str, str]):
+        self._journal_extend([(key_value, changes)])
+
+    def _journal_extend(self, records: List[Tuple[str, Dict[str, str]]]):
+        """Appends several deltas with a single write."""
+        if self._journal_fh is None:
+            self._journal_fh = open(self.journal_path, 'a', encoding='utf-8')
+            if self._journal_torn():
+                # Terminate the torn tail so the next record starts on its own line.
+                self._journal_fh.write('\n')
+        self._journal_fh.write(''.join(
+            json.dumps({'k': key_value, 'd': changes}, ensure_ascii=False) + '\n' for key_value, changes in records
+        ))
+        self._journal_fh.flush()
+        self._journal_records += len(records)
+
+    def _journal_torn(self) -> bool:
+        """True if the journal ends mid-record (a crash interrupted the last append)."""
+        try:
+            with open(self.journal_path, 'rb') as f:
+                f.seek(0, os.SEEK_END)
+                if f.tell() == 0:
+                    return False
+                f.seek(-1, os.SEEK_END)
+                return f.read(1) != b'\n'
+        except FileNotFoundError:
+            return False
+
+    def _close_journal(self):
+        if self._journal_fh is not None:
+            self._journal_fh.close()
+            self._journal_fh = None
+
+    def _ensure_fresh(self):
+        if not self._loaded or self._stat() != self._disk_sig:
+            self._load()
+
+    # --- Internal Row Maintenance ---
+
+    def _blank_row(self, values: Dict[str, str]) -> Dict[str, str]:
+        row = {f: '' for f in self.fieldnames}
+        row.update(values)
+        return row
+
+    def _append_row(self, row: Dict[str, str]) -> int:
+        self._version += 1
+        pos = len(self._rows)
+        self._rows.append(row)
+        key_value = row.get(self.key)
+        if key_value and key_value not in self._index:
+            self._index[key_value] = pos
+        for field, idx in self._secondary.items():
+            idx.setdefault(row.get(field, ''), []).append(pos)
+        return pos
+
+    def _apply(self, pos: int, changes: Dict[str, str]):
+        self._version += 1
+        row = self._rows[pos]
+        for field, idx in self._secondary.items():
+            if field in changes and changes[field] != row.get(field, ''):
+                old = idx.get(row.get(field, ''))
+                if old:
+                    old.remove(pos)
+                bisect.insort(idx.setdefault(changes[field], []), pos)
+        row.update(changes)
+
+    def _clean(self, data_row: Dict[str, Any]) -> Dict[str, str]:
+        return {k: _cell(v) for k, v in data_row.items() if k in self.fieldnames}
+
+    def _mark_dirty(self, key_value: str, changes: Dict[str, str], track: bool = True):
+        if track:
+            self._sync_keys.add(key_value)
+        _start_flusher()
+        if self.journal_path:
+            # Constant-time, durable delta; compaction happens off the hot path.
+            self._journal_append(key_value, changes)
+            return
+        self._pending.setdefault(key_value, {}).update(changes)
+        if len(self._pending) >= MAX_DIRTY_ROWS:
+            self.flush()
+
+    # --- Public API ---
+
+    def upsert(self, data_row: Dict[str, Any], track: bool = True) -> bool:
+        """
+        Updates the row sharing data_row's key, or appends it. Returns False if the key is missing.
+        track=False is for rows pulled from Supabase: they are stored but not queued for push.
+        """
+        key_value = _cell(data_row.get(self.key))
+        if not key_value:
+            print(f"    [DB UPSERT Warning] Skipping entry due to missing unique key '{self.key}'.")
+            return False
+        with self._lock:
+            self._ensure_fresh()
+            changes = self._clean(data_row)
+            pos = self._index.get(key_value)
+            if pos is None:
+                self._append_row(self._blank_row(changes))
+            else:
+                self._apply(pos, changes)
+            self._mark_dirty(key_value, changes, track)
+        return True
+
+    def upsert_many(self, data_rows: List[Dict[str, Any]], track: bool = True) -> List[str]:
+        """
+        upsert() for several rows under one lock, with one journal append (or one
+        dirty-budget check). Rows without a key are skipped. Returns the upserted keys.
+        Untracked (pulled) rows skip the dirty budget: Supabase still has them, and the
+        sync flushes once after the whole pull instead of rewriting the CSV every batch.
+        """
+        with self._lock:
+            self._ensure_fresh()
+            applied: List[Tuple[str, Dict[str, str]]] = []
+            for data_row in data_rows:
+                key_value = _cell(data_row.get(self.key))
+                if not key_value:
+                    print(f"    [DB UPSERT Warning] Skipping entry due to missing unique key '{self.key}'.")
+                    continue
+                changes = self._clean(data_row)
+                pos = self._index.get(key_value)
+                if pos is None:
+                    self._append_row(self._blank_row(changes))
+                else:
+                    self._apply(pos, changes)
+                applied.append((key_value, changes))
+            if applied:
+                if track:
+                    self._sync_keys.update(key_value for key_value, _ in applied)
+                _start_flusher()
+                if self.journal_path:
+                    self._journal_extend(applied)
+                else:
+                    for key_value, changes in applied:
+                        self._pending.setdefault(key_value, {}).update(changes)
+                    if track and len(self._pending) >= MAX_DIRTY_ROWS:
+                        self.flush()
+            return [key_value for key_value, _ in applied]
+
+    def update(self, key_value: str, changes: Dict[str, Any]) -> bool:
+        """Applies field changes to an existing row only. Returns True if the row exists."""
+        with self._lock:
+            self._ensure_fresh()
+            pos = self._index.get(key_value)
+            if pos is None:
+                return False
+            cleaned = self._clean(changes)
+            if cleaned:
+                self._apply(pos, cleaned)
+                self._mark_dirty(key_value, cleaned)
+            return True
+
+    def update_many(self, changes_by_key: Dict[str, Dict[str, Any]]) -> int:
+        """
+        Applies field changes to several existing rows under one lock, with one
+        journal append (or one dirty-budget check). Returns the number of rows found.
+        """
+        with self._lock:
+            self._ensure_fresh()
+            found = 0
+            applied: List[Tuple[str, Dict[str, str]]] = []
+            for key_value, changes in changes_by_key.items():
+                pos = self._index.get(key_value)
+                if pos is None:
+                    continue
+                found += 1
+                cleaned = self._clean(changes)
+                if cleaned:
+                    self._apply(pos, cleaned)
+                    applied.append((key_value, cleaned))
+            if applied:
+                self._sync_keys.update(key_value for key_value, _ in applied)
+                _start_flusher()
+                if self.journal_path:
+                    self._journal_extend(applied)
+                else:
+                    for key_value, cleaned in applied:
+                        self._pending.setdefault(key_value, {}).update(cleaned)
+                    if len(self._pending) >= MAX_DIRTY_ROWS:
+                        self.flush()
+            return found
+
+    def update_where(self, predicate: Callable[[Dict[str, str]], bool], changes: Dict[str, Any]) -> int:
+        """Applies field changes to every row matching predicate. Returns the number of rows touched."""
+        with self._lock:
+            self._ensure_fresh()
+            cleaned = self._clean(changes)
+            touched = 0
+            for pos, row in enumerate(self._rows):
+                key_value = row.get(self.key)
+                if key_value and predicate(row):
+                    self._apply(pos, cleaned)
+                    self._mark_dirty(key_value, cleaned)
+                    touched += 1
+            return touched
+
+    def get(self, key_value: str) -> Optional[Dict[str, str]]:
+        """Returns a copy of the row for key_value, or None."""
+        with self._lock:
+            self._ensure_fresh()
+            pos = self._index.get(key_value)
+            return dict(self._rows[pos]) if pos is not None else None
+
+    def find(self, field: str, value: str) -> List[Dict[str, str]]:
+        """Returns copies of all rows where field == value, in file order (secondary-indexed)."""
+        with self._lock:
+            self._ensure_fresh()
+            idx = self._secondary.get(field)
+            if idx is None:
+                idx = {}
+                for pos, row in enumerate(self._rows):
+                    idx.setdefault(row.get(field, ''), []).append(pos)
+                self._secondary[field] = idx
+            return [dict(self._rows[pos]) for pos in idx.get(value, [])]
+
+    def rows(self) -> List[Dict[str, str]]:
+        """Returns copies of all rows in file order."""
+        with self._lock:
+            self._ensure_fresh()
+            return [dict(r) for r in self._rows]
+
+    def last(self) -> Optional[Dict[str, str]]:
+        """Returns a copy of the last row in file order, or None."""
+        with self._lock:
+            self._ensure_fresh()
+            return dict(self._rows[-1]) if self._rows else None
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._ensure_fresh()
+            return len(self._rows)
+
+    @property
+    def version(self) -> int:
+        """Counter bumped by every row change (and reload); derived indexes compare it to detect staleness."""
+        with self._lock:
+            self._ensure_fresh()
+            return self._version
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self._pending) or self._journal_records > 0
+
+    # --- Sync Change Tracking ---
+
+    def take_changes(self, synced_sig: Optional[Tuple[int, int]]) -> Optional[Set[str]]:
+        """
+        Returns the keys written since the last sync and resets tracking, or None when
+        the file may have changed outside the store (a full diff is required).
+        synced_sig is the file signature recorded at the end of the previous sync.
+        """
+        with self._lock:
+            if not self._loaded:
+                return set() if self._stat() == synced_sig else None
+            stale = self._stat() != self._disk_sig
+            full = self._sync_full or stale or self._sync_base_sig != synced_sig
+            keys, self._sync_keys = self._sync_keys, set()
+            if stale:
+                self._load()
+            self._sync_full = False
+            self._sync_base_sig = self._disk_sig
+            return None if full else keys
+
+    def restore_changes(self, keys: Set[str], synced_sig: Optional[Tuple[int, int]]):
+        """Undoes take_changes after a failed push: the keys are queued again against the old baseline."""
+        with self._lock:
+            self._sync_keys.update(keys)
+            self._sync_base_sig = synced_sig
+
+    def mark_synced(self) -> Optional[Tuple[int, int]]:
+        """Adopts the on-disk file (e.g. after a sync pull rewrote it) as the new sync baseline."""
+        with self._lock:
+            if not self._loaded:
+                return self._stat()
+            if self._stat() != self._disk_sig:
+                self._load()
+                self._sync_full = False
+            self._sync_base_sig = self._disk_sig
+            return self._disk_sig
+
+    def flush(self, compact: bool = True) -> bool:
+        """
+        Writes pending changes to disk atomically. Returns True if a write happened.
+        Journaled tables are already durable; they are only compacted into the base
+        CSV when compact is set or the journal has outgrown JOURNAL_COMPACT_AT.
+        """
+        with self._lock:
+            if self.journal_path and not compact and self._journal_records < JOURNAL_COMPACT_AT:
+                return False
+            if not self.dirty:
+                return False
+            # Pick up any external rewrite before overwriting the file.
+            if self._stat() != self._disk_sig:
+                self._load()
+            try:
+                _atomic_write_csv(self.filepath, self._rows, self.fieldnames)
+            except Exception as e:
+                print(f"    [File Error] Failed to flush {self.filepath}: {e}")
+                return False
+            if self.journal_path:
+                # Base is replaced first: a crash here just replays idempotent deltas.
+                self._close_journal()
+                if os.path.exists(self.journal_path):
+                    os.remove(self.journal_path)
+                self._journal_records = 0
+            self._pending = {}
+            self._disk_sig = self._stat()
+            self.last_flush = time.monotonic()
+            return True
+
+
+# --- Registry ---
+
+_tables: Dict[str, Any] = {}
+_registry_lock = threading.Lock()
+_flusher: Optional[threading.Thread] = None
+
+
+def _declared_fieldnames(filepath: str) -> List[str]:
+    """Looks up the declared headers for a table in db_helpers.files_and_headers."""
+    from .db_helpers import files_and_headers
+    return list(files_and_headers.get(filepath, []))
+
+
+def _declared_key(filepath: str) -> str:
+    """Looks up the unique key for a table in sync_manager.TABLE_CONFIG."""
+    from .sync_manager import TABLE_CONFIG
+    name = os.path.basename(filepath)
+    return next((conf['key'] for conf in TABLE_CONFIG.values() if conf['csv'] == name), '')
+
+
+def get_table(filepath: str, fieldnames: Optional[List[str]] = None, key: Optional[str] = None):
+    """
+    Returns the process-wide store for a CSV file, creating it on first use.
+    The store is a TableStore, or a SqliteTable when LEO_STORE_BACKEND=sqlite.
+    """
+    path = os.path.abspath(filepath)
+    with _registry_lock:
+        store = _tables.get(path)
+        if store is None:
+            fieldnames = fieldnames or _declared_fieldnames(path)
+            key = key or _declared_key(path)
+            if not key:
+                raise ValueError(f"No unique key declared for {os.path.basename(path)} in TABLE_CONFIG")
+            if STORE_BACKEND == 'sqlite':
+                from .sqlite_store import SqliteTable
+                store = SqliteTable(path, fieldnames, key)
+            else:
+                store = TableStore(path, fieldnames, key, journal=os.path.basename(path) in JOURNAL_TABLES)
+            _tables[path] = store
+        return store
+
+
+def take_changes(filepath: str, synced_sig: Optional[Tuple[int, int]]) -> Optional[Set[str]]:
+    """
+    Keys changed in a table since the last sync, or None if a full diff is needed.
+    Tables never opened by this process are compared by file signature only.
+    """
+    path = os.path.abspath(filepath)
+    with _registry_lock:
+        store = _tables.get(path)
+    if store is None:
+        try:
+            st = os.stat(path)
+            current = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            current = None
+        return set() if current == synced_sig else None
+    return store.take_changes(synced_sig)
+
+
+def restore_changes(filepath: str, keys: Set[str], synced_sig: Optional[Tuple[int, int]]):
+    """Re-queues keys returned by take_changes when the sync that took them did not complete."""
+    path = os.path.abspath(filepath)
+    with _registry_lock:
+        store = _tables.get(path)
+    if store is not None and keys:
+        store.restore_changes(keys, synced_sig)
+
+
+def mark_synced(filepath: str) -> Optional[Tuple[int, int]]:
+    """Records the current file as the sync baseline. Returns its signature."""
+    path = os.path.abspath(filepath)
+    with _registry_lock:
+        store = _tables.get(path)
+    if store is None:
+        try:
+            st = os.stat(path)
+            return st.st_mtime_ns, st.st_size
+        except FileNotFoundError:
+            return None
+    return store.mark_synced()
+
+
+def flush_all_tables(compact: bool = True) -> int:
+    """Flushes every dirty table (compacting journals unless compact=False). Returns tables written."""
+    with _registry_lock:
+        stores = list(_tables.values())
+    return sum(1 for store in stores if store.flush(compact=compact))
+
+
+def _flush_loop():
+    while True:
+        time.sleep(FLUSH_INTERVAL)
+        try:
+            flush_all_tables(compact=False)
+        except Exception as e:
+            print(f"    [Store Error] Background flush failed: {e}")
+
+
+def _start_flusher():
+    global _flusher
+    if _flusher is None:
+        with _registry_lock:
+            if _flusher is None:
+                _flusher = threading.Thread(target=_flush_loop, name="TableStoreFlusher", daemon=True)
+                _flusher.start()
+
+
+atexit.register(flush_all_tables)
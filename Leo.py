@@ -26,6 +26,7 @@ from Core.System.withdrawal_checker import (
 )
 from Data.Access.db_helpers import init_csvs, log_audit_event
 from Data.Access.sync_manager import SyncManager, run_full_sync
+from Data.Access.sync_worker import get_sync_worker
 from Data.Access.review_outcomes import run_review_process, run_accuracy_generation
 from Data.Access.prediction_accuracy import print_accuracy_report
 from Scripts.enrich_all_schedules import enrich_all_schedules
@@ -247,6 +248,8 @@ async def main():
                     log_audit_event("CYCLE_ERROR", f"Unhandled: {e}", status="failed")
                     await asyncio.sleep(60)
     finally:
+        # Push queued cloud rows while this loop (and its thread pool) is still up.
+        await get_sync_worker().shutdown_async()
         if os.path.exists(LOCK_FILE): os.remove(LOCK_FILE)
 
 async def main_offline_repredict():
@@ -260,6 +263,8 @@ async def main_offline_repredict():
             await run_flashscore_offline_repredict(p)
         except Exception as e:
             print(f"[ERROR] Offline repredict: {e}")
+        finally:
+            await get_sync_worker().shutdown_async()
 
 if __name__ == "__main__":
     args = parse_args()
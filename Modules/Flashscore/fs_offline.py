@@ -5,7 +5,8 @@
 from datetime import datetime as dt, timedelta
 from zoneinfo import ZoneInfo
 from playwright.async_api import Playwright
-from Data.Access.db_helpers import get_all_schedules, get_standings, save_prediction
+from Data.Access.db_helpers import get_all_schedules, save_prediction
+from Data.Access.history_index import get_history_index
 from Scripts.recommend_bets import get_recommendations
 from Core.Intelligence.model import RuleEngine
 from Core.Intelligence.rule_config import RuleConfig
@@ -56,56 +57,22 @@ async def run_flashscore_offline_repredict(playwright: Playwright, custom_config
     elif not to_process:
         return
 
-    # Sort historical matches once
-    def parse_date(d_str):
-        try:
-            return dt.strptime(d_str, "%d.%m.%Y")
-        except:
-            return dt.min
-
-    historical_matches = [m for m in all_schedules if m.get('match_status') != 'scheduled' and m.get('home_score') not in ('', 'N/A', None) and m.get('away_score') not in ('', 'N/A', None)]
-    historical_matches.sort(key=lambda x: parse_date(x.get('date', '')), reverse=True)
+    # One indexed pass over schedules/standings instead of a full scan per fixture
+    history = get_history_index()
 
     print(f"    [{mode_label}] Processing {len(to_process)} matches...")
 
     total_repredicted = 0
+    batch = []   # (match, analysis_input)
     for m in to_process:
         home_team = m.get('home_team')
         away_team = m.get('away_team')
         region_league = m.get('region_league', 'Unknown')
-        match_label = f"{home_team} vs {away_team}"
 
         # 1. Build H2H Data
-        home_last_10 = []
-        away_last_10 = []
-        h2h_list = []
-        
-        for hist in historical_matches:
-            h_home = hist.get('home_team')
-            h_away = hist.get('away_team')
-            hs = hist.get('home_score', '0')
-            ascore = hist.get('away_score', '0')
-            try:
-                hsi = int(hs)
-                asi = int(ascore)
-                winner = "Home" if hsi > asi else "Away" if asi > hsi else "Draw"
-            except:
-                winner = "Draw"
-                
-            mapped_hist = {
-                "date": hist.get("date"),
-                "home": h_home,
-                "away": h_away,
-                "score": f"{hs}-{ascore}",
-                "winner": winner
-            }
-
-            if (h_home == home_team or h_away == home_team) and len(home_last_10) < 10:
-                home_last_10.append(mapped_hist)
-            if (h_home == away_team or h_away == away_team) and len(away_last_10) < 10:
-                away_last_10.append(mapped_hist)
-            if ((h_home == home_team and h_away == away_team) or (h_home == away_team and h_away == home_team)):
-                h2h_list.append(mapped_hist)
+        home_last_10 = history.team_matches(home_team, limit=10)
+        away_last_10 = history.team_matches(away_team, limit=10)
+        h2h_list = history.head_to_head(home_team, away_team)
 
         h2h_data = {
             "home_team": home_team,
@@ -117,29 +84,24 @@ async def run_flashscore_offline_repredict(playwright: Playwright, custom_config
         }
 
         # 2. Get Standings
-        raw_standings = get_standings(region_league)
-        standings_data = []
-        for s in raw_standings:
-            try:
-                standings_data.append({
-                    "team_name": s.get("team_name"),
-                    "position": int(s.get("position", 0)),
-                    "goal_difference": int(s.get("goal_difference", 0)),
-                    "goals_for": int(s.get("goals_for", 0)),
-                    "goals_against": int(s.get("goals_against", 0))
-                })
-            except:
-                continue
+        standings_data = history.standings(region_league)
 
         # 3. Data Quality Validation
         if len(home_last_10) < 3 or len(away_last_10) < 3:
             continue
 
-        # 4. Predict
-        analysis_input = {"h2h_data": h2h_data, "standings": standings_data}
+        batch.append((m, {"h2h_data": h2h_data, "standings": standings_data}))
+
+    # 4. Predict (one batched pass over all fixtures)
+    predictions = RuleEngine.analyze_many([analysis_input for _, analysis_input in batch], config=custom_config)
+
+    for (m, _), prediction in zip(batch, predictions):
+        match_label = f"{m.get('home_team')} vs {m.get('away_team')}"
+        reason = prediction.get("reason")
+        if isinstance(reason, list) and reason and str(reason[0]).startswith("Analysis error:"):
+            print(f"      [Offline Error] Failed predicting {match_label}: {reason[0]}")
+            continue
         try:
-            prediction = RuleEngine.analyze(analysis_input, config=custom_config)
-            
             if prediction.get("type", "SKIP") != "SKIP":
                 match_data_for_save = m.copy()
                 match_data_for_save['id'] = m.get('fixture_id')
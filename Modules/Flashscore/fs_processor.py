@@ -6,8 +6,10 @@ import asyncio
 from playwright.async_api import Browser
 from Data.Access.db_helpers import save_prediction, save_region_league_entry, save_standings, save_team_entry
 from Core.Browser.site_helpers import fs_universal_popup_dismissal
+from Core.Browser.resource_router import apply_resource_profile
 from Core.Browser.Extractors.h2h_extractor import extract_h2h_data, activate_h2h_tab, save_extracted_h2h_to_schedules
 from Core.Browser.Extractors.standings_extractor import extract_standings_data, activate_standings_tab
+from Core.Browser.Extractors.match_metadata_extractor import extract_match_metadata
 from Core.Utils.monitor import PageMonitor
 from Core.Utils.utils import log_error_state
 import re
@@ -38,6 +40,7 @@ async def process_match_task(match_data: dict, browser: Browser):
         viewport={'width': 450, 'height': 900},
         timezone_id="Africa/Lagos"
     )
+    await apply_resource_profile(context, 'flashscore', 'Chapter 1A')
     page = await context.new_page()
     PageMonitor.attach_listeners(page)
     match_label = f"{match_data.get('home_team', 'unknown')}_vs_{match_data.get('away_team', 'unknown')}"
@@ -125,34 +128,29 @@ async def process_match_task(match_data: dict, browser: Browser):
         try:
             from Core.Intelligence.selector_manager import SelectorManager
             
-            sel_region_name = await SelectorManager.get_selector_auto(page, "fs_match_page", "region_name")
-            sel_region_flag = await SelectorManager.get_selector_auto(page, "fs_match_page", "region_flag_img")
-            sel_league_url = await SelectorManager.get_selector_auto(page, "fs_match_page", "league_url")
-            
-            sel_home_crest = await SelectorManager.get_selector_auto(page, "fs_match_page", "home_crest")
-            sel_home_url = await SelectorManager.get_selector_auto(page, "fs_match_page", "home_url")
-            sel_away_crest = await SelectorManager.get_selector_auto(page, "fs_match_page", "away_crest")
-            sel_away_url = await SelectorManager.get_selector_auto(page, "fs_match_page", "away_url")
-
-            region_name = await page.locator(sel_region_name).inner_text() if sel_region_name else "Unknown"
-            region_flag = await page.locator(sel_region_flag).get_attribute("src") if sel_region_flag else ""
-            region_url = await page.locator(sel_region_url).get_attribute("href") if sel_region_url else ""
-            league_url = await page.locator(sel_league_url).get_attribute("href") if sel_league_url else ""
-            league_name = await page.locator(sel_league_url).inner_text() if sel_league_url else "Unknown"
+            # One validation round trip for the whole block (and at most one AI repair).
+            meta_sel = await SelectorManager.get_selectors_auto(page, "fs_match_page", [
+                "region_name", "region_flag_img", "region_url", "league_url",
+                "home_crest", "home_url", "away_crest", "away_url",
+            ])
+
+            # All fields (and the tournamentId fallback) in one in-page read.
+            meta = await extract_match_metadata(page, groups=('league', 'teams'), selectors=meta_sel)
+
+            region_name = meta.region or "Unknown"
+            region_flag = meta.region_flag or ""
+            region_url = meta.region_url or ""
+            league_url = meta.league_url or ""
+            league_name = meta.league or "Unknown"
             
             # Extract rl_id from league URL fragment (e.g. #/ldxRUZwe)
-            # Or from page source if URL is generic
+            # Or from the tournamentId in the page scripts if URL is generic
             rl_id = ""
             if league_url and "#/" in league_url:
                 rl_id = league_url.split("#/")[-1]
             
             if not rl_id:
-                # Fallback: look for tournamentId in page source
-                content = await page.content()
-                import re
-                match = re.search(r"tournamentId[:\s]+'([^']+)'", content)
-                if match:
-                    rl_id = match.group(1)
+                rl_id = meta.tournament_id or ""
             
             if not rl_id:
                 rl_id = f"{region_name}_{league_name}".replace(' ', '_').replace('-', '_').upper()
@@ -177,8 +175,8 @@ async def process_match_task(match_data: dict, browser: Browser):
                 'team_id': match_data.get('home_team_id'),
                 'team_name': match_data.get('home_team'),
                 'rl_ids': rl_id,
-                'team_crest': await page.locator(sel_home_crest).get_attribute("src") if sel_home_crest else "",
-                'team_url': await page.locator(sel_home_url).get_attribute("href") if sel_home_url else ""
+                'team_crest': meta.home_crest or "",
+                'team_url': meta.home_url or ""
             })
 
             # Away Team
@@ -186,8 +184,8 @@ async def process_match_task(match_data: dict, browser: Browser):
                 'team_id': match_data.get('away_team_id'),
                 'team_name': match_data.get('away_team'),
                 'rl_ids': rl_id,
-                'team_crest': await page.locator(sel_away_crest).get_attribute("src") if sel_away_crest else "",
-                'team_url': await page.locator(sel_away_url).get_attribute("href") if sel_away_url else ""
+                'team_crest': meta.away_crest or "",
+                'team_url': meta.away_url or ""
             })
         except Exception as e:
             print(f"      [Warning] Failed to extract expanded metadata for {match_label}: {e}")
@@ -8,6 +8,7 @@ from playwright.async_api import Page
 from Core.Intelligence.selector_manager import SelectorManager
 from Data.Access.db_helpers import save_schedule_entry, save_team_entry
 from Data.Access.sync_manager import SyncManager
+from Data.Access.sync_worker import get_sync_worker
 
 async def extract_matches_from_page(page: Page) -> list:
     """
@@ -138,10 +139,11 @@ async def extract_matches_from_page(page: Page) -> list:
         # 3. Sync to Cloud
         if sync.supabase:
             print(f"    [Cloud] Upserting {len(matches)} schedules and {len(teams_to_sync)} teams...")
-            await sync.batch_upsert('schedules', matches)
-            # Deduplicate teams before sync
+            worker = get_sync_worker()
+            worker.enqueue_upsert('schedules', matches)
+            # Deduplicate teams before sync (the worker also coalesces by team_id)
             unique_teams = list({t['team_id']: t for t in teams_to_sync}.values())
-            await sync.batch_upsert('teams', unique_teams)
-            print(f"    [SUCCESS] Multi-table synchronization complete.")
+            worker.enqueue_upsert('teams', unique_teams)
+            print(f"    [SUCCESS] Queued multi-table synchronization (depth: {worker.stats()['queue_depth']}).")
 
     return matches
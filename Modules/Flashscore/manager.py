@@ -9,16 +9,21 @@ Pure coordinator of Chapter 1A and 1B logic.
 
 import asyncio
 import os
+import time
 from datetime import datetime as dt, timedelta
+from typing import AsyncIterator
 from zoneinfo import ZoneInfo
 from playwright.async_api import Playwright
 
 from Data.Access.db_helpers import (
-    get_last_processed_info, save_schedule_entry, save_team_entry
+    PREDICTIONS_CSV, get_last_processed_info, save_schedule_entry, save_team_entry
 )
+from Data.Access.table_store import get_table
+from Data.Access.sync_manager import run_full_sync
 from Core.Browser.site_helpers import fs_universal_popup_dismissal, click_next_day
-from Core.Utils.utils import BatchProcessor
+from Core.Browser.resource_router import apply_resource_profile, print_resource_report
 from Core.Utils.monitor import PageMonitor
+from Core.Utils.task_pool import AdaptiveTaskPool
 from Core.Intelligence.selector_manager import SelectorManager
 from Core.Utils.constants import NAVIGATION_TIMEOUT, WAIT_FOR_LOAD_STATE_TIMEOUT
 
@@ -29,10 +34,258 @@ from .fs_offline import run_flashscore_offline_repredict
 
 NIGERIA_TZ = ZoneInfo("Africa/Lagos")
 
+# --- Pipeline Configuration ---
+ANALYSIS_WORKERS = int(os.getenv('FLASHSCORE_CONCURRENCY', 5))          # Starting analysis workers (adapts from here)
+MIN_ANALYSIS_WORKERS = int(os.getenv('FLASHSCORE_MIN_CONCURRENCY', 2))
+MAX_ANALYSIS_WORKERS = int(os.getenv('FLASHSCORE_MAX_CONCURRENCY', 10))
+ANALYSIS_TIMEOUT = float(os.getenv('FLASHSCORE_TASK_TIMEOUT', 300))      # Per-fixture deadline (s); the fixture is cancelled
+ANALYSIS_RETRIES = int(os.getenv('FLASHSCORE_TASK_RETRIES', 1))          # Retries (with backoff) for fixtures that time out
+FIXTURE_QUEUE_SIZE = int(os.getenv('LEO_PIPELINE_QUEUE_SIZE', 50))       # Scraped fixtures buffered ahead of the workers
+SYNC_EVERY = int(os.getenv('LEO_PIPELINE_SYNC_EVERY', 10))               # New predictions per micro-batch sync
+SYNC_INTERVAL = float(os.getenv('LEO_PIPELINE_SYNC_INTERVAL', 120))      # ...or this often (s) while predictions are pending
+REPORT_INTERVAL = float(os.getenv('LEO_PIPELINE_REPORT_INTERVAL', 30))   # Progress line every N seconds
+DAYS_AHEAD = 7
+
+_DONE = None  # End-of-stream marker on the pipeline queues
+
+
+class PipelineStats:
+    """Per-stage counters for Chapter 1A, sampled by the progress reporter."""
+
+    def __init__(self, tasks: AdaptiveTaskPool, fixture_queue: asyncio.Queue, result_queue: asyncio.Queue):
+        self.started = time.monotonic()
+        self.tasks = tasks
+        self.fixture_queue = fixture_queue
+        self.result_queue = result_queue
+        self.days = 0
+        self.scheduled = 0            # Fixtures handed to the workers
+        self.producer_blocked = 0.0   # Seconds the producer waited on a full queue
+        self.analysed = 0
+        self.predictions = 0
+        self.syncs = 0
+        self.max_depth = 0
+
+    def sample_depth(self):
+        self.max_depth = max(self.max_depth, self.fixture_queue.qsize())
+
+    def _rate(self, count: int) -> float:
+        elapsed = time.monotonic() - self.started
+        return count / elapsed * 60 if elapsed > 0 else 0.0
+
+    def line(self) -> str:
+        self.sample_depth()
+        p95 = self.tasks.metrics.p95
+        return (
+            f"  [Pipeline] schedule: {self.days} days, {self.scheduled} fixtures ({self._rate(self.scheduled):.1f}/min)"
+            f" | queue {self.fixture_queue.qsize()}/{self.fixture_queue.maxsize} (max {self.max_depth})"
+            f" | analysis: {self.analysed} done, {self.tasks.in_flight}/{self.tasks.limit} in flight"
+            f" ({self._rate(self.analysed):.1f}/min{f', p95 {p95:.0f}s' if p95 is not None else ''})"
+            f" | persist: {self.predictions} predictions, {self.syncs} syncs, {self.result_queue.qsize()} queued"
+        )
+
+    def summary(self) -> str:
+        elapsed = time.monotonic() - self.started
+        limits = " -> ".join(str(limit) for _, limit in self.tasks.controller.history)
+        return "\n".join([
+            f"  [Pipeline] {elapsed:.0f}s total",
+            f"    schedule : {self.days} days, {self.scheduled} fixtures, {self._rate(self.scheduled):.1f}/min, "
+            f"{self.producer_blocked:.0f}s blocked on a full queue",
+            f"    analysis : {self.analysed} fixtures, {self._rate(self.analysed):.1f}/min, workers {limits}",
+            f"    persist  : {self.predictions} predictions, {self.syncs} micro-batch syncs",
+            f"    queue    : max depth {self.max_depth}/{self.fixture_queue.maxsize}",
+            self.tasks.report(),
+        ])
+
+
+def _is_time_parsable(t_str) -> bool:
+    try:
+        dt.strptime(t_str, '%H:%M')
+        return True
+    except (ValueError, TypeError):
+        return False
+
+
+async def _navigate_home(page) -> bool:
+    print("  [Navigation] Going to Flashscore...")
+    for attempt in range(5):
+        try:
+            await page.goto("https://www.flashscore.com/football/", wait_until="domcontentloaded", timeout=NAVIGATION_TIMEOUT)
+            print("  [Navigation] Flashscore loaded successfully.")
+            return True
+        except Exception as e:
+            print(f"  [Navigation Error] Attempt {attempt + 1}/5 failed: {e}")
+            if attempt < 4:
+                await asyncio.sleep(5)
+    print(f"  [Critical] All navigation attempts failed.")
+    return False
+
+
+async def _scrape_day(page, target_date) -> list:
+    """Schedule rows of the calendar day currently shown, saved to the DB; returns fixtures still to analyse."""
+    target_full = target_date.strftime("%d.%m.%Y")
+    print(f"\n--- ANALYZING DATE: {target_full} ---")
+    await fs_universal_popup_dismissal(page, "fs_home_page")
+
+    try:
+        scheduled_tab_sel = await SelectorManager.get_selector_auto(page, "fs_home_page", "tab_scheduled")
+        if scheduled_tab_sel and await page.locator(scheduled_tab_sel).is_visible(timeout=WAIT_FOR_LOAD_STATE_TIMEOUT):
+            await page.click(scheduled_tab_sel)
+            await asyncio.sleep(2.0)
+    except Exception:
+        pass
+
+    await fs_universal_popup_dismissal(page, "fs_home_page")
+    matches_data = await extract_matches_from_page(page)
+
+    # --- Cleaning & Sorting ---
+    for m in matches_data:
+        original_time_str = m.get('time')
+        if original_time_str:
+            clean_time_str = original_time_str.split('\n')[0].strip()
+            m['time'] = clean_time_str if clean_time_str and clean_time_str != 'N/A' else 'N/A'
+
+    matches_data.sort(key=lambda x: x.get('time', '23:59'))
+
+    # --- Save to DB & Filter ---
+    predictions = get_table(PREDICTIONS_CSV, key='fixture_id')  # Live view: includes this run's predictions
+    valid_matches = []
+    now_time = dt.now(NIGERIA_TZ).time()
+    is_today = target_date.date() == dt.now(NIGERIA_TZ).date()
+
+    for m in matches_data:
+        fixture_id = m.get('id')
+        m['date'] = target_full
+        save_schedule_entry({
+            'fixture_id': fixture_id, 'date': m.get('date'), 'match_time': m.get('time'),
+            'region_league': m.get('region_league'), 'home_team': m.get('home_team'),
+            'away_team': m.get('away_team'), 'home_team_id': m.get('home_team_id'),
+            'away_team_id': m.get('away_team_id'), 'match_status': 'scheduled',
+            'match_link': m.get('match_link')
+        })
+        save_team_entry({'team_id': m.get('home_team_id'), 'team_name': m.get('home_team'), 'region_league': m.get('region_league'), 'team_url': m.get('home_team_url')})
+        save_team_entry({'team_id': m.get('away_team_id'), 'team_name': m.get('away_team'), 'region_league': m.get('region_league'), 'team_url': m.get('away_team_url')})
+
+        # Robust Resume: Skip if already predicted
+        if fixture_id and predictions.get(fixture_id) is not None:
+            continue
+
+        if is_today:
+            time_str = m.get('time')
+            if _is_time_parsable(time_str):
+                if dt.strptime(time_str, '%H:%M').time() > now_time:
+                    valid_matches.append(m)
+            else:
+                # Non-parsable time (Postponed, etc) - Keep it in valid_matches for analysis
+                # unless it's explicitly 'N/A' or 'Fin'
+                if time_str not in ('N/A', 'Fin', 'Finished', 'CAN'):
+                    valid_matches.append(m)
+        else:
+            valid_matches.append(m)
+    return valid_matches
+
+
+async def _schedule_stage(page, fixture_queue: asyncio.Queue, stats: PipelineStats):
+    """Producer: walks the calendar and emits fixtures; a full queue pauses it (backpressure)."""
+    queued = set()
+    try:
+        last_processed_info = get_last_processed_info()
+        print(f"  [Chapter 1A] Starting analysis loop for {DAYS_AHEAD} days...")
+        for day_offset in range(DAYS_AHEAD):
+            target_date = dt.now(NIGERIA_TZ) + timedelta(days=day_offset)
+
+            if day_offset > 0:
+                match_row_sel = await SelectorManager.get_selector_auto(page, "fs_home_page", "match_rows")
+                if not match_row_sel or not await click_next_day(page, match_row_sel):
+                    break
+                await asyncio.sleep(2)
+
+            if last_processed_info.get('date_obj') and target_date.date() < last_processed_info['date_obj']:
+                continue
+
+            valid_matches = [m for m in await _scrape_day(page, target_date) if m.get('id') not in queued]
+            stats.days += 1
+            if not valid_matches:
+                print("    [Info] No new matches to process.")
+                continue
+            print(f"    [Pipeline] Queueing {len(valid_matches)} matches ({stats.tasks.limit} analysis workers)...")
+            for m in valid_matches:
+                queued.add(m.get('id'))
+                if fixture_queue.full():
+                    blocked = time.monotonic()
+                    await fixture_queue.put(m)
+                    stats.producer_blocked += time.monotonic() - blocked
+                else:
+                    fixture_queue.put_nowait(m)
+                stats.scheduled += 1
+                stats.sample_depth()
+    except Exception as e:
+        print(f"  [Pipeline Error] Schedule stage stopped: {e}")
+    # Not in a finally: once cancelled, waiting on a full queue would hang the shutdown.
+    await fixture_queue.put(_DONE)
+
+
+async def _drain(fixture_queue: asyncio.Queue) -> AsyncIterator[dict]:
+    while True:
+        match = await fixture_queue.get()
+        if match is _DONE:
+            return
+        yield match
+
+
+async def _analysis_stage(browser, fixture_queue: asyncio.Queue, result_queue: asyncio.Queue, stats: PipelineStats):
+    """Consumer: the adaptive task pool pulls fixtures as slots free up, so no worker waits on a straggler."""
+    results = stats.tasks.map(process_match_task, _drain(fixture_queue), browser=browser)
+    try:
+        async for match, ok in results:
+            stats.analysed += 1
+            await result_queue.put((match, bool(ok)))
+    finally:
+        await results.aclose()
+
+
+async def _persist_stage(result_queue: asyncio.Queue, stats: PipelineStats):
+    """Batches finished fixtures into background micro-batch syncs (every SYNC_EVERY predictions or SYNC_INTERVAL)."""
+    pending = 0
+    last_sync = time.monotonic()
+
+    async def sync(reason: str):
+        nonlocal pending, last_sync
+        print(f"\n   [Analytics Sync] {stats.predictions} predictions generated ({reason}). Triggering micro-batch sync...")
+        # Hands off to the sync worker thread: analysis never waits on the cloud.
+        await run_full_sync(session_name="Chapter 1A Micro-batch", background=True)
+        stats.syncs += 1
+        pending, last_sync = 0, time.monotonic()
+
+    while True:
+        try:
+            item = await asyncio.wait_for(result_queue.get(), timeout=SYNC_INTERVAL)
+        except asyncio.TimeoutError:
+            item = ()
+        if item is _DONE:
+            break
+        if item and item[1]:
+            stats.predictions += 1
+            pending += 1
+        if pending >= SYNC_EVERY:
+            await sync(f"+{pending}")
+        elif pending and time.monotonic() - last_sync >= SYNC_INTERVAL:
+            await sync("interval")
+    if pending:
+        await sync("final")
+
+
+async def _report_stage(stats: PipelineStats):
+    while True:
+        await asyncio.sleep(REPORT_INTERVAL)
+        print(stats.line())
+
+
 async def run_flashscore_analysis(playwright: Playwright):
     """
     Main function to handle Flashscore data extraction and analysis.
-    Coordinates browser launch, navigation, schedule extraction, and batch processing.
+    Runs Chapter 1A as a pipeline: the schedule stage walks the calendar into a bounded
+    fixture queue, an adaptive task pool of analysis workers drains it without chunk barriers,
+    and the persist stage batches new predictions into background syncs.
     """
     print("\n--- Running Chapter 1A/1B: Data Extraction & Analysis ---")
 
@@ -42,163 +295,56 @@ async def run_flashscore_analysis(playwright: Playwright):
     )
 
     context = None
+    stats = None
     try:
         context = await browser.new_context(
             user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
             timezone_id="Africa/Lagos"
         )
+        await apply_resource_profile(context, 'flashscore', 'Chapter 1A')
         page = await context.new_page()
         PageMonitor.attach_listeners(page)
-        
-        # Concurrency settings from environment (as baseline)
-        env_concurrency = int(os.getenv('FLASHSCORE_CONCURRENCY', 5))
-
-        total_cycle_predictions = 0
 
         # --- Navigation ---
-        print("  [Navigation] Going to Flashscore...")
-        for attempt in range(5):
-            try:
-                await page.goto("https://www.flashscore.com/football/", wait_until="domcontentloaded", timeout=NAVIGATION_TIMEOUT)
-                print("  [Navigation] Flashscore loaded successfully.")
-                break 
-            except Exception as e:
-                print(f"  [Navigation Error] Attempt {attempt + 1}/5 failed: {e}")
-                if attempt < 4:
-                    await asyncio.sleep(5)
-                else:
-                    print(f"  [Critical] All navigation attempts failed.")
-                    await context.close()
-                    return
-                    
+        if not await _navigate_home(page):
+            return
         await fs_universal_popup_dismissal(page, "fs_home_page")
 
-        last_processed_info = get_last_processed_info()
-        print(f"  [Chapter 1A] Starting analysis loop for 7 days...")
-        for day_offset in range(7):
-            target_date = dt.now(NIGERIA_TZ) + timedelta(days=day_offset)
-            target_full = target_date.strftime("%d.%m.%Y")
-            
-            if day_offset > 0:
-                match_row_sel = await SelectorManager.get_selector_auto(page, "fs_home_page", "match_rows")
-                if not match_row_sel or not await click_next_day(page, match_row_sel):
-                    break
-                await asyncio.sleep(2)
+        # --- Pipeline: schedule -> analysis workers -> persist/sync ---
+        tasks = AdaptiveTaskPool('Chapter 1A', min_workers=MIN_ANALYSIS_WORKERS, max_workers=MAX_ANALYSIS_WORKERS,
+                                 initial=ANALYSIS_WORKERS, timeout=ANALYSIS_TIMEOUT, retries=ANALYSIS_RETRIES)
+        fixture_queue = asyncio.Queue(maxsize=max(tasks.controller.maximum, FIXTURE_QUEUE_SIZE))
+        result_queue = asyncio.Queue()
+        stats = PipelineStats(tasks, fixture_queue, result_queue)
 
-            if last_processed_info.get('date_obj') and target_date.date() < last_processed_info['date_obj']:
-                continue
-
-            print(f"\n--- ANALYZING DATE: {target_full} ---")
-            await fs_universal_popup_dismissal(page, "fs_home_page")
-
-            try:
-                scheduled_tab_sel = await SelectorManager.get_selector_auto(page, "fs_home_page", "tab_scheduled")
-                if scheduled_tab_sel and await page.locator(scheduled_tab_sel).is_visible(timeout=WAIT_FOR_LOAD_STATE_TIMEOUT):
-                    await page.click(scheduled_tab_sel)
-                    await asyncio.sleep(2.0)
-            except Exception:
-                pass
-
-            await fs_universal_popup_dismissal(page, "fs_home_page")
-            matches_data = await extract_matches_from_page(page)
-            
-            # --- Cleaning & Sorting ---
-            for m in matches_data:
-                original_time_str = m.get('time')
-                if original_time_str:
-                    clean_time_str = original_time_str.split('\n')[0].strip()
-                    m['time'] = clean_time_str if clean_time_str and clean_time_str != 'N/A' else 'N/A'
-
-            matches_data.sort(key=lambda x: x.get('time', '23:59'))
-
-            # --- Load existing predictions for robust resume ---
-            from Data.Access.db_helpers import PREDICTIONS_CSV
-            import csv
-            existing_ids = set()
-            if os.path.exists(PREDICTIONS_CSV):
-                try:
-                    with open(PREDICTIONS_CSV, 'r', encoding='utf-8') as f:
-                        reader = csv.DictReader(f)
-                        existing_ids = {row['fixture_id'] for row in reader if row.get('fixture_id')}
-                except Exception:
-                    pass
-
-            # --- Save to DB & Filter ---
-            valid_matches = []
-            now_time = dt.now(NIGERIA_TZ).time()
-            is_today = target_date.date() == dt.now(NIGERIA_TZ).date()
-
-            def is_time_parsable(t_str):
-                try:
-                    dt.strptime(t_str, '%H:%M')
-                    return True
-                except (ValueError, TypeError):
-                    return False
-
-            for m in matches_data:
-                fixture_id = m.get('id')
-                m['date'] = target_full
-                save_schedule_entry({
-                    'fixture_id': fixture_id, 'date': m.get('date'), 'match_time': m.get('time'),
-                    'region_league': m.get('region_league'), 'home_team': m.get('home_team'),
-                    'away_team': m.get('away_team'), 'home_team_id': m.get('home_team_id'),
-                    'away_team_id': m.get('away_team_id'), 'match_status': 'scheduled',
-                    'match_link': m.get('match_link')
-                })
-                save_team_entry({'team_id': m.get('home_team_id'), 'team_name': m.get('home_team'), 'region_league': m.get('region_league'), 'team_url': m.get('home_team_url')})
-                save_team_entry({'team_id': m.get('away_team_id'), 'team_name': m.get('away_team'), 'region_league': m.get('region_league'), 'team_url': m.get('away_team_url')})
-
-                # Robust Resume: Skip if already predicted
-                if fixture_id in existing_ids:
-                    continue
-
-                if is_today:
-                    time_str = m.get('time')
-                    if is_time_parsable(time_str):
-                        if dt.strptime(time_str, '%H:%M').time() > now_time:
-                            valid_matches.append(m)
-                    else:
-                        # Non-parsable time (Postponed, etc) - Keep it in valid_matches for analysis
-                        # unless it's explicitly 'N/A' or 'Fin'
-                        if time_str not in ('N/A', 'Fin', 'Finished', 'CAN'):
-                            valid_matches.append(m)
-                else:
-                    valid_matches.append(m)
-
-            # --- Batch Processing With Dynamic Concurrency ---
-            if valid_matches:
-                # Dynamic scaling
-                if len(valid_matches) > 100:
-                    max_concurrent = min(env_concurrency + 3, 10) # Aggressive
-                elif len(valid_matches) < 20:
-                    max_concurrent = max(env_concurrency - 2, 2) # Conservative
-                else:
-                    max_concurrent = env_concurrency             # Standard
-                
-                print(f"    [Batching] Processing {len(valid_matches)} matches concurrently (Scaling: {max_concurrent})...")
-                processor = BatchProcessor(max_concurrent=max_concurrent)
-                
-                # Process in smaller chunks to trigger frequent syncs
-                analysis_chunk_size = 10
-                for i in range(0, len(valid_matches), analysis_chunk_size):
-                    chunk = valid_matches[i:i + analysis_chunk_size]
-                    chunk_results = await processor.run_batch(chunk, process_match_task, browser=browser)
-                    
-                    successful_in_chunk = sum(1 for r in chunk_results if r)
-                    total_cycle_predictions += successful_in_chunk
-                    
-                    if successful_in_chunk > 0:
-                        print(f"\n   [Analytics Sync] {total_cycle_predictions} predictions generated. Triggering micro-batch sync...")
-                        from Data.Access.sync_manager import run_full_sync
-                        await run_full_sync()
-            else:
-                print("    [Info] No new matches to process.")
+        persister = asyncio.create_task(_persist_stage(result_queue, stats))
+        reporter = asyncio.create_task(_report_stage(stats))
+        producer = asyncio.create_task(_schedule_stage(page, fixture_queue, stats), name='schedule stage')
+        analysis = asyncio.create_task(_analysis_stage(browser, fixture_queue, result_queue, stats), name='analysis stage')
+        try:
+            # If either stage dies the other would block forever on the bounded queue, so stop it too.
+            done, pending = await asyncio.wait((producer, analysis), return_when=asyncio.FIRST_EXCEPTION)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            failed = next((t for t in done if not t.cancelled() and t.exception() is not None), None)
+            if failed is not None:
+                print(f"  [Pipeline Error] {failed.get_name().capitalize()} failed, stopping the pipeline: {failed.exception()}")
+            await result_queue.put(_DONE)
+            await persister
+            if failed is not None:
+                raise failed.exception()
+        finally:
+            for task in (reporter, producer, analysis, persister):
+                task.cancel()
+            await asyncio.gather(reporter, producer, analysis, persister, return_exceptions=True)
 
     finally:
         if context is not None:
             await context.close()
         if 'browser' in locals():
              await browser.close()
-             
-    print(f"\n--- Data Extraction & Analysis Complete: {total_cycle_predictions} new predictions found. ---")
 
+    print(stats.summary())
+    print(f"\n--- Data Extraction & Analysis Complete: {stats.predictions} new predictions found. ---")
+    print_resource_report('Chapter 1A')
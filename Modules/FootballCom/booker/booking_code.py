@@ -4,6 +4,7 @@ Handles adding selections to the slip and finalizing accumulators.
 """
 
 import asyncio
+import os
 from typing import List, Dict
 from pathlib import Path
 from datetime import datetime as dt
@@ -26,6 +27,10 @@ from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 
 from .slip import force_clear_slip
 from Data.Access.sync_manager import run_full_sync
+from Core.Utils.task_pool import AdaptiveTaskPool
+
+HARVEST_TIMEOUT = float(os.getenv('LEO_HARVEST_TIMEOUT', 180))  # Per-match deadline (s); a hung harvest is cancelled
+HARVEST_RETRIES = int(os.getenv('LEO_HARVEST_RETRIES', 0))      # Retries for harvests that time out (slip is cleared first)
 
 async def ensure_bet_insights_collapsed(page: Page):
     """Ensure the bet insights widget is collapsed to prevent obstruction."""
@@ -120,21 +125,34 @@ async def harvest_booking_codes(page: Page, matched_urls: Dict[str, str], day_pr
     Chapter 1C: Odds Selection & Extraction.
     Follows flowchart: Navigate -> Select -> Book -> Save Code -> Clear Slip.
     Includes 10-harvest progressive synchronization to Supabase.
+    Harvests run one at a time (they share the account's bet slip) through a task
+    pool that cancels a harvest running past HARVEST_TIMEOUT.
     """
     processed_urls = set()
     harvest_success_count = 0
+    slip_clean = True
 
     # Pre-emptive clear ensuring a fresh start
     await force_clear_slip(page)
 
+    queue = []
     for match_id, match_url in matched_urls.items():
         if not match_url or match_url in processed_urls: continue
         
         pred = next((p for p in day_predictions if str(p.get('fixture_id', '')) == str(match_id)), None)
         if not pred or pred.get('prediction') == 'SKIP': continue
+        processed_urls.add(match_url)
+        queue.append((match_id, match_url, pred))
 
+    async def harvest_one(entry):
+        nonlocal harvest_success_count, slip_clean
+        match_id, match_url, pred = entry
         print(f"\n   [Harvest] Processing: {pred['home_team']} vs {pred['away_team']}")
-        processed_urls.add(match_url)
+
+        if not slip_clean:
+            # The previous harvest was cancelled mid-way: never book on top of its selection.
+            await force_clear_slip(page)
+        slip_clean = False
 
         try:
             # 1. Navigation
@@ -147,7 +165,8 @@ async def harvest_booking_codes(page: Page, matched_urls: Dict[str, str], day_pr
             m_name, o_name = await find_market_and_outcome(pred)
             if not m_name:
                 print(f"    [Info] No market found for prediction: {pred.get('prediction', 'N/A')}")
-                continue
+                slip_clean = True
+                return
 
             # 3. Search & Click Outcome
             bet_added, odds = await find_and_click_outcome(page, m_name, o_name)
@@ -172,7 +191,7 @@ async def harvest_booking_codes(page: Page, matched_urls: Dict[str, str], day_pr
                         harvest_success_count += 1
                         if harvest_success_count % 10 == 0:
                             print(f"\n    [Harvest Sync] Reached {harvest_success_count} successful harvests. Triggering cloud sync...")
-                            await run_full_sync()
+                            await run_full_sync(session_name="Harvest Progressive", background=True)
                 
                 # Close Modal if open
                 close_sel = await get_selector_auto(page, "fb_match_page", "modal_close_button")
@@ -182,6 +201,7 @@ async def harvest_booking_codes(page: Page, matched_urls: Dict[str, str], day_pr
 
                 # 5. Force Clear Slip (Crucial step in flowchart)
                 await force_clear_slip(page)
+                slip_clean = True
             else:
                 print(f"    [Error] Could not add outcome '{o_name}' for matching fixture.")
                 update_prediction_status(match_id, target_date, 'failed_harvest')
@@ -190,6 +210,12 @@ async def harvest_booking_codes(page: Page, matched_urls: Dict[str, str], day_pr
             print(f"    [Error] Harvest failed for match {match_id}: {e}")
             await capture_debug_snapshot(page, f"harvest_fail_{match_id}")
 
+    tasks = AdaptiveTaskPool('Chapter 1C harvest', min_workers=1, max_workers=1, adaptive=False,
+                             timeout=HARVEST_TIMEOUT, retries=HARVEST_RETRIES)
+    await tasks.run(queue, harvest_one)
+    if queue:
+        print(tasks.report())
+
     # Final sync if any new harvests occurred
     if harvest_success_count > 0 and harvest_success_count % 10 != 0:
         print(f"\n    [Harvest Sync] Finalizing sync for {harvest_success_count} harvests...")
@@ -373,7 +399,6 @@ async def save_booking_code(target_date: str, booking_code: str, page: Page):
     Save booking code to file and capture betslip screenshot.
     Stores in DB/bookings.txt with timestamp and date association.
     """
-    from pathlib import Path
     
     try:
         # Save to bookings file
@@ -18,15 +18,17 @@ from .fb_url_resolver import resolve_urls
 from .navigator import load_or_create_session, extract_balance
 from Core.Utils.utils import log_error_state
 from Core.Utils.monitor import PageMonitor
+from Core.Browser.resource_router import apply_resource_profile, print_resource_report
 from Core.System.lifecycle import log_state
 
 
-async def _create_session(playwright: Playwright):
+async def _create_session(playwright: Playwright, chapter: str = "Football.com"):
     """Shared session setup: launch browser, login, extract balance. Returns (context, page, balance)."""
     user_data_dir = Path("Data/Auth/ChromeData_v3").absolute()
     user_data_dir.mkdir(parents=True, exist_ok=True)
 
     context = await launch_browser_with_retry(playwright, user_data_dir)
+    await apply_resource_profile(context, 'football_com', chapter)
     _, page = await load_or_create_session(context)
     PageMonitor.attach_listeners(page)
 
@@ -55,7 +57,7 @@ async def run_odds_harvesting(playwright: Playwright):
         context = None
         try:
             print(f"  [System] Launching Harvest Session (Restart {restarts}/{max_restarts})...")
-            context, page, _ = await _create_session(playwright)
+            context, page, _ = await _create_session(playwright, "Chapter 1C")
             log_state(chapter="Chapter 1C", action="Harvesting odds")
 
             for target_date, day_preds in sorted(predictions_by_date.items()):
@@ -91,6 +93,8 @@ async def run_odds_harvesting(playwright: Playwright):
                 try: await context.close()
                 except: pass
 
+    print_resource_report("Chapter 1C")
+
 
 async def run_automated_booking(playwright: Playwright):
     """
@@ -124,7 +128,7 @@ async def run_automated_booking(playwright: Playwright):
         context = None
         try:
             print(f"  [System] Launching Booking Session (Restart {restarts}/{max_restarts})...")
-            context, page, current_balance = await _create_session(playwright)
+            context, page, current_balance = await _create_session(playwright, "Chapter 2A")
             log_state(chapter="Chapter 2A", action="Placing bets")
 
             from Modules.FootballCom.booker.placement import place_multi_bet_from_codes
@@ -154,6 +158,8 @@ async def run_automated_booking(playwright: Playwright):
                 try: await context.close()
                 except: pass
 
+    print_resource_report("Chapter 2A")
+
 
 # Backward compat — keep old name pointing to harvesting for any legacy callers
 async def run_football_com_booking(playwright: Playwright):
@@ -77,7 +77,7 @@ async def resolve_urls(page: Page, target_date: str) -> dict:
             resolved_count += 1
             if resolved_count % 10 == 0:
                 print(f"\n    [Progressive Sync] Reached {resolved_count} mappings. Triggering cloud sync...")
-                await run_full_sync()
+                await run_full_sync(session_name="URL Resolver Progressive", background=True)
     
     # Final sync if any mappings occurred
     if resolved_count > 0 and resolved_count % 10 != 0:
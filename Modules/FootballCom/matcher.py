@@ -7,13 +7,13 @@ Matcher Module
 Handles matching predictions.csv data with extracted Football.com matches using Leo AI.
 """
 
-import csv
 import difflib
 from typing import List, Dict, Optional, Any
 from datetime import datetime, timedelta
 
 from pathlib import Path
 from Data.Access.db_helpers import PREDICTIONS_CSV, update_prediction_status
+from Data.Access.table_store import get_table
 # Import LLM matcher conditionally
 try:
     import Core.Intelligence.llm_matcher as llm_module
@@ -37,11 +37,10 @@ async def filter_pending_predictions() -> List[Dict]:
     pending_predictions = []
     csv_path = Path(PREDICTIONS_CSV)
     if csv_path.exists():
-        with open(csv_path, 'r', newline='', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            # v2.8: Pick 'pending' and 'failed_harvest' (to allow retries).
-            # Statuses like 'no_site_match', 'added_to_slip', 'booked' are skipped.
-            pending_predictions = [row for row in reader if row.get('status') in ['pending', 'failed_harvest']]
+        # v2.8: Pick 'pending' and 'failed_harvest' (to allow retries).
+        # Statuses like 'no_site_match', 'added_to_slip', 'booked' are skipped.
+        table = get_table(PREDICTIONS_CSV, key='fixture_id')
+        pending_predictions = [row for row in table.rows() if row.get('status') in ['pending', 'failed_harvest']]
     print(f"  [Matcher] Found {len(pending_predictions)} pending predictions.")
     return pending_predictions
 
@@ -73,11 +72,7 @@ def calculate_similarity(str1: str, str2: str) -> float:
     norm1 = normalize_team_name(str1)
     norm2 = normalize_team_name(str2)
     if HAS_RAPIDFUZZ:
-        try:
-            from rapidfuzz import fuzz
-            return fuzz.token_set_ratio(norm1, norm2) / 100.0
-        except ImportError:
-            return difflib.SequenceMatcher(None, norm1, norm2).ratio()
+        return fuzz.token_set_ratio(norm1, norm2) / 100.0
     else:
         return difflib.SequenceMatcher(None, norm1, norm2).ratio()
 
@@ -9,18 +9,35 @@ import traceback
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.append(PROJECT_ROOT)
 
-from Modules.Flashscore.fs_offline import run_flashscore_offline_repredict
-from Core.Intelligence.rule_config import RuleConfig
+import pandas as pd
 
-import asyncio
+from Core.Intelligence.backtest_engine import run_backtest, config_sample
+from Core.Intelligence.rule_config import RuleConfig
 
 STORE_PATH = os.path.join(PROJECT_ROOT, "Data", "Store")
 TRIGGER_FILE = os.path.join(STORE_PATH, "trigger_backtest.json")
 CONFIG_FILE = os.path.join(STORE_PATH, "rule_config.json")
+PREDICTION_COLUMNS = ['fixture_id', 'date', 'home_team', 'away_team', 'prediction', 'confidence',
+                      'actual_score', 'outcome_correct', 'config_name']
+
+def run_config_backtest(config, trigger_data):
+    """
+    Runs the requested config (plus an optional random sweep around it, via the
+    trigger's "sample" / "spread" keys) on the multi-core backtest engine and
+    writes the app's predictions_custom_<name>.csv in one batch.
+    """
+    configs = [config]
+    if trigger_data.get('sample'):
+        configs += config_sample(int(trigger_data['sample']), spread=float(trigger_data.get('spread', 0.5)), base=config)
 
-async def run_backtest(config):
-    # Pass None for playwright as it appears unused in offline mode
-    await run_flashscore_offline_repredict(playwright=None, custom_config=config)
+    run = run_backtest(configs, keep_predictions=True)
+    rows = run['predictions'].get(config.name, [])
+    pd.DataFrame(rows, columns=PREDICTION_COLUMNS).to_csv(
+        os.path.join(STORE_PATH, f"predictions_custom_{config.name}.csv"), index=False
+    )
+    summary = next((r for r in run['results'] if r['config_name'] == config.name and r['scope'] == 'ALL'), None)
+    if summary:
+        print(f"{config.name}: {summary['evaluated']} graded, hit rate {summary['hit_rate']}%, ROI {summary['roi_pct']}%")
 
 def monitor():
     print(f"--- LeoBook Backtest Monitor Started ---")
@@ -31,6 +48,7 @@ def monitor():
             print("\n[Trigger Detected] Starting Backtest...")
             try:
                 # Read trigger info
+                trigger_data = {}
                 try:
                      with open(TRIGGER_FILE, 'r') as f:
                         trigger_data = json.load(f)
@@ -50,10 +68,9 @@ def monitor():
                         config = RuleConfig(**filtered_data)
                         
                         print(f"Loaded Config: {config.name}")
-                        print("Running Repredict...")
+                        print("Running Backtest...")
                         
-                        # Run Async
-                        asyncio.run(run_backtest(config))
+                        run_config_backtest(config, trigger_data)
                         print("Backtest Complete.")
                 else:
                     print("Error: Config file not found at " + CONFIG_FILE)
@@ -0,0 +1,134 @@
+# bench_feature_store.py: Round-trip check and season-scale timing for the feature store.
+# Refactored for Clean Architecture (v2.8)
+# This script records synthetic predictions, reloads them and times the training / learning joins.
+
+"""
+Usage:
+    python Scripts/bench_feature_store.py [--predictions 20000] [--seed 7]
+
+Runs RuleEngine.analyze_many over synthetic fixtures (Scripts/bench_rule_engine.py),
+records every result into a FeatureStore in a temporary directory, then:
+  1. reloads the chunks and checks features, fired rules and market probabilities
+     against the in-memory results (including a re-predicted fixture keeping its latest row),
+  2. grades each prediction and times the learning-engine tally (store join)
+     against the old per-row reason-phrase scan,
+  3. times a full retrain (join + fit_models + 5-fold CV) on the joined features.
+Exits non-zero if the round trip does not match.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+import numpy as np
+
+# Add project root to path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.append(project_root)
+
+from Core.Intelligence.compiled_rules import RULES
+from Core.Intelligence.learning_engine import LearningEngine
+from Core.Intelligence.ml_model import MLModel
+from Core.Intelligence.rule_engine import RuleEngine
+from Data.Access.feature_store import FeatureStore, MARKET_FIELDS
+from Scripts.bench_rule_engine import synthetic_fixture
+
+
+def legacy_tally(reasons, leagues, correct):
+    """Pre-store attribution: substring scan of the joined reason text per row."""
+    performance = {}
+    for text, league, ok in zip(reasons, leagues, correct):
+        for phrase, rule_key in LearningEngine.REASON_TO_RULE_MAP.items():
+            if phrase in text:
+                for scope in (league, "GLOBAL"):
+                    stats = performance.setdefault(scope, {}).setdefault(rule_key, {"correct": 0, "total": 0})
+                    stats["total"] += 1
+                    stats["correct"] += int(ok)
+    return performance
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Feature store round trip and season-scale timings.")
+    parser.add_argument('--predictions', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    fixtures = [synthetic_fixture(rng) for _ in range(args.predictions)]
+    results = RuleEngine.analyze_many(fixtures)
+    saved = [(f"fx{i}", r) for i, r in enumerate(results) if r.get("feature_record")]
+    leagues = [rng.choice(["England: Premier League", "Spain: LaLiga", "Italy: Serie A"]) for _ in saved]
+    print(f"{len(saved):,} of {len(fixtures):,} synthetic fixtures produced a prediction")
+
+    store = FeatureStore(tempfile.mkdtemp(prefix='leo_features_'))
+    t0 = time.perf_counter()
+    for (fixture_id, result), league in zip(saved, leagues):
+        store.record(fixture_id, league, result["feature_record"])
+    # A re-prediction of the first fixture must replace its row.
+    replacement = dict(saved[1][1]["feature_record"])
+    store.record(saved[0][0], leagues[0], replacement)
+    store.flush()
+    t_write = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    frame = store.load()
+    t_load = time.perf_counter() - t0
+    print(f"\n  record + flush:      {t_write:8.3f}s  ({len(os.listdir(store.directory))} chunks)")
+    print(f"  load:                {t_load:8.3f}s  ({len(frame):,} rows)")
+
+    # 1. Round trip
+    failures = 0
+    ids = np.array([fixture_id for fixture_id, _ in saved])
+    rows = frame.locate(ids)
+    features = frame.columns('features', MLModel.FEATURES)
+    rules = frame.columns('rules', [rule[0] for rule in RULES])
+    markets = frame.columns('markets', list(MARKET_FIELDS))
+    for i, (fixture_id, result) in enumerate(saved):
+        record = replacement if i == 0 else result["feature_record"]
+        expected_features = np.array(record["features"] if record["features"] is not None else [np.nan] * len(MLModel.FEATURES))
+        expected_rules = [rule[0] in record["rules"] for rule in RULES]
+        expected_markets = [record["markets"][name] for name in MARKET_FIELDS]
+        r = rows[i]
+        if r < 0 or not np.array_equal(features[r], expected_features, equal_nan=True) \
+                or rules[r].tolist() != expected_rules or not np.allclose(markets[r], expected_markets):
+            failures += 1
+    print(f"  Round trip: {'OK' if not failures else f'{failures} MISMATCHES'}")
+
+    # 2. Learning-engine attribution
+    correct = np.array([rng.random() < 0.55 for _ in saved])
+    reasons = [" | ".join(result.get("reason", [])) for _, result in saved]
+    t0 = time.perf_counter()
+    legacy_tally(reasons, leagues, correct)
+    t_legacy = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    weight_keys = list(dict.fromkeys(rule[2] for rule in RULES))
+    membership = np.array([[rule[2] == key for key in weight_keys] for rule in RULES], dtype=np.int32)
+    key_hits = (frame.columns('rules', [rule[0] for rule in RULES])[rows].astype(np.int32) @ membership) > 0
+    performance = defaultdict(lambda: defaultdict(lambda: {"correct": 0, "total": 0}))
+    LearningEngine._tally(performance, np.array(leagues), correct, key_hits, weight_keys)
+    t_store = time.perf_counter() - t0
+    print(f"\n  rule attribution, reason-text scan: {t_legacy:8.3f}s  ({len(LearningEngine.REASON_TO_RULE_MAP)} phrases)")
+    print(f"  rule attribution, store join:       {t_store:8.3f}s  ({len(weight_keys)} weight keys, incl. rules with no reason text)")
+
+    # 3. Retrain on the joined season
+    MLModel.MODEL_DIR = tempfile.mkdtemp(prefix='leo_models_')
+    t0 = time.perf_counter()
+    X = features[rows]
+    usable = np.isfinite(X).all(axis=1)
+    rf, gb = MLModel.fit_models(X[usable], correct[usable].astype(int))
+    t_fit = time.perf_counter() - t0
+    from sklearn.model_selection import cross_val_score
+    cross_val_score(rf, X[usable], correct[usable].astype(int), cv=5)
+    cross_val_score(gb, X[usable], correct[usable].astype(int), cv=5)
+    t_cv = time.perf_counter() - t0
+    print(f"\n  retrain on {int(usable.sum()):,} rows: fit {t_fit:.1f}s, with 5-fold CV {t_cv:.1f}s")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
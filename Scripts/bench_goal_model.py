@@ -0,0 +1,173 @@
+# bench_goal_model.py: Benchmark and sanity check for the score-matrix goal model.
+# Refactored for Clean Architecture (v2.8)
+# This script compares the form-histogram dict path with batched Poisson / Dixon-Coles matrices.
+
+"""
+Usage:
+    python Scripts/bench_goal_model.py [--fixtures 20000] [--history 100000]
+
+Simulates a league history from known attack/defence strengths, then:
+  1. fits GoalModel (Poisson and Dixon-Coles) and reports fit time and how well
+     the planted strengths are recovered,
+  2. times the current dict path (GoalPredictor histograms + the rule engine's
+     nested BTTS / over 2.5 / correct-score loops) against predict_many + markets
+     for every market at once,
+  3. cross-checks the array reductions against brute-force loops over the matrix
+     and GoalPredictor.predict_score_probabilities against the old factorial loop,
+  4. reports held-out log loss (BTTS, over 2.5) of both paths.
+Exits non-zero if a consistency check fails.
+"""
+
+import argparse
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add project root to path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.append(project_root)
+
+from Core.Intelligence.goal_model import GoalModel, markets, GOAL_RANGES, OU_LINES
+from Core.Intelligence.goal_predictor import GoalPredictor
+
+KEYS = ["0", "1", "2", "3+"]
+
+
+def simulate(n_matches, n_teams=400, seed=5):
+    rng = np.random.default_rng(seed)
+    attack = np.exp(rng.normal(0, 0.3, n_teams))
+    defence = np.exp(rng.normal(0, 0.3, n_teams))
+    home = rng.integers(0, n_teams, n_matches)
+    away = (home + rng.integers(1, n_teams, n_matches)) % n_teams
+    hg = rng.poisson(1.25 * 1.3 * attack[home] * defence[away])
+    ag = rng.poisson(1.25 * attack[away] * defence[home])
+    names = np.array([f"Team {i}" for i in range(n_teams)])
+    return names[home].tolist(), names[away].tolist(), hg, ag, attack, names
+
+
+def dict_path(home_form, away_form, home_team, away_team):
+    """GoalPredictor histograms + the rule engine's string-keyed loops (reference path)."""
+    home_dist = GoalPredictor.predict_goals_distribution(home_form, home_team, True)
+    away_dist = GoalPredictor.predict_goals_distribution(away_form, away_team, False)
+    btts = sum(home_dist["goals_scored"].get(h, 0) * away_dist["goals_scored"].get(a, 0)
+               for h in KEYS for a in KEYS if h != "0" and a != "0")
+    over25 = sum(home_dist["goals_scored"].get(h, 0) * away_dist["goals_scored"].get(a, 0)
+                 for h in KEYS for a in KEYS if int(h.replace("3+", "3")) + int(a.replace("3+", "3")) > 2)
+    scores = []
+    for hg in "01233+":
+        for ag in "01233+":
+            p = home_dist["goals_scored"].get(hg, 0) * away_dist["goals_scored"].get(ag, 0)
+            if p > 0.03:
+                scores.append({"score": f"{hg}-{ag}", "prob": round(p, 3)})
+    scores.sort(key=lambda x: x["prob"], reverse=True)
+    return btts, over25, scores
+
+
+def legacy_score_probabilities(home_xg, away_xg):
+    scores = []
+    for hg in range(6):
+        for ag in range(6):
+            p = (math.exp(-home_xg) * home_xg ** hg / math.factorial(hg)) * (math.exp(-away_xg) * away_xg ** ag / math.factorial(ag))
+            if p > 0.01:
+                scores.append({"score": f"{hg}-{ag}", "probability": round(p, 4), "home_goals": hg, "away_goals": ag})
+    scores.sort(key=lambda x: x["probability"], reverse=True)
+    return scores[:10]
+
+
+def brute_force(matrix):
+    g = matrix.shape[0]
+    cells = [(h, a, matrix[h, a]) for h in range(g) for a in range(g)]
+    out = {
+        'home_win': sum(p for h, a, p in cells if h > a), 'draw': sum(p for h, a, p in cells if h == a),
+        'away_win': sum(p for h, a, p in cells if h < a), 'btts_yes': sum(p for h, a, p in cells if h and a),
+        'home_over_1.5': sum(p for h, a, p in cells if h > 1.5), 'away_over_0.5': sum(p for h, a, p in cells if a > 0.5),
+    }
+    for line in OU_LINES:
+        out[f'over_{line}'] = sum(p for h, a, p in cells if h + a > line)
+    for lo, hi in GOAL_RANGES:
+        key = f'goals_{lo}_{hi}' if hi is not None else f'goals_{lo}_plus'
+        out[key] = sum(p for h, a, p in cells if h + a >= lo and (hi is None or h + a <= hi))
+    return out
+
+
+def last_form(team_matches, team, limit=10):
+    return team_matches.get(team, [])[-limit:]
+
+
+def log_loss(p, y):
+    p = np.clip(np.asarray(p, dtype=float), 1e-6, 1 - 1e-6)
+    return float(-np.mean(y * np.log(p) + (1 - y) * np.log(1 - p)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the score-matrix goal model against the dict path.")
+    parser.add_argument('--fixtures', type=int, default=20000)
+    parser.add_argument('--history', type=int, default=100_000)
+    args = parser.parse_args()
+    failures = 0
+
+    home, away, hg, ag, planted, names = simulate(args.history + args.fixtures)
+    train, test = slice(0, args.history), slice(args.history, None)
+
+    print(f"Fitting on {args.history:,} simulated results...")
+    models = {}
+    for kind in ('poisson', 'dixon_coles'):
+        t0 = time.perf_counter()
+        models[kind] = GoalModel.fit(home[train], away[train], hg[train], ag[train], kind=kind)
+        m = models[kind]
+        corr = np.corrcoef([m.attack[m.team_index[n]] for n in names], planted)[0, 1]
+        print(f"  {kind:<12} fit {time.perf_counter() - t0:6.2f}s  home adv {m.home_adv:.3f} (true 1.3)  "
+              f"rho {m.rho:+.3f}  attack corr {corr:.3f}")
+
+    # Form lists (last 10 before the test window) for the dict path.
+    team_matches = {}
+    for h, a, x, y in zip(home[train], away[train], hg[train], ag[train]):
+        entry = {"home": h, "away": a, "score": f"{x}-{y}"}
+        team_matches.setdefault(h, []).append(entry)
+        team_matches.setdefault(a, []).append(entry)
+    th, ta = home[test], away[test]
+    forms = [(last_form(team_matches, h), last_form(team_matches, a)) for h, a in zip(th, ta)]
+
+    t0 = time.perf_counter()
+    dict_results = [dict_path(hf, af, h, a) for (hf, af), h, a in zip(forms, th, ta)]
+    t_dict = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    matrices = models['dixon_coles'].predict_many(th, ta)
+    all_markets = markets(matrices)
+    t_matrix = time.perf_counter() - t0
+    print(f"\n  {len(th):,} fixtures")
+    print(f"  dict path (BTTS, O2.5, scores):   {t_dict:7.3f}s")
+    print(f"  matrix path ({len(all_markets) - 1} markets + scores): {t_matrix:7.3f}s  ({t_dict / t_matrix:.1f}x)")
+
+    # Consistency checks.
+    if not np.allclose(matrices.sum(axis=(1, 2)), 1) or \
+            not np.allclose(all_markets['home_win'] + all_markets['draw'] + all_markets['away_win'], 1):
+        failures += 1
+        print("  [FAIL] matrices / 1X2 do not sum to 1")
+    for i in range(0, len(th), max(1, len(th) // 50)):
+        for key, expected in brute_force(matrices[i]).items():
+            if not math.isclose(all_markets[key][i], expected, abs_tol=1e-9):
+                failures += 1
+                print(f"  [FAIL] fixture {i} {key}: {all_markets[key][i]} != {expected}")
+    rng = np.random.default_rng(9)
+    for hx, ax in rng.uniform(0, 4, size=(5000, 2)):
+        if GoalPredictor.predict_score_probabilities(hx, ax) != legacy_score_probabilities(hx, ax):
+            failures += 1
+    print(f"  Consistency checks: {'OK' if not failures else f'{failures} FAILURES'}")
+
+    y_btts = ((hg[test] > 0) & (ag[test] > 0)).astype(float)
+    y_over = ((hg[test] + ag[test]) > 2).astype(float)
+    print(f"\n  held-out log loss      {'BTTS':>8}{'O2.5':>8}")
+    print(f"  form histogram         {log_loss([r[0] for r in dict_results], y_btts):8.4f}{log_loss([r[1] for r in dict_results], y_over):8.4f}")
+    for kind, m in models.items():
+        mk = markets(m.predict_many(th, ta))
+        print(f"  {kind:<22} {log_loss(mk['btts_yes'], y_btts):8.4f}{log_loss(mk['over_2.5'], y_over):8.4f}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
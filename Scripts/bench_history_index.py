@@ -0,0 +1,151 @@
+# bench_history_index.py: Parity check and benchmark for the team-history index.
+# Refactored for Clean Architecture (v2.8)
+# This script compares the legacy per-fixture history scan in fs_offline with HistoryIndex lookups.
+
+"""
+Usage:
+    python Scripts/bench_history_index.py [--history 100000] [--fixtures 500]
+
+Builds a synthetic schedules table (finished results with duplicate dates,
+unparseable dates and scores, plus scheduled rows) and a standings table, then:
+  1. builds form / H2H / standings inputs for every fixture with the old
+     "sort all history, scan it per fixture" loop and with HistoryIndex,
+  2. asserts both produce identical inputs,
+  3. lands a batch of new results through HistoryIndex.update_row and checks
+     the incrementally updated index against a full rebuild.
+Exits non-zero on any mismatch.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+# Add project root to path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.append(project_root)
+
+from Data.Access.history_index import HistoryIndex, map_match, parse_standings
+
+
+def synthetic_tables(n_history: int, n_teams: int = 2000, seed: int = 11):
+    rng = random.Random(seed)
+    base = datetime(2022, 1, 1)
+    leagues = [f"Region {i} - League {i % 9}" for i in range(120)]
+    schedules = []
+    for i in range(n_history):
+        home, away = rng.sample(range(n_teams), 2)
+        roll = rng.random()
+        date = (base + timedelta(days=rng.randint(0, 1400))).strftime("%d.%m.%Y")
+        if roll < 0.01:
+            date = rng.choice(['', 'N/A', '2024-05-01'])
+        schedules.append({
+            'fixture_id': f"fx{i}", 'date': date, 'match_time': '15:00',
+            'region_league': rng.choice(leagues),
+            'home_team': f"Team {home}", 'away_team': f"Team {away}",
+            'home_team_id': f"t{home}", 'away_team_id': f"t{away}",
+            'home_score': rng.choice(['0', '1', '2', '3', '4', 'P-P']) if roll > 0.02 else '',
+            'away_score': rng.choice(['0', '1', '2', '3', 'N/A' if roll < 0.03 else '1']),
+            'match_status': 'scheduled' if roll > 0.97 else 'finished',
+        })
+    standings = []
+    for league in leagues:
+        for pos in range(1, 21):
+            standings.append({
+                'standings_key': f"{league}_{pos}", 'region_league': league,
+                'team_name': f"Team {rng.randrange(n_teams)}", 'position': str(pos),
+                'goal_difference': str(rng.randint(-30, 30)) if rng.random() > 0.02 else '',
+                'goals_for': str(rng.randint(5, 60)), 'goals_against': str(rng.randint(5, 60)),
+            })
+    return schedules, standings
+
+
+def legacy_inputs(all_schedules, standings_rows, to_process):
+    """The pre-index fs_offline loop (history scan + standings read per fixture)."""
+    def parse_date(d_str):
+        try:
+            return datetime.strptime(d_str, "%d.%m.%Y")
+        except:
+            return datetime.min
+
+    historical_matches = [m for m in all_schedules if m.get('match_status') != 'scheduled' and m.get('home_score') not in ('', 'N/A', None) and m.get('away_score') not in ('', 'N/A', None)]
+    historical_matches.sort(key=lambda x: parse_date(x.get('date', '')), reverse=True)
+
+    out = []
+    for m in to_process:
+        home_team, away_team = m.get('home_team'), m.get('away_team')
+        home_last_10, away_last_10, h2h_list = [], [], []
+        for hist in historical_matches:
+            h_home, h_away = hist.get('home_team'), hist.get('away_team')
+            mapped_hist = map_match(hist)
+            if (h_home == home_team or h_away == home_team) and len(home_last_10) < 10:
+                home_last_10.append(mapped_hist)
+            if (h_home == away_team or h_away == away_team) and len(away_last_10) < 10:
+                away_last_10.append(mapped_hist)
+            if ((h_home == home_team and h_away == away_team) or (h_home == away_team and h_away == home_team)):
+                h2h_list.append(mapped_hist)
+        raw = [s for s in standings_rows if s.get('region_league') == m.get('region_league', 'Unknown')]
+        out.append((home_last_10, away_last_10, h2h_list, parse_standings(raw)))
+    return out
+
+
+def index_inputs(index, to_process):
+    return [(index.team_matches(m.get('home_team'), limit=10),
+             index.team_matches(m.get('away_team'), limit=10),
+             index.head_to_head(m.get('home_team'), m.get('away_team')),
+             index.standings(m.get('region_league', 'Unknown'))) for m in to_process]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the team-history index against the legacy scan.")
+    parser.add_argument('--history', type=int, default=100_000)
+    parser.add_argument('--fixtures', type=int, default=500)
+    args = parser.parse_args()
+
+    schedules, standings = synthetic_tables(args.history)
+    rng = random.Random(3)
+    to_process = rng.sample(schedules, args.fixtures)
+    print(f"Repredicting {args.fixtures} fixtures against {args.history:,} schedule rows...")
+
+    t0 = time.perf_counter(); expected = legacy_inputs(schedules, standings, to_process); t_old = time.perf_counter() - t0
+    t0 = time.perf_counter(); index = HistoryIndex(schedules, standings); t_build = time.perf_counter() - t0
+    t0 = time.perf_counter(); actual = index_inputs(index, to_process); t_lookup = time.perf_counter() - t0
+
+    mismatches = sum(1 for a, b in zip(expected, actual) if a != b)
+    print(f"\n  legacy scan:          {t_old:8.2f}s")
+    print(f"  index build:          {t_build:8.2f}s  ({len(index):,} finished matches)")
+    print(f"  index lookups:        {t_lookup:8.3f}s")
+    print(f"  speedup:              {t_old / (t_build + t_lookup):8.1f}x")
+    print(f"  Input parity: {'OK' if not mismatches else f'{mismatches} MISMATCHES'}")
+
+    # Incremental updates: results landing on scheduled rows, corrections, brand new rows.
+    landed = []
+    for row in rng.sample(schedules, 2000):
+        landed.append({**row, 'home_score': str(rng.randint(0, 4)), 'away_score': str(rng.randint(0, 4)), 'match_status': 'finished'})
+    for i in range(200):
+        landed.append({**schedules[i], 'fixture_id': f"new{i}", 'home_score': '1', 'away_score': '0', 'match_status': 'finished'})
+    landed.append({**schedules[5], 'match_status': 'scheduled'})
+
+    by_id = {r['fixture_id']: i for i, r in enumerate(schedules)}
+    updated = list(schedules)
+    t0 = time.perf_counter()
+    for row in landed:
+        index.update_row(row)
+        if row['fixture_id'] in by_id:
+            updated[by_id[row['fixture_id']]] = row
+        else:
+            by_id[row['fixture_id']] = len(updated)
+            updated.append(row)
+    t_incr = time.perf_counter() - t0
+    rebuilt = HistoryIndex(updated, standings)
+    incr_mismatches = sum(1 for a, b in zip(index_inputs(index, to_process), index_inputs(rebuilt, to_process)) if a != b)
+    print(f"\n  {len(landed)} incremental updates: {t_incr * 1000:.1f}ms  parity vs rebuild: "
+          f"{'OK' if not incr_mismatches else f'{incr_mismatches} MISMATCHES'}")
+    sys.exit(1 if mismatches or incr_mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# bench_ml_model.py: Benchmark for the warm ML model registry and batched ensemble scoring.
+# Refactored for Clean Architecture (v2.8)
+# This script compares per-call joblib loading with MLModel.predict_many on synthetic fixtures.
+
+"""
+Usage:
+    python Scripts/bench_ml_model.py [--fixtures 5000] [--seed 7]
+
+Fits a throwaway ensemble on the fixtures' feature rows into a temporary
+MODEL_DIR, then:
+  1. times the old per-fixture path (joblib.load both pickles, predict one row),
+  2. times MLModel.predict on warm models and predict_many on the whole batch,
+  3. checks all three give the same confidences,
+  4. retrains and checks the registry serves the new models without a restart.
+Exits non-zero on any mismatch.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import joblib
+import numpy as np
+
+# Add project root to path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.append(project_root)
+
+from Core.Intelligence.ml_model import MLModel
+from Scripts.bench_rule_engine import synthetic_fixture
+
+
+def legacy_predict(features):
+    """Pre-registry MLModel.predict: both pickles loaded on every call."""
+    rf = joblib.load(os.path.join(MLModel.MODEL_DIR, 'random_forest.pkl'))
+    gb = joblib.load(os.path.join(MLModel.MODEL_DIR, 'gradient_boosting.pkl'))
+    X = np.array([[features.get(f, 0) for f in MLModel.FEATURES]])
+    return (rf.predict_proba(X)[0][1] + gb.predict_proba(X)[0][1]) / 2
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the warm ML model registry.")
+    parser.add_argument('--fixtures', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--legacy', type=int, default=200, help='Fixtures timed on the per-call load path')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    fixtures = [synthetic_fixture(rng) for _ in range(args.fixtures)]
+    MLModel.MODEL_DIR = tempfile.mkdtemp(prefix='leo_models_')
+
+    t0 = time.perf_counter()
+    rows = [MLModel.feature_row(f) for f in fixtures]
+    t_features = time.perf_counter() - t0
+    usable = [r for r in rows if r is not None]
+    X = np.vstack(usable)
+    labels = np.random.default_rng(args.seed)
+    MLModel.fit_models(X, (X[:, 0] < X[:, 1]) ^ (labels.random(len(X)) < 0.2))
+    print(f"{len(usable):,} of {len(fixtures):,} fixtures have feature rows ({t_features * 1e6 / len(fixtures):.1f}us each)")
+
+    features = [dict(zip(MLModel.FEATURES, r.tolist())) for r in usable]
+    n_legacy = min(args.legacy, len(features))
+    t0 = time.perf_counter()
+    legacy = [legacy_predict(f) for f in features[:n_legacy]]
+    t_legacy = (time.perf_counter() - t0) / n_legacy
+
+    MLModel.predict(features[0])  # warm the registry
+    n_single = min(1000, len(features))
+    t0 = time.perf_counter()
+    single = [MLModel.predict(f)["confidence"] for f in features[:n_single]]
+    t_single = (time.perf_counter() - t0) / n_single
+
+    t0 = time.perf_counter()
+    batched = [p["confidence"] for p in MLModel.predict_many(X)]
+    t_batch = (time.perf_counter() - t0) / len(X)
+
+    print(f"\n  per-call joblib.load:   {t_legacy * 1e6:10.1f}us / fixture")
+    print(f"  warm predict():         {t_single * 1e6:10.1f}us / fixture  ({t_legacy / t_single:.0f}x)")
+    print(f"  predict_many():         {t_batch * 1e6:10.1f}us / fixture  ({t_legacy / t_batch:.0f}x)")
+
+    failures = sum(1 for a, b in zip(legacy, batched) if not np.isclose(a, b))
+    failures += sum(1 for a, b in zip(single, batched) if not np.isclose(a, b))
+    print(f"  Confidence parity: {'OK' if not failures else f'{failures} MISMATCHES'}")
+
+    # Retrain: the registry must pick up the new pickles on the next call.
+    MLModel.fit_models(X, X[:, 17] > X[:, 18])
+    reloaded = MLModel.predict_many(X[:50])
+    expected = [legacy_predict(f) for f in features[:50]]
+    stale = sum(1 for p, e in zip(reloaded, expected) if not np.isclose(p["confidence"], e))
+    print(f"  Reload after retrain: {'OK' if not stale else f'{stale} STALE'}")
+    sys.exit(1 if failures or stale else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+# bench_outcome_review.py: Benchmark for the pipelined prediction review (Prologue P1).
+# Refactored for Clean Architecture (v2.8)
+# This script compares per-prediction offline review and a single-page browser fallback with the batched pipeline.
+
+"""
+Usage:
+    python Scripts/bench_outcome_review.py [--predictions 3000] [--unresolved 40] [--latency-ms 100] [--workers 4]
+
+Generates synthetic predictions.csv / schedules.csv tables in a temp directory and
+reviews them twice:
+  1. legacy   - schedules reloaded per prediction, one save per result, browser
+                fallback walked on one page
+  2. pipeline - run_review_process: one schedule join, a pool of --workers pages,
+                one batched write and one batched cloud upsert
+Browser pages are stand-ins that sleep --latency-ms per navigation and report the
+scheduled score, so only orchestration is timed. Cloud upserts are counted, not sent.
+Exits non-zero if the two runs leave different prediction rows.
+"""
+
+import argparse
+import asyncio
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Add project root to path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.append(project_root)
+
+import Data.Access.outcome_reviewer as reviewer
+from Data.Access.db_helpers import files_and_headers, PREDICTIONS_CSV, SCHEDULES_CSV
+from Data.Access.table_store import get_table
+
+PREDICTION_FIELDS = files_and_headers[PREDICTIONS_CSV]
+SCHEDULE_FIELDS = files_and_headers[SCHEDULES_CSV]
+
+
+class CloudCounter:
+    """Stands in for the sync worker: counts enqueue calls and rows."""
+
+    def __init__(self):
+        self.calls = 0
+        self.rows = 0
+
+    def enqueue_upsert(self, table_key, rows):
+        self.calls += 1
+        self.rows += len(rows)
+        return len(rows)
+
+
+class FakePage:
+    def __init__(self, latency, scores):
+        self.latency = latency
+        self.scores = scores
+        self.url = ''
+        self.context = None
+
+    async def goto(self, url, timeout=None):
+        await asyncio.sleep(self.latency)
+        self.url = url
+
+    async def wait_for_load_state(self, state=None):
+        pass
+
+    def is_closed(self):
+        return False
+
+
+class FakeContext:
+    def __init__(self, latency, scores):
+        self.latency, self.scores = latency, scores
+
+    async def new_page(self):
+        page = FakePage(self.latency, self.scores)
+        page.context = self
+        return page
+
+
+class FakeBrowser:
+    def __init__(self, latency, scores):
+        self.latency, self.scores = latency, scores
+
+    async def new_context(self):
+        return FakeContext(self.latency, self.scores)
+
+    async def close(self):
+        pass
+
+
+class FakePlaywright:
+    def __init__(self, latency, scores):
+        browser = FakeBrowser(latency, scores)
+
+        class Chromium:
+            async def launch(self, headless=True):
+                return browser
+
+        self.chromium = Chromium()
+
+
+async def fake_final_score(page):
+    return page.scores.get(page.url, "NOT_FINISHED")
+
+
+def build_dataset(directory, n_predictions, n_unresolved, seed):
+    """Writes the two tables; returns {match_link: score} for browser-only results."""
+    rng = random.Random(seed)
+    day = (datetime.now() - timedelta(days=2)).strftime("%d.%m.%Y")
+    predictions, schedules, browser_scores = [], [], {}
+    markets = ["HOME_WIN", "AWAY_WIN", "DRAW", "OVER_2.5", "BTTS_YES"]
+    for i in range(n_predictions):
+        fixture_id = f"fx{i:06d}"
+        link = f"https://www.flashscore.com/match/{fixture_id}/"
+        h, a = rng.randint(0, 4), rng.randint(0, 4)
+        predictions.append({
+            'fixture_id': fixture_id, 'date': day, 'match_time': '15:00',
+            'region_league': 'England - Premier League', 'home_team': f"Home {i}", 'away_team': f"Away {i}",
+            'prediction': rng.choice(markets), 'confidence': 'High', 'status': 'pending', 'match_link': link,
+        })
+        if i < n_unresolved:
+            status = 'scheduled'
+            browser_scores[link] = f"{h}-{a}"
+        else:
+            status = rng.choices(['FINISHED', 'AET', 'POSTPONED', 'CANCELED'], [90, 4, 3, 3])[0]
+        schedules.append({
+            'fixture_id': fixture_id, 'date': day, 'match_time': '15:00', 'match_status': status,
+            'home_score': h if status in ('FINISHED', 'AET') else '', 'away_score': a if status in ('FINISHED', 'AET') else '',
+        })
+    rng.shuffle(schedules)
+    for name, fields, rows in (('predictions.csv', PREDICTION_FIELDS, predictions),
+                               ('schedules.csv', SCHEDULE_FIELDS, schedules)):
+        with open(os.path.join(directory, name), 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fields, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(rows)
+    return browser_scores
+
+
+async def legacy_review(p):
+    """Pre-pipeline run_review_process: per-prediction offline review, one page for the fallback."""
+    needs_browser = []
+    for m in reviewer.get_predictions_to_review():
+        schedule = reviewer._load_schedule_db().get(m.get('fixture_id'), {})
+        status = schedule.get('match_status', '').upper()
+        if status in reviewer.FINISHED_STATUSES and schedule.get('home_score') and schedule.get('away_score'):
+            m['home_score'], m['away_score'] = schedule['home_score'], schedule['away_score']
+            m['actual_score'] = f"{m['home_score']}-{m['away_score']}"
+            reviewer.save_single_outcome(m, 'finished')
+        elif status in reviewer.SCHEDULE_OUTCOMES:
+            reviewer.save_single_outcome(m, reviewer.SCHEDULE_OUTCOMES[status])
+        else:
+            needs_browser.append(m)
+    browser = await p.chromium.launch(headless=True)
+    page = await (await browser.new_context()).new_page()
+    for m in needs_browser:
+        await reviewer.process_review_task_browser(page, m)
+    await browser.close()
+
+
+def run(label, review, args, seed):
+    with tempfile.TemporaryDirectory() as tmp:
+        scores = build_dataset(tmp, args.predictions, args.unresolved, seed)
+        reviewer.PREDICTIONS_CSV = os.path.join(tmp, 'predictions.csv')
+        reviewer.SCHEDULES_CSV = os.path.join(tmp, 'schedules.csv')
+        get_table(reviewer.PREDICTIONS_CSV, PREDICTION_FIELDS, key='fixture_id')
+        get_table(reviewer.SCHEDULES_CSV, SCHEDULE_FIELDS, key='fixture_id')
+        cloud = CloudCounter()
+        reviewer.get_sync_worker = lambda: cloud
+
+        p = FakePlaywright(args.latency_ms / 1000.0, scores)
+        t0 = time.perf_counter()
+        asyncio.run(review(p))
+        elapsed = time.perf_counter() - t0
+        rows = {r['fixture_id']: (r['status'], r['actual_score'], r['outcome_correct'])
+                for r in get_table(reviewer.PREDICTIONS_CSV).rows()}
+        print(f"  [{label:>8}] {elapsed:7.2f}s  ({cloud.calls} cloud upsert calls, {cloud.rows} rows)")
+        return elapsed, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the pipelined outcome review.")
+    parser.add_argument('--predictions', type=int, default=3000)
+    parser.add_argument('--unresolved', type=int, default=40, help='Predictions only the browser can settle')
+    parser.add_argument('--latency-ms', type=float, default=100.0, help='Simulated navigation time per match page')
+    parser.add_argument('--workers', type=int, default=reviewer.REVIEW_WORKERS)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    reviewer.get_final_score = fake_final_score
+    reviewer.REVIEW_WORKERS = args.workers
+    print(f"{args.predictions:,} pending predictions, {args.unresolved} browser-only, "
+          f"{args.latency_ms:.0f}ms per page, {args.workers} workers\n")
+
+    t_legacy, legacy_rows = run('legacy', legacy_review, args, args.seed)
+    t_pipeline, pipeline_rows = run('pipeline', reviewer.run_review_process, args, args.seed)
+
+    mismatches = sum(1 for k, v in legacy_rows.items() if pipeline_rows.get(k) != v)
+    print(f"\n  Speedup: {t_legacy / t_pipeline:.1f}x")
+    print(f"  Outcome parity: {'OK' if not mismatches else f'{mismatches} MISMATCHES'}")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+# bench_page_monitor.py: Benchmark for the in-memory PageMonitor registry.
+# Refactored for Clean Architecture (v2.8)
+# This script compares the read-scan-rewrite capture with the table-store backed registry.
+
+"""
+Usage:
+    python Scripts/bench_page_monitor.py [--captures 500] [--workers 8] [--seed 7]
+
+Copies Data/Store/pages_registry.csv (or synthesizes ~7,300 rows) into a temp
+directory and replays the same page loads through:
+  1. legacy   - read the whole CSV, scan for page_id, rewrite the whole file
+  2. registry - PageMonitor.record (dict index + url index, periodic flush)
+from --workers concurrent asyncio tasks. Exits non-zero if the flushed CSVs differ
+in visit counts or page states.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import csv
+import io
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime as dt
+from pathlib import Path
+
+# Add project root to path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.append(project_root)
+
+import Core.Utils.monitor as monitor
+from Core.Utils.monitor import HEADERS, PageMonitor
+
+
+def seed_registry(path, rows, rng):
+    source = os.path.join(project_root, "Data", "Store", "pages_registry.csv")
+    if os.path.exists(source):
+        shutil.copy(source, path)
+        return
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=HEADERS)
+        writer.writeheader()
+        for i in range(rows):
+            url = f"https://www.flashscore.com/match/{i:08x}/"
+            title = f"Home {i} - Away {i} | Flashscore"
+            writer.writerow({'page_id': PageMonitor._generate_id(url, title), 'url': url, 'page_title': title,
+                             'domain': 'www.flashscore.com', 'first_seen': dt.now().isoformat(),
+                             'last_seen': dt.now().isoformat(), 'visit_count': rng.randint(1, 20), 'status': 'active'})
+
+
+def legacy_record(path, url, title):
+    """Pre-registry capture body: read all, scan, rewrite all."""
+    page_id = PageMonitor._generate_id(url, title)
+    now = dt.now().isoformat()
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    for row in rows:
+        if row['page_id'] == page_id:
+            row['last_seen'] = now
+            row['visit_count'] = str(int(row['visit_count'] or 0) + 1)
+            break
+    else:
+        rows.append({'page_id': page_id, 'url': url, 'page_title': title, 'domain': 'www.flashscore.com',
+                     'first_seen': now, 'last_seen': now, 'visit_count': '1', 'status': 'active'})
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=HEADERS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+async def replay(loads, workers, record):
+    queue = asyncio.Queue()
+    for load in loads:
+        queue.put_nowait(load)
+
+    async def worker():
+        while not queue.empty():
+            url, title = queue.get_nowait()
+            await asyncio.sleep(0)  # page.title() round trip
+            record(url, title)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    return time.perf_counter() - t0
+
+
+def snapshot(path):
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        return {r['page_id']: (r['url'], r['page_title'], r['visit_count']) for r in csv.DictReader(f)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the PageMonitor registry.")
+    parser.add_argument('--captures', type=int, default=500)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    tmp = Path(tempfile.mkdtemp(prefix='leo_pages_'))
+    seed_registry(tmp / "seed.csv", 7300, rng)
+    known = [(r['url'], r['page_title']) for r in csv.DictReader(open(tmp / "seed.csv", encoding='utf-8'))]
+    loads = []
+    for i in range(args.captures):
+        if known and rng.random() < 0.7:
+            loads.append(rng.choice(known))       # revisit
+        elif known and rng.random() < 0.1:
+            url, _ = rng.choice(known)
+            loads.append((url, f"Renamed {i}"))    # title change
+        else:
+            loads.append((f"https://www.flashscore.com/match/new{i}/", f"New {i}"))
+    print(f"{len(known):,} registry rows, {len(loads):,} page loads, {args.workers} workers\n")
+
+    legacy_path = tmp / "legacy.csv"
+    shutil.copy(tmp / "seed.csv", legacy_path)
+    t_legacy = asyncio.run(replay(loads, args.workers, lambda u, t: legacy_record(legacy_path, u, t)))
+
+    monitor.PAGES_CSV = tmp / "registry.csv"
+    shutil.copy(tmp / "seed.csv", monitor.PAGES_CSV)
+    with contextlib.redirect_stdout(io.StringIO()):
+        t_registry = asyncio.run(replay(loads, args.workers, lambda u, t: PageMonitor.record(u, t)))
+    t0 = time.perf_counter()
+    PageMonitor.flush()
+    t_flush = time.perf_counter() - t0
+
+    print(f"  legacy read/scan/rewrite: {t_legacy:8.3f}s  ({t_legacy / len(loads) * 1000:.2f}ms per load)")
+    print(f"  registry record:          {t_registry:8.3f}s  ({t_registry / len(loads) * 1e6:.1f}us per load)")
+    print(f"  registry flush:           {t_flush:8.3f}s  (once, or every LEO_STORE_FLUSH_INTERVAL)")
+
+    legacy, registry = snapshot(legacy_path), snapshot(monitor.PAGES_CSV)
+    mismatches = sum(1 for k in legacy.keys() | registry.keys() if legacy.get(k) != registry.get(k))
+    print(f"  Registry parity: {'OK' if not mismatches else f'{mismatches} MISMATCHES'}")
+    shutil.rmtree(tmp, ignore_errors=True)
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
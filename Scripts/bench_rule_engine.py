@@ -0,0 +1,219 @@
+# bench_rule_engine.py: Parity check and benchmark for the compiled rule engine.
+# Refactored for Clean Architecture (v2.8)
+# This script compares RuleEngine.analyze_reference with the compiled and batched paths on synthetic fixtures.
+
+"""
+Usage:
+    python Scripts/bench_rule_engine.py [--fixtures 5000] [--seed 7]
+
+Runs on two data sets:
+  synthetic  random vision_data payloads (forms, H2H with mixed date formats,
+             standings, unparseable scores, awkward team names), every match a fresh dict
+  history    backtest-shaped inputs read from a HistoryIndex over synthetic seasons,
+             as backtest_engine.prepare_fixtures builds them (shared match dicts and standings)
+For each, asserts that analyze_compiled and analyze_many return the reference results for
+the default and a randomised RuleConfig, then reports analyses per second for
+analyze_reference, analyze (per fixture) and analyze_many. Exits non-zero on any mismatch.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+# Add project root to path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.append(project_root)
+
+from Core.Intelligence.rule_engine import RuleEngine
+from Core.Intelligence.rule_config import RuleConfig
+
+TEAMS = [
+    "Arsenal", "Chelsea", "Wolverhampton Wanderers", "West Ham", "Bayern Munich", "Real Madrid",
+    "Inter", "Ajax", "Porto", "Celtic", "Rovers Vs Topsham", "Go Ahead Eagles", "Red Star", "Lyon",
+    "Sevilla", "Napoli", "Benfica", "Galatasaray", "Club Brugge", "Young Boys", "Drawsko Pomorskie",
+]
+SCORES = ["0-0", "1-0", "0-1", "1-1", "2-1", "1-2", "2-2", "3-0", "0-3", "3-1", "4-2", "5-0", "2 - 0", "", "P-P", None]
+
+
+def _match(rng, team, opponent, when):
+    home, away = (team, opponent) if rng.random() < 0.5 else (opponent, team)
+    score = rng.choice(SCORES)
+    try:
+        hg, ag = map(int, score.replace(" ", "").split("-"))
+        winner = "Home" if hg > ag else "Away" if ag > hg else "Draw"
+    except Exception:
+        winner = rng.choice(["", None, "Draw"])
+    date = when.strftime("%Y-%m-%d") if rng.random() < 0.5 else when.strftime("%d.%m.%Y")
+    if rng.random() < 0.03:
+        date = "not-a-date"
+    return {"home": home, "away": away, "score": score, "winner": winner, "date": date}
+
+
+def synthetic_fixture(rng):
+    home, away = rng.sample(TEAMS, 2)
+    if rng.random() < 0.01:
+        away = home
+    now = datetime.now()
+    pool = [t for t in TEAMS if t not in (home, away)]
+
+    def form(team):
+        return [_match(rng, team, rng.choice(pool), now - timedelta(days=7 * i))
+                for i in range(rng.randint(0, 10))] + ([{}] if rng.random() < 0.1 else [])
+
+    h2h = [_match(rng, home, away, now - timedelta(days=rng.randint(10, 900))) for _ in range(rng.randint(0, 8))]
+
+    standings = []
+    if rng.random() < 0.85:
+        table = rng.sample(TEAMS, rng.randint(6, len(TEAMS)))
+        if rng.random() < 0.9:
+            table += [t for t in (home, away) if t not in table]
+        rng.shuffle(table)
+        for pos, name in enumerate(table, 1):
+            entry = {"team_name": name, "position": pos, "goals_for": rng.randint(5, 60), "goals_against": rng.randint(5, 60)}
+            if rng.random() < 0.8:
+                entry["goal_difference"] = entry["goals_for"] - entry["goals_against"]
+            standings.append(entry)
+
+    return {
+        "h2h_data": {
+            "home_team": home, "away_team": away,
+            "home_last_10_matches": form(home), "away_last_10_matches": form(away),
+            "head_to_head": h2h, "region_league": rng.choice(["GLOBAL", "England - Premier League", "Spain - LaLiga"]),
+        },
+        "standings": standings,
+    }
+
+
+def history_fixtures(rng, count):
+    """Point-in-time inputs for `count` finished fixtures of synthetic double round-robin leagues."""
+    from Data.Access.history_index import HistoryIndex
+
+    rows, standings, played = [], [], []
+    start = datetime(2023, 8, 5)
+    for li, league in enumerate(["England - Premier League", "Spain - LaLiga", "Italy - Serie A", "Germany - Bundesliga"]):
+        teams = [f"{name} {li}" for name in TEAMS]
+        for pos, name in enumerate(rng.sample(teams, len(teams)), 1):
+            gf, ga = rng.randint(10, 80), rng.randint(10, 80)
+            standings.append({"region_league": league, "team_name": name, "position": pos,
+                              "goal_difference": gf - ga, "goals_for": gf, "goals_against": ga})
+        for week in range(count // 40 + 12):
+            order = rng.sample(teams, len(teams))
+            date = (start + timedelta(days=7 * week)).strftime("%d.%m.%Y")
+            for home, away in zip(order[::2], order[1::2]):
+                row = {"fixture_id": f"{li}-{week}-{home}", "date": date, "region_league": league,
+                       "home_team": home, "away_team": away, "match_status": "finished",
+                       "home_score": str(min(rng.choice([0, 0, 1, 1, 1, 2, 2, 3, 4, 5]), 9)),
+                       "away_score": str(rng.choice([0, 0, 1, 1, 2, 2, 3]))}
+                rows.append(row)
+                played.append(row)
+
+    index = HistoryIndex(rows, standings)
+    fixtures = []
+    for m in sorted(played, key=lambda r: (datetime.strptime(r["date"], "%d.%m.%Y"), r["fixture_id"])):
+        home_form = index.team_matches(m["home_team"], limit=10, before=m["date"])
+        away_form = index.team_matches(m["away_team"], limit=10, before=m["date"])
+        if len(home_form) < 3 or len(away_form) < 3:
+            continue
+        fixtures.append({
+            "h2h_data": {
+                "home_team": m["home_team"], "away_team": m["away_team"],
+                "home_last_10_matches": home_form, "away_last_10_matches": away_form,
+                "head_to_head": index.head_to_head(m["home_team"], m["away_team"], before=m["date"]),
+                "region_league": m["region_league"], "reference_date": m["date"],
+            },
+            "standings": index.standings(m["region_league"]),
+        })
+        if len(fixtures) >= count:
+            break
+    return fixtures
+
+
+def random_config(rng) -> RuleConfig:
+    config = RuleConfig(name="Sweep")
+    for field, value in list(config.to_dict().items()):
+        if isinstance(value, float):
+            setattr(config, field, round(rng.uniform(0.1, 8.0), 2))
+    return config
+
+
+def _outcome(fn, vision_data, config):
+    """Result dict, or the raised error as analyze_many reports it (all paths must fail the same way)."""
+    try:
+        return fn(vision_data, config)
+    except Exception as e:
+        return {"type": "SKIP", "confidence": "Low", "reason": [f"Analysis error: {e}"]}
+
+
+def parity(fixtures, config) -> int:
+    mismatches = 0
+    batched = RuleEngine.analyze_many(fixtures, config)
+    for i, vision_data in enumerate(fixtures):
+        expected = _outcome(RuleEngine.analyze_reference, vision_data, config)
+        for label, actual in (('compiled', _outcome(RuleEngine.analyze_compiled, vision_data, config)),
+                              ('analyze_many', batched[i])):
+            if expected != actual:
+                mismatches += 1
+                if mismatches <= 5:
+                    diff = {k: (expected.get(k), actual.get(k)) for k in set(expected) | set(actual) if expected.get(k) != actual.get(k)}
+                    print(f"  [MISMATCH] {label} fixture {i} ({config.name}): {diff}")
+    return mismatches
+
+
+def throughput(fn, fixtures, config) -> float:
+    started = time.perf_counter()
+    for vision_data in fixtures:
+        _outcome(fn, vision_data, config)
+    return len(fixtures) / (time.perf_counter() - started)
+
+
+def batch_throughput(fixtures, config) -> float:
+    started = time.perf_counter()
+    RuleEngine.analyze_many(fixtures, config)
+    return len(fixtures) / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parity check and benchmark for the compiled rule engine.")
+    parser.add_argument('--fixtures', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    datasets = [("synthetic", [synthetic_fixture(rng) for _ in range(args.fixtures)]),
+                ("history", history_fixtures(rng, args.fixtures))]
+    configs = [RuleConfig(), random_config(rng)]
+
+    mismatches = 0
+    for name, fixtures in datasets:
+        print(f"\n[{name}] Parity check on {len(fixtures)} fixtures x {len(configs)} configs...")
+        found = sum(parity(fixtures, config) for config in configs)
+        print(f"  {'OK' if not found else f'{found} MISMATCHES'}")
+        mismatches += found
+
+        ref = throughput(RuleEngine.analyze_reference, fixtures, configs[0])
+        fast = throughput(RuleEngine.analyze_compiled, fixtures, configs[0])
+        many = batch_throughput(fixtures, configs[0])
+        print(f"  end-to-end  reference:    {ref:7.0f} analyses/s")
+        print(f"  end-to-end  analyze:      {fast:7.0f} analyses/s  ({fast / ref:.2f}x reference)")
+        print(f"  end-to-end  analyze_many: {many:7.0f} analyses/s  ({many / ref:.2f}x reference, {many / fast:.2f}x analyze)")
+
+    # Rule evaluation only: skip the shared market/ML/weights stage.
+    fixtures = datasets[0][1]
+    finalize = RuleEngine._finalize
+    RuleEngine._finalize = staticmethod(lambda *args, **kwargs: {})
+    try:
+        ref = throughput(RuleEngine.analyze_reference, fixtures, configs[0])
+        fast = throughput(RuleEngine.analyze_compiled, fixtures, configs[0])
+    finally:
+        RuleEngine._finalize = finalize
+    print(f"\n[synthetic] rules only  reference: {ref:7.0f} analyses/s")
+    print(f"[synthetic] rules only  compiled:  {fast:7.0f} analyses/s  ({fast / ref:.2f}x)")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# bench_selector_validation.py: Benchmark for batched selector validation.
+# Refactored for Clean Architecture (v2.8)
+# This script compares per-key wait_for_selector checks with the context-level validator.
+
+"""
+Usage:
+    python Scripts/bench_selector_validation.py [--fixtures 20] [--rtt-ms 15] [--missing 1] [--timeout-ms 500]
+
+Replays the fs_processor metadata block (8 fs_match_page keys) against stand-in
+pages that charge --rtt-ms per browser round trip. --missing keys are absent from
+the page: the legacy path waits --timeout-ms for each and heals each, the validator
+waits once per fixture and heals once per navigation. AI repairs are counted, not run.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import time
+
+# Add project root to path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.append(project_root)
+
+import Core.Intelligence.intelligence as intelligence
+import Core.Intelligence.selector_validator as validator
+from Core.Intelligence.selector_db import knowledge_db
+
+CONTEXT = "fs_match_page"
+KEYS = ["region_name", "region_flag_img", "region_url", "league_url", "home_crest", "home_url", "away_crest", "away_url"]
+
+
+class FakePage:
+    """Round trips cost rtt; selectors in `absent` never become visible."""
+
+    def __init__(self, url, rtt, absent):
+        self.url, self.rtt, self.absent = url, rtt, absent
+        self.main_frame = object()
+        self.round_trips = 0
+
+    def on(self, event, handler):
+        pass
+
+    async def wait_for_selector(self, selector, state=None, timeout=None):
+        self.round_trips += 1
+        if selector in self.absent:
+            await asyncio.sleep(self.rtt + timeout / 1000.0)
+            raise TimeoutError(selector)
+        await asyncio.sleep(self.rtt)
+
+    async def evaluate(self, script, arg):
+        self.round_trips += 1
+        required_missing = any(arg['selectors'][k] in self.absent for k in arg['required'])
+        await asyncio.sleep(self.rtt + (arg['timeout'] / 1000.0 if required_missing else 0))
+        return {k: s not in self.absent for k, s in arg['selectors'].items()}
+
+
+async def legacy_metadata(page, timeout_ms, heals):
+    """Pre-validator get_selector_auto: one wait per key, one heal per stale key."""
+    for key in KEYS:
+        selector = knowledge_db.get(CONTEXT, {}).get(key)
+        try:
+            await page.wait_for_selector(selector, state='visible', timeout=timeout_ms)
+        except Exception:
+            heals.append(key)
+
+
+async def run(label, fixtures, rtt, absent, metadata):
+    t0 = time.perf_counter()
+    trips = 0
+    for i in range(fixtures):
+        page = FakePage(f"https://www.flashscore.com/match/{i:06d}/", rtt, absent)
+        await metadata(page)
+        trips += page.round_trips
+    elapsed = time.perf_counter() - t0
+    return elapsed, trips
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batched selector validation.")
+    parser.add_argument('--fixtures', type=int, default=20)
+    parser.add_argument('--rtt-ms', type=float, default=15.0, help='Simulated browser round trip')
+    parser.add_argument('--missing', type=int, default=1, help='Keys absent from every page')
+    parser.add_argument('--timeout-ms', type=int, default=500, help='Visibility wait (5000 in production)')
+    args = parser.parse_args()
+
+    absent = {knowledge_db[CONTEXT][k] for k in KEYS[-args.missing:]} if args.missing else set()
+    rtt = args.rtt_ms / 1000.0
+    legacy_heals, batched_heals = [], []
+
+    async def fake_heal(page, context_key, force_refresh=False, info=None):
+        batched_heals.append(info)
+    intelligence.analyze_page_and_update_selectors = fake_heal
+
+    async def batched(page):
+        await validator.resolve_selectors(page, CONTEXT, KEYS, timeout_ms=args.timeout_ms)
+
+    print(f"{args.fixtures} fixtures x {len(KEYS)} keys, {args.missing} missing, "
+          f"{args.rtt_ms:.0f}ms round trip, {args.timeout_ms}ms visibility timeout\n")
+    t_legacy, trips_legacy = asyncio.run(run('legacy', args.fixtures, rtt, absent,
+                                             lambda p: legacy_metadata(p, args.timeout_ms, legacy_heals)))
+    with contextlib.redirect_stdout(io.StringIO()):
+        t_batched, trips_batched = asyncio.run(run('batched', args.fixtures, rtt, absent, batched))
+
+    print(f"  legacy per-key:  {t_legacy:7.2f}s  ({t_legacy / args.fixtures * 1000:6.0f}ms per fixture, "
+          f"{trips_legacy} round trips, {len(legacy_heals)} AI repairs)")
+    print(f"  batched context: {t_batched:7.2f}s  ({t_batched / args.fixtures * 1000:6.0f}ms per fixture, "
+          f"{trips_batched} round trips, {len(batched_heals)} AI repairs)")
+    print(f"\n  Speedup: {t_legacy / t_batched:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+# bench_sync_parallel.py: Benchmark for parallel table sync.
+# Refactored for Clean Architecture (v2.8)
+# This script times a full sync of all TABLE_CONFIG tables against a local mock PostgREST server.
+
+"""
+Usage:
+    python Scripts/bench_sync_parallel.py [--latency-ms 40] [--scale 1.0]
+
+Starts a threaded stand-in for Supabase's PostgREST API on 127.0.0.1 (with an
+artificial per-request latency), generates synthetic CSVs in a temp directory,
+and runs SyncManager.sync_tables(full=True) twice:
+  1. serial     - LEO_SYNC_CONCURRENCY=1, LEO_SYNC_PAGE_CONCURRENCY=1 (old behaviour)
+  2. parallel   - the configured concurrency limits
+Each run also reports every table's own sync time, so the parallel wall time can be
+compared with the slowest single table (the floor) and with the serial sum.
+The real Data/Store files are never touched.
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+# Add project root to path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.append(project_root)
+
+# Table sizes (rows) at --scale 1.0; roughly the production proportions.
+TABLE_ROWS = {
+    'predictions': 8000, 'schedules': 30000, 'teams': 6000, 'region_league': 400, 'standings': 9000,
+    'fb_matches': 2000, 'profiles': 20, 'custom_rules': 20, 'rule_executions': 200,
+    'accuracy_reports': 100, 'audit_log': 1500,
+}
+
+
+class MockPostgREST:
+    """Minimal in-memory PostgREST: GET with select/range/in/gt/order and POST upserts."""
+
+    def __init__(self, latency_ms: float):
+        self.latency = latency_ms / 1000.0
+        self.tables = {}
+        self.keys = {}
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _table(self):
+                return urlparse(self.path).path.rstrip('/').split('/')[-1]
+
+            def _send(self, status, payload, total=None):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                if total is not None:
+                    self.send_header('Content-Range', f"0-{max(0, len(payload) - 1)}/{total}")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                time.sleep(mock.latency)
+                with mock.lock:
+                    mock.requests += 1
+                table = self._table()
+                params = parse_qs(urlparse(self.path).query)
+                rows = list(mock.tables.get(table, {}).values())
+
+                for col, values in params.items():
+                    for v in values:
+                        if v.startswith('in.('):
+                            wanted = set(x.strip('"') for x in v[4:-1].split(','))
+                            rows = [r for r in rows if str(r.get(col)) in wanted]
+                        elif v.startswith('gt.'):
+                            rows = [r for r in rows if (r.get(col) or '') > v[3:]]
+                if 'order' in params:
+                    col = params['order'][0].split('.')[0]
+                    rows.sort(key=lambda r: r.get(col) or '')
+
+                start, end = 0, len(rows) - 1
+                if 'offset' in params:
+                    start = int(params['offset'][0])
+                    end = start + int(params.get('limit', [len(rows)])[0]) - 1
+                elif self.headers.get('Range'):
+                    start, end = (int(x) for x in self.headers['Range'].split('-'))
+                page = rows[start:end + 1]
+
+                select = params.get('select', ['*'])[0]
+                if select != '*':
+                    cols = select.split(',')
+                    page = [{c: r.get(c) for c in cols} for r in page]
+                self._send(200, page, total=len(rows))
+
+            def do_POST(self):
+                time.sleep(mock.latency)
+                table = self._table()
+                length = int(self.headers.get('Content-Length', 0))
+                payload = json.loads(self.rfile.read(length) or b'[]')
+                payload = payload if isinstance(payload, list) else [payload]
+                key = mock.keys.get(table, 'id')
+                with mock.lock:
+                    mock.requests += 1
+                    store = mock.tables.setdefault(table, {})
+                    for row in payload:
+                        store.setdefault(str(row.get(key)), {}).update(row)
+                self._send(201, payload)
+
+            do_PATCH = do_POST
+
+        return Handler
+
+
+def _ts(base: datetime, minutes: int) -> str:
+    return (base + timedelta(minutes=minutes)).isoformat()
+
+
+def build_dataset(data_dir: Path, mock: MockPostgREST, table_config, files_and_headers, scale: float):
+    """Writes synthetic local CSVs and seeds the mock so each table has pushes and pulls."""
+    rng = random.Random(42)
+    base = datetime(2026, 1, 1)
+    name_to_headers = {os.path.basename(p): h for p, h in files_and_headers.items()}
+
+    for table_key, conf in table_config.items():
+        key = conf['key']
+        headers = list(name_to_headers.get(conf['csv'], [key, 'last_updated']))
+        for col in (key, 'last_updated'):
+            if col not in headers:
+                headers.insert(0, col)
+        n = max(10, int(TABLE_ROWS.get(table_key, 100) * scale))
+
+        local_rows, remote = [], {}
+        for i in range(n):
+            row = {h: f"{h}_{i % 97}" for h in headers}
+            row[key] = f"{table_key}_{i}"
+            row['last_updated'] = _ts(base, i)
+            if 'date' in row:
+                row['date'] = (base + timedelta(days=i % 30)).strftime("%d.%m.%Y")
+            remote_row = dict(row)
+            if 'date' in row:
+                remote_row['date'] = (base + timedelta(days=i % 30)).strftime("%Y-%m-%d")
+            if 'over_2.5' in row:
+                remote_row['over_2_5'] = remote_row.pop('over_2.5')
+
+            roll = rng.random()
+            if roll < 0.85:
+                local_rows.append(row)                                          # in sync
+                remote[row[key]] = remote_row
+            elif roll < 0.93:
+                local_rows.append({**row, 'last_updated': _ts(base, n + i)})   # local newer -> push
+                remote[row[key]] = remote_row
+            else:
+                remote[row[key]] = {**remote_row, 'last_updated': _ts(base, n + i)}  # remote newer -> pull
+
+        csv_path = data_dir / conf['csv']
+        with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=headers)
+            writer.writeheader()
+            writer.writerows(local_rows)
+        files_and_headers[str(csv_path)] = headers
+        mock.tables[conf['table']] = remote
+        mock.keys[conf['table']] = key
+
+
+async def timed_sync(manager):
+    """Full sync wall time plus each table's own time (measured inside the concurrency limit)."""
+    per_table = {}
+    sync_table = manager._sync_table
+
+    async def _timed_table(table_key, config, full=False):
+        started = time.perf_counter()
+        try:
+            return await sync_table(table_key, config, full=full)
+        finally:
+            per_table[table_key] = time.perf_counter() - started
+
+    manager._sync_table = _timed_table
+    started = time.perf_counter()
+    results = await manager.sync_tables(full=True)
+    elapsed = time.perf_counter() - started
+    failed = [k for k, e in results if e]
+    if failed:
+        print(f"    [Warning] Failed tables: {failed}")
+    return elapsed, per_table
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark serial vs parallel table sync against a mock PostgREST.")
+    parser.add_argument('--latency-ms', type=float, default=40.0, help='Artificial per-request latency')
+    parser.add_argument('--scale', type=float, default=1.0, help='Multiplier for synthetic table sizes')
+    args = parser.parse_args()
+
+    mock = MockPostgREST(args.latency_ms)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), mock.handler())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    os.environ['SUPABASE_URL'] = f"http://127.0.0.1:{server.server_address[1]}"
+    os.environ['SUPABASE_SERVICE_KEY'] = "eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoic2VydmljZV9yb2xlIn0.bench"
+
+    import Data.Access.sync_manager as sm
+    from Data.Access.db_helpers import files_and_headers
+
+    timings = {}
+    for label, table_conc, page_conc in (
+        ('serial', 1, 1),
+        ('parallel', sm.SYNC_CONCURRENCY, sm.PAGE_CONCURRENCY),
+    ):
+        with tempfile.TemporaryDirectory() as tmp:
+            data_dir = Path(tmp)
+            build_dataset(data_dir, mock, sm.TABLE_CONFIG, files_and_headers, args.scale)
+            sm.DATA_DIR = data_dir
+            sm.SYNC_STATE_FILE = data_dir / "sync_state.json"
+            sm.SYNC_CONCURRENCY, sm.PAGE_CONCURRENCY = table_conc, page_conc
+
+            mock.requests = 0
+            manager = sm.SyncManager()
+            elapsed, per_table = asyncio.run(timed_sync(manager))
+            timings[label] = elapsed, per_table
+            slowest = max(per_table, key=per_table.get)
+            print(f"  [{label:>8}] tables={table_conc} pages={page_conc}  {elapsed:7.2f}s  ({mock.requests} requests)  "
+                  f"sum of tables {sum(per_table.values()):.2f}s, slowest {slowest} {per_table[slowest]:.2f}s")
+
+    server.shutdown()
+    if timings.get('parallel'):
+        (serial, serial_tables), (parallel, parallel_tables) = timings['serial'], timings['parallel']
+        print(f"\n  {'table':<18}{'serial':>9}{'parallel':>10}")
+        for table_key in sorted(serial_tables, key=serial_tables.get, reverse=True):
+            print(f"  {table_key:<18}{serial_tables[table_key]:>8.2f}s{parallel_tables.get(table_key, 0):>9.2f}s")
+        print(f"\n  Speedup: {serial / parallel:.2f}x (latency {args.latency_ms:.0f}ms, scale {args.scale})")
+        print(f"  Parallel wall time is {parallel / max(serial_tables.values()):.2f}x the slowest table's serial sync "
+              f"and {parallel / serial:.2f}x the serial sum.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+# bench_sync_vectorized.py: Micro-benchmark for SyncManager timestamp/cleaning paths.
+# Refactored for Clean Architecture (v2.8)
+# This script compares the legacy per-row code with the vectorized column operations.
+
+"""
+Usage:
+    python Scripts/bench_sync_vectorized.py [--rows 200000]
+
+Builds a synthetic schedules table (DD.MM.YYYY dates, mixed naive / tz-aware /
+blank last_updated values, null tokens) and times:
+  1. last_updated normalisation: Series.apply(pd.to_datetime) vs _normalize_ts_series
+  2. upsert cleaning: per-row regex loop vs _prepare_upsert_rows
+The cleaned payloads are compared (ignoring timestamps stamped with "now").
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+# Add project root to path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.append(project_root)
+
+from Data.Access.sync_manager import _normalize_ts_series, _prepare_upsert_rows, TABLE_CONFIG, DATA_DIR
+from Data.Access.db_helpers import files_and_headers
+
+
+def legacy_normalize(ts):
+    """The pre-vectorization per-row normaliser."""
+    if not ts or ts in ('None', 'nan', ''): return '1970-01-01T00:00:00'
+    try:
+        return pd.to_datetime(ts).isoformat()
+    except:
+        return '1970-01-01T00:00:00'
+
+
+def legacy_clean(table_key, data):
+    """The pre-vectorization per-row batch_upsert cleaning loop."""
+    conf = TABLE_CONFIG[table_key]
+    whitelist = set(files_and_headers.get(str(DATA_DIR / conf['csv']), []))
+    whitelist.update(['id', 'created_at', 'last_updated'])
+    cleaned_data = []
+    for row in data:
+        clean = {}
+        for k, v in row.items():
+            if whitelist and k not in whitelist and k != 'over_2.5':
+                continue
+            if v in ('', 'N/A', None, 'None', 'none', 'nan', 'NaN', 'null', 'NULL'):
+                clean[k] = None
+            else:
+                val = v
+                if k in ['date', 'date_updated', 'last_extracted'] and isinstance(val, str):
+                    match_full = re.match(r'^(\d{2})\.(\d{2})\.(\d{4})$', val)
+                    if match_full:
+                        d, m, y = match_full.groups()
+                        val = f"{y}-{m}-{d}"
+                    else:
+                        match_short = re.match(r'^(\d{2})\.(\d{2})\.(\d{2})$', val)
+                        if match_short:
+                            d, m, y_short = match_short.groups()
+                            val = f"20{y_short}-{m}-{d}"
+                clean['over_2_5' if k == 'over_2.5' else k] = val
+        if 'id' in clean and not clean['id']: del clean['id']
+        now_iso = datetime.utcnow().isoformat()
+        for ts in ['last_updated', 'date_updated', 'last_extracted', 'created_at']:
+            if ts in clean:
+                if not clean[ts] or not re.match(r'^\d{4}-\d{2}-\d{2}', str(clean[ts])):
+                    clean[ts] = now_iso
+        if 'last_updated' not in clean: clean['last_updated'] = now_iso
+        cleaned_data.append(clean)
+    seen, deduped = set(), []
+    for row in cleaned_data:
+        kv = row.get(conf['key'])
+        if kv not in (None, '') and kv not in seen:
+            seen.add(kv); deduped.append(row)
+    return deduped
+
+
+def synthetic_schedules(n: int):
+    rng = random.Random(7)
+    base = datetime(2025, 8, 1)
+    headers = files_and_headers[str(DATA_DIR / 'schedules.csv')]
+    rows = []
+    for i in range(n):
+        when = base + timedelta(minutes=37 * i)
+        ts_kind = rng.random()
+        if ts_kind < 0.6:
+            last_updated = when.isoformat()
+        elif ts_kind < 0.9:
+            last_updated = when.strftime("%Y-%m-%dT%H:%M:%S.%f") + "+00:00"
+        else:
+            last_updated = rng.choice(['', 'N/A', 'garbage'])
+        row = {h: '' for h in headers}
+        row.update({
+            'fixture_id': f"fx{i}", 'date': when.strftime("%d.%m.%Y") if rng.random() > 0.05 else when.strftime("%d.%m.%y"),
+            'match_time': when.strftime("%H:%M"), 'region_league': f"Region {i % 50} - League {i % 7}",
+            'home_team': f"Home {i % 900}", 'away_team': f"Away {i % 911}", 'home_score': str(i % 5),
+            'away_score': rng.choice(['1', 'N/A', '']), 'match_status': rng.choice(['finished', 'scheduled', 'None']),
+            'last_updated': last_updated,
+        })
+        rows.append(row)
+    return rows
+
+
+def _strip_now(rows, ts_cols=('last_updated', 'date_updated', 'last_extracted', 'created_at')):
+    return [{k: v for k, v in r.items() if k not in ts_cols} for r in rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark vectorized sync normalisation/cleaning.")
+    parser.add_argument('--rows', type=int, default=200_000)
+    args = parser.parse_args()
+
+    print(f"Building {args.rows:,} synthetic schedule rows...")
+    rows = synthetic_schedules(args.rows)
+    series = pd.Series([r['last_updated'] for r in rows], dtype=object)
+
+    t0 = time.perf_counter(); series.apply(legacy_normalize); t_norm_old = time.perf_counter() - t0
+    t0 = time.perf_counter(); _normalize_ts_series(series); t_norm_new = time.perf_counter() - t0
+
+    t0 = time.perf_counter(); old_clean = legacy_clean('schedules', rows); t_clean_old = time.perf_counter() - t0
+    t0 = time.perf_counter(); new_clean = _prepare_upsert_rows('schedules', rows); t_clean_new = time.perf_counter() - t0
+
+    parity = _strip_now(old_clean) == _strip_now(new_clean)
+
+    print(f"\n  {'step':<28}{'legacy':>10}{'new':>12}{'speedup':>10}")
+    print(f"  {'normalize last_updated':<28}{t_norm_old:>9.2f}s{t_norm_new:>11.2f}s{t_norm_old / t_norm_new:>9.1f}x")
+    print(f"  {'batch_upsert cleaning':<28}{t_clean_old:>9.2f}s{t_clean_new:>11.2f}s{t_clean_old / t_clean_new:>9.1f}x")
+    print(f"\n  Cleaning parity (non-timestamp fields): {'OK' if parity else 'MISMATCH'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,15 +16,29 @@ Purpose:
 
 Usage:
   python Scripts/enrich_all_schedules.py [--limit N] [--dry-run] [--standings] [--backfill-predictions]
+  python Scripts/enrich_all_schedules.py --bench DIR [--limit N] [--bench-baseline]
+
+Browser:
+  One Chromium is shared by the whole run through Core/Browser/context_pool.BrowserPool;
+  contexts and pages are reused across fixtures (reset to about:blank in between) and the
+  number of pages in flight adapts to CPU/memory headroom and page latency.
+  --bench serves locally saved match pages (*.html under DIR, e.g. the
+  Data/Logs/EnrichmentFailures snapshots) over a local HTTP server and reports
+  fixtures/minute and per-stage timings without writing anything.
 """
 
 import asyncio
 import csv
 import json
 import os
+import random
 import sys
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, List, Optional
 from datetime import datetime
 import pandas as pd
 import re
@@ -32,7 +46,7 @@ import re
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from playwright.async_api import Playwright, async_playwright, Browser
+from playwright.async_api import Page, async_playwright
 from Data.Access.sync_manager import SyncManager, run_full_sync
 from Data.Access.db_helpers import (
     SCHEDULES_CSV, TEAMS_CSV, REGION_LEAGUE_CSV, STANDINGS_CSV, PREDICTIONS_CSV,
@@ -40,13 +54,22 @@ from Data.Access.db_helpers import (
     save_standings, backfill_prediction_entry
 )
 from Data.Access.outcome_reviewer import smart_parse_datetime
+from Data.Access.table_store import get_table, flush_all_tables
 from Core.Browser.Extractors.standings_extractor import extract_standings_data, activate_standings_tab
 from Core.Browser.Extractors.league_page_extractor import extract_league_match_urls
+from Core.Browser.Extractors.match_metadata_extractor import extract_match_metadata
 from Modules.Flashscore.fs_utils import retry_extraction
+from Core.Browser.context_pool import BrowserPool, StageTimings
+from Core.Browser.resource_router import print_resource_report
 from Core.Utils.constants import NAVIGATION_TIMEOUT, WAIT_FOR_LOAD_STATE_TIMEOUT
 
 # Configuration
-CONCURRENCY = int(os.getenv('ENRICH_CONCURRENCY', 5))  # Default 5 for stability
+CONCURRENCY = int(os.getenv('ENRICH_CONCURRENCY', 5))  # Starting pages in flight (adapts from here)
+MIN_CONCURRENCY = int(os.getenv('ENRICH_MIN_CONCURRENCY', 2))
+MAX_CONCURRENCY = int(os.getenv('ENRICH_MAX_CONCURRENCY', 0)) or None  # Default: from host cores and memory
+JITTER_MAX = float(os.getenv('ENRICH_JITTER_MAX', 0.0))  # Optional random delay (s) before each fixture
+TASK_TIMEOUT = float(os.getenv('ENRICH_TASK_TIMEOUT', 180))  # Per-fixture deadline (s); the page is cancelled and recycled
+TASK_RETRIES = int(os.getenv('ENRICH_TASK_RETRIES', 1))  # Retries (with backoff) for fixtures that time out
 BATCH_SIZE = int(os.getenv('ENRICH_BATCH_SIZE', 10))   # Report progress more frequently
 KNOWLEDGE_PATH = Path(__file__).parent.parent / "Config" / "knowledge.json"
 HISTORICAL_GAP_LIMIT = 500  # Prevent Priority 3 bloat
@@ -65,77 +88,6 @@ def load_selectors() -> Dict[str, str]:
     return selectors
 
 
-from Core.Intelligence.selector_manager import SelectorManager
-
-async def _raw_safe_attr(page, selector: str, attr: str) -> Optional[str]:
-    """Raw attribute extraction for smart wrapper."""
-    try:
-        el = await page.query_selector(selector)
-        if el:
-            val = await el.get_attribute(attr)
-            return val.strip() if val else None
-    except:
-        pass
-    return None
-
-
-async def _raw_safe_text(page, selector: str) -> Optional[str]:
-    """Raw text extraction for smart wrapper."""
-    try:
-        el = await page.query_selector(selector)
-        if el:
-            val = await el.inner_text()
-            return val.strip() if val else None
-    except:
-        pass
-    return None
-
-
-async def _smart_attr(page, context: str, key: str, attr: str) -> Optional[str]:
-    """Safe extraction using direct selector lookup with hardening."""
-    try:
-        selector = SelectorManager.get_selector(context, key)
-        if selector:
-            # Hardening: Wait for selector if it might be dynamic
-            try:
-                await page.wait_for_selector(selector, timeout=2000)
-            except: pass
-            return await _raw_safe_attr(page, selector, attr)
-    except:
-        pass
-    return None
-
-async def _smart_text(page, context: str, key: str) -> Optional[str]:
-    """Safe extraction using direct selector lookup with hardening."""
-    try:
-        selector = SelectorManager.get_selector(context, key)
-        if selector:
-            # Hardening: Wait for selector if it might be dynamic
-            try:
-                await page.wait_for_selector(selector, timeout=2000)
-            except: pass
-            
-            text = await _raw_safe_text(page, selector)
-            if text and text.lower() == "loading...":
-                await asyncio.sleep(2)
-                text = await _raw_safe_text(page, selector)
-            return text
-    except:
-        pass
-    return None
-
-
-async def _smart_text(page, context: str, key: str) -> Optional[str]:
-    """Safe text extraction using direct selector lookup."""
-    try:
-        selector = SelectorManager.get_selector(context, key)
-        if selector:
-            return await _raw_safe_text(page, selector)
-    except:
-        pass
-    return None
-
-
 def _id_from_href(href: str) -> Optional[str]:
     """Extract entity ID from a flashscore URL like /team/name/ABC123/."""
     if not href:
@@ -169,12 +121,14 @@ def strip_league_stage(league_name: str):
 
 async def extract_match_enrichment(page, match_url: str, sel: Dict[str, str],
                                     extract_standings: bool = False,
-                                    needs: List[str] = None) -> Optional[Dict]:
+                                    needs: List[str] = None,
+                                    timings: Optional[StageTimings] = None) -> Optional[Dict]:
     """
     Extract team IDs, crests, URLs, league info, score, datetime, and optionally standings.
-    Targeted extraction based on 'needs'.
+    Targeted extraction based on 'needs'. Stage durations are added to 'timings'.
     """
     if not needs: needs = ['ids', 'date', 'time', 'region_league', 'league_id', 'scores']
+    timings = timings or StageTimings()
     
     try:
         # Use retry for navigation
@@ -182,83 +136,72 @@ async def extract_match_enrichment(page, match_url: str, sel: Dict[str, str],
             await page.goto(match_url, wait_until='domcontentloaded', timeout=NAVIGATION_TIMEOUT)
             await asyncio.sleep(1.0)
         
-        await retry_extraction(_navigate)
+        async with timings.stage('navigate'):
+            await retry_extraction(_navigate)
 
         enriched = {}
-
-        # --- HOME TEAM (IDs) ---
-        if 'ids' in needs or 'league_id' in needs:
-            home_href = await _smart_attr(page, "fs_match_page", "home_name", "href")
-            if home_href:
-                enriched['home_team_id'] = _id_from_href(home_href)
-                enriched['home_team_url'] = _standardize_url(home_href)
-            home_name = await _smart_text(page, "fs_match_page", "home_name")
-            if home_name:
-                enriched['home_team_name'] = home_name
-            home_crest_src = await _smart_attr(page, "fs_match_page", "home_crest", "src")
-            if home_crest_src:
-                enriched['home_team_crest'] = _standardize_url(home_crest_src)
-
-        # --- AWAY TEAM (IDs) ---
+        groups = []
         if 'ids' in needs or 'league_id' in needs:
-            away_href = await _smart_attr(page, "fs_match_page", "away_name", "href")
-            if away_href:
-                enriched['away_team_id'] = _id_from_href(away_href)
-                enriched['away_team_url'] = _standardize_url(away_href)
-            away_name = await _smart_text(page, "fs_match_page", "away_name")
-            if away_name:
-                enriched['away_team_name'] = away_name
-            away_crest_src = await _smart_attr(page, "fs_match_page", "away_crest", "src")
-            if away_crest_src:
-                enriched['away_team_crest'] = _standardize_url(away_crest_src)
-
-        # --- REGION + LEAGUE ---
+            groups.append('teams')
         if 'region_league' in needs or 'league_id' in needs:
-            region_name = await _smart_text(page, "fs_match_page", "region_name")
-            if region_name:
-                enriched['region'] = region_name
-
-            league_name_text = await _smart_text(page, "fs_match_page", "league_url")
-            if league_name_text:
-                enriched['league'] = league_name_text
-
-            if region_name and league_name_text:
-                clean_league, stage = strip_league_stage(league_name_text)
-                enriched['region_league'] = f"{region_name.upper()} - {clean_league}"
-                enriched['league_stage'] = stage
+            groups.append('league')
+        if 'scores' in needs:
+            groups.append('score')
+        if 'date' in needs or 'time' in needs:
+            groups.append('datetime')
+
+        # Every field group in one in-page read
+        async with timings.stage('extract'):
+            meta = await extract_match_metadata(page, groups=groups, selectors=sel)
+        for group in groups:
+            timings.add(f"meta_{group}", meta.timings.get(group, 0.0))
+
+        # --- HOME / AWAY TEAM (IDs) ---
+        for side in ('home', 'away'):
+            href = getattr(meta, f"{side}_url")
+            if href:
+                enriched[f'{side}_team_id'] = _id_from_href(href)
+                enriched[f'{side}_team_url'] = _standardize_url(href)
+            if getattr(meta, f"{side}_name"):
+                enriched[f'{side}_team_name'] = getattr(meta, f"{side}_name")
+            if getattr(meta, f"{side}_crest"):
+                enriched[f'{side}_team_crest'] = _standardize_url(getattr(meta, f"{side}_crest"))
 
-            league_url_href = await _smart_attr(page, "fs_match_page", "league_url", "href")
-            if league_url_href:
-                enriched['league_url'] = _standardize_url(league_url_href)
-                enriched['rl_id'] = _id_from_href(league_url_href)
-                enriched['league_id'] = enriched['rl_id']
+        # --- REGION + LEAGUE ---
+        if meta.region:
+            enriched['region'] = meta.region
+        if meta.league:
+            enriched['league'] = meta.league
+        if meta.region and meta.league:
+            clean_league, stage = strip_league_stage(meta.league)
+            enriched['region_league'] = f"{meta.region.upper()} - {clean_league}"
+            enriched['league_stage'] = stage
+        if meta.league_url:
+            enriched['league_url'] = _standardize_url(meta.league_url)
+            enriched['rl_id'] = _id_from_href(meta.league_url)
+            enriched['league_id'] = enriched['rl_id']
 
         # --- FINAL SCORE ---
-        if 'scores' in needs:
-            home_score = await _smart_text(page, "fs_match_page", "final_score_home")
-            away_score = await _smart_text(page, "fs_match_page", "final_score_away")
-            if home_score:
-                enriched['home_score'] = home_score
-            if away_score:
-                enriched['away_score'] = away_score
+        if meta.home_score:
+            enriched['home_score'] = meta.home_score
+        if meta.away_score:
+            enriched['away_score'] = meta.away_score
 
         # --- MATCH DATETIME ---
-        if 'date' in needs or 'time' in needs:
+        if meta.match_time_text:
             try:
-                dt_text = await _smart_text(page, "fs_match_page", "match_time")
-                if dt_text:
-                    date_part, time_part = smart_parse_datetime(dt_text)
-                    if 'date' in needs and date_part:
-                        enriched['date'] = date_part
-                    if 'time' in needs and time_part:
-                        enriched['match_time'] = time_part
+                date_part, time_part = smart_parse_datetime(meta.match_time_text)
+                if 'date' in needs and date_part:
+                    enriched['date'] = date_part
+                if 'time' in needs and time_part:
+                    enriched['match_time'] = time_part
             except:
                 pass
 
         # --- LEAGUE_ID DEEP SCRAPE ---
         if 'league_id' in needs:
             # 3. League URL (Deep Scrape)
-            league_url = await _smart_attr(page, "fs_match_page", "league_url", "href")
+            league_url = meta.league_url
             if league_url:
                 enriched['league_url'] = _standardize_url(league_url)
                 # Parse ID from URL
@@ -270,10 +213,11 @@ async def extract_match_enrichment(page, match_url: str, sel: Dict[str, str],
                     from Core.Browser.Extractors.league_page_extractor import extract_league_metadata
                     l_results_url = enriched.get('league_url')
                     if not l_results_url.endswith('/results/'): l_results_url = l_results_url.rstrip('/') + '/results/'
-                    await page.goto(l_results_url, wait_until='domcontentloaded')
-                    await asyncio.sleep(2)
-                    
-                    league_meta = await extract_league_metadata(page)
+                    async with timings.stage('league_page'):
+                        await page.goto(l_results_url, wait_until='domcontentloaded')
+                        await asyncio.sleep(2)
+                        
+                        league_meta = await extract_league_metadata(page)
                     if league_meta:
                         enriched.update(league_meta)
                 except: pass
@@ -284,12 +228,12 @@ async def extract_match_enrichment(page, match_url: str, sel: Dict[str, str],
         # --- STANDINGS ---
         if extract_standings:
             try:
-                from Core.Browser.Extractors.standings_extractor import activate_standings_tab, extract_standings_data
-                tab_active = await activate_standings_tab(page)
-                if tab_active:
-                    standings_result = await retry_extraction(extract_standings_data, page)
-                    if standings_result:
-                        enriched['_standings_data'] = standings_result
+                async with timings.stage('standings'):
+                    tab_active = await activate_standings_tab(page)
+                    if tab_active:
+                        standings_result = await retry_extraction(extract_standings_data, page)
+                        if standings_result:
+                            enriched['_standings_data'] = standings_result
             except: pass
 
         return enriched if enriched else None
@@ -299,70 +243,92 @@ async def extract_match_enrichment(page, match_url: str, sel: Dict[str, str],
         return None
 
 
-async def process_match_task_isolated(browser: Browser, match: Dict, sel: Dict[str, str], extract_standings: bool) -> Dict:
-    """Worker to enrich a single match within its own context with failure diagnostics."""
+async def _save_failure_diagnostics(page: Page, fixture_id: str) -> Optional[Path]:
+    """AIGO Fallback: screenshot and page source of a failed extraction (best effort, the page may be gone)."""
+    log_dir = Path("Data/Logs/EnrichmentFailures") / fixture_id
+    try:
+        log_dir.mkdir(parents=True, exist_ok=True)
+        await page.screenshot(path=str(log_dir / "failure.png"))
+        with open(log_dir / "source.html", "w", encoding='utf-8') as f:
+            f.write(await page.content())
+    except Exception:
+        return None
+    return log_dir
+
+
+async def process_match_task_isolated(page: Page, match: Dict, sel: Dict[str, str], extract_standings: bool,
+                                     timings: Optional[StageTimings] = None) -> Dict:
+    """
+    Worker to enrich a single match on a pooled page (own context per worker) with failure diagnostics.
+    Errors are re-raised after the diagnostics are saved, so BrowserPool.map marks the page
+    unhealthy, the controller backs off and the task pool retries the fixture.
+    """
     fixture_id = match.get('fixture_id', 'unknown')
     try:
-        context = await browser.new_context(
-            viewport={'width': 1280, 'height': 720},
-            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            ignore_https_errors=True
-        )
-        try:
-            page = await context.new_page()
-            needs = match.get('_enrich_needs', [])
-            enriched = await extract_match_enrichment(page, match['match_link'], sel, extract_standings, needs)
-            if enriched:
-                match.update(enriched)
-            else:
-                # AIGO Fallback: Capture diagnostics on extraction failure
-                log_dir = Path("Data/Logs/EnrichmentFailures") / fixture_id
-                log_dir.mkdir(parents=True, exist_ok=True)
-                
-                screenshot_path = log_dir / "failure.png"
-                html_path = log_dir / "source.html"
-                
-                await page.screenshot(path=str(screenshot_path))
-                with open(html_path, "w", encoding='utf-8') as f:
-                    f.write(await page.content())
-                
-                print(f"      [AIGO Fallback] Extraction failed for {fixture_id}. Diagnostics saved to {log_dir}")
-                
-        except Exception as e:
-            # print(f"      [ISOLATION INFO] Failed to enrich {match.get('fixture_id')}: {str(e)[:100]}")
-            pass
-        finally:
-            await context.close()
+        if JITTER_MAX > 0:
+            await asyncio.sleep(random.random() * JITTER_MAX)
+        needs = match.get('_enrich_needs', [])
+        enriched = await extract_match_enrichment(page, match['match_link'], sel, extract_standings, needs, timings)
     except Exception as e:
-        print(f"      [ISOLATION CRITICAL] Context creation failed for {fixture_id}: {e}")
-    
+        log_dir = await _save_failure_diagnostics(page, fixture_id)
+        saved = f" Diagnostics saved to {log_dir}" if log_dir else ""
+        print(f"      [AIGO Fallback] Enrichment error for {fixture_id}: {str(e)[:100]}.{saved}")
+        raise
+
+    if enriched:
+        match.update(enriched)
+    else:
+        # AIGO Fallback: Capture diagnostics on extraction failure
+        log_dir = await _save_failure_diagnostics(page, fixture_id)
+        if log_dir:
+            print(f"      [AIGO Fallback] Extraction failed for {fixture_id}. Diagnostics saved to {log_dir}")
     return match
 
 
-async def enrich_batch(playwright: Playwright, matches: List[Dict], batch_num: int,
-                       sel: Dict[str, str], extract_standings: bool = False,
-                       concurrency: int = 5) -> List[Dict]:
-    """Process a batch of matches with isolated contexts and throttled concurrency."""
-    browser = await playwright.chromium.launch(
-        headless=True,
-        args=['--disable-gpu', '--no-sandbox', '--disable-setuid-sandbox', '--disable-dev-shm-usage']
-    )
-    
-    semaphore = asyncio.Semaphore(concurrency)
-
-    async def worker(match):
-        async with semaphore:
-            # Enhanced Jitter: random delay between 0.5 and 2.5 seconds
-            import random
-            jitter = 0.5 + random.random() * 2.0
-            await asyncio.sleep(jitter)
-            return await process_match_task_isolated(browser, match, sel, extract_standings)
-
-    # Gather results for all matches in the batch
-    results = await asyncio.gather(*(worker(m) for m in matches))
-    
-    await browser.close()
-    return list(results)
+async def enrich_matches(pool: BrowserPool, matches: List[Dict], sel: Dict[str, str],
+                         extract_standings: bool = False,
+                         timings: Optional[StageTimings] = None) -> AsyncIterator[Dict]:
+    """Streams enriched matches in completion order from the shared browser pool (no batch barriers)."""
+    async def worker(page, match):
+        return await process_match_task_isolated(page, match, sel, extract_standings, timings)
+
+    results = pool.map(worker, matches, timeout=TASK_TIMEOUT, retries=TASK_RETRIES)
+    try:
+        async for match in results:
+            yield match
+    finally:
+        await results.aclose()
+
+
+async def _next_batch(stream: AsyncIterator[Dict], size: int) -> List[Dict]:
+    """Collects up to 'size' items from an async stream (fewer once it is exhausted)."""
+    batch = []
+    async for item in stream:
+        batch.append(item)
+        if len(batch) >= size:
+            break
+    return batch
+
+
+def _throughput(count: int, started: float) -> float:
+    """Fixtures per minute since 'started' (time.monotonic)."""
+    elapsed = time.monotonic() - started
+    return count * 60.0 / elapsed if elapsed > 0 else 0.0
+
+
+def _print_pool_report(pool: BrowserPool, timings: StageTimings, count: int, started: float):
+    print(f"  Throughput:              {_throughput(count, started):.1f} fixtures/min ({count} in {time.monotonic() - started:.0f}s)")
+    limits = " -> ".join(str(limit) for _, limit in pool.controller.history)
+    print(f"  Pages in flight:         {limits} (max {pool.controller.maximum})")
+    print(f"  Contexts:                {pool.stats['contexts_created']} created, {pool.stats['contexts_recycled']} recycled")
+    if pool.tasks is not None:
+        m = pool.tasks.metrics
+        if m.p50 is not None:
+            print(f"  Fixture latency:         p50 {m.p50:.1f}s, p95 {m.p95:.1f}s")
+        print(f"  Timeouts / retries:      {m.timed_out} / {m.retried} ({m.failed} fixtures given up)")
+    if timings.totals:
+        print("  Stage timings:")
+        print(timings.report(indent="    "))
 
 
 def analyze_metadata_gaps(df: pd.DataFrame) -> pd.DataFrame:
@@ -423,6 +389,12 @@ async def resolve_metadata_gaps(df: pd.DataFrame, sync_manager: SyncManager) ->
 
 
 
+def _rewrite_schedules(df: pd.DataFrame):
+    """Replaces schedules.csv with df; pending table-store writes are flushed first so none are lost."""
+    flush_all_tables()
+    df.to_csv(SCHEDULES_CSV, index=False, encoding='utf-8')
+
+
 # ...
 
 async def enrich_all_schedules(limit: Optional[int] = None, dry_run: bool = False,
@@ -478,16 +450,16 @@ async def enrich_all_schedules(limit: Optional[int] = None, dry_run: bool = Fals
         print("  Goal: Proactively harvest all match URLs from active leagues.")
         print("=" * 80)
         
-        if not os.path.exists(REGION_LEAGUE_CSV):
-            print("[WARNING] region_league.csv not found. Skipping league harvesting.")
+        leagues = get_table(REGION_LEAGUE_CSV, key='rl_id')
+        if not len(leagues):
+            print("[WARNING] region_league.csv is missing or empty. Skipping league harvesting.")
         else:
             async with async_playwright() as p:
                 browser = await p.chromium.launch(headless=True)
                 page = await browser.new_page()
                 
-                leagues_df = pd.read_csv(REGION_LEAGUE_CSV, dtype=str).fillna('')
                 # Filter for leagues that have a URL
-                active_leagues = leagues_df[leagues_df['league_url'] != ''].to_dict('records')
+                active_leagues = [row for row in leagues.rows() if row.get('league_url')]
                 
                 print(f"[INFO] Scanning {len(active_leagues)} leagues for new matches...")
                 
@@ -506,8 +478,7 @@ async def enrich_all_schedules(limit: Optional[int] = None, dry_run: bool = Fals
                 if new_match_urls:
                     print(f"[SUCCESS] Harvested {len(new_match_urls)} total match URLs from league pages.")
                     # Load current schedules to avoid duplicates
-                    df_current = pd.read_csv(SCHEDULES_CSV, dtype=str).fillna('')
-                    existing_links = set(df_current['match_link'].tolist())
+                    existing_links = {r.get('match_link', '') for r in get_table(SCHEDULES_CSV).rows()}
                     
                     added_count = 0
                     for m_url in new_match_urls:
@@ -532,8 +503,9 @@ async def enrich_all_schedules(limit: Optional[int] = None, dry_run: bool = Fals
     print("  Goal: Identify and resolve fixture gaps using Pandas & Cloud Merge.")
     print("=" * 80)
 
-    # Load with Pandas for Analysis
-    df_schedules = pd.read_csv(SCHEDULES_CSV, dtype=str).fillna('')
+    # Load with Pandas for Analysis (from the table store, so unflushed Phase 0 saves are included)
+    schedules = get_table(SCHEDULES_CSV)
+    df_schedules = pd.DataFrame(schedules.rows(), columns=schedules.fieldnames, dtype=str).fillna('')
     
     # --- ROW CLEANUP: Remove invalid matches ---
     initial_count = len(df_schedules)
@@ -542,7 +514,7 @@ async def enrich_all_schedules(limit: Optional[int] = None, dry_run: bool = Fals
     if removed_count > 0:
         print(f"[CLEANUP] Removed {removed_count} rows with missing both fixture_id and match_link.")
         if not dry_run:
-            df_schedules.to_csv(SCHEDULES_CSV, index=False, encoding='utf-8')
+            _rewrite_schedules(df_schedules)
 
     gaps_found = analyze_metadata_gaps(df_schedules)
     print(f"[INFO] Initial scan found {len(gaps_found)} fixtures with structural metadata gaps.")
@@ -554,7 +526,7 @@ async def enrich_all_schedules(limit: Optional[int] = None, dry_run: bool = Fals
         print(f"[INFO] Post-resolution gaps: {len(gaps_found)}")
         
         # Save resolved data
-        df_schedules.to_csv(SCHEDULES_CSV, index=False, encoding='utf-8')
+        _rewrite_schedules(df_schedules)
 
     # Convert to list of dicts for the enrichment loop
     all_matches = df_schedules.to_dict('records')
@@ -617,9 +589,9 @@ async def enrich_all_schedules(limit: Optional[int] = None, dry_run: bool = Fals
     to_enrich = final_to_enrich
     print(f"  [PRIORITY] Sorted {len(to_enrich)} tasks. (Capped Priority 3 to {HISTORICAL_GAP_LIMIT})")
 
-    # Calculate auto-scaling concurrency (2-5)
-    calc_concurrency = max(2, min(5, len(to_enrich) // 20))
-    print(f"  [AUTO-SCALE] Concurrency set to: {calc_concurrency}")
+    # Starting concurrency; the pool adapts it to host headroom and page latency from here
+    calc_concurrency = max(MIN_CONCURRENCY, CONCURRENCY)
+    print(f"  [AUTO-SCALE] Starting with {calc_concurrency} pages in flight (adaptive, min {MIN_CONCURRENCY})")
 
     if limit:
         to_enrich = to_enrich[:limit]
@@ -644,16 +616,28 @@ async def enrich_all_schedules(limit: Optional[int] = None, dry_run: bool = Fals
     sync_buffer_leagues = []
     sync_buffer_standings = []
 
+    timings = StageTimings()
+    started = time.monotonic()
+    processed = 0
+
     async with async_playwright() as playwright:
+        pool = BrowserPool(playwright, min_workers=MIN_CONCURRENCY, max_workers=MAX_CONCURRENCY, initial=calc_concurrency,
+                           resource_profile='flashscore', chapter='Prologue P2')
+        stream = enrich_matches(pool, to_enrich, sel, extract_standings, timings)
         try:
-            for batch_idx in range(0, len(to_enrich), BATCH_SIZE):
-                batch = to_enrich[batch_idx:batch_idx + BATCH_SIZE]
-                batch_num = (batch_idx // BATCH_SIZE) + 1
-
-                print(f"\n[BATCH {batch_num}/{total_batches}] Processing {len(batch)} matches...")
-
-                enriched_batch = await enrich_batch(playwright, batch, batch_num, sel, extract_standings, calc_concurrency)
-
+            batch_num = 0
+            while True:
+                # Workers keep running while a completed batch is saved and synced.
+                enriched_batch = await _next_batch(stream, BATCH_SIZE)
+                if not enriched_batch:
+                    break
+                batch_num += 1
+                processed += len(enriched_batch)
+
+                print(f"\n[BATCH {batch_num}/{total_batches}] Completed {len(enriched_batch)} matches "
+                      f"({pool.in_flight} in flight, limit {pool.limit})...")
+
+                persist_started = time.perf_counter()
                 if not dry_run:
                     # Save enriched data
                     for match in enriched_batch:
@@ -747,8 +731,11 @@ async def enrich_all_schedules(limit: Optional[int] = None, dry_run: bool = Fals
 
                         enriched_count += 1
                     
+                    timings.add('persist', time.perf_counter() - persist_started)
+
                     # --- PERIODIC SYNC (Every batch - fulfills "every 10 extractions") ---
                     if not dry_run:
+                        sync_started = time.perf_counter()
                         print(f"   [SYNC] Upserting buffered data for batch {batch_num} to Supabase...")
                         if sync_buffer_schedules:
                             await sync_manager.batch_upsert('schedules', sync_buffer_schedules)
@@ -762,11 +749,14 @@ async def enrich_all_schedules(limit: Optional[int] = None, dry_run: bool = Fals
                         if sync_buffer_standings:
                             await sync_manager.batch_upsert('standings', sync_buffer_standings)
                             sync_buffer_standings = []
+                        timings.add('sync', time.perf_counter() - sync_started)
 
-                print(f"   [+] Enriched {len(enriched_batch)} matches")
+                print(f"   [+] Enriched {len(enriched_batch)} matches ({_throughput(processed, started):.1f} fixtures/min)")
                 print(f"   [+] Teams: {len(teams_added)}, Leagues: {len(leagues_added)}")
 
         finally:
+            await stream.aclose()
+            await pool.close()
             # --- FINAL PROLOGUE SYNC (Chapter 0 Closure) ---
             if not dry_run:
                 print(f"\n   [PROLOGUE] Initiating Final Global Sync...")
@@ -785,6 +775,8 @@ async def enrich_all_schedules(limit: Optional[int] = None, dry_run: bool = Fals
     print("  ENRICHMENT COMPLETE")
     print("=" * 80)
     print(f"  Total enriched:          {enriched_count}")
+    _print_pool_report(pool, timings, processed, started)
+    print_resource_report('Prologue P2')
     print(f"  Teams updated:           {len(teams_added)}")
     print(f"  Leagues updated:         {len(leagues_added)}")
     if extract_standings:
@@ -796,6 +788,65 @@ async def enrich_all_schedules(limit: Optional[int] = None, dry_run: bool = Fals
         print("\n[DRY-RUN] No files were modified")
 
 
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+async def _bench_run(label: str, fixtures: List[Dict], sel: Dict[str, str], **pool_options):
+    timings = StageTimings()
+    started = time.monotonic()
+    count = 0
+    async with async_playwright() as playwright:
+        async with BrowserPool(playwright, chapter=f"Bench {label}", **pool_options) as pool:
+            async for _ in enrich_matches(pool, [dict(f) for f in fixtures], sel, False, timings):
+                count += 1
+    print(f"\n  [{label}]")
+    _print_pool_report(pool, timings, count, started)
+    print_resource_report(f"Bench {label}")
+    return _throughput(count, started)
+
+
+async def run_benchmark(html_dir: str, limit: Optional[int] = None, baseline: bool = False):
+    """
+    Enriches locally saved match pages served over 127.0.0.1 and reports throughput.
+    Nothing is written to Data/Store or synced.
+    """
+    root = Path(html_dir).resolve()
+    pages = sorted(root.rglob('*.html'))[:limit] if limit else sorted(root.rglob('*.html'))
+    if not pages:
+        print(f"[ERROR] No .html files under {root}")
+        return
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), partial(_QuietHandler, directory=str(root)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    fixtures = [{
+        'fixture_id': page.parent.name if page.name == 'source.html' else page.stem,
+        'match_link': f"{base_url}/{page.relative_to(root).as_posix()}",
+        '_enrich_needs': ['ids', 'date', 'time', 'region_league', 'scores'],
+    } for page in pages]
+
+    with open(KNOWLEDGE_PATH, 'r', encoding='utf-8') as f:
+        sel = json.load(f).get('fs_match_page', {})
+
+    print("=" * 80)
+    print(f"  ENRICHMENT BENCHMARK: {len(fixtures)} saved pages from {root}")
+    print("=" * 80)
+    try:
+        pooled = await _bench_run("pooled", fixtures, sel, min_workers=MIN_CONCURRENCY,
+                                  max_workers=MAX_CONCURRENCY, initial=max(MIN_CONCURRENCY, CONCURRENCY),
+                                  resource_profile='flashscore')
+        if baseline:
+            # Previous behaviour: fixed 5 workers, a fresh context per fixture, every asset loaded.
+            legacy = await _bench_run("baseline", fixtures, sel, min_workers=5, max_workers=5,
+                                      initial=5, adaptive=False, max_uses=1)
+            if legacy:
+                print(f"\n  Speedup: {pooled / legacy:.2f}x")
+    finally:
+        server.shutdown()
+
+
 if __name__ == "__main__":
     import argparse
 
@@ -805,9 +856,15 @@ if __name__ == "__main__":
     parser.add_argument('--standings', action='store_true', help='Also extract standings data from Standings tab')
     parser.add_argument('--backfill-predictions', action='store_true', help='Fix region_league/crests in predictions.csv')
     parser.add_argument('--league-page', action='store_true', help='Harvest all match URLs from registered league pages')
+    parser.add_argument('--bench', metavar='DIR', help='Benchmark against saved match pages (*.html) served locally')
+    parser.add_argument('--bench-baseline', action='store_true', help='With --bench, also time the previous per-fixture-context strategy')
     
     args = parser.parse_args()
 
+    if args.bench:
+        asyncio.run(run_benchmark(args.bench, limit=args.limit, baseline=args.bench_baseline))
+        sys.exit(0)
+
     asyncio.run(enrich_all_schedules(
         limit=args.limit,
         dry_run=args.dry_run,
@@ -2,11 +2,10 @@
 # Refactored for Clean Architecture (v2.7)
 # This script displays the top-rated AI predictions for manual review or export.
 
-import csv
 import os
 import sys
 import argparse
-from datetime import datetime, timedelta
+from datetime import datetime
 import json
 from dotenv import load_dotenv
 from supabase import create_client, Client
@@ -26,55 +25,17 @@ project_root = os.path.dirname(script_dir)
 sys.path.append(project_root)
 
 from Data.Access.db_helpers import PREDICTIONS_CSV
-from Data.Access.prediction_accuracy import get_market_option
+from Data.Access.prediction_analytics import PredictionAnalytics, get_prediction_analytics, get_market_option
+from Data.Access.table_store import get_table
 
 def load_data():
     if not os.path.exists(PREDICTIONS_CSV):
         return []
-    with open(PREDICTIONS_CSV, 'r', encoding='utf-8', newline='') as f:
-        return list(csv.DictReader(f))
+    return get_table(PREDICTIONS_CSV, key='fixture_id').rows()
 
 def calculate_market_reliability(predictions):
     """Calculates accuracy for each market type based on historical results."""
-    market_stats = {} # {market_name: {total: 0, correct: 0, recent_total: 0, recent_correct: 0}}
-    
-    now = datetime.now()
-    seven_days_ago = now - timedelta(days=7)
-    
-    for p in predictions:
-        outcome = p.get('outcome_correct')
-        if outcome not in ['True', 'False']:
-            continue
-            
-        try:
-            p_date = datetime.strptime(p.get('date', ''), "%d.%m.%Y")
-        except:
-            continue
-
-        market = get_market_option(p.get('prediction', ''), p.get('home_team', ''), p.get('away_team', ''))
-        if market not in market_stats:
-            market_stats[market] = {'total': 0, 'correct': 0, 'recent_total': 0, 'recent_correct': 0}
-            
-        market_stats[market]['total'] += 1
-        if outcome == 'True':
-            market_stats[market]['correct'] += 1
-            
-        if p_date >= seven_days_ago:
-            market_stats[market]['recent_total'] += 1
-            if outcome == 'True':
-                market_stats[market]['recent_correct'] += 1
-            
-    reliability = {}
-    for m, stats in market_stats.items():
-        overall = stats['correct'] / stats['total'] if stats['total'] >= 3 else 0.5
-        recent = stats['recent_correct'] / stats['recent_total'] if stats['recent_total'] >= 2 else overall
-        reliability[m] = {
-            'overall': overall,
-            'recent': recent,
-            'trend': recent - overall
-        }
-            
-    return reliability
+    return PredictionAnalytics(predictions).market_reliability()
 
 def get_recommendations(target_date=None, show_all_upcoming=False, **kwargs):
     all_predictions = load_data()
@@ -82,8 +43,8 @@ def get_recommendations(target_date=None, show_all_upcoming=False, **kwargs):
         print("No predictions found.")
         return
 
-    # 1. Build reliability index from past results
-    reliability = calculate_market_reliability(all_predictions)
+    # 1. Build reliability index from past results (cached until predictions change)
+    reliability = get_prediction_analytics().market_reliability()
     
     # 2. Filter for future matches
     now = datetime.now()
@@ -226,7 +187,8 @@ def get_recommendations(target_date=None, show_all_upcoming=False, **kwargs):
 
 def save_recommendations_to_predictions_csv(recommendations):
     """Updates predictions.csv with is_recommended flag and score."""
-    if not os.path.exists(PREDICTIONS_CSV):
+    table = get_table(PREDICTIONS_CSV, key='fixture_id')
+    if not len(table):
         print(f"[Error] predictions.csv not found at {PREDICTIONS_CSV}")
         return
 
@@ -237,44 +199,29 @@ def save_recommendations_to_predictions_csv(recommendations):
     # Also map by team names for fallback
     rec_map_teams = {f"{r['match']}_{r['date']}": r for r in recommendations}
 
-    updated_rows = []
-    headers = []
+    updates = {}
     updates_count = 0
 
     try:
-        with open(PREDICTIONS_CSV, 'r', newline='', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            headers = reader.fieldnames
-            data = list(reader)
-
-        if 'is_recommended' not in headers:
-            headers.append('is_recommended')
-        if 'recommendation_score' not in headers:
-            headers.append('recommendation_score')
-
-        for row in data:
+        for row in table.rows():
             # Reset by default to ensure clean state
-            row['is_recommended'] = 'False'
-            row['recommendation_score'] = '0.0'
+            flags = {'is_recommended': 'False', 'recommendation_score': '0.0'}
 
             # Try to match
             fid = row.get('fixture_id')
             match_key = f"{row.get('home_team')} vs {row.get('away_team')}_{row.get('date')}"
-            
+
             matched_rec = rec_map.get(fid) or rec_map_teams.get(match_key)
 
             if matched_rec:
-                row['is_recommended'] = 'True'
-                row['recommendation_score'] = str(matched_rec['score'])
+                flags = {'is_recommended': 'True', 'recommendation_score': str(matched_rec['score'])}
                 updates_count += 1
-            
-            updated_rows.append(row)
 
-        with open(PREDICTIONS_CSV, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=headers)
-            writer.writeheader()
-            writer.writerows(updated_rows)
-            
+            # Only rows whose flags change are written (and queued for sync)
+            if fid and any(row.get(k, '') != v for k, v in flags.items()):
+                updates[fid] = flags
+
+        table.update_many(updates)
         print(f"[DB] Updated predictions.csv with {updates_count} recommendations.")
 
     except Exception as e:
@@ -0,0 +1,78 @@
+# run_backtest.py: Command-line RuleConfig sweep on the multi-core backtest engine.
+# Refactored for Clean Architecture (v2.8)
+# This script runs a grid or random sample of RuleConfig variants and prints the leaderboard.
+
+"""
+Usage:
+    python Scripts/run_backtest.py --sample 64 [--spread 0.5] [--seed 1]
+    python Scripts/run_backtest.py --grid form_no_score=3,5,7 --grid h2h_draw=2,4
+    python Scripts/run_backtest.py --config Data/Store/rule_config.json --sample 32
+
+Options:
+    --workers N        Process count (default LEO_BACKTEST_WORKERS or all cores)
+    --limit N          Only the first N eligible fixtures (quick checks)
+    --no-point-in-time Let form/H2H see results after the fixture (old behaviour)
+    --no-write         Do not append to Data/Store/backtest_results.csv
+"""
+
+import argparse
+import json
+import os
+import sys
+
+# Add project root to path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.append(project_root)
+
+from Core.Intelligence.backtest_engine import run_backtest, config_grid, config_sample
+from Core.Intelligence.rule_config import RuleConfig
+
+
+def _parse_grid(specs):
+    grid = {}
+    for spec in specs:
+        field, _, values = spec.partition('=')
+        if not values:
+            raise SystemExit(f"Bad --grid '{spec}', expected field=v1,v2,...")
+        grid[field.strip()] = [float(v) for v in values.split(',')]
+    return grid
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest RuleConfig variants over all finished fixtures.")
+    parser.add_argument('--config', help='Base RuleConfig JSON (defaults to RuleConfig())')
+    parser.add_argument('--grid', action='append', default=[], help='field=v1,v2,... (repeatable)')
+    parser.add_argument('--sample', type=int, default=0, help='Random variants around the base config')
+    parser.add_argument('--spread', type=float, default=0.5)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--limit', type=int, default=None)
+    parser.add_argument('--no-point-in-time', action='store_true')
+    parser.add_argument('--no-write', action='store_true')
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    base = RuleConfig()
+    if args.config:
+        with open(args.config, 'r') as f:
+            data = json.load(f)
+        base = RuleConfig(**{k: v for k, v in data.items() if k in RuleConfig.__annotations__})
+
+    configs = [base]
+    if args.grid:
+        configs += config_grid(_parse_grid(args.grid), base=base)
+    if args.sample:
+        configs += config_sample(args.sample, spread=args.spread, seed=args.seed, base=base)
+
+    run = run_backtest(configs, workers=args.workers, point_in_time=not args.no_point_in_time,
+                       limit=args.limit, write=not args.no_write)
+
+    overall = sorted((r for r in run['results'] if r['scope'] == 'ALL'), key=lambda r: r['roi_pct'], reverse=True)
+    print(f"\n  {'config':<24}{'graded':>8}{'hit %':>8}{'ROI %':>8}{'brier':>8}")
+    for r in overall[:args.top]:
+        print(f"  {r['config_name']:<24}{r['evaluated']:>8}{r['hit_rate']:>8}{r['roi_pct']:>8}{r['brier'] if r['brier'] is not None else '-':>8}")
+
+
+if __name__ == "__main__":
+    main()
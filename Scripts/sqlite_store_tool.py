@@ -0,0 +1,86 @@
+# sqlite_store_tool.py: Import/export utility for the SQLite storage backend.
+# Refactored for Clean Architecture (v2.8)
+# This script round-trips every Data/Store CSV table to and from leobook.db.
+
+"""
+Usage:
+    python Scripts/sqlite_store_tool.py import            # CSV -> SQLite (all tables)
+    python Scripts/sqlite_store_tool.py export            # SQLite -> CSV (all tables)
+    python Scripts/sqlite_store_tool.py export --tables predictions fb_matches
+    python Scripts/sqlite_store_tool.py verify            # Row/key parity check
+
+Export writes the exact CSV layout (headers from db_helpers.files_and_headers plus
+any extra columns) so SyncManager and the Flutter app keep working unchanged.
+"""
+
+import argparse
+import csv
+import os
+import sys
+
+# Add project root to path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.append(project_root)
+
+from Data.Access.db_helpers import files_and_headers
+from Data.Access.sync_manager import TABLE_CONFIG
+from Data.Access.sqlite_store import SqliteTable, SQLITE_DB_PATH
+
+
+def _tables(selected=None):
+    """Yields a SqliteTable for every configured CSV table (optionally filtered by name)."""
+    for filepath, headers in files_and_headers.items():
+        name = os.path.splitext(os.path.basename(filepath))[0]
+        if selected and name not in selected:
+            continue
+        key = next((conf['key'] for conf in TABLE_CONFIG.values() if conf['csv'] == os.path.basename(filepath)), None)
+        if not key:
+            print(f"  [Skip] {name}: no key in TABLE_CONFIG")
+            continue
+        yield SqliteTable(filepath, headers, key)
+
+
+def import_tables(selected=None):
+    for table in _tables(selected):
+        count = table.import_csv()
+        print(f"  [Import] {table.name}: {count} rows -> {SQLITE_DB_PATH}")
+
+
+def export_tables(selected=None):
+    for table in _tables(selected):
+        count = table.export_csv()
+        print(f"  [Export] {table.name}: {count} rows -> {table.filepath}")
+
+
+def verify_tables(selected=None):
+    """Compares keyed CSV rows with the SQLite table. Returns True when all tables match."""
+    ok = True
+    for table in _tables(selected):
+        if not os.path.exists(table.filepath):
+            continue
+        with open(table.filepath, 'r', newline='', encoding='utf-8') as f:
+            csv_rows = {r[table.key]: r for r in csv.DictReader(f) if r.get(table.key)}
+        db_rows = {r[table.key]: r for r in table.rows()}
+        mismatched = [k for k, r in csv_rows.items() if k not in db_rows or any(
+            (r.get(c) or '') != db_rows[k].get(c, '') for c in r if c
+        )]
+        extra = len(set(db_rows) - set(csv_rows))
+        status = "OK" if not mismatched and not extra else "MISMATCH"
+        ok = ok and status == "OK"
+        print(f"  [{status}] {table.name}: csv={len(csv_rows)} db={len(db_rows)} mismatched={len(mismatched)} db_only={extra}")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Round-trip Data/Store CSV tables through the SQLite backend.")
+    parser.add_argument('command', choices=['import', 'export', 'verify'])
+    parser.add_argument('--tables', nargs='*', help='Table names (e.g. predictions schedules). Default: all')
+    args = parser.parse_args()
+
+    if args.command == 'import':
+        import_tables(args.tables)
+    elif args.command == 'export':
+        export_tables(args.tables)
+    else:
+        sys.exit(0 if verify_tables(args.tables) else 1)